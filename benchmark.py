@@ -6,13 +6,74 @@ from __future__ import unicode_literals
 from __future__ import absolute_import
 
 import argparse
+import base64
+import collections
+import http.client
+import json
 import platform
+import socket
 import os
 import os.path as p
 import subprocess
 import sys
+import tempfile
+import threading
+import time
 
 DIR_OF_THIS_SCRIPT = p.dirname( p.abspath( __file__ ) )
+sys.path.insert( 0, DIR_OF_THIS_SCRIPT )
+
+HMAC_HEADER = 'x-ycm-hmac'
+# Requests never replayed: the server must not be shut down before the end of
+# the recording and long polls only return when a message is available or after
+# a timeout, which would dominate the replay time.
+SKIPPED_REPLAY_PATHS = ( '/shutdown', '/receive_messages' )
+REPLAYED_POLL_PATHS = ( '/shutdown', )
+# Server name, extra ycmd arguments and whether it serves on a Unix socket.
+SERVER_MODES = [
+  ( 'thread-per-request', [], False ),
+  ( 'pooled', [ '--server_threads=4' ], False ),
+  ( 'unix', [], True ),
+  ( 'unix-pooled', [ '--server_threads=4' ], True ),
+]
+# Fake language server writing |count| responses of about |size| bytes to its
+# stdout as fast as possible. The result is either a list of locations, as for
+# a references request, or a single string, which is cheap to decode so that
+# reading the frames dominates.
+FAKE_LANGUAGE_SERVER = """
+import sys
+size, count, kind = int( sys.argv[ 1 ] ), int( sys.argv[ 2 ] ), sys.argv[ 3 ]
+if kind == 'locations':
+  item = ( b'{"uri":"file:///foo/bar.cpp","range":{"start":{"line":1,'
+           b'"character":2},"end":{"line":1,"character":5}}}' )
+  result = b'[' + b','.join( [ item ] * ( size // ( len( item ) + 1 ) ) ) + b']'
+else:
+  result = b'"' + b'x' * size + b'"'
+for i in range( count ):
+  content = b'{"jsonrpc":"2.0","id":%d,"result":%s}' % ( i, result )
+  sys.stdout.buffer.write( b'Content-Length: %d\\r\\n\\r\\n' % len( content ) )
+  sys.stdout.buffer.write( content )
+sys.stdout.buffer.flush()
+"""
+# Size in bytes and number of the frames read from the fake language server.
+LANGUAGE_SERVER_FRAMES = [
+  ( 1 << 10, 20000 ),
+  ( 1 << 16, 1000 ),
+  ( 1 << 20, 100 ),
+  ( 1 << 24, 5 ),
+]
+LANGUAGE_SERVER_RESULTS = [ 'string', 'locations' ]
+
+
+class UnixHTTPConnection( http.client.HTTPConnection ):
+  def __init__( self, path ):
+    super().__init__( 'localhost' )
+    self._path = path
+
+
+  def connect( self ):
+    self.sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+    self.sock.connect( self._path )
 
 
 def ParseArguments():
@@ -20,6 +81,34 @@ def ParseArguments():
   parser.add_argument( '--msvc', type = int, choices = [ 15, 16, 17 ],
                        default = 16, help = 'Choose the Microsoft Visual '
                        'Studio version (default: %(default)s).' )
+  parser.add_argument( '--server', action = 'store_true',
+                       help = 'Measure the request latency of the ycmd HTTP '
+                       'server in each of its modes instead of running the '
+                       'ycm_core benchmarks. Requires a built ycmd.' )
+  parser.add_argument( '--requests', type = int, default = 1000,
+                       help = 'Number of requests sent to the server for each '
+                       'endpoint (default: %(default)s).' )
+  parser.add_argument( '--replay', type = str, metavar = 'RECORDING',
+                       help = 'Replay the requests recorded by ycmd with '
+                       '--record_requests against a new ycmd server and '
+                       'report the latency and throughput of each endpoint. '
+                       'Requires a built ycmd.' )
+  parser.add_argument( '--speed', type = float, default = 0,
+                       help = 'Pace at which the recording is replayed: 1 for '
+                       'the recorded pace, 2 for twice as fast, etc. 0 sends '
+                       'the requests as fast as possible (default: '
+                       '%(default)s).' )
+  parser.add_argument( '--server_mode', default = SERVER_MODES[ 0 ][ 0 ],
+                       choices = [ mode[ 0 ] for mode in SERVER_MODES ],
+                       help = 'Server mode used to replay the recording '
+                       '(default: %(default)s).' )
+  parser.add_argument( '--language_server', action = 'store_true',
+                       help = 'Measure how fast responses of various sizes are '
+                       'read from a fake language server over stdio instead '
+                       'of running the ycm_core benchmarks.' )
+  parser.add_argument( '--replay_polls', action = 'store_true',
+                       help = 'Also replay the /receive_messages long-poll '
+                       'requests, which block until a message is available.' )
 
   return parser.parse_known_args()
 
@@ -38,9 +127,269 @@ def BuildYcmdLibsAndRunBenchmark( args, extra_args ):
   subprocess.check_call( build_cmd )
 
 
+def StartYcmd( hmac_secret, extra_args, unix_socket_dir ):
+  from ycmd.user_options_store import DefaultOptions
+  from ycmd.utils import GetUnusedLocalhostPort
+
+  options = DefaultOptions()
+  options[ 'hmac_secret' ] = base64.b64encode( hmac_secret ).decode()
+  with tempfile.NamedTemporaryFile( mode = 'w',
+                                    delete = False ) as options_file:
+    json.dump( options, options_file )
+
+  if unix_socket_dir:
+    path = p.join( unix_socket_dir, 'ycmd.sock' )
+    extra_args = extra_args + [ f'--unix_socket={ path }' ]
+    connection = UnixHTTPConnection( path )
+  else:
+    port = GetUnusedLocalhostPort()
+    extra_args = extra_args + [ f'--port={ port }' ]
+    connection = http.client.HTTPConnection( '127.0.0.1', port )
+
+  ycmd = subprocess.Popen( [ sys.executable,
+                             p.join( DIR_OF_THIS_SCRIPT, 'ycmd' ),
+                             f'--options_file={ options_file.name }',
+                             '--log=error' ] + extra_args,
+                           stdout = subprocess.DEVNULL,
+                           stderr = subprocess.DEVNULL )
+  return ycmd, connection
+
+
+def SendRequest( connection, hmac_secret, method, path, data = None ):
+  from ycmd.hmac_utils import CreateRequestHmac
+
+  body = json.dumps( data ).encode() if data else b''
+  request_hmac = CreateRequestHmac( method.encode(),
+                                    path.encode(),
+                                    body,
+                                    hmac_secret )
+  headers = { 'content-type': 'application/json',
+              HMAC_HEADER: base64.b64encode( request_hmac ).decode() }
+  try:
+    connection.request( method, path, body = body, headers = headers )
+    response = connection.getresponse()
+    content = response.read()
+  except ( http.client.HTTPException, OSError ):
+    connection.close()
+    raise
+  if response.status != 200:
+    raise RuntimeError( f'{ method } { path } failed with status '
+                        f'{ response.status }: { content }' )
+  return content
+
+
+def WaitUntilReady( connection, hmac_secret, timeout = 60 ):
+  expiration = time.time() + timeout
+  while time.time() < expiration:
+    try:
+      SendRequest( connection, hmac_secret, 'GET', '/ready' )
+      return
+    except ( http.client.HTTPException, OSError ):
+      time.sleep( 0.1 )
+  raise RuntimeError( f'ycmd did not start in { timeout } seconds.' )
+
+
+def CompletionRequest():
+  filepath = p.join( DIR_OF_THIS_SCRIPT, 'benchmark.py' )
+  with open( filepath ) as f:
+    contents = f.read()
+  return {
+    'filepath': filepath,
+    'line_num': 1,
+    'column_num': 2,
+    'file_data': {
+      filepath: {
+        'contents': contents,
+        'filetypes': [ 'python' ]
+      }
+    },
+    'completer_target': 'identifier'
+  }
+
+
+def Percentile( sorted_values, percentile ):
+  index = min( len( sorted_values ) - 1,
+               int( len( sorted_values ) * percentile / 100 ) )
+  return sorted_values[ index ]
+
+
+def RunServerBenchmark( args ):
+  hmac_secret = os.urandom( 16 )
+  endpoints = [
+    ( 'GET', '/ready', None ),
+    ( 'POST', '/completions', CompletionRequest() ),
+  ]
+
+  print( f'{ "Server":<20}{ "Endpoint":<16}'
+         f'{ "mean (ms)":>12}{ "p50 (ms)":>12}{ "p95 (ms)":>12}'
+         f'{ "p99 (ms)":>12}' )
+  for mode, extra_args, use_unix_socket in SERVER_MODES:
+    if use_unix_socket and not hasattr( socket, 'AF_UNIX' ):
+      continue
+    with tempfile.TemporaryDirectory() as temp_dir:
+      ycmd, connection = StartYcmd( hmac_secret,
+                                    extra_args,
+                                    temp_dir if use_unix_socket else None )
+      try:
+        WaitUntilReady( connection, hmac_secret )
+        for method, path, data in endpoints:
+          latencies = []
+          for _ in range( args.requests ):
+            start = time.perf_counter()
+            SendRequest( connection, hmac_secret, method, path, data )
+            latencies.append( ( time.perf_counter() - start ) * 1000 )
+          latencies.sort()
+          print( f'{ mode:<20}{ path:<16}'
+                 f'{ sum( latencies ) / len( latencies ):>12.3f}'
+                 f'{ Percentile( latencies, 50 ):>12.3f}'
+                 f'{ Percentile( latencies, 95 ):>12.3f}'
+                 f'{ Percentile( latencies, 99 ):>12.3f}' )
+      finally:
+        connection.close()
+        ycmd.terminate()
+        ycmd.wait()
+
+
+def RunLanguageServerBenchmark():
+  from ycmd.completers.language_server.language_server_completer import (
+    LanguageServerConnectionStopped,
+    StandardIOLanguageServerConnection )
+
+  class Connection( StandardIOLanguageServerConnection ):
+    def __init__( self, server_stdout ):
+      super().__init__( None, None, None, server_stdout, None )
+      self.decode_thread_done = threading.Event()
+
+
+    def IsStopped( self ):
+      return True
+
+
+    def _DecodeMessages( self ):
+      super()._DecodeMessages()
+      self.decode_thread_done.set()
+
+
+    def _DispatchMessage( self, message ):
+      pass
+
+  print( f'{ "Result":<12}{ "Frame size":>12}{ "frames":>8}'
+         f'{ "total (ms)":>12}{ "per frame (ms)":>16}{ "MB/s":>10}' )
+  for kind in LANGUAGE_SERVER_RESULTS:
+    for size, count in LANGUAGE_SERVER_FRAMES:
+      server = subprocess.Popen( [ sys.executable,
+                                   '-c',
+                                   FAKE_LANGUAGE_SERVER,
+                                   str( size ),
+                                   str( count ),
+                                   kind ],
+                                 stdin = subprocess.DEVNULL,
+                                 stdout = subprocess.PIPE )
+      connection = Connection( server.stdout )
+      start = time.perf_counter()
+      try:
+        connection._ReadMessages()
+      except LanguageServerConnectionStopped:
+        pass
+      # Large frames are decoded by another thread.
+      connection.decode_thread_done.wait()
+      elapsed = time.perf_counter() - start
+      server.stdout.close()
+      server.wait()
+      print( f'{ kind:<12}{ size:>12}{ count:>8}{ elapsed * 1000:>12.1f}'
+             f'{ elapsed * 1000 / count:>16.3f}'
+             f'{ size * count / elapsed / ( 1 << 20 ):>10.1f}' )
+
+
+def LoadRecording( path ):
+  with open( path, encoding = 'utf-8' ) as recording:
+    return [ json.loads( line ) for line in recording if line.strip() ]
+
+
+def ReplayRequests( args, connection, hmac_secret, requests ):
+  """Sends the recorded |requests| one after the other. Returns the latencies in
+  milliseconds and number of errors of each endpoint and the total time spent
+  replaying them."""
+  latencies = collections.defaultdict( list )
+  errors = collections.Counter()
+  first_request_time = requests[ 0 ][ 'time' ] if requests else 0
+  start = time.perf_counter()
+  for request in requests:
+    if args.speed > 0:
+      delay = ( ( request[ 'time' ] - first_request_time ) / args.speed -
+                ( time.perf_counter() - start ) )
+      if delay > 0:
+        time.sleep( delay )
+
+    path = request[ 'path' ].split( '?' )[ 0 ]
+    endpoint = f'{ request[ "method" ] } { path }'
+    request_start = time.perf_counter()
+    try:
+      SendRequest( connection,
+                   hmac_secret,
+                   request[ 'method' ],
+                   request[ 'path' ],
+                   request[ 'body' ] )
+    except ( RuntimeError, http.client.HTTPException, OSError ):
+      errors[ endpoint ] += 1
+    latencies[ endpoint ].append(
+      ( time.perf_counter() - request_start ) * 1000 )
+  return latencies, errors, time.perf_counter() - start
+
+
+def ReplayRecording( args ):
+  requests = [ request for request in LoadRecording( args.replay )
+               if request[ 'path' ].split( '?' )[ 0 ] not in
+                  ( REPLAYED_POLL_PATHS if args.replay_polls else
+                    SKIPPED_REPLAY_PATHS ) ]
+  _, extra_args, use_unix_socket = next(
+    mode for mode in SERVER_MODES if mode[ 0 ] == args.server_mode )
+  if use_unix_socket and not hasattr( socket, 'AF_UNIX' ):
+    sys.exit( 'Unix domain sockets are not supported on this platform.' )
+
+  hmac_secret = os.urandom( 16 )
+  with tempfile.TemporaryDirectory() as temp_dir:
+    ycmd, connection = StartYcmd( hmac_secret,
+                                  extra_args,
+                                  temp_dir if use_unix_socket else None )
+    try:
+      WaitUntilReady( connection, hmac_secret )
+      latencies, errors, elapsed = ReplayRequests( args,
+                                                   connection,
+                                                   hmac_secret,
+                                                   requests )
+    finally:
+      connection.close()
+      ycmd.terminate()
+      ycmd.wait()
+
+  print( f'{ "Endpoint":<36}{ "count":>8}{ "errors":>8}{ "req/s":>10}'
+         f'{ "mean (ms)":>12}{ "p50 (ms)":>12}{ "p95 (ms)":>12}'
+         f'{ "p99 (ms)":>12}' )
+  for endpoint, endpoint_latencies in sorted( latencies.items() ):
+    endpoint_latencies.sort()
+    count = len( endpoint_latencies )
+    print( f'{ endpoint:<36}{ count:>8}{ errors[ endpoint ]:>8}'
+           f'{ count / elapsed:>10.1f}'
+           f'{ sum( endpoint_latencies ) / count:>12.3f}'
+           f'{ Percentile( endpoint_latencies, 50 ):>12.3f}'
+           f'{ Percentile( endpoint_latencies, 95 ):>12.3f}'
+           f'{ Percentile( endpoint_latencies, 99 ):>12.3f}' )
+  print( f'Replayed { len( requests ) } requests in { elapsed:.3f} s '
+         f'({ len( requests ) / elapsed:.1f} requests/s, '
+         f'{ sum( errors.values() ) } errors).' )
+
+
 def Main():
   args, extra_args = ParseArguments()
-  BuildYcmdLibsAndRunBenchmark( args, extra_args )
+  if args.replay:
+    ReplayRecording( args )
+  elif args.language_server:
+    RunLanguageServerBenchmark()
+  elif args.server:
+    RunServerBenchmark( args )
+  else:
+    BuildYcmdLibsAndRunBenchmark( args, extra_args )
 
 
 if __name__ == "__main__":
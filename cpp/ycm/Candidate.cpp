@@ -20,24 +20,29 @@
 
 namespace YouCompleteMe {
 
-void Candidate::ComputeCaseSwappedText() {
-  for ( const auto &character : Characters() ) {
-    case_swapped_text_.append( character->SwappedCase() );
+namespace {
+
+std::string ComputeCaseSwappedText( const CharacterSequence &characters ) {
+  std::string case_swapped_text;
+  for ( const auto &character : characters ) {
+    case_swapped_text.append( character->SwappedCase() );
   }
+  return case_swapped_text;
 }
 
 
-void Candidate::ComputeWordBoundaryChars() {
-  const CharacterSequence &characters = Characters();
+CharacterSequence ComputeWordBoundaryChars(
+  const CharacterSequence &characters ) {
+  CharacterSequence word_boundary_chars;
 
   auto character_pos = characters.begin();
   if ( character_pos == characters.end() ) {
-    return;
+    return word_boundary_chars;
   }
 
   const auto &first_character = *character_pos;
   if ( !first_character->IsPunctuation() ) {
-    word_boundary_chars_.push_back( first_character );
+    word_boundary_chars.push_back( first_character );
   }
 
   auto previous_character_pos = characters.begin();
@@ -49,29 +54,39 @@ void Candidate::ComputeWordBoundaryChars() {
 
     if ( ( !previous_character->IsUppercase() && character->IsUppercase() ) ||
          ( previous_character->IsPunctuation() && character->IsLetter() ) ) {
-      word_boundary_chars_.push_back( character );
+      word_boundary_chars.push_back( character );
     }
   }
+
+  return word_boundary_chars;
 }
 
 
-void Candidate::ComputeTextIsLowercase() {
-  for ( const auto &character : Characters() ) {
+bool ComputeTextIsLowercase( const CharacterSequence &characters ) {
+  for ( const auto &character : characters ) {
     if ( character->IsUppercase() ) {
-      text_is_lowercase_ = false;
-      return;
+      return false;
     }
   }
 
-  text_is_lowercase_ = true;
+  return true;
 }
 
+} // unnamed namespace
+
 
 Candidate::Candidate( std::string&& text )
-  : Word( std::move( text ) ) {
-  ComputeCaseSwappedText();
-  ComputeWordBoundaryChars();
-  ComputeTextIsLowercase();
+  : Candidate( text, BreakIntoCharacters( text ) ) {
+}
+
+
+Candidate::Candidate( std::string_view text,
+                      const CharacterSequence &characters )
+  : Word( text,
+          characters,
+          ComputeWordBoundaryChars( characters ),
+          ComputeCaseSwappedText( characters ) ),
+    text_is_lowercase_( ComputeTextIsLowercase( characters ) ) {
 }
 
 
@@ -100,8 +115,8 @@ Result Candidate::QueryMatchResult( const Word &query ) const {
   size_t candidate_index = 0;
   size_t index_sum = 0;
 
-  const CharacterSequence &query_characters = query.Characters();
-  const CharacterSequence &candidate_characters = Characters();
+  CharacterView query_characters = query.Characters();
+  CharacterView candidate_characters = Characters();
 
   auto query_character_pos = query_characters.begin();
   auto candidate_character_pos = candidate_characters.begin();
@@ -20,33 +20,32 @@
 
 #include "Word.h"
 
-#include <memory>
 #include <string>
+#include <string_view>
 
 namespace YouCompleteMe {
 
 class Result;
 
+// The case swapped text and the word boundary characters are stored with the
+// text and the characters of the word.
 class Candidate : public Word {
 public:
 
   YCM_EXPORT explicit Candidate( std::string&& text );
   // Make class noncopyable
-private:
-  Candidate( const Candidate& ) = default;
-  Candidate& operator=( const Candidate& ) = default;
-public:
-  Candidate clone() const { return *this; }
+  Candidate( const Candidate& ) = delete;
+  Candidate& operator=( const Candidate& ) = delete;
   Candidate( Candidate&& ) = default;
   Candidate& operator=( Candidate&& ) = default;
   ~Candidate() = default;
 
-  inline const std::string &CaseSwappedText() const {
-    return case_swapped_text_;
+  inline std::string_view CaseSwappedText() const {
+    return ExtraText();
   }
 
-  inline const CharacterSequence &WordBoundaryChars() const {
-    return word_boundary_chars_;
+  inline CharacterView WordBoundaryChars() const {
+    return ExtraCharacters();
   }
 
   inline bool TextIsLowercase() const {
@@ -56,12 +55,8 @@ public:
   YCM_EXPORT Result QueryMatchResult( const Word &query ) const;
 
 private:
-  void ComputeCaseSwappedText();
-  void ComputeTextIsLowercase();
-  void ComputeWordBoundaryChars();
+  Candidate( std::string_view text, const CharacterSequence &characters );
 
-  std::string case_swapped_text_;
-  CharacterSequence word_boundary_chars_;
   bool text_is_lowercase_;
 };
 
@@ -18,6 +18,7 @@
 #ifndef CHARACTER_H_YTIET2HZ
 #define CHARACTER_H_YTIET2HZ
 
+#include <algorithm>
 #include <string>
 #include <string_view>
 #include <vector>
@@ -112,6 +113,50 @@ YCM_EXPORT std::string NormalizeInput( std::string_view text );
 
 using CharacterSequence = std::vector< const Character * >;
 
+
+// A non-owning view of a contiguous sequence of characters, like the characters
+// of a Word.
+class CharacterView {
+public:
+  using value_type = const Character *;
+  using const_iterator = const Character * const *;
+  using iterator = const_iterator;
+
+  CharacterView() = default;
+  CharacterView( const Character * const *characters, size_t size )
+    : characters_( characters ),
+      size_( size ) {
+  }
+
+  inline const_iterator begin() const {
+    return characters_;
+  }
+
+  inline const_iterator end() const {
+    return characters_ + size_;
+  }
+
+  inline size_t size() const {
+    return size_;
+  }
+
+  inline bool empty() const {
+    return size_ == 0;
+  }
+
+  inline const Character *operator[]( size_t index ) const {
+    return characters_[ index ];
+  }
+
+  inline bool operator==( const CharacterView &other ) const {
+    return std::equal( begin(), end(), other.begin(), other.end() );
+  }
+
+private:
+  const Character * const *characters_ = nullptr;
+  size_t size_ = 0;
+};
+
 } // namespace YouCompleteMe
 
 #endif /* end of include guard: CHARACTER_H_YTIET2HZ */
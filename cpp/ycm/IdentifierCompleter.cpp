@@ -19,11 +19,17 @@
 
 #include "Candidate.h"
 #include "IdentifierUtils.h"
-#include "Result.h"
 #include "Utils.h"
 
 namespace YouCompleteMe {
 
+namespace {
+
+// The number of bytes compared to check that a tags file only grew.
+const size_t MAX_TAG_FILE_TAIL_SIZE = 1 << 12;
+
+} // unnamed namespace
+
 
 IdentifierCompleter::IdentifierCompleter(
   std::vector< std::string > candidates ) {
@@ -61,11 +67,84 @@ void IdentifierCompleter::ClearForFileAndAddIdentifiersToDatabase(
 }
 
 
+void IdentifierCompleter::ClearForFilesAndAddIdentifiersToDatabase(
+  FiletypeIdentifierMap&& filetype_identifier_map ) {
+  identifier_database_.RecreateIdentifiers(
+    std::move( filetype_identifier_map ) );
+}
+
+
+void IdentifierCompleter::AddIdentifiersToDatabase(
+  std::vector< std::string >& new_candidates,
+  std::string& filetype,
+  std::string& filepath ) {
+  identifier_database_.AddIdentifiers( std::move( new_candidates ),
+                                       std::move( filetype ),
+                                       std::move( filepath ) );
+}
+
+
+void IdentifierCompleter::RemoveIdentifiersFromDatabase(
+  std::vector< std::string >& candidates,
+  std::string& filetype,
+  std::string& filepath ) {
+  identifier_database_.RemoveIdentifiers( std::move( candidates ),
+                                          std::move( filetype ),
+                                          std::move( filepath ) );
+}
+
+
 void IdentifierCompleter::AddIdentifiersToDatabaseFromTagFiles(
   std::vector< std::string >& absolute_paths_to_tag_files ) {
+  std::lock_guard locker( tag_files_mutex_ );
   for( auto&& path : absolute_paths_to_tag_files ) {
+    AddIdentifiersFromTagFile( std::move( path ) );
+  }
+}
+
+
+// WARNING: You need to hold the tag_files_mutex_ before calling this function.
+void IdentifierCompleter::AddIdentifiersFromTagFile( std::string&& path ) {
+  auto& tag_file = tag_files_[ path ];
+
+  // If the file still starts with what was ingested, only read from the end of
+  // the bytes kept to check that.
+  size_t offset = tag_file.size - tag_file.tail.size();
+  std::string tags;
+  try {
+    tags = ReadFile( path, offset );
+  } catch ( ... ) {
+  }
+  bool appended = tag_file.size > 0 &&
+                  tags.size() > tag_file.tail.size() &&
+                  std::string_view( tags ).substr(
+                    0, tag_file.tail.size() ) == tag_file.tail;
+  if ( !appended && offset > 0 ) {
+    offset = 0;
+    try {
+      tags = ReadFile( path );
+    } catch ( ... ) {
+      tags.clear();
+    }
+  }
+
+  // The last line may still be written. It is ingested, but read again next
+  // time.
+  size_t lines_end = tags.rfind( '\n' ) + 1;
+  size_t tail_begin = lines_end - std::min( lines_end, MAX_TAG_FILE_TAIL_SIZE );
+  std::string_view new_tags( tags );
+  if ( appended ) {
+    new_tags.remove_prefix( tag_file.tail.size() );
+  }
+  tag_file.size = offset + lines_end;
+  tag_file.tail = tags.substr( tail_begin, lines_end - tail_begin );
+
+  if ( appended ) {
+    identifier_database_.AddIdentifiers(
+      ExtractIdentifiersFromTags( new_tags, path ) );
+  } else {
     identifier_database_.RecreateIdentifiers(
-      ExtractIdentifiersFromTagsFile( std::move( path ) ) );
+      ExtractIdentifiersFromTags( new_tags, path ) );
   }
 }
 
@@ -80,21 +159,13 @@ std::vector< std::string > IdentifierCompleter::CandidatesForQuery(
 std::vector< std::string > IdentifierCompleter::CandidatesForQueryAndType(
   std::string& query,
   const std::string &filetype,
-  const size_t max_candidates ) const {
-
-  std::vector< Result > results =
-    identifier_database_.ResultsForQueryAndType( std::move( query ),
-                                                 filetype,
-                                                 max_candidates );
-
-  std::vector< std::string > candidates( results.size() );
-
-  std::transform( results.begin(),
-                  results.end(),
-                  candidates.begin(),
-                  []( const Result& result ) { return result.Text(); } );
+  const size_t max_candidates,
+  const std::string &filepath ) const {
 
-  return candidates;
+  return identifier_database_.CandidatesForQueryAndType( std::move( query ),
+                                                       filetype,
+                                                       max_candidates,
+                                                       filepath );
 }
 
 
@@ -20,6 +20,7 @@
 
 #include "IdentifierDatabase.h"
 
+#include <mutex>
 #include <string>
 #include <vector>
 
@@ -43,18 +44,37 @@ public:
                        std::string&& filetype,
                        std::string&& filepath );
 
-  void AddSingleIdentifierToDatabase(
+  YCM_EXPORT void AddSingleIdentifierToDatabase(
     std::string& new_candidate,
     std::string& filetype,
     std::string& filepath );
 
   // Same as above, but clears all identifiers stored for the file before adding
   // new identifiers.
-  void ClearForFileAndAddIdentifiersToDatabase(
+  YCM_EXPORT void ClearForFileAndAddIdentifiersToDatabase(
     std::vector< std::string >& new_candidates,
     std::string& filetype,
     std::string& filepath );
 
+  // Same as above, for several files at once. Changes the candidates of each
+  // filetype only once.
+  YCM_EXPORT void ClearForFilesAndAddIdentifiersToDatabase(
+    FiletypeIdentifierMap&& filetype_identifier_map );
+
+  // Adds identifiers to those stored for the file and removes others from
+  // them, in time proportional to the number of identifiers given.
+  YCM_EXPORT void AddIdentifiersToDatabase(
+    std::vector< std::string >& new_candidates,
+    std::string& filetype,
+    std::string& filepath );
+
+  YCM_EXPORT void RemoveIdentifiersFromDatabase(
+    std::vector< std::string >& candidates,
+    std::string& filetype,
+    std::string& filepath );
+
+  // Tags files that only grew since they were last ingested are ingested by
+  // adding the identifiers of the new lines.
   YCM_EXPORT void AddIdentifiersToDatabaseFromTagFiles(
     std::vector< std::string >& absolute_paths_to_tag_files );
 
@@ -63,18 +83,32 @@ public:
     std::string&& query,
     const size_t max_candidates = 0 ) const;
 
+  // |filepath| is the file where the completion is requested. See
+  // IdentifierDatabase::CandidatesForQueryAndType.
   YCM_EXPORT std::vector< std::string > CandidatesForQueryAndType(
     std::string& query,
     const std::string &filetype,
-    const size_t max_candidates = 0 ) const;
+    const size_t max_candidates = 0,
+    const std::string &filepath = "" ) const;
 
 private:
+  // The size of the whole lines of a tags file that were ingested, and the last
+  // bytes of these lines.
+  struct TagFile {
+    size_t size = 0;
+    std::string tail;
+  };
+
+  void AddIdentifiersFromTagFile( std::string&& path );
 
   /////////////////////////////
   // PRIVATE MEMBER VARIABLES
   /////////////////////////////
 
   IdentifierDatabase identifier_database_;
+
+  HashMap< std::string, TagFile > tag_files_;
+  std::mutex tag_files_mutex_;
 };
 
 } // namespace YouCompleteMe
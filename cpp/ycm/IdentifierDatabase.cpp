@@ -21,42 +21,29 @@
 #include "IdentifierUtils.h"
 #include "Repository.h"
 #include "Result.h"
+#include "ThreadPool.h"
 #include "Utils.h"
+#include "Word.h"
 
-#ifdef YCM_ABSEIL_SUPPORTED
-#include <absl/container/flat_hash_set.h>
-namespace YouCompleteMe {
-template< typename T, typename H, typename Eq >
-using HashSet = absl::flat_hash_set< T, H, Eq >;
-template< typename T > using Hash = absl::Hash< T >;
-} // namespace YouCompleteMe
-#else
-#include <unordered_set>
-namespace YouCompleteMe {
-template< typename T, typename H, typename Eq >
-using HashSet = std::unordered_set< T, H, Eq >;
-template< typename T >
-using Hash = std::hash< T >;
-} // namespace YouCompleteMe
-#endif
-#include <memory>
+#include <algorithm>
+#include <utility>
 
 namespace YouCompleteMe {
 
 namespace {
-struct CandidateHasher {
-  size_t operator() ( const Candidate* c ) const noexcept {
-    static Hash< std::string > h;
-    return h(c->Text());
-  }
-};
-struct CandidateCompareEq {
-  bool operator() ( const Candidate* a, const Candidate* b ) const noexcept {
-    return a->Text() == b->Text();
-  }
-};
-} // namespace
 
+// Each cache keeps a snapshot alive, so only a few buffers are remembered.
+const size_t MAX_QUERY_CACHES = 8;
+
+// Below this number of candidates, matching them on another thread costs more
+// than it saves.
+const size_t MIN_SHARD_SIZE = 1 << 14;
+
+// The maximum number of candidates of a snapshot segment. A change copies the
+// segments it touches, while a query goes through all of them.
+const size_t SEGMENT_SIZE = 1 << 12;
+
+} // unnamed namespace
 
 
 IdentifierDatabase::IdentifierDatabase()
@@ -64,16 +51,28 @@ IdentifierDatabase::IdentifierDatabase()
 }
 
 
+IdentifierDatabase::~IdentifierDatabase() {
+  for ( auto& [ _, filetype_candidates ] : filetype_candidate_map_ ) {
+    for ( auto& [ _, candidate_set ] :
+          filetype_candidates.filepath_to_candidates ) {
+      ClearCandidateSetNoLock( filetype_candidates, candidate_set );
+    }
+  }
+}
+
+
 void IdentifierDatabase::RecreateIdentifiers(
   FiletypeIdentifierMap&& filetype_identifier_map ) {
   std::lock_guard locker( filetype_candidate_map_mutex_ );
 
   for ( auto&& [ filetype, paths_to_candidates ] : filetype_identifier_map ) {
+    auto& filetype_candidates = filetype_candidate_map_[ filetype ];
     for ( auto&& [ filepath, identifiers ] : paths_to_candidates ) {
       RecreateIdentifiersNoLock( std::move( identifiers ),
-                                 std::string( filetype ),
+                                 filetype_candidates,
                                  std::string( filepath ) );
     }
+    PublishSnapshotNoLock( filetype, filetype_candidates );
   }
 }
 
@@ -82,20 +81,67 @@ void IdentifierDatabase::AddSingleIdentifier(
   std::string&& new_candidate,
   std::string&& filetype,
   std::string&& filepath ) {
+  AddIdentifiers( { std::move( new_candidate ) },
+                  std::move( filetype ),
+                  std::move( filepath ) );
+}
+
+
+void IdentifierDatabase::AddIdentifiers(
+  std::vector< std::string >&& new_candidates,
+  std::string&& filetype,
+  std::string&& filepath ) {
   std::lock_guard locker( filetype_candidate_map_mutex_ );
-  std::vector< std::string > candidate_vector( 1 );
-  auto candidate_pointer = candidate_repository_.GetElements(
-         { new_candidate } )[ 0 ];
-  auto& current_identifier_set = GetCandidateSet( std::move( filetype ),
-                                                  std::move( filepath ) );
-  auto it = std::find_if( current_identifier_set.begin(),
-                          current_identifier_set.end(),
-                          [ candidate_pointer ]( const Candidate& c ) {
-                                return c.Text() == candidate_pointer->Text();
-                          } );
-  if ( it == current_identifier_set.end() ) {
-    current_identifier_set.push_back( candidate_pointer->clone() );
+  auto& filetype_candidates = filetype_candidate_map_[ filetype ];
+  auto& candidate_set =
+    filetype_candidates.filepath_to_candidates[ std::move( filepath ) ];
+  AddIdentifiersNoLock( std::move( new_candidates ),
+                        filetype_candidates,
+                        candidate_set );
+  PublishSnapshotNoLock( filetype, filetype_candidates );
+}
+
+
+void IdentifierDatabase::AddIdentifiers(
+  FiletypeIdentifierMap&& filetype_identifier_map ) {
+  std::lock_guard locker( filetype_candidate_map_mutex_ );
+
+  for ( auto&& [ filetype, paths_to_candidates ] : filetype_identifier_map ) {
+    auto& filetype_candidates = filetype_candidate_map_[ filetype ];
+    for ( auto&& [ filepath, identifiers ] : paths_to_candidates ) {
+      auto& candidate_set =
+        filetype_candidates.filepath_to_candidates[ filepath ];
+      AddIdentifiersNoLock( std::move( identifiers ),
+                            filetype_candidates,
+                            candidate_set );
+    }
+    PublishSnapshotNoLock( filetype, filetype_candidates );
+  }
+}
+
+
+void IdentifierDatabase::RemoveIdentifiers(
+  std::vector< std::string >&& candidates,
+  std::string&& filetype,
+  std::string&& filepath ) {
+  std::lock_guard locker( filetype_candidate_map_mutex_ );
+  auto& filetype_candidates = filetype_candidate_map_[ filetype ];
+  auto& candidate_set =
+    filetype_candidates.filepath_to_candidates[ std::move( filepath ) ];
+
+  std::vector< const Candidate* > removed_candidates;
+  for ( const std::string& candidate : candidates ) {
+    auto it = candidate_set.find( candidate );
+    if ( it == candidate_set.end() ) {
+      continue;
+    }
+
+    RemoveCandidateNoLock( it->second, filetype_candidates );
+    removed_candidates.push_back( it->second );
+    candidate_set.erase( it );
   }
+  PublishSnapshotNoLock( filetype, filetype_candidates );
+  candidate_repository_.ReleaseElements( removed_candidates );
 }
 
 
@@ -104,90 +150,371 @@ void IdentifierDatabase::RecreateIdentifiers(
   std::string&& filetype,
   std::string&& filepath ) {
   std::lock_guard locker( filetype_candidate_map_mutex_ );
+  auto& filetype_candidates = filetype_candidate_map_[ filetype ];
   RecreateIdentifiersNoLock( std::move( new_candidates ),
-                             std::move( filetype ),
+                             filetype_candidates,
                              std::move( filepath ) );
+  PublishSnapshotNoLock( filetype, filetype_candidates );
 }
 
 
-std::vector< Result > IdentifierDatabase::ResultsForQueryAndType(
+void IdentifierDatabase::ClearCandidatesStoredForFile(
+  std::string&& filetype,
+  std::string&& filepath ) {
+  RecreateIdentifiers( {}, std::move( filetype ), std::move( filepath ) );
+}
+
+
+std::vector< std::string > IdentifierDatabase::CandidatesForQueryAndType(
   std::string&& query,
   const std::string &filetype,
-  const size_t max_results ) const {
-  FiletypeCandidateMap::const_iterator it;
-  {
-    std::shared_lock locker( filetype_candidate_map_mutex_ );
-    it = filetype_candidate_map_.find( filetype );
+  const size_t max_candidates,
+  const std::string &filepath ) const {
+  auto snapshot = GetSnapshot( filetype );
+  if ( !snapshot ) {
+    return {};
+  }
+  Word query_object( std::move( query ) );
+  const auto &query_characters = query_object.Characters();
 
-    if ( it == filetype_candidate_map_.end() ) {
-      return {};
+  // The candidates matching a query also match the previous query if it is a
+  // prefix of that query. Only the segments that changed since the previous
+  // query are scanned entirely.
+  std::vector< const CandidateSegment* > segments( snapshot->size() );
+  std::transform( snapshot->begin(),
+                  snapshot->end(),
+                  segments.begin(),
+                  []( const auto& segment ) { return segment.get(); } );
+  auto previous_query_cache = GetQueryCache( filetype, filepath );
+  if ( previous_query_cache &&
+       previous_query_cache->query.size() <= query_characters.size() &&
+       std::equal( previous_query_cache->query.begin(),
+                   previous_query_cache->query.end(),
+                   query_characters.begin() ) ) {
+    const auto &previous_snapshot = *previous_query_cache->snapshot;
+    HashMap< const CandidateSegment*, size_t > previous_segments;
+    previous_segments.reserve( previous_snapshot.size() );
+    for ( size_t index = 0; index < previous_snapshot.size(); ++index ) {
+      previous_segments.emplace( previous_snapshot[ index ].get(), index );
+    }
+    for ( auto& segment : segments ) {
+      auto previous_segment = previous_segments.find( segment );
+      if ( previous_segment != previous_segments.end() ) {
+        segment = &previous_query_cache->candidates[ previous_segment->second ];
+      }
     }
   }
-  Word query_object( std::move( query ) );
 
-  HashSet< const Candidate *,
-           CandidateHasher,
-           CandidateCompareEq > seen_candidates;
-  seen_candidates.reserve( candidate_repository_.NumStoredElements() );
-  std::vector< Result > results;
+  auto query_cache = std::make_shared< QueryCache >();
+  query_cache->filetype = filetype;
+  query_cache->filepath = filepath;
+  query_cache->snapshot = snapshot;
+  query_cache->query.assign( query_characters.begin(),
+                            query_characters.end() );
+  query_cache->candidates.resize( segments.size() );
 
-  {
-    std::lock_guard locker( filetype_candidate_map_mutex_ );
-    auto& paths_to_candidates = it->second;
-    for ( const auto& [ _, candidates ] : paths_to_candidates ) {
-      for ( const Candidate& candidate : candidates ) {
-        if ( !seen_candidates.insert( &candidate ).second ) {
-          continue;
-        }
+  // Split the segments into shards matched in parallel. Each shard keeps its
+  // best results, which are merged at the end.
+  size_t num_candidates = 0;
+  for ( const CandidateSegment* segment : segments ) {
+    num_candidates += segment->size();
+  }
+  size_t num_shards = std::min( { ThreadPool::Instance().NumThreads(),
+                                  std::max< size_t >(
+                                    num_candidates / MIN_SHARD_SIZE, 1 ),
+                                  std::max< size_t >( segments.size(), 1 ) } );
+  std::vector< std::vector< Result > > shard_results( num_shards );
 
-        if ( candidate.IsEmpty() ||
-             !candidate.ContainsBytes( query_object ) ) {
+  ThreadPool::Instance().Run( num_shards, [ & ]( size_t shard ) {
+    auto &results = shard_results[ shard ];
+    for ( size_t index = segments.size() * shard / num_shards;
+          index < segments.size() * ( shard + 1 ) / num_shards;
+          ++index ) {
+      auto &matching_candidates = query_cache->candidates[ index ];
+      for ( const Candidate* candidate : *segments[ index ] ) {
+        if ( !candidate->ContainsBytes( query_object ) ) {
           continue;
         }
 
-        Result result = candidate.QueryMatchResult( query_object );
+        Result result = candidate->QueryMatchResult( query_object );
 
         if ( result.IsSubsequence() ) {
           results.push_back( result );
+          matching_candidates.push_back( candidate );
         }
       }
     }
+
+    if ( num_shards > 1 && max_candidates > 0 ) {
+      PartialSort( results, max_candidates );
+    }
+  } );
+
+  std::vector< Result > results = std::move( shard_results[ 0 ] );
+  for ( size_t shard = 1; shard < num_shards; ++shard ) {
+    results.insert( results.end(),
+                    shard_results[ shard ].begin(),
+                    shard_results[ shard ].end() );
   }
 
-  PartialSort( results, max_results );
-  return results;
+  SetQueryCache( std::move( query_cache ) );
+
+  PartialSort( results, max_candidates );
+
+  // The results point to candidates that are only guaranteed to be alive as
+  // long as the snapshot is.
+  std::vector< std::string > texts( results.size() );
+  std::transform( results.begin(),
+                  results.end(),
+                  texts.begin(),
+                  []( const Result& result ) {
+                    return std::string( result.Text() );
+                  } );
+  return texts;
+}
+
+
+std::shared_ptr< const IdentifierDatabase::CandidateSnapshot >
+IdentifierDatabase::GetSnapshot( const std::string &filetype ) const {
+  std::shared_lock locker( filetype_snapshots_mutex_ );
+  auto it = filetype_snapshots_.find( filetype );
+  return it != filetype_snapshots_.end() ? it->second : nullptr;
+}
+
+
+std::shared_ptr< const IdentifierDatabase::QueryCache >
+IdentifierDatabase::GetQueryCache( const std::string &filetype,
+                                   const std::string &filepath ) const {
+  std::lock_guard locker( query_caches_mutex_ );
+  for ( const auto& query_cache : query_caches_ ) {
+    if ( query_cache->filetype == filetype &&
+         query_cache->filepath == filepath ) {
+      return query_cache;
+    }
+  }
+  return nullptr;
+}
+
+
+void IdentifierDatabase::SetQueryCache(
+  std::shared_ptr< const QueryCache > query_cache ) const {
+  std::lock_guard locker( query_caches_mutex_ );
+  auto it = std::find_if( query_caches_.begin(),
+                          query_caches_.end(),
+                          [ &query_cache ]( const auto& other ) {
+                            return other->filetype == query_cache->filetype &&
+                                   other->filepath == query_cache->filepath;
+                          } );
+  if ( it == query_caches_.end() ) {
+    if ( query_caches_.size() == MAX_QUERY_CACHES ) {
+      query_caches_.pop_back();
+    }
+    it = query_caches_.insert( query_caches_.begin(), nullptr );
+  } else {
+    std::rotate( query_caches_.begin(), it, it + 1 );
+    it = query_caches_.begin();
+  }
+  *it = std::move( query_cache );
 }
 
 
 // WARNING: You need to hold the filetype_candidate_map_mutex_ before calling
-// this function and while using the returned set.
-std::vector< Candidate > &IdentifierDatabase::GetCandidateSet(
-  std::string&& filetype,
-  std::string&& filepath ) {
-  return filetype_candidate_map_[ std::move( filetype ) ]
-                                [ std::move( filepath ) ];
+// this function.
+void IdentifierDatabase::AddIdentifiersNoLock(
+  std::vector< std::string >&& new_candidates,
+  FiletypeCandidates &filetype_candidates,
+  CandidateSet &candidate_set ) {
+  AddCandidatesNoLock(
+    candidate_repository_.GetElements( std::move( new_candidates ) ),
+    filetype_candidates,
+    candidate_set );
+}
+
+
+// WARNING: You need to hold the filetype_candidate_map_mutex_ before calling
+// this function.
+void IdentifierDatabase::AddCandidatesNoLock(
+  std::vector< const Candidate* >&& new_candidates,
+  FiletypeCandidates &filetype_candidates,
+  CandidateSet &candidate_set ) {
+  // The references to the candidates already stored for the file.
+  std::vector< const Candidate* > duplicate_candidates;
+  for ( const Candidate* candidate_ptr : new_candidates ) {
+    if ( !candidate_set.emplace( candidate_ptr->Text(),
+                                 candidate_ptr ).second ) {
+      duplicate_candidates.push_back( candidate_ptr );
+    } else {
+      auto &entry = filetype_candidates.entries[ candidate_ptr ];
+      if ( ++entry.file_count == 1 && !candidate_ptr->IsEmpty() ) {
+        filetype_candidates.added_candidates.push_back( candidate_ptr );
+      }
+    }
+  }
+  candidate_repository_.ReleaseElements( duplicate_candidates );
 }
 
 
 // WARNING: You need to hold the filetype_candidate_map_mutex_ before calling
-// this function and while using the returned set.
+// this function.
 void IdentifierDatabase::RecreateIdentifiersNoLock(
   std::vector< std::string >&& new_candidates,
-  std::string&& filetype,
+  FiletypeCandidates &filetype_candidates,
   std::string&& filepath ) {
+  auto& candidate_set =
+    filetype_candidates.filepath_to_candidates[ std::move( filepath ) ];
+  // Reference the new candidates before releasing the old ones, so that the
+  // candidates found in both are not reclaimed in between.
+  auto candidates = candidate_repository_.GetElements(
+                      std::move( new_candidates ) );
+  ClearCandidateSetNoLock( filetype_candidates, candidate_set );
+  candidate_set.reserve( candidates.size() );
+  AddCandidatesNoLock( std::move( candidates ),
+                       filetype_candidates,
+                       candidate_set );
+}
 
-  auto& current_identifier_set = GetCandidateSet( std::move( filetype ),
-                                                  std::move( filepath ) );
-  auto candidate_pointers = candidate_repository_.GetElements(
-                  std::move( new_candidates ) );
-  current_identifier_set.clear();
-  current_identifier_set.reserve( candidate_pointers.size() );
-  std::transform( candidate_pointers.begin(),
-                  candidate_pointers.end(),
-                  std::back_inserter( current_identifier_set ),
-                  []( const Candidate* candidate_ptr ) {
-                    return candidate_ptr->clone();
-                  } );
+
+// WARNING: You need to hold the filetype_candidate_map_mutex_ before calling
+// this function. Removes one file from the files containing |candidate|.
+void IdentifierDatabase::RemoveCandidateNoLock(
+  const Candidate *candidate,
+  FiletypeCandidates &filetype_candidates ) {
+  auto entry = filetype_candidates.entries.find( candidate );
+  if ( --entry->second.file_count != 0 ) {
+    return;
+  }
+  if ( entry->second.segment ) {
+    filetype_candidates.removed_candidates.emplace_back(
+      candidate, entry->second.segment );
+  }
+  filetype_candidates.entries.erase( entry );
+}
+
+
+// WARNING: You need to hold the filetype_candidate_map_mutex_ before calling
+// this function.
+void IdentifierDatabase::ClearCandidateSetNoLock(
+  FiletypeCandidates &filetype_candidates,
+  CandidateSet &candidate_set ) {
+  std::vector< const Candidate* > candidates;
+  candidates.reserve( candidate_set.size() );
+  for ( const auto& [ _, candidate ] : candidate_set ) {
+    RemoveCandidateNoLock( candidate, filetype_candidates );
+    candidates.push_back( candidate );
+  }
+  candidate_set.clear();
+  candidate_repository_.ReleaseElements( candidates );
+}
+
+
+// WARNING: You need to hold the filetype_candidate_map_mutex_ before calling
+// this function. Publishes the changes made to the filetype since its last
+// snapshot. The segments containing removed candidates are replaced, and the
+// added candidates fill the last segment or go in new ones. Takes time
+// proportional to the number of changed candidates, not to the number of
+// candidates of the filetype.
+void IdentifierDatabase::PublishSnapshotNoLock(
+  const std::string &filetype,
+  FiletypeCandidates &filetype_candidates ) {
+  auto &entries = filetype_candidates.entries;
+
+  std::vector< const CandidateSegment* > changed_segments;
+  for ( const auto& [ candidate, segment ] :
+        filetype_candidates.removed_candidates ) {
+    auto entry = entries.find( candidate );
+    if ( entry == entries.end() ) {
+      changed_segments.push_back( segment );
+    } else {
+      // The candidate was added again, so it stays where it was.
+      entry->second.segment = segment;
+    }
+  }
+  filetype_candidates.removed_candidates.clear();
+
+  // The candidates to lay out in new segments.
+  CandidateSegment candidates;
+  for ( const Candidate* candidate : filetype_candidates.added_candidates ) {
+    auto entry = entries.find( candidate );
+    if ( entry != entries.end() && !entry->second.segment ) {
+      candidates.push_back( candidate );
+    }
+  }
+  filetype_candidates.added_candidates.clear();
+
+  if ( changed_segments.empty() && candidates.empty() &&
+       filetype_candidates.snapshot ) {
+    // Keep the snapshot, and the queries cached for it.
+    return;
+  }
+
+  std::sort( changed_segments.begin(), changed_segments.end() );
+  auto snapshot = std::make_shared< CandidateSnapshot >();
+  if ( filetype_candidates.snapshot ) {
+    snapshot->reserve( filetype_candidates.snapshot->size() + 1 );
+    for ( const auto& segment : *filetype_candidates.snapshot ) {
+      if ( !std::binary_search( changed_segments.begin(),
+                                changed_segments.end(),
+                                segment.get() ) ) {
+        snapshot->push_back( segment );
+        continue;
+      }
+      for ( const Candidate* candidate : *segment ) {
+        auto entry = entries.find( candidate );
+        if ( entry != entries.end() &&
+             entry->second.segment == segment.get() ) {
+          candidates.push_back( candidate );
+        }
+      }
+    }
+  }
+
+  // Fill the last segment rather than adding a small one for each change.
+  if ( !candidates.empty() && !snapshot->empty() &&
+       snapshot->back()->size() < SEGMENT_SIZE ) {
+    candidates.insert( candidates.end(),
+                       snapshot->back()->begin(),
+                       snapshot->back()->end() );
+    snapshot->pop_back();
+  }
+
+  // Scan the candidates of a segment in the order they are laid out in memory.
+  std::sort( candidates.begin(), candidates.end() );
+  candidates.erase( std::unique( candidates.begin(), candidates.end() ),
+                    candidates.end() );
+  for ( size_t begin = 0; begin < candidates.size(); begin += SEGMENT_SIZE ) {
+    auto segment = CreateSegment( CandidateSegment(
+      candidates.begin() + begin,
+      candidates.begin() + std::min( begin + SEGMENT_SIZE,
+                                     candidates.size() ) ) );
+    for ( const Candidate* candidate : *segment ) {
+      entries.find( candidate )->second.segment = segment.get();
+    }
+    snapshot->push_back( std::move( segment ) );
+  }
+
+  std::shared_ptr< const CandidateSnapshot > previous_snapshot =
+    std::exchange( filetype_candidates.snapshot, snapshot );
+  {
+    std::lock_guard locker( filetype_snapshots_mutex_ );
+    filetype_snapshots_[ filetype ] = std::move( snapshot );
+  }
+  // The segments of the previous snapshot that no query uses anymore are
+  // destroyed here, without blocking the queries.
+}
+
+
+// The segments outlive the changes of the database, so they reference their
+// candidates until the last query using them is done.
+std::shared_ptr< const IdentifierDatabase::CandidateSegment >
+IdentifierDatabase::CreateSegment( CandidateSegment &&candidates ) const {
+  candidate_repository_.AcquireElements( candidates );
+  return std::shared_ptr< const CandidateSegment >(
+    new CandidateSegment( std::move( candidates ) ),
+    [ &repository = candidate_repository_ ](
+        const CandidateSegment *segment ) {
+      repository.ReleaseElements( *segment );
+      delete segment;
+    } );
 }
 
 } // namespace YouCompleteMe
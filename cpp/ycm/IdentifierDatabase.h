@@ -32,14 +32,16 @@ using HashMap = std::unordered_map< K, V >;
 } // namespace YouCompleteMe
 #endif
 #include <memory>
+#include <mutex>
 #include <shared_mutex>
 #include <string>
+#include <string_view>
 #include <vector>
 
 namespace YouCompleteMe {
 
 class Candidate;
-class Result;
+class Character;
 template< typename Candidate >
 class Repository;
 
@@ -59,10 +61,24 @@ using FiletypeIdentifierMap = HashMap< std::string, FilepathToIdentifiers >;
 // access to this internal data structure so that it's easier to confirm that
 // mutexes are used correctly to protect concurrent access.
 //
+// Queries don't read that data structure. Instead, they scan an immutable
+// snapshot of the unique candidates of the filetype without blocking or being
+// blocked by changes. The snapshot is split into segments of a bounded size.
+// A change publishes a new snapshot sharing the segments it didn't touch with
+// the previous one, so it takes time proportional to the number of changed
+// candidates rather than to the size of the filetype. Queries also remember
+// their matches per segment, so that a query extending the previous one only
+// scans again the segments that changed in between.
+//
+// The candidates are owned by the repository. The database references each
+// candidate once per file it is stored for, and once per segment containing
+// it, so that the repository doesn't reclaim candidates still in use.
+//
 // This class is thread-safe.
 class IdentifierDatabase {
 public:
   YCM_EXPORT IdentifierDatabase();
+  YCM_EXPORT ~IdentifierDatabase();
   IdentifierDatabase( const IdentifierDatabase& ) = delete;
   IdentifierDatabase& operator=( const IdentifierDatabase& ) = delete;
 
@@ -71,6 +87,22 @@ public:
     std::string&& filetype,
     std::string&& filepath );
 
+  // Adds the identifiers that are not already stored for the file. Takes time
+  // proportional to the number of new identifiers, not to the size of the file.
+  void AddIdentifiers(
+    std::vector< std::string >&& new_candidates,
+    std::string&& filetype,
+    std::string&& filepath );
+
+  // Same as above, for the identifiers of several files.
+  void AddIdentifiers( FiletypeIdentifierMap&& filetype_identifier_map );
+
+  // Removes the identifiers stored for the file, ignoring those that are not.
+  void RemoveIdentifiers(
+    std::vector< std::string >&& candidates,
+    std::string&& filetype,
+    std::string&& filepath );
+
   void RecreateIdentifiers( FiletypeIdentifierMap&& filetype_identifier_map );
 
   void RecreateIdentifiers(
@@ -81,33 +113,112 @@ public:
   void ClearCandidatesStoredForFile( std::string&& filetype,
                                      std::string&& filepath );
 
-  std::vector< Result > ResultsForQueryAndType(
+  // The candidates matching the query are remembered for each filetype and
+  // |filepath| so that, if the next query for the same file extends this one
+  // and the database didn't change, only these candidates are filtered.
+  std::vector< std::string > CandidatesForQueryAndType(
     std::string&& query,
     const std::string &filetype,
-    const size_t max_results ) const;
+    const size_t max_candidates,
+    const std::string &filepath = "" ) const;
 
 private:
-  std::vector< Candidate > &GetCandidateSet(
-    std::string&& filetype,
-    std::string&& filepath );
+  // The candidates of a file, without duplicates. The candidates are owned by
+  // the repository, so their text can be used as key.
+  using CandidateSet = HashMap< std::string_view, const Candidate* >;
+
+  // filepath -> ( candidate )
+  using FilepathToCandidates = HashMap< std::string, CandidateSet >;
+
+  // Some of the unique non-empty candidates of a filetype.
+  using CandidateSegment = std::vector< const Candidate* >;
+
+  // The unique non-empty candidates of a filetype.
+  using CandidateSnapshot =
+    std::vector< std::shared_ptr< const CandidateSegment > >;
+
+  struct CandidateEntry {
+    // The number of files containing the candidate.
+    size_t file_count = 0;
+    // The segment of the published snapshot containing the candidate, if any.
+    const CandidateSegment *segment = nullptr;
+  };
+
+  struct FiletypeCandidates {
+    FilepathToCandidates filepath_to_candidates;
+    HashMap< const Candidate*, CandidateEntry > entries;
+    std::shared_ptr< const CandidateSnapshot > snapshot;
+    // The changes not published yet. A candidate may be removed and added
+    // again before they are.
+    std::vector< const Candidate* > added_candidates;
+    std::vector< std::pair< const Candidate*, const CandidateSegment* > >
+      removed_candidates;
+  };
+
+  // filetype -> ( filepath -> ( candidate ) )
+  using FiletypeCandidateMap = HashMap< std::string, FiletypeCandidates >;
+
+  // The candidates of each segment of a snapshot matching a query.
+  struct QueryCache {
+    std::string filetype;
+    std::string filepath;
+    std::shared_ptr< const CandidateSnapshot > snapshot;
+    std::vector< const Character* > query;
+    std::vector< CandidateSegment > candidates;
+  };
+
+  // Returns the published snapshot of |filetype|, or nullptr if the filetype
+  // is unknown.
+  std::shared_ptr< const CandidateSnapshot > GetSnapshot(
+    const std::string &filetype ) const;
+
+  std::shared_ptr< const QueryCache > GetQueryCache(
+    const std::string &filetype,
+    const std::string &filepath ) const;
+
+  void SetQueryCache( std::shared_ptr< const QueryCache > query_cache ) const;
+
+  void AddIdentifiersNoLock(
+    std::vector< std::string >&& new_candidates,
+    FiletypeCandidates &filetype_candidates,
+    CandidateSet &candidate_set );
+
+  // Takes over one reference to each of |new_candidates|.
+  void AddCandidatesNoLock(
+    std::vector< const Candidate* >&& new_candidates,
+    FiletypeCandidates &filetype_candidates,
+    CandidateSet &candidate_set );
 
   void RecreateIdentifiersNoLock(
     std::vector< std::string >&& new_candidates,
-    std::string&& filetype,
+    FiletypeCandidates &filetype_candidates,
     std::string&& filepath );
 
+  void RemoveCandidateNoLock( const Candidate *candidate,
+                              FiletypeCandidates &filetype_candidates );
 
-  // filepath -> ( candidate )
-  using FilepathToCandidates = HashMap< std::string, std::vector< Candidate > >;
+  void ClearCandidateSetNoLock( FiletypeCandidates &filetype_candidates,
+                                CandidateSet &candidate_set );
 
-  // filetype -> ( filepath -> ( candidate ) )
-  using FiletypeCandidateMap = HashMap< std::string, FilepathToCandidates >;
+  void PublishSnapshotNoLock( const std::string &filetype,
+                              FiletypeCandidates &filetype_candidates );
+
+  std::shared_ptr< const CandidateSegment > CreateSegment(
+    CandidateSegment &&candidates ) const;
 
 
   Repository< Candidate > &candidate_repository_;
 
   FiletypeCandidateMap filetype_candidate_map_;
-  mutable std::shared_mutex filetype_candidate_map_mutex_;
+  std::mutex filetype_candidate_map_mutex_;
+
+  HashMap< std::string, std::shared_ptr< const CandidateSnapshot > >
+    filetype_snapshots_;
+  mutable std::shared_mutex filetype_snapshots_mutex_;
+
+  // Most recently used first.
+  mutable std::vector< std::shared_ptr< const QueryCache > > query_caches_;
+  mutable std::mutex query_caches_mutex_;
 };
 
 } // namespace YouCompleteMe
@@ -16,8 +16,10 @@
 // along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
 #include "IdentifierUtils.h"
+#include "ThreadPool.h"
 #include "Utils.h"
 
+#include <algorithm>
 #include <array>
 #include <filesystem>
 #include <functional>
@@ -48,66 +50,620 @@ constexpr std::array LANG_TO_FILETYPE = {
   std::pair{ "SystemdUnit"sv      , "systemd"sv     },
 };
 
-}  // unnamed namespace
 
+// The comments and strings of identifier_utils.py.
+enum class CommentOrString {
+  C_STYLE_COMMENT,
+  CPP_STYLE_COMMENT,
+  PYTHON_STYLE_COMMENT,
+  SINGLE_QUOTE_STRING,
+  DOUBLE_QUOTE_STRING,
+  BACK_QUOTE_STRING,
+  MULTILINE_SINGLE_QUOTE_STRING,
+  MULTILINE_DOUBLE_QUOTE_STRING
+};
 
-// For details on the tag format supported, see here for details:
-// http://ctags.sourceforge.net/FORMAT
-// TL;DR: The only supported format is the one Exuberant Ctags emits.
-FiletypeIdentifierMap ExtractIdentifiersFromTagsFile(
-  const fs::path &path_to_tag_file ) {
-  FiletypeIdentifierMap filetype_identifier_map;
-  const auto lines = [ &path_to_tag_file ]{
-    try {
-      return ReadUtf8File( path_to_tag_file );
-    } catch ( ... ) {
-      return std::vector< std::string >{};
+using CommentsAndStrings = std::vector< CommentOrString >;
+
+const CommentsAndStrings DEFAULT_COMMENTS_AND_STRINGS = {
+  CommentOrString::C_STYLE_COMMENT,
+  CommentOrString::CPP_STYLE_COMMENT,
+  CommentOrString::PYTHON_STYLE_COMMENT,
+  CommentOrString::MULTILINE_SINGLE_QUOTE_STRING,
+  CommentOrString::MULTILINE_DOUBLE_QUOTE_STRING,
+  CommentOrString::SINGLE_QUOTE_STRING,
+  CommentOrString::DOUBLE_QUOTE_STRING
+};
+
+const CommentsAndStrings CPP_COMMENTS_AND_STRINGS = {
+  CommentOrString::C_STYLE_COMMENT,
+  CommentOrString::CPP_STYLE_COMMENT,
+  CommentOrString::SINGLE_QUOTE_STRING,
+  CommentOrString::DOUBLE_QUOTE_STRING
+};
+
+const CommentsAndStrings GO_COMMENTS_AND_STRINGS = {
+  CommentOrString::C_STYLE_COMMENT,
+  CommentOrString::CPP_STYLE_COMMENT,
+  CommentOrString::SINGLE_QUOTE_STRING,
+  CommentOrString::DOUBLE_QUOTE_STRING,
+  CommentOrString::BACK_QUOTE_STRING
+};
+
+const CommentsAndStrings PYTHON_COMMENTS_AND_STRINGS = {
+  CommentOrString::PYTHON_STYLE_COMMENT,
+  CommentOrString::MULTILINE_SINGLE_QUOTE_STRING,
+  CommentOrString::MULTILINE_DOUBLE_QUOTE_STRING,
+  CommentOrString::SINGLE_QUOTE_STRING,
+  CommentOrString::DOUBLE_QUOTE_STRING
+};
+
+const CommentsAndStrings RUST_COMMENTS_AND_STRINGS = {
+  CommentOrString::CPP_STYLE_COMMENT,
+  CommentOrString::SINGLE_QUOTE_STRING,
+  CommentOrString::DOUBLE_QUOTE_STRING
+};
+
+// Must match FILETYPE_TO_COMMENT_AND_STRING_REGEX in identifier_utils.py. When
+// several comments or strings start at the same position, the first one in
+// the list is used.
+constexpr std::array FILETYPE_TO_COMMENTS_AND_STRINGS = {
+  std::pair{ "c"sv         , &CPP_COMMENTS_AND_STRINGS    },
+  std::pair{ "cpp"sv       , &CPP_COMMENTS_AND_STRINGS    },
+  std::pair{ "cuda"sv      , &CPP_COMMENTS_AND_STRINGS    },
+  std::pair{ "go"sv        , &GO_COMMENTS_AND_STRINGS     },
+  std::pair{ "javascript"sv, &CPP_COMMENTS_AND_STRINGS    },
+  std::pair{ "objc"sv      , &CPP_COMMENTS_AND_STRINGS    },
+  std::pair{ "objcpp"sv    , &CPP_COMMENTS_AND_STRINGS    },
+  std::pair{ "python"sv    , &PYTHON_COMMENTS_AND_STRINGS },
+  std::pair{ "rust"sv      , &RUST_COMMENTS_AND_STRINGS   },
+  std::pair{ "typescript"sv, &CPP_COMMENTS_AND_STRINGS    },
+};
+
+
+// Removes comments and strings the same way the regular expressions of
+// identifier_utils.py do: at each position, the first comment or string that
+// matches is removed and the search continues after it.
+class CommentAndStringRemover {
+public:
+  CommentAndStringRemover( std::string_view text,
+                           const CommentsAndStrings &comments_and_strings )
+    : text_( text ),
+      comments_and_strings_( comments_and_strings ) {
+  }
+
+
+  std::string Remove() {
+    std::string result;
+    result.reserve( text_.size() );
+    size_t copied = 0;
+    size_t position = 0;
+    while ( position < text_.size() ) {
+      position = text_.find_first_of( "/#'\"`", position );
+      if ( position == std::string_view::npos ) {
+        break;
+      }
+      size_t end = MatchAt( position );
+      if ( end == std::string_view::npos ) {
+        ++position;
+        continue;
+      }
+      result.append( text_, copied, position - copied );
+      result.append( std::count( text_.begin() + position,
+                                 text_.begin() + end,
+                                 '\n' ), '\n' );
+      position = copied = end;
     }
-  }();
+    result.append( text_, copied );
+    return result;
+  }
+
+
+  bool EndsInsideCommentOrString() const {
+    return ends_inside_comment_or_string_;
+  }
+
+private:
+  // Returns the end of the comment or string starting at |position| or npos.
+  size_t MatchAt( size_t position ) {
+    for ( CommentOrString comment_or_string : comments_and_strings_ ) {
+      size_t end = Match( comment_or_string, position );
+      if ( end != std::string_view::npos ) {
+        return end;
+      }
+    }
+    return std::string_view::npos;
+  }
+
+
+  size_t Match( CommentOrString comment_or_string, size_t position ) {
+    switch ( comment_or_string ) {
+      case CommentOrString::C_STYLE_COMMENT:
+        return MatchMultiline( position, "/*", "*/", c_comment_end_missing_ );
+      case CommentOrString::CPP_STYLE_COMMENT:
+        return StartsWith( position, "//" ) ? LineEnd( position + 2 )
+                                            : std::string_view::npos;
+      case CommentOrString::PYTHON_STYLE_COMMENT:
+        return StartsWith( position, "#" ) ? LineEnd( position + 1 )
+                                           : std::string_view::npos;
+      case CommentOrString::SINGLE_QUOTE_STRING:
+        return MatchQuoted( position, '\'' );
+      case CommentOrString::DOUBLE_QUOTE_STRING:
+        return MatchQuoted( position, '"' );
+      case CommentOrString::BACK_QUOTE_STRING:
+        return MatchQuoted( position, '`' );
+      case CommentOrString::MULTILINE_SINGLE_QUOTE_STRING:
+        return MatchMultiline( position,
+                               "'''",
+                               "'''",
+                               single_quote_string_end_missing_ );
+      case CommentOrString::MULTILINE_DOUBLE_QUOTE_STRING:
+        return MatchMultiline( position,
+                               "\"\"\"",
+                               "\"\"\"",
+                               double_quote_string_end_missing_ );
+    }
+    return std::string_view::npos;
+  }
+
+
+  bool StartsWith( size_t position, std::string_view prefix ) const {
+    return text_.compare( position, prefix.size(), prefix ) == 0;
+  }
+
+
+  size_t LineEnd( size_t position ) const {
+    return std::min( text_.find( '\n', position ), text_.size() );
+  }
+
+
+  // Matches |start|(?:\n|.)*?|end|. |end_missing_from| is the position from
+  // which |end| is known not to be found, to avoid searching the rest of the
+  // text again for every unterminated comment or string.
+  size_t MatchMultiline( size_t position,
+                         std::string_view start,
+                         std::string_view end,
+                         size_t &end_missing_from ) {
+    if ( !StartsWith( position, start ) ) {
+      return std::string_view::npos;
+    }
+    size_t end_position = std::string_view::npos;
+    if ( position + start.size() < end_missing_from ) {
+      end_position = text_.find( end, position + start.size() );
+    }
+    if ( end_position == std::string_view::npos ) {
+      end_missing_from = std::min( end_missing_from,
+                                   position + start.size() );
+      ends_inside_comment_or_string_ = true;
+      return std::string_view::npos;
+    }
+    return end_position + end.size();
+  }
+
+
+  // Matches (?<!\\)Q(?:\\\\|\\Q|.)*?Q where Q is |quote|.
+  size_t MatchQuoted( size_t position, char quote ) const {
+    if ( text_[ position ] != quote ||
+         ( position > 0 && text_[ position - 1 ] == '\\' ) ) {
+      return std::string_view::npos;
+    }
+    size_t line_end = LineEnd( position + 1 );
+
+    // The regular expression engine first tries to skip escaped backslashes
+    // and quotes.
+    size_t index = position + 1;
+    while ( index < line_end ) {
+      if ( text_[ index ] == quote ) {
+        return index + 1;
+      }
+      index += IsEscape( index, line_end, quote ) ? 2 : 1;
+    }
+
+    // If no quote ends the string, it backtracks and tries to match backslashes
+    // as any other character, starting from the last one. |ends[ i ]| is the
+    // end of the string if the engine gets to |position + 1 + i|.
+    std::vector< size_t > ends( line_end - position, std::string_view::npos );
+    for ( index = line_end; index-- > position + 1; ) {
+      size_t &end = ends[ index - position - 1 ];
+      if ( text_[ index ] == quote ) {
+        end = index + 1;
+        continue;
+      }
+      if ( IsEscape( index, line_end, quote ) ) {
+        end = ends[ index - position + 1 ];
+      }
+      if ( end == std::string_view::npos ) {
+        end = ends[ index - position ];
+      }
+    }
+    return ends[ 0 ];
+  }
+
+
+  bool IsEscape( size_t index, size_t line_end, char quote ) const {
+    return text_[ index ] == '\\' && index + 1 < line_end &&
+           ( text_[ index + 1 ] == '\\' || text_[ index + 1 ] == quote );
+  }
+
+
+  std::string_view text_;
+  const CommentsAndStrings &comments_and_strings_;
+  bool ends_inside_comment_or_string_ = false;
+  size_t c_comment_end_missing_ = std::string_view::npos;
+  size_t single_quote_string_end_missing_ = std::string_view::npos;
+  size_t double_quote_string_end_missing_ = std::string_view::npos;
+};
+
+
+bool IsAscii( char c ) {
+  return static_cast< uint8_t >( c ) < 0x80;
+}
+
+
+bool IsAsciiDigit( char c ) {
+  return '0' <= c && c <= '9';
+}
+
+
+bool IsAsciiAlpha( char c ) {
+  return ( 'a' <= c && c <= 'z' ) || ( 'A' <= c && c <= 'Z' );
+}
+
+
+bool IsWordCharacter( char c ) {
+  return IsAsciiAlpha( c ) || IsAsciiDigit( c ) || c == '_';
+}
+
+
+bool IsIdentifierStart( char c ) {
+  return IsAsciiAlpha( c ) || c == '_';
+}
+
+
+// Returns the end of the longest sequence of characters starting at |position|
+// for which |predicate| is true.
+template< typename Predicate >
+size_t SkipWhile( std::string_view text, size_t position,
+                  Predicate predicate ) {
+  while ( position < text.size() && predicate( text[ position ] ) ) {
+    ++position;
+  }
+  return position;
+}
+
+
+// Each of the following functions matches the identifier regular expression
+// of a filetype in identifier_utils.py on ASCII text. They return the end of
+// the identifier starting at |position| or npos.
+
+// [^\W\d]\w*
+size_t MatchDefaultIdentifier( std::string_view text, size_t position ) {
+  if ( !IsIdentifierStart( text[ position ] ) ) {
+    return std::string_view::npos;
+  }
+  return SkipWhile( text, position + 1, IsWordCharacter );
+}
+
+
+// (?:[^\W\d]|\$)[\w$]*
+size_t MatchJavaScriptIdentifier( std::string_view text, size_t position ) {
+  auto is_word_character_or_dollar = []( char c ) {
+    return IsWordCharacter( c ) || c == '$';
+  };
+  if ( !IsIdentifierStart( text[ position ] ) && text[ position ] != '$' ) {
+    return std::string_view::npos;
+  }
+  return SkipWhile( text, position + 1, is_word_character_or_dollar );
+}
+
+
+// -?[^\W\d][\w-]*
+size_t MatchCssIdentifier( std::string_view text, size_t position ) {
+  auto is_word_character_or_dash = []( char c ) {
+    return IsWordCharacter( c ) || c == '-';
+  };
+  if ( text[ position ] == '-' ) {
+    ++position;
+  }
+  if ( position == text.size() || !IsIdentifierStart( text[ position ] ) ) {
+    return std::string_view::npos;
+  }
+  return SkipWhile( text, position + 1, is_word_character_or_dash );
+}
+
+
+// [a-zA-Z][^\s/>='\"}{\.]*
+size_t MatchHtmlIdentifier( std::string_view text, size_t position ) {
+  auto is_html_character = []( char c ) {
+    return std::string_view( " \t\n\v\f\r/>='\"}{." ).find( c ) ==
+           std::string_view::npos;
+  };
+  if ( !IsAsciiAlpha( text[ position ] ) ) {
+    return std::string_view::npos;
+  }
+  return SkipWhile( text, position + 1, is_html_character );
+}
+
+
+// (?!(?:\.\d|\d|_))[\.\w]+
+size_t MatchRIdentifier( std::string_view text, size_t position ) {
+  auto is_word_character_or_dot = []( char c ) {
+    return IsWordCharacter( c ) || c == '.';
+  };
+  char c = text[ position ];
+  if ( !is_word_character_or_dot( c ) || IsAsciiDigit( c ) || c == '_' ||
+       ( c == '.' && position + 1 < text.size() &&
+         IsAsciiDigit( text[ position + 1 ] ) ) ) {
+    return std::string_view::npos;
+  }
+  return SkipWhile( text, position + 1, is_word_character_or_dot );
+}
+
+
+// [-\*\+!_\?:\.a-zA-Z][-\*\+!_\?:\.\w]*/?[-\*\+!_\?:\.\w]*
+size_t MatchClojureIdentifier( std::string_view text, size_t position ) {
+  auto is_symbol_character = []( char c ) {
+    return IsWordCharacter( c ) ||
+           std::string_view( "-*+!?:." ).find( c ) != std::string_view::npos;
+  };
+  if ( !is_symbol_character( text[ position ] ) ||
+       IsAsciiDigit( text[ position ] ) ) {
+    return std::string_view::npos;
+  }
+  position = SkipWhile( text, position + 1, is_symbol_character );
+  if ( position < text.size() && text[ position ] == '/' ) {
+    position = SkipWhile( text, position + 1, is_symbol_character );
+  }
+  return position;
+}
+
+
+// [_a-zA-Z][\w']+
+size_t MatchHaskellIdentifier( std::string_view text, size_t position ) {
+  auto is_word_character_or_quote = []( char c ) {
+    return IsWordCharacter( c ) || c == '\'';
+  };
+  if ( !IsIdentifierStart( text[ position ] ) ) {
+    return std::string_view::npos;
+  }
+  size_t end = SkipWhile( text, position + 1, is_word_character_or_quote );
+  return end > position + 1 ? end : std::string_view::npos;
+}
+
+
+// [^\W\d](?:[\w:-]*\w)?
+size_t MatchTexIdentifier( std::string_view text, size_t position ) {
+  auto is_label_character = []( char c ) {
+    return IsWordCharacter( c ) || c == ':' || c == '-';
+  };
+  if ( !IsIdentifierStart( text[ position ] ) ) {
+    return std::string_view::npos;
+  }
+  size_t end = SkipWhile( text, position + 1, is_label_character );
+  while ( !IsWordCharacter( text[ end - 1 ] ) ) {
+    --end;
+  }
+  return end;
+}
+
+
+// [_a-zA-Z](?:\w|[-'](?=[_a-zA-Z]))*
+size_t MatchPerl6Identifier( std::string_view text, size_t position ) {
+  if ( !IsIdentifierStart( text[ position ] ) ) {
+    return std::string_view::npos;
+  }
+  ++position;
+  while ( position < text.size() &&
+          ( IsWordCharacter( text[ position ] ) ||
+            ( ( text[ position ] == '-' || text[ position ] == '\'' ) &&
+              position + 1 < text.size() &&
+              IsIdentifierStart( text[ position + 1 ] ) ) ) ) {
+    ++position;
+  }
+  return position;
+}
+
+
+using IdentifierMatcher = size_t (*)( std::string_view, size_t );
+
+// Must match FILETYPE_TO_IDENTIFIER_REGEX in identifier_utils.py. The scheme
+// regular expression is not supported since it contains a capturing group.
+constexpr std::array FILETYPE_TO_IDENTIFIER_MATCHER = {
+  std::pair{ "clojure"sv   , &MatchClojureIdentifier    },
+  std::pair{ "css"sv       , &MatchCssIdentifier        },
+  std::pair{ "elisp"sv     , &MatchClojureIdentifier    },
+  std::pair{ "haskell"sv   , &MatchHaskellIdentifier    },
+  std::pair{ "html"sv      , &MatchHtmlIdentifier       },
+  std::pair{ "javascript"sv, &MatchJavaScriptIdentifier },
+  std::pair{ "less"sv      , &MatchCssIdentifier        },
+  std::pair{ "lisp"sv      , &MatchClojureIdentifier    },
+  std::pair{ "perl6"sv     , &MatchPerl6Identifier      },
+  std::pair{ "r"sv         , &MatchRIdentifier          },
+  std::pair{ "sass"sv      , &MatchCssIdentifier        },
+  std::pair{ "scss"sv      , &MatchCssIdentifier        },
+  std::pair{ "tex"sv       , &MatchTexIdentifier        },
+  std::pair{ "typescript"sv, &MatchJavaScriptIdentifier },
+};
+
+constexpr std::array UNSUPPORTED_IDENTIFIER_FILETYPES = {
+  "racket"sv,
+  "scheme"sv
+};
+
+// Below this size, parsing a tags file on several threads costs more than it
+// saves.
+const size_t MIN_TAGS_CHUNK_SIZE = 1 << 20;
+
+
+// Parses the lines of |tags|, adding the identifiers to
+// |filetype_identifier_map|. The paths of the tags are relative to
+// |tag_file_directory|.
+void ExtractIdentifiersFromTagsChunk(
+  std::string_view tags,
+  const fs::path &tag_file_directory,
+  FiletypeIdentifierMap &filetype_identifier_map ) {
+  // Tags files contain many identifiers for each file and language, so the
+  // paths are only made canonical and the languages converted once.
+  HashMap< std::string_view, std::string > canonical_paths;
+  HashMap< std::string_view, std::string > filetypes;
+
+  while ( !tags.empty() ) {
+    size_t line_end = std::min( tags.find( '\n' ), tags.size() );
+    std::string_view line = tags.substr( 0, line_end );
+    tags.remove_prefix( std::min( line_end + 1, tags.size() ) );
 
-  for ( auto&& line : lines ) {
     // Identifier name is from the start of the line to the first \t.
-    const auto id_end = std::find( line.cbegin(), line.cend(), '\t' );
-    if ( id_end == line.cend() ) {
+    const size_t id_end = line.find( '\t' );
+    if ( id_end == std::string_view::npos ) {
       continue;
     }
     // File path the identifier is in is the second field.
-    const auto path_begin = std::find_if( id_end + 1, line.cend(), [](char c) {
-      return c != '\t';
-    } );
-    if ( path_begin == line.cend() ) {
+    const size_t path_begin = line.find_first_not_of( '\t', id_end + 1 );
+    if ( path_begin == std::string_view::npos ) {
       continue;
     }
-    const auto path_end = std::find( path_begin + 1, line.cend(), '\t' );
-    if ( path_end == line.cend() ) {
+    const size_t path_end = line.find( '\t', path_begin + 1 );
+    if ( path_end == std::string_view::npos ) {
       continue;
     }
     // IdentifierCompleter depends on the "language:Foo" field.
     const std::string_view lang_str = "language:";
-    auto searcher = std::default_searcher( lang_str.cbegin(), lang_str.cend() );
-    const auto lang_begin = searcher( path_end + 1, line.cend() ).second;
-    if ( lang_begin == line.cend() ) {
+    size_t lang_begin = line.find( lang_str, path_end + 1 );
+    if ( lang_begin == std::string_view::npos ||
+         lang_begin + lang_str.size() == line.size() ) {
       continue;
     }
-    const auto lang_end = [ &line, lang_begin ] {
-      auto end = std::find( lang_begin + 1, line.cend(), '\t' );
-      if (end == line.cend() ) {
-        end = line.back() == '\r' ? line.cend() - 1 : line.cend();
-      }
-      return end;
-    }();
-    std::string_view identifier( line.data(), id_end - line.cbegin() );
-    fs::path path( path_begin, path_end );
-    path = fs::weakly_canonical( path_to_tag_file.parent_path() / path );
-    std::string_view language( &*lang_begin, lang_end - lang_begin );
-    std::string filetype( FindWithDefault( LANG_TO_FILETYPE,
-                                           language,
-                                           Lowercase( language ) ) );
-    filetype_identifier_map[ std::move( filetype ) ]
-                           [ std::move( path ).string() ]
+    lang_begin += lang_str.size();
+    size_t lang_end = line.find( '\t', lang_begin + 1 );
+    if ( lang_end == std::string_view::npos ) {
+      lang_end = line.back() == '\r' ? line.size() - 1 : line.size();
+    }
+    std::string_view identifier = line.substr( 0, id_end );
+    std::string_view path = line.substr( path_begin, path_end - path_begin );
+    std::string_view language = line.substr( lang_begin,
+                                             lang_end - lang_begin );
+
+    auto [ canonical_path, path_inserted ] = canonical_paths.try_emplace(
+      path );
+    if ( path_inserted ) {
+      canonical_path->second =
+        fs::weakly_canonical( tag_file_directory / path ).string();
+    }
+    auto [ filetype, filetype_inserted ] = filetypes.try_emplace( language );
+    if ( filetype_inserted ) {
+      filetype->second = FindWithDefault( LANG_TO_FILETYPE,
+                                          language,
+                                          Lowercase( language ) );
+    }
+    filetype_identifier_map[ filetype->second ][ canonical_path->second ]
       .emplace_back( identifier );
   }
+}
+
+}  // unnamed namespace
+
+
+// For details on the tag format supported, see here for details:
+// http://ctags.sourceforge.net/FORMAT
+// TL;DR: The only supported format is the one Exuberant Ctags emits.
+FiletypeIdentifierMap ExtractIdentifiersFromTagsFile(
+  const fs::path &path_to_tag_file ) {
+  const auto tags = [ &path_to_tag_file ]{
+    try {
+      return ReadFile( path_to_tag_file );
+    } catch ( ... ) {
+      return std::string();
+    }
+  }();
+
+  return ExtractIdentifiersFromTags( tags, path_to_tag_file );
+}
+
+
+FiletypeIdentifierMap ExtractIdentifiersFromTags(
+  std::string_view tags,
+  const fs::path &path_to_tag_file ) {
+  // Split the tags in chunks of whole lines parsed in parallel.
+  size_t num_chunks = std::clamp< size_t >( tags.size() / MIN_TAGS_CHUNK_SIZE,
+                                            1,
+                                            ThreadPool::Instance().NumThreads() );
+  std::vector< size_t > chunk_begins{ 0 };
+  for ( size_t chunk = 1; chunk < num_chunks; ++chunk ) {
+    size_t line_end = std::min( tags.find( '\n',
+                                           chunk * tags.size() / num_chunks ),
+                                tags.size() - 1 );
+    chunk_begins.push_back( std::max( chunk_begins.back(), line_end + 1 ) );
+  }
+  chunk_begins.push_back( tags.size() );
+
+  std::vector< FiletypeIdentifierMap > chunk_maps( num_chunks );
+  const fs::path tag_file_directory = path_to_tag_file.parent_path();
+  ThreadPool::Instance().Run( num_chunks, [ & ]( size_t chunk ) {
+    ExtractIdentifiersFromTagsChunk(
+      tags.substr( chunk_begins[ chunk ],
+                   chunk_begins[ chunk + 1 ] - chunk_begins[ chunk ] ),
+      tag_file_directory,
+      chunk_maps[ chunk ] );
+  } );
+
+  // Merge the chunks in order, so that the identifiers of each file are in the
+  // same order as in the tags file.
+  FiletypeIdentifierMap filetype_identifier_map = std::move( chunk_maps[ 0 ] );
+  for ( size_t chunk = 1; chunk < num_chunks; ++chunk ) {
+    for ( auto&& [ filetype, paths_to_identifiers ] : chunk_maps[ chunk ] ) {
+      auto &merged_paths = filetype_identifier_map[ filetype ];
+      for ( auto&& [ path, identifiers ] : paths_to_identifiers ) {
+        auto &merged_identifiers = merged_paths[ path ];
+        merged_identifiers.insert(
+          merged_identifiers.end(),
+          std::make_move_iterator( identifiers.begin() ),
+          std::make_move_iterator( identifiers.end() ) );
+      }
+    }
+  }
   return filetype_identifier_map;
 }
 
+
+std::string RemoveIdentifierFreeText(
+  std::string_view text,
+  std::string_view filetype,
+  bool &ends_inside_comment_or_string ) {
+  CommentAndStringRemover remover(
+    text,
+    *FindWithDefault( FILETYPE_TO_COMMENTS_AND_STRINGS,
+                      filetype,
+                      &DEFAULT_COMMENTS_AND_STRINGS ) );
+  std::string result = remover.Remove();
+  ends_inside_comment_or_string = remover.EndsInsideCommentOrString();
+  return result;
+}
+
+
+std::optional< std::vector< std::string > >
+ExtractIdentifiersFromText( std::string_view text, std::string_view filetype ) {
+  if ( std::find( UNSUPPORTED_IDENTIFIER_FILETYPES.begin(),
+                  UNSUPPORTED_IDENTIFIER_FILETYPES.end(),
+                  filetype ) != UNSUPPORTED_IDENTIFIER_FILETYPES.end() ||
+       !std::all_of( text.begin(), text.end(), IsAscii ) ) {
+    return std::nullopt;
+  }
+
+  IdentifierMatcher match = FindWithDefault( FILETYPE_TO_IDENTIFIER_MATCHER,
+                                             filetype,
+                                             &MatchDefaultIdentifier );
+  std::vector< std::string > identifiers;
+  size_t position = 0;
+  while ( position < text.size() ) {
+    size_t end = match( text, position );
+    if ( end == std::string_view::npos ) {
+      ++position;
+      continue;
+    }
+    identifiers.emplace_back( text.substr( position, end - position ) );
+    position = end;
+  }
+  return identifiers;
+}
+
 } // namespace YouCompleteMe
@@ -21,12 +21,39 @@
 #include "IdentifierDatabase.h"
 
 #include <filesystem>
+#include <optional>
+#include <string>
+#include <string_view>
+#include <vector>
 
 namespace YouCompleteMe {
 
 YCM_EXPORT FiletypeIdentifierMap ExtractIdentifiersFromTagsFile(
   const std::filesystem::path &path_to_tag_file );
 
+// Same as above, for |tags|, whole lines read from |path_to_tag_file|. Large
+// tags are parsed in parallel.
+YCM_EXPORT FiletypeIdentifierMap ExtractIdentifiersFromTags(
+  std::string_view tags,
+  const std::filesystem::path &path_to_tag_file );
+
+// Same as RemoveIdentifierFreeText in identifier_utils.py: replaces the comments
+// and strings of |text| with as many newlines as they contain. Sets
+// |ends_inside_comment_or_string| to true if a comment or string spanning
+// several lines is not terminated, in which case the result depends on the
+// text that could follow |text|.
+YCM_EXPORT std::string RemoveIdentifierFreeText(
+  std::string_view text,
+  std::string_view filetype,
+  bool &ends_inside_comment_or_string );
+
+// Same as ExtractIdentifiersFromText in identifier_utils.py. Returns nothing if
+// the identifiers of the filetype are not supported or if the text is not
+// ASCII, in which case the regular expressions of identifier_utils.py must be
+// used instead.
+YCM_EXPORT std::optional< std::vector< std::string > >
+ExtractIdentifiersFromText( std::string_view text, std::string_view filetype );
+
 } // namespace YouCompleteMe
 
 #endif /* end of include guard: IDENTIFIERUTILS_CPP_WFFUZNET */
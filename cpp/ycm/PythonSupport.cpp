@@ -19,8 +19,10 @@
 #include "Candidate.h"
 #include "Repository.h"
 #include "Result.h"
+#include "ThreadPool.h"
 #include "Utils.h"
 
+#include <algorithm>
 #include <utility>
 #include <vector>
 
@@ -28,6 +30,17 @@ namespace YouCompleteMe {
 
 namespace {
 
+// Number of candidates filtered between two checks of the cancellation token.
+constexpr size_t CANCELLATION_CHECK_INTERVAL = 1024;
+
+// Lists with fewer candidates are filtered on the calling thread only.
+std::atomic< size_t > parallel_filtering_threshold =
+  DEFAULT_PARALLEL_FILTERING_THRESHOLD;
+
+bool IsCancelled( const CancellationToken *cancellation_token ) {
+  return cancellation_token && cancellation_token->IsCancelled();
+}
+
 std::vector< const Candidate * > CandidatesFromObjectList(
   const pybind11::list& candidates,
   pybind11::str candidate_property,
@@ -51,41 +64,74 @@ std::vector< const Candidate * > CandidatesFromObjectList(
            std::move( candidate_strings ) );
 }
 
-} // unnamed namespace
-
 
-pybind11::list FilterAndSortCandidates(
+// Filters the candidates of the python list |candidates|, stored in the
+// repository as |repository_candidates|.
+pybind11::list FilterAndSortRepositoryCandidates(
   const pybind11::list& candidates,
-  pybind11::str candidate_property,
+  const std::vector< const Candidate * > &repository_candidates,
   std::string& query,
-  const size_t max_candidates ) {
-
-  auto num_candidates = size_t( PyList_GET_SIZE( candidates.ptr() ) );
-  std::vector< const Candidate * > repository_candidates =
-    CandidatesFromObjectList( candidates,
-                              std::move( candidate_property ),
-                              num_candidates );
+  const size_t max_candidates,
+  const CancellationToken *cancellation_token ) {
 
+  size_t num_candidates = repository_candidates.size();
   std::vector< ResultAnd< size_t > > result_and_objects;
   {
     pybind11::gil_scoped_release unlock;
     Word query_object( std::move( query ) );
 
-    for ( size_t i = 0; i < num_candidates; ++i ) {
-      const Candidate *candidate = repository_candidates[ i ];
-
-      if ( candidate->IsEmpty() || !candidate->ContainsBytes( query_object ) ) {
-        continue;
+    // Large lists are split into shards scored in parallel. Each shard keeps
+    // its best results, which are merged at the end. Since results are totally
+    // ordered, this gives the same results as scoring the list in one go.
+    size_t num_shards =
+      num_candidates < parallel_filtering_threshold.load() ? 1 :
+      std::min( ThreadPool::Instance().NumThreads(), num_candidates );
+    std::vector< std::vector< ResultAnd< size_t > > > shard_results(
+      num_shards );
+
+    ThreadPool::Instance().Run( num_shards, [ & ]( size_t shard ) {
+      size_t begin = num_candidates * shard / num_shards;
+      size_t end = num_candidates * ( shard + 1 ) / num_shards;
+      auto &results = shard_results[ shard ];
+
+      for ( size_t i = begin; i < end; ++i ) {
+        if ( ( i - begin ) % CANCELLATION_CHECK_INTERVAL == 0 &&
+             IsCancelled( cancellation_token ) ) {
+          results.clear();
+          return;
+        }
+
+        const Candidate *candidate = repository_candidates[ i ];
+
+        if ( candidate->IsEmpty() ||
+             !candidate->ContainsBytes( query_object ) ) {
+          continue;
+        }
+
+        Result result = candidate->QueryMatchResult( query_object );
+
+        if ( result.IsSubsequence() ) {
+          results.emplace_back( result, i );
+        }
       }
 
-      Result result = candidate->QueryMatchResult( query_object );
-
-      if ( result.IsSubsequence() ) {
-        result_and_objects.emplace_back( result, i );
+      if ( num_shards > 1 && max_candidates > 0 ) {
+        PartialSort( results, max_candidates );
       }
+    } );
+
+    result_and_objects = std::move( shard_results[ 0 ] );
+    for ( size_t shard = 1; shard < num_shards; ++shard ) {
+      result_and_objects.insert( result_and_objects.end(),
+                                 shard_results[ shard ].begin(),
+                                 shard_results[ shard ].end() );
     }
 
-    PartialSort( result_and_objects, max_candidates );
+    if ( !IsCancelled( cancellation_token ) ) {
+      PartialSort( result_and_objects, max_candidates );
+    } else {
+      result_and_objects.clear();
+    }
   }
 
   pybind11::list filtered_candidates( result_and_objects.size() );
@@ -100,6 +146,70 @@ pybind11::list FilterAndSortCandidates(
   return filtered_candidates;
 }
 
+} // unnamed namespace
+
+
+void SetParallelFilteringThreshold( size_t num_candidates ) {
+  parallel_filtering_threshold = num_candidates;
+}
+
+
+pybind11::list FilterAndSortCandidates(
+  const pybind11::list& candidates,
+  pybind11::str candidate_property,
+  std::string& query,
+  const size_t max_candidates,
+  const CancellationToken *cancellation_token ) {
+
+  auto num_candidates = size_t( PyList_GET_SIZE( candidates.ptr() ) );
+  std::vector< const Candidate * > repository_candidates =
+    CandidatesFromObjectList( candidates,
+                              std::move( candidate_property ),
+                              num_candidates );
+
+  auto filtered_candidates = FilterAndSortRepositoryCandidates(
+                               candidates,
+                               repository_candidates,
+                               query,
+                               max_candidates,
+                               cancellation_token );
+
+  // The candidates are not used anymore; let the repository reclaim those
+  // that are not requested again.
+  Repository< Candidate >::Instance().ReleaseElements( repository_candidates );
+  return filtered_candidates;
+}
+
+
+CandidateList::CandidateList( const pybind11::list& candidates,
+                              pybind11::str candidate_property )
+  : candidates_( pybind11::reinterpret_steal< pybind11::list >(
+                   PyList_GetSlice( candidates.ptr(),
+                                    0,
+                                    PyList_GET_SIZE( candidates.ptr() ) ) ) ),
+    repository_candidates_( CandidatesFromObjectList(
+                              candidates_,
+                              std::move( candidate_property ),
+                              size_t( PyList_GET_SIZE( candidates_.ptr() ) ) ) ) {
+}
+
+
+CandidateList::~CandidateList() {
+  Repository< Candidate >::Instance().ReleaseElements( repository_candidates_ );
+}
+
+
+pybind11::list CandidateList::FilterAndSort(
+  std::string& query,
+  const size_t max_candidates,
+  const CancellationToken *cancellation_token ) const {
+  return FilterAndSortRepositoryCandidates( candidates_,
+                                            repository_candidates_,
+                                            query,
+                                            max_candidates,
+                                            cancellation_token );
+}
+
 
 std::string GetUtf8String( pybind11::handle value ) {
   // If already a unicode or string (or something derived from it)
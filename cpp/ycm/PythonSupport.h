@@ -20,19 +20,83 @@
 
 #include <pybind11/pybind11.h>
 
+#include <atomic>
+#include <string>
+#include <vector>
+
 namespace YouCompleteMe {
 
+class Candidate;
+
+/// A flag shared between Python and a long running operation. Once |Cancel| is
+/// called, the operation stops as soon as possible and its result is discarded.
+/// It is safe to call |Cancel| from any thread, with or without the GIL.
+class CancellationToken {
+public:
+  CancellationToken() = default;
+  CancellationToken( const CancellationToken& ) = delete;
+  CancellationToken& operator=( const CancellationToken& ) = delete;
+
+  void Cancel() {
+    cancelled_.store( true, std::memory_order_relaxed );
+  }
+
+  bool IsCancelled() const {
+    return cancelled_.load( std::memory_order_relaxed );
+  }
+
+private:
+  std::atomic< bool > cancelled_{ false };
+};
+
+/// Default value of |SetParallelFilteringThreshold|.
+constexpr size_t DEFAULT_PARALLEL_FILTERING_THRESHOLD = 1 << 14;
+
+/// Lists of at least |num_candidates| candidates are split into shards filtered
+/// in parallel on the ThreadPool. The results don't depend on this setting.
+YCM_EXPORT void SetParallelFilteringThreshold( size_t num_candidates );
+
 /// Given a list of python objects (that represent completion candidates) in a
 /// python list |candidates|, a |candidate_property| on which to filter and sort
 /// the candidates and a user query, returns a new sorted python list with the
 /// original objects that survived the filtering. This list contains at most
 /// |max_candidates|. If |max_candidates| is omitted or 0, all candidates are
-/// sorted.
+/// sorted. If |cancellation_token| is cancelled while the candidates are being
+/// filtered, an empty list is returned.
 YCM_EXPORT pybind11::list FilterAndSortCandidates(
   const pybind11::list& candidates,
   pybind11::str candidate_property,
   std::string& query,
-  const size_t max_candidates = 0 );
+  const size_t max_candidates = 0,
+  const CancellationToken *cancellation_token = nullptr );
+
+/// The candidates of a python list |candidates|, filtered and sorted on their
+/// |candidate_property| like in |FilterAndSortCandidates|, but stored once so
+/// that they can be filtered with many queries without being extracted again.
+class CandidateList {
+public:
+  YCM_EXPORT CandidateList( const pybind11::list& candidates,
+                            pybind11::str candidate_property );
+  YCM_EXPORT ~CandidateList();
+  CandidateList( const CandidateList& ) = delete;
+  CandidateList& operator=( const CandidateList& ) = delete;
+
+  /// Returns a new sorted python list with the original objects that match
+  /// |query|. See |FilterAndSortCandidates|.
+  YCM_EXPORT pybind11::list FilterAndSort(
+    std::string& query,
+    const size_t max_candidates = 0,
+    const CancellationToken *cancellation_token = nullptr ) const;
+
+  size_t Size() const {
+    return repository_candidates_.size();
+  }
+
+private:
+  // A copy of the list, so that the objects stay where the candidates are.
+  pybind11::list candidates_;
+  std::vector< const Candidate * > repository_candidates_;
+};
 
 /// Given a Python object that's supposed to be "string-like", returns a UTF-8
 /// encoded std::string. Raises an exception if the object can't be converted to
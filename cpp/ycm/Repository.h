@@ -36,9 +36,13 @@ template< typename K, typename V >
 using HashMap = std::unordered_map< K, V >;
 } // namespace YouCompleteMe
 #endif
+#include <algorithm>
+#include <atomic>
 #include <memory>
 #include <shared_mutex>
 #include <string>
+#include <string_view>
+#include <type_traits>
 #include <vector>
 
 namespace YouCompleteMe {
@@ -46,12 +50,39 @@ namespace YouCompleteMe {
 // This singleton stores already built T objects. If Ts are requested for
 // previously unseen strings, new T objects are built.
 //
+// Every T returned by GetElements is referenced once until it is given back
+// with ReleaseElements. The Ts that stay unreferenced from one reclamation to
+// the next are destroyed; the others are kept, so that Ts released and
+// requested again shortly after, like the candidates of successive filter
+// calls, are not built again. Reclamations happen when enough Ts were released
+// since the previous one.
+//
 // This class is thread-safe.
 template< typename T >
 class Repository {
+  struct Element : T {
+    using T::T;
+
+    // Only changed from 0 while holding the lock exclusively, so that elements
+    // cannot be referenced again while they are being reclaimed.
+    std::atomic< size_t > references = 1;
+    // Whether the element was unreferenced during the last reclamation. Only
+    // accessed while holding the lock exclusively.
+    bool unreferenced_since_reclamation = false;
+  };
+
+  // Candidates are looked up by their own text instead of a copy of it.
+  using Key = std::conditional_t< std::is_same_v< T, Candidate >,
+                                  std::string_view,
+                                  std::string >;
+
 public:
-  using Holder = HashMap< std::string, std::unique_ptr< T > >;
+  using Holder = HashMap< Key, std::unique_ptr< Element > >;
   using Sequence = std::vector< const T* >;
+
+  // Releasing fewer elements does not start a reclamation.
+  static constexpr size_t MIN_ELEMENTS_TO_RECLAIM = 1 << 14;
+
   static Repository &Instance() {
     static Repository repo;
     return repo;
@@ -65,6 +96,11 @@ public:
     return element_holder_.size();
   }
 
+  // The number of elements destroyed since the repository was created.
+  size_t NumReclaimedElements() const {
+    return num_reclaimed_elements_;
+  }
+
   Sequence GetElements(
     std::vector< std::string >&& elements ) {
     Sequence element_objects( elements.size() );
@@ -79,34 +115,111 @@ public:
             element = "";
           }
         }
-        std::unique_ptr< T > &element_object = GetValueElseInsert(
-                                                           element_holder_,
-                                                           element,
-                                                           nullptr );
+        auto element_pos = element_holder_.find( element );
   
-        if ( !element_object ) {
-          element_object = std::make_unique< T >( std::move( element ) );
+        if ( element_pos == element_holder_.end() ) {
+          if constexpr ( std::is_same_v< T, Candidate > ) {
+            auto element_object = std::make_unique< Element >(
+                                    std::move( element ) );
+            Key text = element_object->Text();
+            element_pos = element_holder_.emplace(
+                            text, std::move( element_object ) ).first;
+          } else {
+            element_pos = element_holder_.emplace(
+                            element,
+                            std::make_unique< Element >( element ) ).first;
+          }
+        } else {
+          Element &element_object = *element_pos->second;
+          if ( element_object.references++ == 0 ) {
+            --num_unreferenced_elements_;
+          }
+          element_object.unreferenced_since_reclamation = false;
         }
   
-        *it++ = element_object.get();
+        *it++ = element_pos->second.get();
       }
     }
   
     return element_objects;
   }
 
+  // References the elements once more. The caller must already hold a
+  // reference to each of them.
+  void AcquireElements( const Sequence &elements ) {
+    for ( const T* element : elements ) {
+      ++AsElement( element )->references;
+    }
+  }
+
+  // Gives back one reference to each element. The elements must not be used
+  // afterwards unless other references to them are held.
+  void ReleaseElements( const Sequence &elements ) {
+    size_t num_released = 0;
+    for ( const T* element : elements ) {
+      if ( --AsElement( element )->references == 0 ) {
+        ++num_released;
+      }
+    }
+    if ( num_released > 0 &&
+         ( num_unreferenced_elements_ += num_released ) >=
+           reclamation_threshold_ ) {
+      ReclaimElements();
+    }
+  }
+
+  // Destroys the elements that were already unreferenced during the previous
+  // call and still are.
+  void ReclaimElements() {
+    std::lock_guard locker( element_holder_mutex_ );
+
+    size_t num_reclaimed = 0;
+    for ( auto it = element_holder_.begin(); it != element_holder_.end(); ) {
+      Element &element = *it->second;
+      if ( element.references != 0 ) {
+        ++it;
+      } else if ( element.unreferenced_since_reclamation ) {
+        element_holder_.erase( it++ );
+        ++num_reclaimed;
+      } else {
+        element.unreferenced_since_reclamation = true;
+        ++it;
+      }
+    }
+
+    num_unreferenced_elements_ -= num_reclaimed;
+    num_reclaimed_elements_ += num_reclaimed;
+    // Wait for as many elements as there are unreferenced ones now, or half of
+    // the stored ones, to be released before reclaiming again.
+    reclamation_threshold_ = num_unreferenced_elements_ +
+                             std::max( MIN_ELEMENTS_TO_RECLAIM,
+                                       element_holder_.size() / 2 );
+  }
+
   // This should only be used to isolate tests and benchmarks.
   void ClearElements() {
+    std::lock_guard locker( element_holder_mutex_ );
     element_holder_.clear();
+    num_unreferenced_elements_ = 0;
+    num_reclaimed_elements_ = 0;
+    reclamation_threshold_ = MIN_ELEMENTS_TO_RECLAIM;
   }
 
 private:
   Repository() = default;
   ~Repository() = default;
 
+  static Element *AsElement( const T* element ) {
+    return static_cast< Element* >( const_cast< T* >( element ) );
+  }
+
   // This data structure owns all the T pointers
   Holder element_holder_;
   mutable std::shared_mutex element_holder_mutex_;
+
+  std::atomic< size_t > num_unreferenced_elements_ = 0;
+  std::atomic< size_t > num_reclaimed_elements_ = 0;
+  std::atomic< size_t > reclamation_threshold_ = MIN_ELEMENTS_TO_RECLAIM;
 };
 
 extern template class YCM_EXPORT Repository< Candidate >;
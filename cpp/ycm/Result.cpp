@@ -22,8 +22,8 @@ namespace YouCompleteMe {
 
 namespace {
 
-size_t LongestCommonSubsequenceLength( const CharacterSequence &first,
-                                       const CharacterSequence &second ) {
+size_t LongestCommonSubsequenceLength( CharacterView first,
+                                       CharacterView second ) {
   const auto &longer  = first.size() > second.size() ? first  : second;
   const auto &shorter = first.size() > second.size() ? second : first;
 
@@ -136,7 +136,16 @@ bool Result::operator< ( const Result &other ) const {
 
   // Lexicographic comparison, but we prioritize lowercase letters over
   // uppercase ones. So "foo" < "Foo".
-  return candidate_->CaseSwappedText() < other.candidate_->CaseSwappedText();
+  int comparison = candidate_->CaseSwappedText().compare(
+                     other.candidate_->CaseSwappedText() );
+  if ( comparison != 0 ) {
+    return comparison < 0;
+  }
+
+  // Different texts may have the same normalized characters. Comparing them
+  // makes the order total, so that the results don't depend on the order they
+  // are sorted in.
+  return candidate_->Text() < other.candidate_->Text();
 }
 
 
@@ -21,6 +21,7 @@
 #include "Candidate.h"
 
 #include <string>
+#include <string_view>
 
 namespace YouCompleteMe {
 
@@ -40,9 +41,9 @@ public:
           size_t char_match_index_sum,
           bool query_is_candidate_prefix );
 
-  bool operator< ( const Result &other ) const;
+  YCM_EXPORT bool operator< ( const Result &other ) const;
 
-  inline const std::string &Text() const {
+  inline std::string_view Text() const {
     return candidate_->Text();
   }
 
@@ -54,6 +55,10 @@ public:
     return is_subsequence_;
   }
 
+  inline bool HasSameCandidate( const Result &other ) const {
+    return candidate_ == other.candidate_;
+  }
+
 private:
   void SetResultFeaturesFromQuery();
 
@@ -105,7 +110,12 @@ struct ResultAnd {
       result_( result ) {
   }
 
+  // The results of a candidate appearing several times are ordered on their
+  // extra objects.
   bool operator< ( const ResultAnd &other ) const {
+    if ( result_.HasSameCandidate( other.result_ ) ) {
+      return extra_object_ < other.extra_object_;
+    }
     return result_ < other.result_;
   }
 
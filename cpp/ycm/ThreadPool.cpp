@@ -0,0 +1,164 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "ThreadPool.h"
+
+#include <algorithm>
+#include <atomic>
+
+namespace YouCompleteMe {
+
+// The tasks of a call to Run. Each thread picking the job runs the next task
+// until there is none left.
+struct ThreadPool::Job {
+  Job( size_t num_tasks, const std::function< void( size_t ) > &task )
+    : num_tasks( num_tasks ),
+      task( task ) {
+  }
+
+  const size_t num_tasks;
+  // Only used while there are tasks left, so it can't outlive the call to Run.
+  const std::function< void( size_t ) > &task;
+  std::atomic< size_t > next_task = 0;
+  size_t num_done_tasks = 0;
+  std::mutex mutex;
+  std::condition_variable done;
+};
+
+
+ThreadPool &ThreadPool::Instance() {
+  static ThreadPool thread_pool;
+  return thread_pool;
+}
+
+
+ThreadPool::ThreadPool() {
+  SetNumThreads( 0 );
+}
+
+
+ThreadPool::~ThreadPool() {
+  std::lock_guard locker( resize_mutex_ );
+  StopThreads();
+}
+
+
+void ThreadPool::SetNumThreads( size_t num_threads ) {
+  if ( num_threads == 0 ) {
+    num_threads = std::clamp< size_t >( std::thread::hardware_concurrency(),
+                                        1,
+                                        DEFAULT_MAX_THREADS );
+  }
+  std::lock_guard locker( resize_mutex_ );
+  if ( NumThreads() == num_threads ) {
+    return;
+  }
+  StopThreads();
+  StartThreads( num_threads - 1 );
+}
+
+
+size_t ThreadPool::NumThreads() const {
+  std::lock_guard locker( mutex_ );
+  return threads_.size() + 1;
+}
+
+
+void ThreadPool::Run( size_t num_tasks,
+                      const std::function< void( size_t ) > &task ) {
+  if ( num_tasks == 0 ) {
+    return;
+  }
+
+  auto job = std::make_shared< Job >( num_tasks, task );
+  {
+    std::lock_guard locker( mutex_ );
+    size_t num_helpers = std::min( threads_.size(), num_tasks - 1 );
+    for ( size_t i = 0; i < num_helpers; ++i ) {
+      jobs_.push_back( job );
+    }
+  }
+  jobs_available_.notify_all();
+
+  RunTasks( *job );
+
+  std::unique_lock locker( job->mutex );
+  job->done.wait( locker, [ &job ] {
+    return job->num_done_tasks == job->num_tasks;
+  } );
+}
+
+
+void ThreadPool::StartThreads( size_t num_threads ) {
+  std::lock_guard locker( mutex_ );
+  stopping_ = false;
+  for ( size_t i = 0; i < num_threads; ++i ) {
+    threads_.emplace_back( &ThreadPool::WaitForJobs, this );
+  }
+}
+
+
+void ThreadPool::StopThreads() {
+  std::vector< std::thread > threads;
+  {
+    std::lock_guard locker( mutex_ );
+    stopping_ = true;
+    threads.swap( threads_ );
+  }
+  jobs_available_.notify_all();
+  for ( auto &thread : threads ) {
+    thread.join();
+  }
+}
+
+
+void ThreadPool::WaitForJobs() {
+  while ( true ) {
+    std::shared_ptr< Job > job;
+    {
+      std::unique_lock locker( mutex_ );
+      jobs_available_.wait( locker, [ this ] {
+        return stopping_ || !jobs_.empty();
+      } );
+      if ( stopping_ ) {
+        // The threads calling Run finish the remaining tasks.
+        return;
+      }
+      job = std::move( jobs_.front() );
+      jobs_.pop_front();
+    }
+    RunTasks( *job );
+  }
+}
+
+
+void ThreadPool::RunTasks( Job &job ) {
+  while ( true ) {
+    size_t index = job.next_task++;
+    if ( index >= job.num_tasks ) {
+      return;
+    }
+    job.task( index );
+
+    std::lock_guard locker( job.mutex );
+    if ( ++job.num_done_tasks == job.num_tasks ) {
+      job.done.notify_all();
+    }
+  }
+}
+
+} // namespace YouCompleteMe
@@ -0,0 +1,81 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#ifndef THREADPOOL_H_Q3ZV8M1T
+#define THREADPOOL_H_Q3ZV8M1T
+
+#include <condition_variable>
+#include <deque>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+namespace YouCompleteMe {
+
+// A pool of threads used to match candidates in parallel. The threads are
+// started once and wait for work, so that queries don't pay for creating them.
+//
+// This class is thread-safe.
+class ThreadPool {
+public:
+  YCM_EXPORT static ThreadPool &Instance();
+  // Make class noncopyable
+  ThreadPool( const ThreadPool& ) = delete;
+  ThreadPool& operator=( const ThreadPool& ) = delete;
+
+  // Sets the number of threads running the tasks of a call to Run, including
+  // the calling thread. If |num_threads| is 0, it depends on the number of
+  // cores, up to DEFAULT_MAX_THREADS. The threads are only restarted if their
+  // number changes.
+  YCM_EXPORT void SetNumThreads( size_t num_threads );
+
+  YCM_EXPORT size_t NumThreads() const;
+
+  // Calls |task| with each index from 0 to |num_tasks| - 1 and returns once
+  // all calls returned. The calling thread runs tasks too, so tasks never wait
+  // for threads busy with other calls.
+  YCM_EXPORT void Run( size_t num_tasks,
+                       const std::function< void( size_t ) > &task );
+
+  static constexpr size_t DEFAULT_MAX_THREADS = 4;
+
+private:
+  struct Job;
+
+  ThreadPool();
+  ~ThreadPool();
+
+  void StartThreads( size_t num_threads );
+  void StopThreads();
+  void WaitForJobs();
+  static void RunTasks( Job &job );
+
+  std::vector< std::thread > threads_;
+  std::deque< std::shared_ptr< Job > > jobs_;
+  bool stopping_ = false;
+  mutable std::mutex mutex_;
+  std::condition_variable jobs_available_;
+  // Held while the threads are stopped and started again, so that concurrent
+  // calls to SetNumThreads don't start threads twice.
+  std::mutex resize_mutex_;
+};
+
+} // namespace YouCompleteMe
+
+#endif /* end of include guard: THREADPOOL_H_Q3ZV8M1T */
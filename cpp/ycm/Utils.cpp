@@ -28,14 +28,19 @@ namespace fs = std::filesystem;
 
 namespace YouCompleteMe {
 
-std::vector< std::string > ReadUtf8File( const fs::path &filepath ) {
-  std::vector< std::string > contents;
+std::string ReadFile( const fs::path &filepath, size_t offset ) {
+  std::string contents;
   if ( !fs::is_empty( filepath ) && fs::is_regular_file( filepath ) ) {
-    std::string line;
-    for( std::ifstream file( filepath.string(),
-                             std::ios::in | std::ios::binary );
-         std::getline( file, line ); ) {
-      contents.push_back( std::move( line ) );
+    std::ifstream file( filepath.string(), std::ios::in | std::ios::binary );
+    file.seekg( 0, std::ios::end );
+    auto size = static_cast< size_t >( file.tellg() );
+    if ( file && offset < size ) {
+      contents.resize( size - offset );
+      file.seekg( static_cast< std::streamoff >( offset ) );
+      file.read( contents.data(),
+                 static_cast< std::streamsize >( contents.size() ) );
+      // The file may have been truncated in the meantime.
+      contents.resize( static_cast< size_t >( file.gcount() ) );
     }
   }
   return contents;
@@ -58,9 +58,9 @@ YCM_EXPORT inline std::string Lowercase( std::string_view text ) {
 }
 
 
-// Reads the entire contents of the specified file. If the file does not exist,
-// an exception is thrown.
-std::vector< std::string > ReadUtf8File( const fs::path &filepath );
+// Reads the contents of the specified file from byte |offset| to the end, in a
+// single buffer. If the file does not exist, an exception is thrown.
+std::string ReadFile( const fs::path &filepath, size_t offset = 0 );
 
 
 template <class Container, class Key, typename Value>
@@ -269,16 +269,16 @@ std::vector< std::string > BreakCodePointsIntoCharacters(
 
 } // unnamed namespace
 
-void Word::BreakIntoCharacters() {
-  const CodePointSequence &code_points = BreakIntoCodePoints( text_ );
+CharacterSequence Word::BreakIntoCharacters( std::string_view text ) {
+  const CodePointSequence &code_points = BreakIntoCodePoints( text );
 
-  characters_ = Repository< Character >::Instance().GetElements(
+  return Repository< Character >::Instance().GetElements(
     BreakCodePointsIntoCharacters( code_points ) );
 }
 
 
 void Word::ComputeBytesPresent() {
-  for ( const auto &character : characters_ ) {
+  for ( const auto &character : Characters() ) {
     for ( auto byte : character->Base() ) {
       bytes_present_.set( static_cast< uint8_t >( byte ) );
     }
@@ -287,8 +287,35 @@ void Word::ComputeBytesPresent() {
 
 
 Word::Word( std::string&& text )
-  : text_( std::move( text ) ) {
-  BreakIntoCharacters();
+  : Word( text, BreakIntoCharacters( text ), {}, {} ) {
+}
+
+
+Word::Word( std::string_view text,
+            const CharacterSequence &characters,
+            const CharacterSequence &extra_characters,
+            std::string_view extra_text )
+  : num_characters_( static_cast< uint32_t >( characters.size() ) ),
+    num_extra_characters_( static_cast< uint32_t >(
+                             extra_characters.size() ) ),
+    text_size_( static_cast< uint32_t >( text.size() ) ),
+    extra_text_size_( static_cast< uint32_t >( extra_text.size() ) ) {
+  size_t num_pointers = characters.size() + extra_characters.size();
+  size_t text_size = text.size() + extra_text.size();
+  data_.reset( new const Character *[
+    num_pointers +
+    ( text_size + sizeof( const Character * ) - 1 ) /
+    sizeof( const Character * ) ] );
+
+  std::copy( extra_characters.begin(),
+             extra_characters.end(),
+             std::copy( characters.begin(), characters.end(), data_.get() ) );
+  std::copy( extra_text.begin(),
+             extra_text.end(),
+             std::copy( text.begin(),
+                        text.end(),
+                        reinterpret_cast< char * >( data_.get() +
+                                                    num_pointers ) ) );
   ComputeBytesPresent();
 }
 
@@ -21,7 +21,10 @@
 #include "Character.h"
 
 #include <bitset>
+#include <cstdint>
+#include <memory>
 #include <string>
+#include <string_view>
 #include <vector>
 
 #define NUM_BYTES 256
@@ -34,28 +37,30 @@ using Bitset = std::bitset< NUM_BYTES >;
 // This class represents a sequence of UTF-8 characters. It takes a UTF-8
 // encoded string and splits that string into characters following the rules in
 // https://www.unicode.org/reports/tr29/tr29-37.html#Grapheme_Cluster_Boundary_Rules
+//
+// The characters and the text are stored in a single allocation, followed by
+// the extra characters and text of derived classes. Words are kept by the
+// hundreds of thousands, so they must stay small.
 class Word {
 public:
   YCM_EXPORT explicit Word( std::string&& text );
   // Make class noncopyable
-protected:
-  Word( const Word& ) = default;
-  Word& operator=( const Word& ) = default;
-public:
+  Word( const Word& ) = delete;
+  Word& operator=( const Word& ) = delete;
   Word( Word&& ) = default;
   Word& operator=( Word&& ) = default;
   ~Word() = default;
 
-  inline const CharacterSequence &Characters() const {
-    return characters_;
+  inline CharacterView Characters() const {
+    return { CharacterData(), num_characters_ };
   }
 
-  inline const std::string &Text() const {
-    return text_;
+  inline std::string_view Text() const {
+    return { TextData(), text_size_ };
   }
 
   inline size_t Length() const {
-    return characters_.size();
+    return num_characters_;
   }
 
   // Returns true if the word contains the bytes from another word (it may also
@@ -65,15 +70,45 @@ public:
   }
 
   inline bool IsEmpty() const {
-    return characters_.empty();
+    return num_characters_ == 0;
+  }
+
+protected:
+  // Stores |extra_characters| and |extra_text| along with the characters and
+  // the text of the word.
+  Word( std::string_view text,
+        const CharacterSequence &characters,
+        const CharacterSequence &extra_characters,
+        std::string_view extra_text );
+
+  static CharacterSequence BreakIntoCharacters( std::string_view text );
+
+  inline CharacterView ExtraCharacters() const {
+    return { CharacterData() + num_characters_, num_extra_characters_ };
+  }
+
+  inline std::string_view ExtraText() const {
+    return { TextData() + text_size_, extra_text_size_ };
   }
 
 private:
-  void BreakIntoCharacters();
+  inline const Character * const *CharacterData() const {
+    return data_.get();
+  }
+
+  inline const char *TextData() const {
+    return reinterpret_cast< const char * >(
+             data_.get() + num_characters_ + num_extra_characters_ );
+  }
+
   void ComputeBytesPresent();
 
-  std::string text_;
-  CharacterSequence characters_;
+  // The characters, then the extra characters, the text and the extra text.
+  std::unique_ptr< const Character *[] > data_;
+  uint32_t num_characters_;
+  uint32_t num_extra_characters_;
+  uint32_t text_size_;
+  uint32_t extra_text_size_;
   Bitset bytes_present_;
 };
 
@@ -0,0 +1,136 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "BenchUtils.h"
+#include "Candidate.h"
+#include "Repository.h"
+#include "Result.h"
+#include "Utils.h"
+
+#include <benchmark/benchmark.h>
+#include <algorithm>
+#include <random>
+
+#ifdef __GLIBC__
+#include <malloc.h>
+#endif
+
+namespace YouCompleteMe {
+
+namespace {
+
+// The number of bytes allocated on the heap, or 0 if unknown.
+size_t AllocatedBytes() {
+#if defined( __GLIBC__ ) && \
+    ( __GLIBC__ > 2 || ( __GLIBC__ == 2 && __GLIBC_MINOR__ >= 33 ) )
+  return mallinfo2().uordblks;
+#else
+  return 0;
+#endif
+}
+
+} // unnamed namespace
+
+
+class CandidateFixture : public benchmark::Fixture {
+public:
+  void SetUp( const benchmark::State& ) {
+    Repository< CodePoint >::Instance().ClearElements();
+    Repository< Character >::Instance().ClearElements();
+    Repository< Candidate >::Instance().ClearElements();
+  }
+};
+
+
+// Reports the memory used by the repository for each candidate, including the
+// repository's own bookkeeping.
+BENCHMARK_DEFINE_F( CandidateFixture, StoreCandidates )(
+    benchmark::State& state ) {
+  auto raw_candidates = GenerateCandidatesWithCommonPrefix(
+                          "ycm_identifier_", state.range( 0 ) );
+  // Build the characters beforehand, so that only candidates are counted.
+  Repository< Candidate >::Instance().GetElements(
+    std::vector< std::string >( raw_candidates ) );
+  Repository< Candidate >::Instance().ClearElements();
+
+  size_t bytes = 0;
+  for ( auto _ : state ) {
+    state.PauseTiming();
+    Repository< Candidate >::Instance().ClearElements();
+    std::vector< std::string > candidates( raw_candidates );
+    size_t allocated_bytes = AllocatedBytes();
+    state.ResumeTiming();
+
+    Repository< Candidate >::Instance().GetElements( std::move( candidates ) );
+
+    state.PauseTiming();
+    bytes = AllocatedBytes() - allocated_bytes;
+    state.ResumeTiming();
+  }
+
+  state.counters[ "bytes_per_candidate" ] =
+    static_cast< double >( bytes ) / static_cast< double >( state.range( 0 ) );
+  state.SetComplexityN( state.range( 0 ) );
+}
+
+
+// Matches and sorts candidates visited in a random order, as they are when
+// filtering the candidates of a semantic completer. Once the candidates don't
+// fit in the cache, this is bound by the memory accesses of each candidate.
+BENCHMARK_DEFINE_F( CandidateFixture, ScoreScatteredCandidates )(
+    benchmark::State& state ) {
+  auto candidates = Repository< Candidate >::Instance().GetElements(
+    GenerateCandidatesWithCommonPrefix( "ycm_identifier_",
+                                        state.range( 0 ) ) );
+  std::shuffle( candidates.begin(), candidates.end(), std::mt19937( 0 ) );
+  Word query( "yiab" );
+
+  for ( auto _ : state ) {
+    std::vector< Result > results;
+    for ( const Candidate *candidate : candidates ) {
+      if ( !candidate->ContainsBytes( query ) ) {
+        continue;
+      }
+      Result result = candidate->QueryMatchResult( query );
+      if ( result.IsSubsequence() ) {
+        results.push_back( result );
+      }
+    }
+    PartialSort( results, state.range( 1 ) );
+    benchmark::DoNotOptimize( results );
+  }
+
+  state.SetComplexityN( state.range( 0 ) );
+}
+
+
+BENCHMARK_REGISTER_F( CandidateFixture, StoreCandidates )
+    ->RangeMultiplier( 1 << 4 )
+    ->Range( 1 << 8, 1 << 16 )
+    ->Complexity();
+
+BENCHMARK_REGISTER_F( CandidateFixture, ScoreScatteredCandidates )
+    ->RangeMultiplier( 1 << 4 )
+    ->Ranges( { { 1 << 8, 1 << 20 }, { 0, 0 } } )
+    ->Complexity();
+
+BENCHMARK_REGISTER_F( CandidateFixture, ScoreScatteredCandidates )
+    ->RangeMultiplier( 1 << 4 )
+    ->Ranges( { { 1 << 8, 1 << 20 }, { 50, 50 } } )
+    ->Complexity();
+
+} // namespace YouCompleteMe
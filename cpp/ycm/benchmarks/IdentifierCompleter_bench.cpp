@@ -18,8 +18,13 @@
 #include "BenchUtils.h"
 #include "Repository.h"
 #include "IdentifierCompleter.h"
+#include "ThreadPool.h"
 
+#include <atomic>
 #include <benchmark/benchmark.h>
+#include <filesystem>
+#include <fstream>
+#include <thread>
 
 namespace YouCompleteMe {
 
@@ -58,4 +63,210 @@ BENCHMARK_REGISTER_F( IdentifierCompleterFixture, CandidatesWithCommonPrefix )
     ->Ranges( { { 1, 1 << 16 }, { 10, 10 } } )
     ->Complexity();
 
+
+// Measure queries while another file of the same filetype is parsed again and
+// again.
+BENCHMARK_DEFINE_F( IdentifierCompleterFixture, CandidatesWhileUpdating )(
+    benchmark::State& state ) {
+
+  std::vector< std::string > candidates =
+    GenerateCandidatesWithCommonPrefix( "a_A_a_", state.range( 0 ) );
+  IdentifierCompleter completer( std::move( candidates ) );
+
+  std::atomic_bool done = false;
+  std::thread writer( [ &completer, &done, &state ]() {
+    while ( !done ) {
+      std::vector< std::string > candidates =
+        GenerateCandidatesWithCommonPrefix( "b_B_b_", state.range( 0 ) );
+      std::string filetype;
+      std::string filepath = "foo";
+      completer.ClearForFileAndAddIdentifiersToDatabase( candidates,
+                                                         filetype,
+                                                         filepath );
+    }
+  } );
+
+  for ( auto _ : state ) {
+    std::string query = "aA";
+    completer.CandidatesForQueryAndType( query, "", 10 );
+  }
+
+  done = true;
+  writer.join();
+  state.SetComplexityN( state.range( 0 ) );
+}
+
+
+BENCHMARK_REGISTER_F( IdentifierCompleterFixture, CandidatesWhileUpdating )
+    ->RangeMultiplier( 1 << 4 )
+    ->Range( 1 << 8, 1 << 16 )
+    ->UseRealTime()
+    ->Complexity();
+
+
+// Measure a query extending the previous query of the same file. If the second
+// argument is 0, the previous query is not extended.
+BENCHMARK_DEFINE_F( IdentifierCompleterFixture, FollowUpQuery )(
+    benchmark::State& state ) {
+
+  std::vector< std::string > candidates =
+    GenerateCandidatesWithCommonPrefix( "a_A_a_", state.range( 0 ) );
+  IdentifierCompleter completer( std::move( candidates ) );
+
+  for ( auto _ : state ) {
+    state.PauseTiming();
+    std::string previous_query = state.range( 1 ) ? "aAz" : "b";
+    completer.CandidatesForQueryAndType( previous_query, "", 10, "foo" );
+    state.ResumeTiming();
+
+    std::string query = "aAzz";
+    completer.CandidatesForQueryAndType( query, "", 10, "foo" );
+  }
+
+  state.SetComplexityN( state.range( 0 ) );
+}
+
+
+BENCHMARK_REGISTER_F( IdentifierCompleterFixture, FollowUpQuery )
+    ->RangeMultiplier( 1 << 3 )
+    ->Ranges( { { 1 << 10, 1 << 19 }, { 0, 1 } } );
+
+
+// Measure adding a new identifier to a file of a filetype with
+// |state.range( 0 )| identifiers, which is queried between the additions.
+BENCHMARK_DEFINE_F( IdentifierCompleterFixture, AddIdentifierAfterQuery )(
+    benchmark::State& state ) {
+
+  std::vector< std::string > candidates =
+    GenerateCandidatesWithCommonPrefix( "a_A_a_", state.range( 0 ) );
+  IdentifierCompleter completer( std::move( candidates ) );
+
+  size_t num_identifiers = 0;
+  for ( auto _ : state ) {
+    state.PauseTiming();
+    std::string query = "aA";
+    completer.CandidatesForQueryAndType( query, "", 10, "foo" );
+    std::vector< std::string > identifiers = {
+      "b_B_b_" + std::to_string( num_identifiers++ ) };
+    std::string filetype;
+    std::string filepath = "foo";
+    state.ResumeTiming();
+
+    completer.AddIdentifiersToDatabase( identifiers, filetype, filepath );
+  }
+
+  state.SetComplexityN( state.range( 0 ) );
+}
+
+
+// The untimed queries dominate, so the number of iterations is fixed.
+BENCHMARK_REGISTER_F( IdentifierCompleterFixture, AddIdentifierAfterQuery )
+    ->RangeMultiplier( 1 << 3 )
+    ->Range( 1 << 10, 1 << 19 )
+    ->Iterations( 200 )
+    ->Complexity();
+
+
+// Measure a query right after a new identifier is added to a filetype with
+// |state.range( 0 )| identifiers. If the second argument is 1, the query extends
+// the query made before the addition.
+BENCHMARK_DEFINE_F( IdentifierCompleterFixture, QueryAfterAddIdentifier )(
+    benchmark::State& state ) {
+
+  std::vector< std::string > candidates =
+    GenerateCandidatesWithCommonPrefix( "a_A_a_", state.range( 0 ) );
+  IdentifierCompleter completer( std::move( candidates ) );
+
+  size_t num_identifiers = 0;
+  for ( auto _ : state ) {
+    state.PauseTiming();
+    std::string previous_query = state.range( 1 ) ? "aAz" : "b";
+    completer.CandidatesForQueryAndType( previous_query, "", 10, "foo" );
+    std::vector< std::string > identifiers = {
+      "b_B_b_" + std::to_string( num_identifiers++ ) };
+    std::string filetype;
+    std::string filepath = "foo";
+    completer.AddIdentifiersToDatabase( identifiers, filetype, filepath );
+    state.ResumeTiming();
+
+    std::string query = "aAzz";
+    completer.CandidatesForQueryAndType( query, "", 10, "foo" );
+  }
+
+  state.SetComplexityN( state.range( 0 ) );
+}
+
+
+BENCHMARK_REGISTER_F( IdentifierCompleterFixture, QueryAfterAddIdentifier )
+    ->RangeMultiplier( 1 << 3 )
+    ->Ranges( { { 1 << 10, 1 << 19 }, { 0, 1 } } )
+    ->Iterations( 200 );
+
+
+// Measure how matching scales with the number of threads. The second argument
+// is the number of threads.
+BENCHMARK_DEFINE_F( IdentifierCompleterFixture, CandidatesOnThreads )(
+    benchmark::State& state ) {
+
+  std::vector< std::string > candidates =
+    GenerateCandidatesWithCommonPrefix( "a_A_a_", state.range( 0 ) );
+  IdentifierCompleter completer( std::move( candidates ) );
+  ThreadPool::Instance().SetNumThreads( state.range( 1 ) );
+
+  for ( auto _ : state ) {
+    completer.CandidatesForQuery( "aA", 10 );
+  }
+
+  ThreadPool::Instance().SetNumThreads( 0 );
+}
+
+
+BENCHMARK_REGISTER_F( IdentifierCompleterFixture, CandidatesOnThreads )
+    ->ArgsProduct( { { 1 << 16, 1 << 20 },
+                     benchmark::CreateDenseRange( 1, 8, 1 ) } )
+    ->UseRealTime()
+    ->Unit( benchmark::kMillisecond );
+
+
+
+// Measure ingesting a tags file of |state.range( 0 )| tags after a hundred tags
+// are appended to it.
+BENCHMARK_DEFINE_F( IdentifierCompleterFixture, TagsFileAppendedTo )(
+    benchmark::State& state ) {
+
+  std::filesystem::path path =
+    std::filesystem::temp_directory_path() / "ycm_core_benchmark.tags";
+  size_t num_tags = 0;
+  auto append_tags = [ &path, &num_tags ]( size_t count ) {
+    std::ofstream file( path, std::ios::binary | std::ios::app );
+    for ( size_t end = num_tags + count; num_tags < end; ++num_tags ) {
+      file << "a_A_a_" << num_tags << "\tsrc/file_" << num_tags % 1000
+           << ".cpp\t/^void a_A_a_" << num_tags << "();$/;\"\tf\t"
+           << "language:C++\n";
+    }
+  };
+  std::filesystem::remove( path );
+  append_tags( state.range( 0 ) );
+  IdentifierCompleter completer;
+  std::vector< std::string > tag_files = { path.string() };
+  completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+
+  for ( auto _ : state ) {
+    state.PauseTiming();
+    append_tags( 100 );
+    state.ResumeTiming();
+
+    completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+  }
+
+  std::filesystem::remove( path );
+  state.SetComplexityN( state.range( 0 ) );
+}
+
+
+BENCHMARK_REGISTER_F( IdentifierCompleterFixture, TagsFileAppendedTo )
+    ->RangeMultiplier( 1 << 3 )
+    ->Range( 1 << 12, 1 << 18 )
+    ->Complexity();
+
 } // namespace YouCompleteMe
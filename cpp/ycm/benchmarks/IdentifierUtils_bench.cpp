@@ -0,0 +1,116 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "IdentifierUtils.h"
+
+#include <benchmark/benchmark.h>
+#include <filesystem>
+#include <fstream>
+
+namespace YouCompleteMe {
+
+namespace fs = std::filesystem;
+
+namespace {
+
+// Generate C++ code of at least |size| bytes with comments and strings.
+std::string GenerateCppBuffer( size_t size ) {
+  std::string buffer;
+  for ( size_t i = 0; buffer.size() < size; ++i ) {
+    std::string index = std::to_string( i );
+    buffer += "/* Function number " + index + ".\n"
+              " * Returns a string. */\n"
+              "std::string function_" + index + "( int argument_" + index +
+              " ) {\n"
+              "  // Escape the \"quotes\".\n"
+              "  return \"a \\\"string\\\" \" + std::to_string( 'c' + "
+              "argument_" + index + " );\n"
+              "}\n\n";
+  }
+  return buffer;
+}
+
+
+// Write a tags file with |num_tags| tags spread over a thousand files.
+fs::path WriteTagsFile( size_t num_tags ) {
+  fs::path path = fs::temp_directory_path() / "ycm_core_benchmark.tags";
+  std::ofstream file( path, std::ios::binary );
+  file << "!_TAG_FILE_FORMAT\t2\t/extended format/\n";
+  for ( size_t i = 0; i < num_tags; ++i ) {
+    std::string index = std::to_string( i );
+    file << "function_" << index << "\tsrc/file_" << i % 1000 << ".cpp\t"
+         << "/^std::string function_" << index << "( int a ) {$/;\"\tf\t"
+         << "language:C++\tsignature:( int a )\n";
+  }
+  return path;
+}
+
+} // unnamed namespace
+
+
+static void RemoveIdentifierFreeText_CppBuffer( benchmark::State& state ) {
+  std::string buffer = GenerateCppBuffer( state.range( 0 ) );
+  bool ends_inside_comment_or_string;
+
+  for ( auto _ : state ) {
+    benchmark::DoNotOptimize( RemoveIdentifierFreeText(
+      buffer, "cpp", ends_inside_comment_or_string ) );
+  }
+
+  state.SetBytesProcessed( state.iterations() * buffer.size() );
+}
+
+
+static void ExtractIdentifiersFromText_CppBuffer( benchmark::State& state ) {
+  std::string buffer = GenerateCppBuffer( state.range( 0 ) );
+
+  for ( auto _ : state ) {
+    benchmark::DoNotOptimize( ExtractIdentifiersFromText( buffer, "cpp" ) );
+  }
+
+  state.SetBytesProcessed( state.iterations() * buffer.size() );
+}
+
+
+static void ExtractIdentifiersFromTagsFile_CppTags( benchmark::State& state ) {
+  fs::path path = WriteTagsFile( state.range( 0 ) );
+
+  for ( auto _ : state ) {
+    benchmark::DoNotOptimize( ExtractIdentifiersFromTagsFile( path ) );
+  }
+
+  state.SetBytesProcessed( state.iterations() * fs::file_size( path ) );
+  fs::remove( path );
+}
+
+
+BENCHMARK( RemoveIdentifierFreeText_CppBuffer )
+    ->RangeMultiplier( 1 << 2 )
+    ->Range( 1 << 16, 1 << 22 )
+    ->Unit( benchmark::kMillisecond );
+
+BENCHMARK( ExtractIdentifiersFromText_CppBuffer )
+    ->RangeMultiplier( 1 << 2 )
+    ->Range( 1 << 16, 1 << 22 )
+    ->Unit( benchmark::kMillisecond );
+
+BENCHMARK( ExtractIdentifiersFromTagsFile_CppTags )
+    ->RangeMultiplier( 1 << 3 )
+    ->Range( 1 << 12, 1 << 18 )
+    ->Unit( benchmark::kMillisecond );
+
+} // namespace YouCompleteMe
@@ -18,6 +18,7 @@
 #include "BenchUtils.h"
 #include "Repository.h"
 #include "PythonSupport.h"
+#include "ThreadPool.h"
 
 #include <benchmark/benchmark.h>
 
@@ -94,6 +95,62 @@ BENCHMARK_DEFINE_F( PythonSupportFixture,
 }
 
 
+BENCHMARK_DEFINE_F( PythonSupportFixture,
+                    FilterAndSortRegisteredCandidatesWithCommonPrefix )(
+    benchmark::State& state ) {
+
+  std::vector< std::string > raw_candidates;
+  raw_candidates = GenerateCandidatesWithCommonPrefix( "a_A_a_",
+                                                       state.range( 0 ) );
+
+  pybind11::list candidates;
+  for ( auto insertion_text : raw_candidates ) {
+    pybind11::dict candidate;
+    candidate[ "insertion_text" ] = insertion_text;
+    candidates.append( candidate );
+  }
+
+  CandidateList candidate_list( candidates, "insertion_text" );
+
+  for ( auto _ : state ) {
+    std::string query = "aA";
+    candidate_list.FilterAndSort( query, state.range( 1 ) );
+  }
+
+  state.SetComplexityN( state.range( 0 ) );
+}
+
+
+// Filters a large registered list on a pool of state.range( 2 ) threads.
+BENCHMARK_DEFINE_F( PythonSupportFixture,
+                    FilterAndSortCandidatesInParallel )(
+    benchmark::State& state ) {
+
+  std::vector< std::string > raw_candidates;
+  raw_candidates = GenerateCandidatesWithCommonPrefix( "a_A_a_",
+                                                       state.range( 0 ) );
+
+  pybind11::list candidates;
+  for ( auto insertion_text : raw_candidates ) {
+    pybind11::dict candidate;
+    candidate[ "insertion_text" ] = insertion_text;
+    candidates.append( candidate );
+  }
+
+  CandidateList candidate_list( candidates, "insertion_text" );
+  size_t num_threads = ThreadPool::Instance().NumThreads();
+  ThreadPool::Instance().SetNumThreads( state.range( 2 ) );
+
+  for ( auto _ : state ) {
+    std::string query = "aA";
+    candidate_list.FilterAndSort( query, state.range( 1 ) );
+  }
+
+  ThreadPool::Instance().SetNumThreads( num_threads );
+  state.SetComplexityN( state.range( 0 ) );
+}
+
+
 BENCHMARK_REGISTER_F( PythonSupportFixture,
                       FilterAndSortUnstoredCandidatesWithCommonPrefix )
     ->RangeMultiplier( 1 << 4 )
@@ -119,4 +176,23 @@ BENCHMARK_REGISTER_F( PythonSupportFixture,
     ->Ranges( { { 1, 1 << 16 }, { 50, 50 } } )
     ->Complexity();
 
+
+BENCHMARK_REGISTER_F( PythonSupportFixture,
+                      FilterAndSortRegisteredCandidatesWithCommonPrefix )
+    ->RangeMultiplier( 1 << 4 )
+    ->Ranges( { { 1, 1 << 16 }, { 0, 0 } } )
+    ->Complexity();
+
+BENCHMARK_REGISTER_F( PythonSupportFixture,
+                      FilterAndSortRegisteredCandidatesWithCommonPrefix )
+    ->RangeMultiplier( 1 << 4 )
+    ->Ranges( { { 1, 1 << 16 }, { 50, 50 } } )
+    ->Complexity();
+
+
+BENCHMARK_REGISTER_F( PythonSupportFixture,
+                      FilterAndSortCandidatesInParallel )
+    ->ArgsProduct( { { 1 << 16, 1 << 20 }, { 0, 50 }, { 1, 2, 4 } } )
+    ->UseRealTime();
+
 } // namespace YouCompleteMe
@@ -84,5 +84,72 @@ TEST_F( CandidateRepositoryTest, NonPrintableCandidates ) {
 }
 
 
+TEST_F( CandidateRepositoryTest, ReleasedCandidatesReclaimed ) {
+  auto candidates = repo_.GetElements( { "foo", "bar" } );
+  repo_.ReleaseElements( { candidates[ 0 ] } );
+
+  // Unreferenced candidates survive one reclamation.
+  repo_.ReclaimElements();
+  EXPECT_EQ( 2, repo_.NumStoredElements() );
+  EXPECT_EQ( 0, repo_.NumReclaimedElements() );
+
+  repo_.ReclaimElements();
+  EXPECT_EQ( 1, repo_.NumStoredElements() );
+  EXPECT_EQ( 1, repo_.NumReclaimedElements() );
+  EXPECT_EQ( "bar", candidates[ 1 ]->Text() );
+}
+
+
+TEST_F( CandidateRepositoryTest, CandidatesRequestedAgainNotReclaimed ) {
+  auto candidates = repo_.GetElements( { "foo" } );
+  repo_.ReleaseElements( candidates );
+  repo_.ReclaimElements();
+
+  auto new_candidates = repo_.GetElements( { "foo" } );
+  EXPECT_EQ( candidates[ 0 ], new_candidates[ 0 ] );
+  repo_.ReleaseElements( new_candidates );
+  repo_.ReclaimElements();
+  EXPECT_EQ( 1, repo_.NumStoredElements() );
+
+  repo_.ReclaimElements();
+  EXPECT_EQ( 0, repo_.NumStoredElements() );
+}
+
+
+TEST_F( CandidateRepositoryTest, AcquiredCandidatesNotReclaimed ) {
+  auto candidates = repo_.GetElements( { "foo" } );
+  repo_.AcquireElements( candidates );
+  repo_.ReleaseElements( candidates );
+  repo_.ReclaimElements();
+  repo_.ReclaimElements();
+  EXPECT_EQ( 1, repo_.NumStoredElements() );
+
+  repo_.ReleaseElements( candidates );
+  repo_.ReclaimElements();
+  repo_.ReclaimElements();
+  EXPECT_EQ( 0, repo_.NumStoredElements() );
+}
+
+
+TEST_F( CandidateRepositoryTest, ReclaimedWhenEnoughCandidatesReleased ) {
+  const size_t num_candidates = Repository< Candidate >::MIN_ELEMENTS_TO_RECLAIM;
+  std::vector< std::string > first_inputs;
+  std::vector< std::string > second_inputs;
+  for ( size_t i = 0; i < num_candidates; ++i ) {
+    first_inputs.push_back( "a" + std::to_string( i ) );
+    second_inputs.push_back( "b" + std::to_string( i ) );
+  }
+
+  // Releasing the first candidates starts a reclamation, which they survive.
+  repo_.ReleaseElements( repo_.GetElements( std::move( first_inputs ) ) );
+  EXPECT_EQ( num_candidates, repo_.NumStoredElements() );
+
+  // Releasing as many candidates again reclaims the first ones.
+  repo_.ReleaseElements( repo_.GetElements( std::move( second_inputs ) ) );
+  EXPECT_EQ( num_candidates, repo_.NumStoredElements() );
+  EXPECT_EQ( num_candidates, repo_.NumReclaimedElements() );
+}
+
+
 } // namespace YouCompleteMe
 
@@ -148,6 +148,21 @@ TEST( CandidateTest, TextValid ) {
   EXPECT_EQ( "foo", Candidate( "foo" ).Text() );
 }
 
+TEST( CandidateTest, StoredTogether ) {
+  Candidate candidate( "f𐍈oBar_Baz" );
+  EXPECT_EQ( "f𐍈oBar_Baz", candidate.Text() );
+  EXPECT_EQ( "F𐍈ObAR_bAZ", candidate.CaseSwappedText() );
+  EXPECT_EQ( 10, candidate.Length() );
+  EXPECT_EQ( Word( "fBB" ).Characters(), candidate.WordBoundaryChars() );
+  EXPECT_FALSE( candidate.TextIsLowercase() );
+
+  Candidate empty( "" );
+  EXPECT_EQ( "", empty.Text() );
+  EXPECT_EQ( "", empty.CaseSwappedText() );
+  EXPECT_TRUE( empty.IsEmpty() );
+  EXPECT_TRUE( empty.WordBoundaryChars().empty() );
+}
+
 MATCHER_P( IsSubsequence,
            candidate,
            std::string( negation ? "is not" : "is" ) + " a subsequence of " +
@@ -19,9 +19,19 @@
 #include <gmock/gmock.h>
 #include "Candidate.h"
 #include "IdentifierCompleter.h"
+#include "Repository.h"
+#include "ThreadPool.h"
 #include "Utils.h"
 #include "TestUtils.h"
 
+#include <algorithm>
+#include <atomic>
+#include <filesystem>
+#include <fstream>
+#include <set>
+#include <thread>
+
+using ::testing::ContainerEq;
 using ::testing::ElementsAre;
 using ::testing::IsEmpty;
 using ::testing::WhenSorted;
@@ -305,6 +315,303 @@ TEST( IdentifierCompleterTest, TagsEndToEndWorks ) {
 }
 
 
+TEST( IdentifierCompleterTest, TagsFileAppendedTo ) {
+  fs::path path = fs::temp_directory_path() / "ycm_core_appended.tags";
+  auto write = [ &path ]( std::string_view tags, std::ios::openmode mode ) {
+    std::ofstream( path, std::ios::binary | mode ) << tags;
+  };
+  auto candidates = []( IdentifierCompleter &completer ) {
+    std::string query = "fo";
+    return completer.CandidatesForQueryAndType( query, "cpp" );
+  };
+  IdentifierCompleter completer;
+  std::vector< std::string > tag_files = { path.string() };
+
+  write( "foo\tfoo.cpp\tlanguage:C++\n"
+         "fooba", std::ios::trunc );
+  completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+  EXPECT_THAT( candidates( completer ), ElementsAre( "foo" ) );
+
+  // The last line is completed and new lines are added.
+  write( "r\tfoo.cpp\tlanguage:C++\n"
+         "food\tbar.cpp\tlanguage:C++\n", std::ios::app );
+  completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+  EXPECT_THAT( candidates( completer ),
+               WhenSorted( ElementsAre( "foo", "foobar", "food" ) ) );
+
+  // The file is rewritten.
+  write( "fool\tfoo.cpp\tlanguage:C++\n"
+         "fox\tfoo.cpp\tlanguage:C++\n"
+         "food\tbar.cpp\tlanguage:C++\n"
+         "form\tbar.cpp\tlanguage:C++\n", std::ios::trunc );
+  completer.AddIdentifiersToDatabaseFromTagFiles( tag_files );
+  EXPECT_THAT( candidates( completer ),
+               WhenSorted( ElementsAre( "food", "fool", "form", "fox" ) ) );
+
+  fs::remove( path );
+}
+
+
+TEST( IdentifierCompleterTest, AddAndRemoveIdentifiers ) {
+  IdentifierCompleter completer;
+  // The arguments are moved from.
+  auto add = [ &completer ]( std::vector< std::string > identifiers ) {
+    std::string filetype = "c";
+    std::string filepath = "foo";
+    completer.AddIdentifiersToDatabase( identifiers, filetype, filepath );
+  };
+  auto remove = [ &completer ]( std::vector< std::string > identifiers ) {
+    std::string filetype = "c";
+    std::string filepath = "foo";
+    completer.RemoveIdentifiersFromDatabase( identifiers, filetype, filepath );
+  };
+  auto candidates = [ &completer ]() {
+    std::string query = "foo";
+    return completer.CandidatesForQueryAndType( query, "c" );
+  };
+
+  add( { "foobar", "foobaz", "foobar" } );
+  add( { "fooqux", "foobaz" } );
+  EXPECT_THAT( candidates(),
+               WhenSorted( ElementsAre( "foobar", "foobaz", "fooqux" ) ) );
+
+  remove( { "foobar", "unknown" } );
+  EXPECT_THAT( candidates(),
+               WhenSorted( ElementsAre( "foobaz", "fooqux" ) ) );
+
+  remove( { "fooqux", "foobaz" } );
+  EXPECT_THAT( candidates(), IsEmpty() );
+
+  add( { "foobar" } );
+  EXPECT_THAT( candidates(), ElementsAre( "foobar" ) );
+}
+
+
+TEST( IdentifierCompleterTest, IdentifiersSharedBetweenFiles ) {
+  IdentifierCompleter completer;
+  // The arguments are moved from.
+  auto add = [ &completer ]( std::vector< std::string > identifiers,
+                             std::string filepath ) {
+    std::string filetype = "c";
+    completer.AddIdentifiersToDatabase( identifiers, filetype, filepath );
+  };
+  auto remove = [ &completer ]( std::vector< std::string > identifiers,
+                                std::string filepath ) {
+    std::string filetype = "c";
+    completer.RemoveIdentifiersFromDatabase( identifiers, filetype, filepath );
+  };
+  auto candidates = [ &completer ]() {
+    std::string query = "foo";
+    return completer.CandidatesForQueryAndType( query, "c" );
+  };
+
+  add( { "foobar", "foobaz" }, "foo" );
+  add( { "foobar", "fooqux" }, "bar" );
+  EXPECT_THAT( candidates(),
+               WhenSorted( ElementsAre( "foobar", "foobaz", "fooqux" ) ) );
+
+  remove( { "foobar", "foobaz" }, "foo" );
+  EXPECT_THAT( candidates(),
+               WhenSorted( ElementsAre( "foobar", "fooqux" ) ) );
+
+  remove( { "foobar", "fooqux" }, "bar" );
+  EXPECT_THAT( candidates(), IsEmpty() );
+}
+
+
+TEST( IdentifierCompleterTest, NarrowingQueries ) {
+  IdentifierCompleter completer;
+  // The arguments are moved from.
+  auto add = [ &completer ]( std::string identifier ) {
+    std::string filetype = "c";
+    std::string filepath = "foo";
+    completer.AddSingleIdentifierToDatabase( identifier, filetype, filepath );
+  };
+  auto recreate = [ &completer ]( std::vector< std::string > identifiers ) {
+    std::string filetype = "c";
+    std::string filepath = "foo";
+    completer.ClearForFileAndAddIdentifiersToDatabase( identifiers,
+                                                       filetype,
+                                                       filepath );
+  };
+  auto candidates = [ &completer ]( std::string query,
+                                    std::string filepath = "foo" ) {
+    return completer.CandidatesForQueryAndType( query, "c", 0, filepath );
+  };
+
+  recreate( { "foobar", "fooqux", "barfoo", "goo" } );
+  EXPECT_THAT( candidates( "o" ),
+               ElementsAre( "goo", "foobar", "fooqux", "barfoo" ) );
+  EXPECT_THAT( candidates( "fo" ),
+               ElementsAre( "foobar", "fooqux", "barfoo" ) );
+  EXPECT_THAT( candidates( "foob" ), ElementsAre( "foobar" ) );
+
+  // The query doesn't extend the previous one.
+  EXPECT_THAT( candidates( "foo" ),
+               ElementsAre( "foobar", "fooqux", "barfoo" ) );
+  EXPECT_THAT( candidates( "foq" ), ElementsAre( "fooqux" ) );
+  EXPECT_THAT( candidates( "fo", "bar" ),
+               ElementsAre( "foobar", "fooqux", "barfoo" ) );
+
+  // The database changed.
+  EXPECT_THAT( candidates( "fo" ),
+               ElementsAre( "foobar", "fooqux", "barfoo" ) );
+  add( "foobaz" );
+  EXPECT_THAT( candidates( "foo" ),
+               ElementsAre( "foobar", "foobaz", "fooqux", "barfoo" ) );
+  recreate( { "foofoo" } );
+  EXPECT_THAT( candidates( "foof" ), ElementsAre( "foofoo" ) );
+}
+
+
+// The snapshot is split into segments, and changes replace some of them. Check
+// the queries against a database created with the same identifiers.
+TEST( IdentifierCompleterTest, ChangesAcrossSegments ) {
+  IdentifierCompleter completer;
+  std::set< std::string > expected_identifiers;
+  auto add = [ & ]( int first, int last, std::string filepath = "foo" ) {
+    std::vector< std::string > identifiers;
+    for ( int i = first; i < last; ++i ) {
+      identifiers.push_back( "foo" + std::to_string( i ) );
+      expected_identifiers.insert( identifiers.back() );
+    }
+    std::string filetype = "c";
+    completer.AddIdentifiersToDatabase( identifiers, filetype, filepath );
+  };
+  auto remove = [ & ]( int first, int last, int step = 1 ) {
+    std::vector< std::string > identifiers;
+    for ( int i = first; i < last; i += step ) {
+      identifiers.push_back( "foo" + std::to_string( i ) );
+      expected_identifiers.erase( identifiers.back() );
+    }
+    std::string filetype = "c";
+    std::string filepath = "foo";
+    completer.RemoveIdentifiersFromDatabase( identifiers, filetype, filepath );
+  };
+  auto recreate = [ & ]( int first, int last ) {
+    std::vector< std::string > identifiers;
+    expected_identifiers.clear();
+    for ( int i = first; i < last; ++i ) {
+      identifiers.push_back( "foo" + std::to_string( i ) );
+      expected_identifiers.insert( identifiers.back() );
+    }
+    std::string filetype = "c";
+    std::string filepath = "foo";
+    completer.ClearForFileAndAddIdentifiersToDatabase( identifiers,
+                                                       filetype,
+                                                       filepath );
+  };
+  auto expect_candidates = [ & ]( std::string query ) {
+    IdentifierCompleter expected_completer(
+      std::vector< std::string >( expected_identifiers.begin(),
+                                  expected_identifiers.end() ) );
+    std::vector< std::string > expected =
+      expected_completer.CandidatesForQuery( std::string( query ) );
+    std::sort( expected.begin(), expected.end() );
+    EXPECT_THAT( completer.CandidatesForQueryAndType( query, "c", 0, "foo" ),
+                 WhenSorted( ContainerEq( expected ) ) );
+  };
+
+  add( 0, 20000 );
+  expect_candidates( "f1" );
+  remove( 5000, 6000 );
+  expect_candidates( "f19" );
+  add( 20000, 20010 );
+  expect_candidates( "f199" );
+  remove( 0, 20010, 7 );
+  expect_candidates( "f1999" );
+  // Identifiers removed and added again in the same change.
+  recreate( 100, 15000 );
+  expect_candidates( "f1" );
+  // Identifiers only removed from one of the files containing them.
+  add( 100, 200, "bar" );
+  remove( 100, 200 );
+  add( 100, 200, "bar" );
+  expect_candidates( "f1" );
+  // The identifiers of the other file remain.
+  recreate( 0, 0 );
+  add( 100, 200, "bar" );
+  expect_candidates( "f1" );
+}
+
+
+TEST( IdentifierCompleterTest, ShardedMatching ) {
+  std::vector< std::string > identifiers;
+  for ( int i = 0; i < 100000; ++i ) {
+    identifiers.push_back( "foo" + std::to_string( i ) + "bar" );
+  }
+  IdentifierCompleter completer( identifiers );
+
+  ThreadPool::Instance().SetNumThreads( 1 );
+  std::vector< std::string > expected = completer.CandidatesForQuery( "f1b" );
+  std::vector< std::string > expected_best =
+    completer.CandidatesForQuery( "f2b", 10 );
+
+  ThreadPool::Instance().SetNumThreads( 4 );
+  EXPECT_THAT( completer.CandidatesForQuery( "f1b" ), ContainerEq( expected ) );
+  EXPECT_THAT( completer.CandidatesForQuery( "f2b", 10 ),
+               ContainerEq( expected_best ) );
+  ThreadPool::Instance().SetNumThreads( 0 );
+}
+
+
+TEST( IdentifierCompleterTest, QueriesWhileAddingAndRemovingIdentifiers ) {
+  IdentifierCompleter completer;
+  std::string filetype = "c";
+  std::string filepath = "foo";
+  std::vector< std::string > identifiers = { "foobar" };
+  completer.AddIdentifiersToDatabase( identifiers, filetype, filepath );
+
+  std::atomic_bool done = false;
+  std::thread writer( [ &completer, &done ]() {
+    for ( int i = 0; i < 1000; ++i ) {
+      std::vector< std::string > identifiers = { "foo" + std::to_string( i ) };
+      std::string filetype = "c";
+      std::string filepath = "foo";
+      completer.AddIdentifiersToDatabase( identifiers, filetype, filepath );
+      identifiers = { "foo" + std::to_string( i ) };
+      filetype = "c";
+      filepath = "foo";
+      completer.RemoveIdentifiersFromDatabase( identifiers,
+                                               filetype,
+                                               filepath );
+    }
+    done = true;
+  } );
+
+  while ( !done ) {
+    std::string query = "fbr";
+    EXPECT_THAT( completer.CandidatesForQueryAndType( query, "c" ),
+                 ElementsAre( "foobar" ) );
+  }
+  writer.join();
+}
+
+
+TEST( IdentifierCompleterTest, StoredCandidatesNotReclaimed ) {
+  Repository< Candidate > &repository = Repository< Candidate >::Instance();
+  // Reclaim the candidates of the previous tests.
+  repository.ReclaimElements();
+  repository.ReclaimElements();
+  size_t num_stored = repository.NumStoredElements();
+
+  {
+    IdentifierCompleter completer( { "stored", "stored_too" }, "c", "foo" );
+    repository.ReclaimElements();
+    repository.ReclaimElements();
+    EXPECT_EQ( num_stored + 2, repository.NumStoredElements() );
+    std::string query = "sto";
+    EXPECT_THAT( completer.CandidatesForQueryAndType( query, "c" ),
+                 WhenSorted( ElementsAre( "stored", "stored_too" ) ) );
+  }
+
+  // The candidates are reclaimed once no database references them.
+  repository.ReclaimElements();
+  repository.ReclaimElements();
+  EXPECT_EQ( num_stored, repository.NumStoredElements() );
+}
+
+
 // Filetype checking
 TEST( IdentifierCompleterTest, ManyCandidateSimpleFileType ) {
   IdentifierCompleter completer;
@@ -18,6 +18,7 @@
 #include "IdentifierUtils.h"
 #include "TestUtils.h"
 #include "IdentifierDatabase.h"
+#include "ThreadPool.h"
 
 #include <gtest/gtest.h>
 #include <gmock/gmock.h>
@@ -28,9 +29,12 @@ namespace YouCompleteMe {
 namespace fs = std::filesystem;
 using ::testing::ElementsAre;
 using ::testing::ContainerEq;
+using ::testing::Eq;
 using ::testing::IsEmpty;
+using ::testing::Optional;
 using ::testing::WhenSorted;
 using ::testing::Pair;
+using ::testing::SizeIs;
 using ::testing::UnorderedElementsAre;
 
 
@@ -91,5 +95,89 @@ TEST( IdentifierUtilsTest, TagFileInvalidPath ) {
   EXPECT_THAT( ExtractIdentifiersFromTagsFile( testfile ), IsEmpty() );
 }
 
+
+TEST( IdentifierUtilsTest, ExtractIdentifiersFromTagsInParallel ) {
+  std::string tags;
+  for ( int i = 0; i < 100000; ++i ) {
+    tags += "foo" + std::to_string( i ) + "\tfile" + std::to_string( i % 7 ) +
+            ".cpp\t/^void foo" + std::to_string( i ) + "();$/;\"\tf\t" +
+            ( i % 2 ? "language:C++" : "language:C" ) + "\n";
+  }
+  fs::path path_to_tag_file = fs::current_path() / "tags";
+
+  ThreadPool::Instance().SetNumThreads( 1 );
+  FiletypeIdentifierMap expected =
+    ExtractIdentifiersFromTags( tags, path_to_tag_file );
+  const auto &identifiers =
+    expected[ "cpp" ][ ( fs::current_path() / "file1.cpp" ).string() ];
+  ASSERT_THAT( identifiers, SizeIs( 7143 ) );
+  EXPECT_THAT( std::vector( identifiers.begin(), identifiers.begin() + 3 ),
+               ElementsAre( "foo1", "foo15", "foo29" ) );
+
+  ThreadPool::Instance().SetNumThreads( 4 );
+  EXPECT_THAT( ExtractIdentifiersFromTags( tags, path_to_tag_file ),
+               ContainerEq( expected ) );
+  ThreadPool::Instance().SetNumThreads( 0 );
+}
+
+
+TEST( IdentifierUtilsTest, RemoveIdentifierFreeText ) {
+  auto remove = []( std::string_view text, std::string_view filetype ) {
+    bool ends_inside_comment_or_string;
+    std::string result = RemoveIdentifierFreeText(
+      text, filetype, ends_inside_comment_or_string );
+    return std::pair{ result, ends_inside_comment_or_string };
+  };
+
+  EXPECT_THAT( remove( "foo /* bar\n */ baz // qux", "cpp" ),
+               Pair( "foo \n baz ", false ) );
+  EXPECT_THAT( remove( "foo 'bar' \"b\\\"az\" `qux`", "go" ),
+               Pair( "foo   ", false ) );
+  EXPECT_THAT( remove( "foo 'bar' \"b\\\"az\" `qux`", "cpp" ),
+               Pair( "foo   `qux`", false ) );
+  EXPECT_THAT( remove( "foo # bar\n'''baz\n'''", "python" ),
+               Pair( "foo \n\n", false ) );
+  EXPECT_THAT( remove( "foo # bar\n'''baz\n'''", "cpp" ),
+               Pair( "foo # bar\n'baz\n'", false ) );
+  EXPECT_THAT( remove( "foo /* bar /* baz", "" ),
+               Pair( "foo /* bar /* baz", true ) );
+  EXPECT_THAT( remove( "foo \"\"\" bar", "python" ),
+               Pair( "foo \" bar", true ) );
+  // The starting quote must not be escaped.
+  EXPECT_THAT( remove( "foo \\'bar' baz'", "cpp" ),
+               Pair( "foo \\'bar", false ) );
+  // Backslashes escaping the closing quote are matched as any other character
+  // if no other quote closes the string.
+  EXPECT_THAT( remove( "'foo\\' bar\n'", "cpp" ), Pair( " bar\n'", false ) );
+  EXPECT_THAT( remove( "'foo\\\\' bar'", "cpp" ), Pair( " bar'", false ) );
+}
+
+
+TEST( IdentifierUtilsTest, ExtractIdentifiersFromText ) {
+  EXPECT_THAT( ExtractIdentifiersFromText( "foo _bar 1baz b4z $q", "" ),
+               Optional( ElementsAre( "foo", "_bar", "baz", "b4z", "q" ) ) );
+  EXPECT_THAT( ExtractIdentifiersFromText( "foo $bar b$z", "javascript" ),
+               Optional( ElementsAre( "foo", "$bar", "b$z" ) ) );
+  EXPECT_THAT( ExtractIdentifiersFromText( "-foo-bar --baz -1", "css" ),
+               Optional( ElementsAre( "-foo-bar", "-baz" ) ) );
+  EXPECT_THAT( ExtractIdentifiersFromText( "<foo bar='baz'>{{q.x}}", "html" ),
+               Optional( ElementsAre( "foo", "bar", "baz", "q", "x" ) ) );
+  EXPECT_THAT( ExtractIdentifiersFromText( "foo.bar .1 .b _c 2d", "r" ),
+               Optional( ElementsAre( "foo.bar", ".b", "c", "d" ) ) );
+  EXPECT_THAT( ExtractIdentifiersFromText( "foo/bar? *baz* 1q", "clojure" ),
+               Optional( ElementsAre( "foo/bar?", "*baz*", "q" ) ) );
+  EXPECT_THAT( ExtractIdentifiersFromText( "foo' b x'", "haskell" ),
+               Optional( ElementsAre( "foo'", "x'" ) ) );
+  EXPECT_THAT( ExtractIdentifiersFromText( "fig:foo-bar: baz:-", "tex" ),
+               Optional( ElementsAre( "fig:foo-bar", "baz" ) ) );
+  EXPECT_THAT( ExtractIdentifiersFromText( "foo-bar baz'q x- y'1", "perl6" ),
+               Optional( ElementsAre( "foo-bar", "baz'q", "x", "y" ) ) );
+  // The scheme identifiers and non-ASCII text are not supported.
+  EXPECT_THAT( ExtractIdentifiersFromText( "foo", "scheme" ),
+               Eq( std::nullopt ) );
+  EXPECT_THAT( ExtractIdentifiersFromText( "f\xc3\xb8", "" ),
+               Eq( std::nullopt ) );
+}
+
 } // namespace YouCompleteMe
 
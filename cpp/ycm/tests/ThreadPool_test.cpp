@@ -0,0 +1,114 @@
+// Copyright (C) 2026 ycmd contributors
+//
+// This file is part of ycmd.
+//
+// ycmd is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// ycmd is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License
+// along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+#include "ThreadPool.h"
+
+#include <gtest/gtest.h>
+#include <gmock/gmock.h>
+
+#include <atomic>
+#include <thread>
+#include <vector>
+
+using ::testing::Each;
+using ::testing::Eq;
+
+namespace YouCompleteMe {
+
+class ThreadPoolTest : public ::testing::Test {
+protected:
+  void TearDown() override {
+    ThreadPool::Instance().SetNumThreads( 0 );
+  }
+};
+
+
+TEST_F( ThreadPoolTest, SetNumThreads ) {
+  ThreadPool::Instance().SetNumThreads( 3 );
+  EXPECT_EQ( ThreadPool::Instance().NumThreads(), 3 );
+
+  ThreadPool::Instance().SetNumThreads( 1 );
+  EXPECT_EQ( ThreadPool::Instance().NumThreads(), 1 );
+
+  ThreadPool::Instance().SetNumThreads( 0 );
+  EXPECT_GE( ThreadPool::Instance().NumThreads(), 1 );
+  EXPECT_LE( ThreadPool::Instance().NumThreads(),
+             ThreadPool::DEFAULT_MAX_THREADS );
+}
+
+
+TEST_F( ThreadPoolTest, ConcurrentSetNumThreads ) {
+  std::atomic< bool > resizing = true;
+  std::thread runner( [ &resizing ]() {
+    while ( resizing ) {
+      ThreadPool::Instance().Run( 10, []( size_t ) {} );
+    }
+  } );
+  std::vector< std::thread > threads;
+  for ( size_t i = 0; i < 8; ++i ) {
+    threads.emplace_back( [ i ]() {
+      for ( size_t j = 0; j < 50; ++j ) {
+        ThreadPool::Instance().SetNumThreads( 2 + ( i + j ) % 2 );
+      }
+    } );
+  }
+  for ( auto &thread : threads ) {
+    thread.join();
+  }
+  resizing = false;
+  runner.join();
+
+  // The last call wins; the threads of other calls are not left running.
+  size_t num_threads = ThreadPool::Instance().NumThreads();
+  EXPECT_TRUE( num_threads == 2 || num_threads == 3 ) << num_threads;
+}
+
+
+TEST_F( ThreadPoolTest, RunEachTaskOnce ) {
+  for ( size_t num_threads : { 1, 2, 4 } ) {
+    ThreadPool::Instance().SetNumThreads( num_threads );
+    for ( size_t num_tasks : { 0, 1, 3, 100 } ) {
+      std::vector< std::atomic< int > > calls( num_tasks );
+      ThreadPool::Instance().Run( num_tasks, [ &calls ]( size_t index ) {
+        ++calls[ index ];
+      } );
+      EXPECT_THAT( calls, Each( Eq( 1 ) ) );
+    }
+  }
+}
+
+
+TEST_F( ThreadPoolTest, ConcurrentRuns ) {
+  ThreadPool::Instance().SetNumThreads( 2 );
+  std::atomic< int > sum = 0;
+  std::vector< std::thread > threads;
+  for ( int i = 0; i < 8; ++i ) {
+    threads.emplace_back( [ &sum ]() {
+      for ( int j = 0; j < 100; ++j ) {
+        ThreadPool::Instance().Run( 10, [ &sum ]( size_t index ) {
+          sum += static_cast< int >( index );
+        } );
+      }
+    } );
+  }
+  for ( auto &thread : threads ) {
+    thread.join();
+  }
+  EXPECT_EQ( sum, 8 * 100 * 45 );
+}
+
+} // namespace YouCompleteMe
@@ -18,7 +18,10 @@
 #include "Candidate.h"
 #include "CodePoint.h"
 #include "IdentifierCompleter.h"
+#include "IdentifierUtils.h"
 #include "PythonSupport.h"
+#include "Repository.h"
+#include "ThreadPool.h"
 #include "versioning.h"
 
 #ifdef USE_CLANG_COMPLETER
@@ -60,15 +63,53 @@ PYBIND11_MODULE( ycm_core, mod )
 {
   mod.def( "HasClangSupport", &HasClangSupport );
 
+  py::class_< CancellationToken >( mod, "CancellationToken" )
+    .def( py::init<>() )
+    .def( "Cancel", &CancellationToken::Cancel )
+    .def( "IsCancelled", &CancellationToken::IsCancelled );
+
   mod.def( "FilterAndSortCandidates",
            &FilterAndSortCandidates,
            py::arg("candidates"),
            py::arg("candidate_property"),
            py::arg("query"),
-           py::arg("max_candidates") = 0 );
+           py::arg("max_candidates") = 0,
+           py::arg("cancellation_token") = nullptr );
+
+  py::class_< CandidateList >( mod, "CandidateList" )
+    .def( py::init< const py::list&, py::str >(),
+          py::arg("candidates"),
+          py::arg("candidate_property") )
+    .def( "FilterAndSort",
+          &CandidateList::FilterAndSort,
+          py::arg("query"),
+          py::arg("max_candidates") = 0,
+          py::arg("cancellation_token") = nullptr )
+    .def( "__len__", &CandidateList::Size );
 
   mod.def( "YcmCoreVersion", &YcmCoreVersion );
 
+  mod.def( "SetNumMatchingThreads",
+           []( size_t num_threads ) {
+             ThreadPool::Instance().SetNumThreads( num_threads );
+           },
+           py::call_guard< py::gil_scoped_release >() );
+
+  mod.def( "SetParallelFilteringThreshold",
+           &SetParallelFilteringThreshold,
+           py::arg("num_candidates") );
+
+  mod.def( "NumMatchingThreads",
+           []() { return ThreadPool::Instance().NumThreads(); } );
+
+  mod.def( "NumStoredCandidates", []() {
+    return Repository< Candidate >::Instance().NumStoredElements();
+  } );
+
+  mod.def( "NumReclaimedCandidates", []() {
+    return Repository< Candidate >::Instance().NumReclaimedElements();
+  } );
+
   // This is exposed so that we can test it.
   mod.def( "GetUtf8String", []( py::object o ) -> py::bytes {
                                   return GetUtf8String( o ); } );
@@ -81,6 +122,33 @@ PYBIND11_MODULE( ycm_core, mod )
     .def( "ClearForFileAndAddIdentifiersToDatabase",
           &IdentifierCompleter::ClearForFileAndAddIdentifiersToDatabase,
           py::call_guard< py::gil_scoped_release >() )
+    .def( "ClearForFilesAndAddIdentifiersToDatabase",
+          []( IdentifierCompleter &completer,
+              const py::dict &filetype_identifier_map ) {
+            // filetype -> ( filepath -> [ identifier ] )
+            FiletypeIdentifierMap identifiers;
+            for ( auto [ filetype, filepath_to_identifiers ] :
+                  filetype_identifier_map ) {
+              auto &filepaths = identifiers[ filetype.cast< std::string >() ];
+              for ( auto [ filepath, file_identifiers ] :
+                    filepath_to_identifiers.cast< py::dict >() ) {
+                auto &candidates = filepaths[ filepath.cast< std::string >() ];
+                for ( auto identifier : file_identifiers ) {
+                  candidates.push_back( identifier.cast< std::string >() );
+                }
+              }
+            }
+            py::gil_scoped_release unlock;
+            completer.ClearForFilesAndAddIdentifiersToDatabase(
+              std::move( identifiers ) );
+          },
+          py::arg( "filetype_identifier_map" ) )
+    .def( "AddIdentifiersToDatabase",
+          &IdentifierCompleter::AddIdentifiersToDatabase,
+          py::call_guard< py::gil_scoped_release >() )
+    .def( "RemoveIdentifiersFromDatabase",
+          &IdentifierCompleter::RemoveIdentifiersFromDatabase,
+          py::call_guard< py::gil_scoped_release >() )
     .def( "AddIdentifiersToDatabaseFromTagFiles",
           &IdentifierCompleter::AddIdentifiersToDatabaseFromTagFiles,
           py::call_guard< py::gil_scoped_release >() )
@@ -89,10 +157,45 @@ PYBIND11_MODULE( ycm_core, mod )
           py::call_guard< py::gil_scoped_release >(),
           py::arg( "query" ),
           py::arg( "filetype" ),
-          py::arg( "max_candidates" ) = 0 );
+          py::arg( "max_candidates" ) = 0,
+          py::arg( "filepath" ) = "" );
 
   py::bind_vector< std::vector< std::string > >( mod, "StringVector" );
 
+  mod.def( "RemoveIdentifierFreeText",
+           []( std::string_view text, std::string_view filetype ) {
+             bool ends_inside_comment_or_string;
+             std::string result;
+             {
+               py::gil_scoped_release unlock;
+               result = RemoveIdentifierFreeText(
+                 text, filetype, ends_inside_comment_or_string );
+             }
+             return py::make_tuple( py::str( result ),
+                                    ends_inside_comment_or_string );
+           },
+           py::arg( "text" ),
+           py::arg( "filetype" ) );
+
+  mod.def( "ExtractIdentifiersFromText",
+           []( std::string_view text, std::string_view filetype ) {
+             std::optional< std::vector< std::string > > identifiers;
+             {
+               py::gil_scoped_release unlock;
+               identifiers = ExtractIdentifiersFromText( text, filetype );
+             }
+             if ( !identifiers ) {
+               return py::object( py::none() );
+             }
+             py::list result( identifiers->size() );
+             for ( size_t i = 0; i < identifiers->size(); ++i ) {
+               result[ i ] = py::str( ( *identifiers )[ i ] );
+             }
+             return py::object( result );
+           },
+           py::arg( "text" ),
+           py::arg( "filetype" ) );
+
 #ifdef USE_CLANG_COMPLETER
   py::register_exception< ClangParseError >( mod, "ClangParseError" );
 
@@ -56,15 +56,21 @@ import logging
 import json
 import argparse
 import signal
+import socket
 import base64
 
 from ycmd import extra_conf_store, user_options_store, utils
 from ycmd.hmac_plugin import HmacPlugin
+from ycmd.request_recorder import RequestRecorder
 from ycmd.utils import ( ImportAndCheckCore,
                          OpenForStdHandle,
                          ReadFile,
                          ToBytes )
-from ycmd.wsgi_server import StoppableWSGIServer
+from ycmd.wsgi_server import ( MIN_SERVER_THREADS,
+                               PooledWSGIServer,
+                               StoppableWSGIServer,
+                               UnixSocketPooledWSGIServer,
+                               UnixSocketStoppableWSGIServer )
 
 
 def YcmCoreSanityCheck():
@@ -120,6 +126,18 @@ def ParseArguments():
   # Default of 0 will make the OS pick a free port for us
   parser.add_argument( '--port', type = int, default = 0,
                        help = 'server port' )
+  parser.add_argument( '--unix_socket', type = str, default = None,
+                       help = 'path of a Unix domain socket to serve on '
+                              'instead of --host and --port' )
+  parser.add_argument( '--server_threads', type = int, default = 0,
+                       help = 'number of worker threads serving persistent '
+                              'HTTP/1.1 connections, at least '
+                              f'{ MIN_SERVER_THREADS }; 0 starts a new thread '
+                              'for every request instead' )
+  parser.add_argument( '--server_queue_size', type = int, default = 64,
+                       help = 'number of connections waiting for a worker '
+                              'thread before new ones are refused; only used '
+                              'with --server_threads' )
   parser.add_argument( '--log', type = str, default = 'info',
                        help = 'log level, one of '
                               '[debug|info|warning|error|critical]' )
@@ -136,7 +154,22 @@ def ParseArguments():
                        help = 'optional file to use for stderr' )
   parser.add_argument( '--keep_logfiles', action = 'store_true', default = None,
                        help = 'retain logfiles after the server exits' )
-  return parser.parse_args()
+  parser.add_argument( '--record_requests', type = str, default = None,
+                       help = 'file to which all requests are appended, to be '
+                              'replayed with benchmark.py --replay' )
+  parser.add_argument( '--anonymize_recording', action = 'store_true',
+                       help = 'replace the paths, contents of the files and '
+                              'other text in the recorded requests with '
+                              'pseudonyms' )
+  args = parser.parse_args()
+  if args.unix_socket is not None and not hasattr( socket, 'AF_UNIX' ):
+    parser.error( 'Unix domain sockets are not supported on this platform' )
+  if 0 < args.server_threads < MIN_SERVER_THREADS:
+    parser.error( f'--server_threads must be 0 or at least '
+                  f'{ MIN_SERVER_THREADS }' )
+  if args.server_queue_size < 1:
+    parser.error( '--server_queue_size must be at least 1' )
+  return args
 
 
 def SetupLogging( log_level ):
@@ -166,6 +199,24 @@ def CloseStdin():
   os.close( 0 )
 
 
+def CreateServer( app, args ):
+  if args.unix_socket is not None:
+    if args.server_threads > 0:
+      return UnixSocketPooledWSGIServer( app,
+                                         path = args.unix_socket,
+                                         num_threads = args.server_threads,
+                                         queue_size = args.server_queue_size )
+    return UnixSocketStoppableWSGIServer( app, path = args.unix_socket )
+
+  if args.server_threads > 0:
+    return PooledWSGIServer( app,
+                             host = args.host,
+                             port = args.port,
+                             num_threads = args.server_threads,
+                             queue_size = args.server_queue_size )
+  return StoppableWSGIServer( app, host = args.host, port = args.port )
+
+
 def Main():
   args = ParseArguments()
 
@@ -192,6 +243,7 @@ def Main():
   # ycm_core which we want to be imported ONLY after extra conf
   # preload has executed.
   from ycmd import handlers
+  from ycmd.metrics_plugin import MetricsPlugin
   from ycmd.watchdog_plugin import WatchdogPlugin
   handlers.UpdateUserOptions( options )
   handlers.SetHmacSecret( hmac_secret )
@@ -203,16 +255,24 @@ def Main():
                                     args.stderr,
                                     args.keep_logfiles )
   atexit.register( handlers.ServerCleanup )
+  handlers.app.install( MetricsPlugin() )
   handlers.app.install( WatchdogPlugin( args.idle_suicide_seconds,
                                         args.check_interval_seconds ) )
-  handlers.app.install( HmacPlugin( hmac_secret ) )
+  handlers.app.install( HmacPlugin(
+    hmac_secret, check_host_header = args.unix_socket is None ) )
+  # Installed after the HMAC plugin so that only authenticated requests are
+  # recorded.
+  if args.record_requests:
+    handlers.SetRequestRecorder( RequestRecorder( args.record_requests,
+                                                  args.anonymize_recording ) )
   CloseStdin()
-  handlers.wsgi_server = StoppableWSGIServer( handlers.app,
-                                              host = args.host,
-                                              port = args.port )
+  handlers.wsgi_server = CreateServer( handlers.app, args )
   if sys.stdin is not None:
-    print( f'serving on http://{ handlers.wsgi_server.server_name }:'
-           f'{ handlers.wsgi_server.server_port }' )
+    if args.unix_socket is not None:
+      print( f'serving on unix:{ handlers.wsgi_server.unix_socket_path }' )
+    else:
+      print( f'serving on http://{ handlers.wsgi_server.server_name }:'
+             f'{ handlers.wsgi_server.server_port }' )
   handlers.wsgi_server.serve_forever()
   handlers.wsgi_server.server_close()
   handlers.ServerCleanup()
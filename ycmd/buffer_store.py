@@ -0,0 +1,124 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+
+from ycmd.responses import BufferVersionMismatch, ServerError
+from ycmd.utils import ByteOffsetToCodepointOffset, SplitLines, ToBytes
+
+
+class BufferStore:
+  """Keeps the last known contents of every buffer sent by the client with a
+  version number. This allows the client to send the changes made to a buffer
+  since a given version instead of its whole contents on every request:
+
+    file_data: {
+      "/path/to/file": {
+        "filetypes": [ "python" ],
+        "version": 4,
+        "base_version": 3,
+        "changes": [ {
+          "start": { "line_num": 1, "column_num": 5 },
+          "end": { "line_num": 1, "column_num": 5 },
+          "text": "foo"
+        } ]
+      }
+    }
+
+  Changes are applied in order, each one relative to the result of the
+  previous. If the stored version of the buffer is not |base_version|, a
+  BufferVersionMismatch exception is raised and the client must send the full
+  contents again. Buffers sent with their contents and a version are stored as
+  the new base for future changes."""
+
+  def __init__( self ):
+    self._buffers = {}
+    self._lock = threading.Lock()
+
+
+  def ResolveFileData( self, request_json ):
+    """Fills in the contents of every buffer in the file_data of
+    |request_json| sent as a list of changes and stores the new versions. The
+    request is modified in place."""
+    file_data = request_json.get( 'file_data' )
+    if not isinstance( file_data, dict ):
+      return
+
+    for filepath, data in file_data.items():
+      if 'changes' in data:
+        data[ 'contents' ] = self._ApplyChanges( filepath, data )
+      elif 'contents' in data:
+        self._Store( filepath, data.get( 'version' ), data[ 'contents' ] )
+
+
+  def Remove( self, filepath ):
+    with self._lock:
+      self._buffers.pop( filepath, None )
+
+
+  def _Store( self, filepath, version, contents ):
+    with self._lock:
+      if version is None:
+        # The client does not use versions for this buffer.
+        self._buffers.pop( filepath, None )
+      else:
+        self._buffers[ filepath ] = ( version, contents )
+
+
+  def _ApplyChanges( self, filepath, data ):
+    for field in [ 'version', 'base_version' ]:
+      if field not in data:
+        raise ServerError(
+          f'Request missing required field: '
+          f'file_data[ "{ filepath }" ][ "{ field }" ]' )
+
+    with self._lock:
+      stored_version, contents = self._buffers.get( filepath, ( None, None ) )
+      if stored_version is None or stored_version != data[ 'base_version' ]:
+        raise BufferVersionMismatch( filepath, stored_version )
+
+      lines = SplitLines( contents )
+      for change in data[ 'changes' ]:
+        _ApplyChange( lines, change )
+      contents = '\n'.join( lines )
+      self._buffers[ filepath ] = ( data[ 'version' ], contents )
+      return contents
+
+
+def _ApplyChange( lines, change ):
+  start_line, start_column = _CodepointPosition( lines, change[ 'start' ] )
+  end_line, end_column = _CodepointPosition( lines, change[ 'end' ] )
+  if ( end_line, end_column ) < ( start_line, start_column ):
+    raise ServerError( f'Invalid change range: { change }' )
+
+  new_text = ( lines[ start_line ][ : start_column ] +
+               change[ 'text' ] +
+               lines[ end_line ][ end_column : ] )
+  lines[ start_line : end_line + 1 ] = SplitLines( new_text )
+
+
+def _CodepointPosition( lines, position ):
+  """Converts a position with a 1-based line number and 1-based byte column
+  into 0-based line and codepoint indices in |lines|."""
+  line_index = position[ 'line_num' ] - 1
+  if line_index < 0 or line_index >= len( lines ):
+    raise ServerError( f'Invalid line number in change: { position }' )
+  line = lines[ line_index ]
+  column_num = position[ 'column_num' ]
+  if column_num < 1 or column_num > len( ToBytes( line ) ) + 1:
+    raise ServerError( f'Invalid column number in change: { position }' )
+  return line_index, ByteOffsetToCodepointOffset( line, column_num ) - 1
@@ -0,0 +1,95 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+import collections
+import secrets
+import threading
+import time
+
+from ycmd.responses import UnknownCandidatesHandle
+from ycmd.utils import ImportCore
+ycm_core = ImportCore()
+
+# The least recently used lists are dropped beyond that number, even if they
+# didn't expire.
+MAX_CANDIDATE_LISTS = 32
+
+
+class _Entry:
+  def __init__( self, candidate_list, ttl ):
+    self.candidate_list = candidate_list
+    self.ttl = ttl
+    self.expiration = time.monotonic() + ttl
+
+
+class CandidateStore:
+  """Keeps the candidate lists registered by the client, so that filtering a
+  large list with successive queries doesn't require sending it and extracting
+  its candidates again on every request:
+
+    /register_candidates: {
+      "candidates": [ ... ],
+      "sort_property": "insertion_text"
+    } -> { "candidates_handle": "...", "ttl": 120 }
+
+    /filter_and_sort_candidates: {
+      "candidates_handle": "...",
+      "query": "..."
+    }
+
+  A list expires when it is not used for |ttl| seconds. Using an expired or
+  unknown handle raises an UnknownCandidatesHandle exception and the client
+  must register the candidates again."""
+
+  def __init__( self, max_candidate_lists = MAX_CANDIDATE_LISTS ):
+    self._max_candidate_lists = max_candidate_lists
+    # Least recently used first.
+    self._entries = collections.OrderedDict()
+    self._lock = threading.Lock()
+
+
+  def Register( self, candidates, sort_property, ttl ):
+    """Stores |candidates| and returns the handle to filter them with."""
+    candidate_list = ycm_core.CandidateList( candidates, sort_property )
+    handle = secrets.token_hex( 16 )
+    with self._lock:
+      self._RemoveExpiredNoLock()
+      self._entries[ handle ] = _Entry( candidate_list, ttl )
+      while len( self._entries ) > self._max_candidate_lists:
+        self._entries.popitem( last = False )
+    return handle
+
+
+  def Get( self, handle ):
+    """Returns the ycm_core.CandidateList of |handle| and postpones its
+    expiration."""
+    with self._lock:
+      self._RemoveExpiredNoLock()
+      entry = self._entries.get( handle )
+      if entry is None:
+        raise UnknownCandidatesHandle( handle )
+      entry.expiration = time.monotonic() + entry.ttl
+      self._entries.move_to_end( handle )
+      return entry.candidate_list
+
+
+  def _RemoveExpiredNoLock( self ):
+    now = time.monotonic()
+    expired = [ handle for handle, entry in self._entries.items()
+                if entry.expiration <= now ]
+    for handle in expired:
+      del self._entries[ handle ]
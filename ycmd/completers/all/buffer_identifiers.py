@@ -0,0 +1,196 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from collections import Counter
+
+from ycmd import identifier_utils
+from ycmd.utils import CommonPrefixLength, CommonSuffixLength
+
+# Number of lines scanned together. Blocks are larger when a comment or string
+# spans several of them.
+BLOCK_SIZE = 64
+
+
+class _Block:
+  __slots__ = ( 'line_count', 'length', 'identifiers' )
+
+  def __init__( self, line_count, length, identifiers ):
+    self.line_count = line_count
+    # Number of characters, without the newline separating it from the next
+    # block.
+    self.length = length
+    self.identifiers = identifiers
+
+
+class BufferIdentifiers:
+  """Keeps track of the identifiers of a buffer so that only the lines that
+  changed since the last update are scanned again.
+
+  The buffer is split into blocks of lines that are scanned independently. A
+  block never ends inside a comment or a string, except for the last one, so
+  that the identifiers of all blocks are exactly the identifiers of the whole
+  buffer. Each identifier is counted once per block containing it, so that it
+  is only removed when no block contains it anymore."""
+
+  def __init__( self, filetype, collect_from_comments_and_strings ):
+    self.filetype = filetype
+    self.collect_from_comments_and_strings = collect_from_comments_and_strings
+    self._text = None
+    self._blocks = []
+    self._counts = Counter()
+    self._extra_identifiers = set()
+
+
+  def Identifiers( self ):
+    return list( self._counts )
+
+
+  def AddExtraIdentifier( self, identifier ):
+    """Records an identifier added to the database for the buffer without being
+    found by a scan. It is removed by the next update if the buffer does not
+    contain it."""
+    if identifier not in self._counts:
+      self._extra_identifiers.add( identifier )
+
+
+  def Update( self, text ):
+    """Updates the identifiers for the new contents |text| of the buffer and
+    returns a tuple ( added, removed ) of the identifiers that appeared in and
+    disappeared from the buffer."""
+    if text == self._text:
+      return [], self._RemoveExtraIdentifiers( [] )
+
+    new_line_count = text.count( '\n' ) + 1
+    if self._text is None:
+      old_line_count = 0
+      unchanged_leading_lines = unchanged_trailing_lines = 0
+    else:
+      old_line_count = self._text.count( '\n' ) + 1
+      prefix_length = CommonPrefixLength( self._text, text )
+      suffix_length = CommonSuffixLength(
+        self._text,
+        text,
+        min( len( self._text ), len( text ) ) - prefix_length )
+      unchanged_leading_lines = text.count( '\n', 0, prefix_length )
+      unchanged_trailing_lines = text.count( '\n',
+                                             len( text ) - suffix_length )
+    self._text = text
+
+    # Find the blocks containing changed lines.
+    first = 0
+    start_line = 0
+    start = 0
+    while ( first < len( self._blocks ) and
+            start_line + self._blocks[ first ].line_count <=
+              unchanged_leading_lines ):
+      start_line += self._blocks[ first ].line_count
+      start += self._blocks[ first ].length + 1
+      first += 1
+    last = first
+    end_line = start_line
+    while ( last < len( self._blocks ) and
+            end_line < old_line_count - unchanged_trailing_lines ):
+      end_line += self._blocks[ last ].line_count
+      last += 1
+
+    removed = Counter()
+    for block in self._blocks[ first : last ]:
+      removed.update( block.identifiers )
+    next_blocks = self._blocks[ last : ]
+    next_blocks.reverse()
+
+    new_blocks = []
+    added = Counter()
+    line_count = end_line - start_line + new_line_count - old_line_count
+    while line_count:
+      block_line_count = min( BLOCK_SIZE, line_count )
+      while True:
+        end = _EndOfLines( text, start, block_line_count )
+        is_last_block = block_line_count == line_count and not next_blocks
+        identifiers = self._Scan( text[ start : end ], is_last_block )
+        if identifiers is not None:
+          break
+        # The block ends inside a comment or a string: scan it again with twice
+        # as many lines, taking them from the next unchanged blocks if needed.
+        block_line_count *= 2
+        while line_count < block_line_count and next_blocks:
+          next_block = next_blocks.pop()
+          removed.update( next_block.identifiers )
+          line_count += next_block.line_count
+        block_line_count = min( block_line_count, line_count )
+
+      block = _Block( block_line_count, end - start, set( identifiers ) )
+      added.update( block.identifiers )
+      new_blocks.append( block )
+      line_count -= block_line_count
+      start = end + 1
+
+    next_blocks.reverse()
+    self._blocks[ first : ] = new_blocks + next_blocks
+    return self._UpdateCounts( added, removed )
+
+
+  def _Scan( self, text, is_last_block ):
+    """Returns the identifiers of |text| or None if it ends inside a comment or
+    a string, unless it is the end of the buffer."""
+    if self.collect_from_comments_and_strings:
+      return identifier_utils.ExtractIdentifiersFromText( text, self.filetype )
+
+    text, ends_inside_comment_or_string = (
+      identifier_utils.RemoveIdentifierFreeTextAndCheckEnd( text,
+                                                            self.filetype ) )
+    if ends_inside_comment_or_string and not is_last_block:
+      return None
+    return identifier_utils.ExtractIdentifiersFromText( text, self.filetype )
+
+
+  def _UpdateCounts( self, added, removed ):
+    added_identifiers = []
+    removed_identifiers = []
+    for identifier in added.keys() | removed.keys():
+      old_count = self._counts[ identifier ]
+      new_count = old_count + added[ identifier ] - removed[ identifier ]
+      if new_count:
+        self._counts[ identifier ] = new_count
+      else:
+        del self._counts[ identifier ]
+      if new_count and not old_count:
+        added_identifiers.append( identifier )
+      elif old_count and not new_count:
+        removed_identifiers.append( identifier )
+    removed_identifiers = self._RemoveExtraIdentifiers( removed_identifiers )
+    return added_identifiers, removed_identifiers
+
+
+  def _RemoveExtraIdentifiers( self, removed_identifiers ):
+    removed_identifiers.extend( identifier
+                                for identifier in self._extra_identifiers
+                                if identifier not in self._counts and
+                                   identifier not in removed_identifiers )
+    self._extra_identifiers.clear()
+    return removed_identifiers
+
+
+def _EndOfLines( text, start, line_count ):
+  """Returns the index of the end of the |line_count| lines starting at index
+  |start| of |text|."""
+  end = start - 1
+  for _ in range( line_count ):
+    end = text.find( '\n', end + 1 )
+    if end < 0:
+      return len( text )
+  return end
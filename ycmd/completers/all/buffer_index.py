@@ -0,0 +1,159 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import threading
+
+from ycmd.completers.all import identifier_index
+from ycmd.completers.all.workspace_crawler import ( DEFAULT_INDEX_DIRECTORY,
+                                                    FILES_PER_BATCH,
+                                                    FindProjectRoot,
+                                                    IndexPath )
+from ycmd.utils import LOGGER, StartThread, ToBytes
+
+# Seconds between the first change of the identifiers of a buffer and the
+# writing of the index of its project.
+SAVE_DELAY = 2.0
+
+
+class BufferIndex:
+  """Saves the identifiers of the buffers of each project in an index, so that
+  they are added back to the database when ycmd restarts, before the editor
+  sends these buffers again.
+
+  The identifiers of a buffer are only saved while the buffer has the contents
+  of its file, and only used after a restart if the file didn't change since.
+  The index of a project is read in a background thread when the editor first
+  sends one of its files. It is separate from the index of the workspace
+  crawler, which is only used with index_workspace_identifiers."""
+
+  def __init__( self, add_identifiers, user_options ):
+    self._add_identifiers = add_identifiers
+    self._index_directory = ( user_options[ 'workspace_index_path' ] or
+                              DEFAULT_INDEX_DIRECTORY )
+    self._index_flags = (
+      identifier_index.COLLECT_FROM_COMMENTS_AND_STRINGS
+      if user_options[ 'collect_identifiers_from_comments_and_strings' ]
+      else 0 )
+    # directory -> project root or None
+    self._project_roots = {}
+    # root -> identifier_index.ProjectIndex
+    self._projects = {}
+    # filepath -> ( stamp, text ) of the last contents saved for the buffer.
+    self._saved_buffers = {}
+    self._save_timer = None
+    self._load_threads = []
+    self._lock = threading.Lock()
+
+
+  def OnBufferIdentifiers( self, filepath, filetype, text, get_identifiers ):
+    """Called with the contents |text| of a buffer each time they are updated.
+    Loads the index of its project the first time and saves the identifiers
+    returned by |get_identifiers| if the buffer has the contents of its
+    file."""
+    project = self._Project( filepath )
+    if project is None:
+      return
+
+    stamp = identifier_index.FileStamp( filepath )
+    with self._lock:
+      saved_buffer = self._saved_buffers.get( filepath )
+    if stamp is None or saved_buffer == ( stamp, text ):
+      return
+    # Most edits change the size of the buffer, so that the file is rarely read
+    # while the buffer is modified.
+    text_bytes = ToBytes( text )
+    if len( text_bytes ) != stamp[ 1 ]:
+      return
+    try:
+      with open( filepath, 'rb' ) as f:
+        if f.read() != text_bytes:
+          return
+    except OSError:
+      return
+
+    project.Update( { filepath: identifier_index.IndexEntry(
+      *stamp,
+      filetype,
+      identifier_index.EncodeIdentifiers( get_identifiers() ) ) } )
+    with self._lock:
+      self._saved_buffers[ filepath ] = ( stamp, text )
+      if self._save_timer is None:
+        self._save_timer = threading.Timer( SAVE_DELAY, self.Save )
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+
+  def OnBufferUnload( self, filepath ):
+    with self._lock:
+      self._saved_buffers.pop( filepath, None )
+
+
+  def Save( self ):
+    """Writes the indexes that changed."""
+    with self._lock:
+      if self._save_timer is not None:
+        self._save_timer.cancel()
+        self._save_timer = None
+      projects = list( self._projects.values() )
+    for project in projects:
+      project.Save()
+
+
+  def WaitUntilLoaded( self, timeout = None ):
+    """Blocks until the indexes of the projects seen so far are loaded. Returns
+    False if |timeout| seconds passed before that."""
+    with self._lock:
+      threads = list( self._load_threads )
+    for thread in threads:
+      thread.join( timeout )
+    return not any( thread.is_alive() for thread in threads )
+
+
+  def _Project( self, filepath ):
+    directory = os.path.dirname( filepath )
+    with self._lock:
+      if directory in self._project_roots:
+        root = self._project_roots[ directory ]
+        return None if root is None else self._projects[ root ]
+
+    root = FindProjectRoot( directory )
+    with self._lock:
+      self._project_roots[ directory ] = root
+      if root is None:
+        return None
+      project = self._projects.get( root )
+      if project is not None:
+        return project
+      project = identifier_index.ProjectIndex(
+        IndexPath( self._index_directory, root, 'buffers' ),
+        self._index_flags )
+      self._projects[ root ] = project
+      LOGGER.info( 'Loading the buffer identifiers of project %s', root )
+      self._load_threads.append( StartThread( self._Load, project ) )
+    return project
+
+
+  def _Load( self, project ):
+    def AddEntries( entries ):
+      self._add_identifiers(
+        identifier_index.FiletypeIdentifierMap( entries ) )
+
+    try:
+      project.LoadValidEntries( FILES_PER_BATCH, AddEntries )
+    except Exception:
+      LOGGER.exception( 'Error while loading buffer identifiers' )
@@ -16,7 +16,11 @@
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
+import threading
 from collections import defaultdict
+from ycmd.completers.all.buffer_identifiers import BufferIdentifiers
+from ycmd.completers.all.buffer_index import BufferIndex
+from ycmd.completers.all.workspace_crawler import WorkspaceCrawler
 from ycmd.completers.general_completer import GeneralCompleter
 from ycmd import identifier_utils
 from ycmd.utils import ImportCore, LOGGER, SplitLines
@@ -32,6 +36,17 @@ class IdentifierCompleter( GeneralCompleter ):
     self._completer = ycm_core.IdentifierCompleter()
     self._tags_file_last_mtime = defaultdict( int )
     self._max_candidates = user_options[ 'max_num_identifier_candidates' ]
+    # filepath -> BufferIdentifiers
+    self._buffer_identifiers = {}
+    self._buffer_identifiers_lock = threading.Lock()
+    self._buffer_index = None
+    if user_options[ 'persist_buffer_identifiers' ]:
+      self._buffer_index = BufferIndex( self._AddIdentifiersFromDisk,
+                                        user_options )
+    self._workspace_crawler = None
+    if user_options[ 'index_workspace_identifiers' ]:
+      self._workspace_crawler = WorkspaceCrawler(
+        self._AddIdentifiersFromDisk, user_options )
 
 
   def ShouldUseNow( self, request_data ):
@@ -39,13 +54,20 @@ class IdentifierCompleter( GeneralCompleter ):
 
 
   def ComputeCandidates( self, request_data ):
-    if not self.ShouldUseNow( request_data ):
+    with self.TimePhase( 'ShouldUseNow' ):
+      should_use_now = self.ShouldUseNow( request_data )
+    if not should_use_now:
       return []
 
-    completions = self._completer.CandidatesForQueryAndType(
-      _SanitizeQuery( request_data[ 'query' ] ),
-      request_data[ 'first_filetype' ],
-      self._max_candidates )
+    # The identifiers are filtered and sorted in the identifier database, which
+    # only filters the previous matches for the file if the query extends the
+    # previous one.
+    with self.TimePhase( 'FilterAndSortCandidates' ):
+      completions = self._completer.CandidatesForQueryAndType(
+        _SanitizeQuery( request_data[ 'query' ] ),
+        request_data[ 'first_filetype' ],
+        self._max_candidates,
+        request_data[ 'filepath' ] )
 
     completions = _RemoveSmallCandidates(
       completions, self.user_options[ 'min_num_identifier_candidate_chars' ] )
@@ -66,9 +88,13 @@ class IdentifierCompleter( GeneralCompleter ):
       return
 
     LOGGER.info( 'Adding ONE buffer identifier for file: %s', filepath )
-    self._completer.AddSingleIdentifierToDatabase( identifier,
-                                                  filetype,
-                                                  filepath )
+    with self._buffer_identifiers_lock:
+      buffer_identifiers = self._buffer_identifiers.get( filepath )
+      if buffer_identifiers and buffer_identifiers.filetype == filetype:
+        buffer_identifiers.AddExtraIdentifier( identifier )
+      self._completer.AddSingleIdentifierToDatabase( identifier,
+                                                    filetype,
+                                                    filepath )
 
 
   def _AddPreviousIdentifier( self, request_data ):
@@ -98,13 +124,39 @@ class IdentifierCompleter( GeneralCompleter ):
     collect_from_comments_and_strings = bool( self.user_options[
       'collect_identifiers_from_comments_and_strings' ] )
     text = request_data[ 'file_data' ][ filepath ][ 'contents' ]
-    LOGGER.info( 'Adding buffer identifiers for file: %s', filepath )
-    self._completer.ClearForFileAndAddIdentifiersToDatabase(
-        _IdentifiersFromBuffer( text,
-                                filetype,
-                                collect_from_comments_and_strings ),
-        filetype,
-        filepath )
+    with self._buffer_identifiers_lock:
+      buffer_identifiers = self._buffer_identifiers.get( filepath )
+      if ( buffer_identifiers is None or
+           buffer_identifiers.filetype != filetype or
+           buffer_identifiers.collect_from_comments_and_strings !=
+             collect_from_comments_and_strings ):
+        if buffer_identifiers is not None:
+          self._completer.ClearForFileAndAddIdentifiersToDatabase(
+            ycm_core.StringVector(),
+            buffer_identifiers.filetype,
+            filepath )
+        LOGGER.info( 'Adding buffer identifiers for file: %s', filepath )
+        buffer_identifiers = BufferIdentifiers(
+          filetype, collect_from_comments_and_strings )
+        self._buffer_identifiers[ filepath ] = buffer_identifiers
+        buffer_identifiers.Update( text )
+        self._completer.ClearForFileAndAddIdentifiersToDatabase(
+          ycm_core.StringVector( buffer_identifiers.Identifiers() ),
+          filetype,
+          filepath )
+      else:
+        LOGGER.info( 'Updating buffer identifiers for file: %s', filepath )
+        added, removed = buffer_identifiers.Update( text )
+        if removed:
+          self._completer.RemoveIdentifiersFromDatabase(
+            ycm_core.StringVector( removed ), filetype, filepath )
+        if added:
+          self._completer.AddIdentifiersToDatabase(
+            ycm_core.StringVector( added ), filetype, filepath )
+
+      if self._buffer_index:
+        self._buffer_index.OnBufferIdentifiers(
+          filepath, filetype, text, buffer_identifiers.Identifiers )
 
 
   def _FilterUnchangedTagFiles( self, tag_files ):
@@ -126,6 +178,17 @@ class IdentifierCompleter( GeneralCompleter ):
       yield tag_file
 
 
+  def _AddIdentifiersFromDisk( self, filetype_identifier_map ):
+    # The identifiers of the buffers the editor sent are more recent than those
+    # read from the disk.
+    with self._buffer_identifiers_lock:
+      for filepath_to_identifiers in filetype_identifier_map.values():
+        for filepath in self._buffer_identifiers:
+          filepath_to_identifiers.pop( filepath, None )
+      self._completer.ClearForFilesAndAddIdentifiersToDatabase(
+        filetype_identifier_map )
+
+
   def _AddIdentifiersFromTagFiles( self, tag_files ):
     self._completer.AddIdentifiersToDatabaseFromTagFiles(
       ycm_core.StringVector(
@@ -147,6 +210,17 @@ class IdentifierCompleter( GeneralCompleter ):
     if 'syntax_keywords' in request_data:
       self._AddIdentifiersFromSyntax( request_data[ 'syntax_keywords' ],
                                      request_data[ 'first_filetype' ] )
+    if self._workspace_crawler:
+      self._workspace_crawler.OnFileReadyToParse( request_data )
+
+
+  def OnBufferUnload( self, request_data ):
+    # The identifiers of the buffer are kept in the database. The whole buffer
+    # is scanned again if it is loaded again.
+    with self._buffer_identifiers_lock:
+      self._buffer_identifiers.pop( request_data[ 'filepath' ], None )
+    if self._buffer_index:
+      self._buffer_index.OnBufferUnload( request_data[ 'filepath' ] )
 
 
   def OnInsertLeave( self, request_data ):
@@ -222,14 +296,5 @@ def _GetCursorIdentifier( collect_from_comments_and_strings,
       filetype )
 
 
-def _IdentifiersFromBuffer( text,
-                            filetype,
-                            collect_from_comments_and_strings ):
-  if not collect_from_comments_and_strings:
-    text = identifier_utils.RemoveIdentifierFreeText( text, filetype )
-  idents = identifier_utils.ExtractIdentifiersFromText( text, filetype )
-  return ycm_core.StringVector( idents )
-
-
 def _SanitizeQuery( query ):
   return query.strip()
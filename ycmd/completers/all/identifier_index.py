@@ -0,0 +1,318 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Reads and writes the identifiers of the files of a project, so that they
+don't have to be extracted again when ycmd restarts.
+
+An index file is made of:
+  - a header: the magic bytes, the version of the format, flags and the number
+    of files;
+  - a table of fixed-size entries, one per file: its modification time and
+    size when it was indexed, and the offsets and lengths of its path, filetype
+    and identifiers in the data section;
+  - the data section: UTF-8 strings. The identifiers of a file are separated
+    by newlines.
+
+The table can be read from a memory-mapped file without reading the data, and
+an entry is only decoded when it is asked for."""
+
+import collections
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+from ycmd.utils import LOGGER, RemoveIfExists
+
+MAGIC = b'YCMIDX'
+# Increase when the format changes or when the same file would give different
+# identifiers.
+VERSION = 1
+HEADER = struct.Struct( '<6sHII' )
+ENTRY = struct.Struct( '<qQIIIIII' )
+
+# Flags of the options the identifiers depend on.
+COLLECT_FROM_COMMENTS_AND_STRINGS = 1
+
+# |identifiers| are the UTF-8 encoded identifiers separated by newlines.
+IndexEntry = collections.namedtuple( 'IndexEntry',
+                                     [ 'mtime_ns', 'size', 'filetype',
+                                       'identifiers' ] )
+
+
+def FileStamp( filepath ):
+  """Returns the modification time and size of |filepath|, which must match
+  those of its entry for the entry to be used, or None if the file is gone."""
+  try:
+    stat = os.stat( filepath )
+  except OSError:
+    return None
+  return stat.st_mtime_ns, stat.st_size
+
+
+def EncodeIdentifiers( identifiers ):
+  return '\n'.join( identifiers ).encode( 'utf8' )
+
+
+def DecodeIdentifiers( identifiers ):
+  return identifiers.decode( 'utf8' ).split( '\n' ) if identifiers else []
+
+
+def FiletypeIdentifierMap( entries ):
+  """Returns the identifiers of |entries|, tuples ( filepath, IndexEntry ), as
+  a dictionary from filetype to filepath to identifiers."""
+  filetype_identifier_map = collections.defaultdict( dict )
+  for filepath, entry in entries:
+    filetype_identifier_map[ entry.filetype ][ filepath ] = DecodeIdentifiers(
+      entry.identifiers )
+  return filetype_identifier_map
+
+
+def Load( index_path, flags ):
+  """Returns the Index at |index_path|. The index is empty if the file doesn't
+  exist, is corrupted or was written by another version or with other flags."""
+  try:
+    with open( index_path, 'rb' ) as f:
+      if os.fstat( f.fileno() ).st_size < HEADER.size:
+        return Index()
+      data = mmap.mmap( f.fileno(), 0, access = mmap.ACCESS_READ )
+  except FileNotFoundError:
+    return Index()
+  except ( OSError, ValueError ):
+    LOGGER.exception( 'Ignoring invalid identifier index %s', index_path )
+    return Index()
+
+  magic, version, index_flags, num_files = HEADER.unpack_from( data )
+  if magic != MAGIC or version != VERSION or index_flags != flags:
+    data.close()
+    return Index()
+  if HEADER.size + num_files * ENTRY.size > len( data ):
+    LOGGER.error( 'Ignoring truncated identifier index %s', index_path )
+    data.close()
+    return Index()
+  return Index( index_path, data, num_files )
+
+
+class Index:
+  """The entries of an index file, read from a memory map when they are asked
+  for. The table is sorted by path, so that an entry is found by bisection
+  without reading the others."""
+
+  def __init__( self, index_path = None, data = None, num_files = 0 ):
+    self._index_path = index_path
+    self._data = data
+    self._num_files = num_files
+    self._data_start = HEADER.size + num_files * ENTRY.size
+
+
+  def __len__( self ):
+    return self._num_files
+
+
+  def Items( self ):
+    """Yields the filepath and IndexEntry of each entry, in order. Stops at the
+    first corrupted entry."""
+    try:
+      for row in range( self._num_files ):
+        yield self._Path( row ).decode( 'utf8' ), self._Entry( row )
+    except ( ValueError, UnicodeDecodeError ):
+      LOGGER.exception( 'Corrupted identifier index %s', self._index_path )
+
+
+  def Get( self, filepath ):
+    """Returns the IndexEntry of |filepath| or None if there is none."""
+    path = filepath.encode( 'utf8' )
+    low, high = 0, self._num_files
+    try:
+      while low < high:
+        middle = ( low + high ) // 2
+        if self._Path( middle ) < path:
+          low = middle + 1
+        else:
+          high = middle
+      if low < self._num_files and self._Path( low ) == path:
+        return self._Entry( low )
+    except ( ValueError, UnicodeDecodeError ):
+      LOGGER.exception( 'Corrupted identifier index %s', self._index_path )
+    return None
+
+
+  def Close( self ):
+    if self._data is not None:
+      self._data.close()
+      self._data = None
+      self._num_files = 0
+
+
+  def _Row( self, row ):
+    return ENTRY.unpack_from( self._data, HEADER.size + row * ENTRY.size )
+
+
+  def _String( self, offset, length ):
+    start = self._data_start + offset
+    if start + length > len( self._data ):
+      raise ValueError( 'Truncated identifier index' )
+    return self._data[ start : start + length ]
+
+
+  def _Path( self, row ):
+    return self._String( *self._Row( row )[ 2 : 4 ] )
+
+
+  def _Entry( self, row ):
+    ( mtime_ns, size, _, _,
+      filetype_offset, filetype_length,
+      identifiers_offset, identifiers_length ) = self._Row( row )
+    return IndexEntry(
+      mtime_ns,
+      size,
+      self._String( filetype_offset, filetype_length ).decode( 'utf8' ),
+      self._String( identifiers_offset, identifiers_length ) )
+
+
+class ProjectIndex:
+  """The entries of the index of a project that are still valid, read from the
+  index file on demand, and those added since. The index file is only
+  rewritten if they differ from its entries."""
+
+  def __init__( self, index_path, flags ):
+    self._index_path = index_path
+    self._flags = flags
+    self._index = Index()
+    # The filepaths of the entries of |_index| that are still valid.
+    self._valid_filepaths = set()
+    # filepath -> IndexEntry
+    self._entries = {}
+    self._changed = False
+    self._lock = threading.Lock()
+    self._save_lock = threading.Lock()
+
+
+  def LoadValidEntries( self, batch_size, add_entries ):
+    """Reads the index file and calls |add_entries| with lists of at most
+    |batch_size| tuples ( filepath, IndexEntry ) of the entries whose file
+    still has the same modification time and size. The others are dropped.
+    Returns the number of valid entries."""
+    with self._save_lock:
+      index = Load( self._index_path, self._flags )
+      with self._lock:
+        self._index.Close()
+        self._index = index
+        self._valid_filepaths.clear()
+
+      batch = []
+      num_entries = 0
+      num_valid_entries = 0
+      for filepath, entry in index.Items():
+        num_entries += 1
+        if FileStamp( filepath ) != ( entry.mtime_ns, entry.size ):
+          continue
+        batch.append( ( filepath, entry ) )
+        num_valid_entries += 1
+        if len( batch ) == batch_size:
+          self._AddValidEntries( batch, add_entries )
+          batch = []
+      if batch:
+        self._AddValidEntries( batch, add_entries )
+
+      with self._lock:
+        if num_valid_entries != num_entries:
+          self._changed = True
+      return num_valid_entries
+
+
+  def __contains__( self, filepath ):
+    with self._lock:
+      return filepath in self._entries or filepath in self._valid_filepaths
+
+
+  def Update( self, entries ):
+    """Adds |entries|, a dictionary from filepath to IndexEntry, replacing the
+    entries of the same files."""
+    with self._lock:
+      self._entries.update( entries )
+      self._changed = True
+
+
+  def Save( self ):
+    """Writes the entries to the index file if they changed. The entries still
+    read from the previous file are copied first, since it is replaced."""
+    with self._save_lock:
+      with self._lock:
+        if not self._changed:
+          return
+        self._changed = False
+        for filepath in self._valid_filepaths:
+          if filepath not in self._entries:
+            entry = self._index.Get( filepath )
+            if entry is not None:
+              self._entries[ filepath ] = entry
+        self._valid_filepaths.clear()
+        self._index.Close()
+        self._index = Index()
+        entries = dict( self._entries )
+      Save( self._index_path, self._flags, entries )
+
+
+  def _AddValidEntries( self, batch, add_entries ):
+    with self._lock:
+      self._valid_filepaths.update( filepath for filepath, _ in batch )
+    add_entries( batch )
+
+
+def Save( index_path, flags, entries ):
+  """Writes |entries|, a dictionary from filepath to IndexEntry, to
+  |index_path|. The file is replaced at once, so that a ycmd reading it never
+  sees a partially written index."""
+  table = bytearray()
+  strings = []
+  offset = 0
+  filetype_offsets = {}
+
+  def AddString( string ):
+    nonlocal offset
+    strings.append( string )
+    offset += len( string )
+    return offset - len( string ), len( string )
+
+  # The table is sorted by path for Index.Get.
+  for path, entry in sorted( ( filepath.encode( 'utf8' ), entry )
+                             for filepath, entry in entries.items() ):
+    path = AddString( path )
+    if entry.filetype not in filetype_offsets:
+      filetype_offsets[ entry.filetype ] = AddString(
+        entry.filetype.encode( 'utf8' ) )
+    identifiers = AddString( entry.identifiers )
+    table += ENTRY.pack( entry.mtime_ns, entry.size,
+                         *path, *filetype_offsets[ entry.filetype ],
+                         *identifiers )
+
+  directory = os.path.dirname( index_path )
+  temporary_path = None
+  try:
+    os.makedirs( directory, exist_ok = True )
+    fd, temporary_path = tempfile.mkstemp( dir = directory, suffix = '.tmp' )
+    with os.fdopen( fd, 'wb' ) as f:
+      f.write( HEADER.pack( MAGIC, VERSION, flags, len( entries ) ) )
+      f.write( table )
+      f.write( b''.join( strings ) )
+    os.replace( temporary_path, index_path )
+  except OSError:
+    LOGGER.exception( 'Error while writing identifier index %s', index_path )
+    if temporary_path is not None:
+      RemoveIfExists( temporary_path )
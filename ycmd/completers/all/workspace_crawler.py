@@ -0,0 +1,426 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+import collections
+import hashlib
+import os
+import re
+import sys
+import threading
+
+from ycmd import identifier_utils
+from ycmd.completers.all import identifier_index
+from ycmd.utils import ( LOGGER, PathsToAllParentFolders, StartThread,
+                         ToBytes )
+
+# A directory containing one of these is the root of a project.
+PROJECT_ROOT_MARKERS = [ '.git', '.hg', '.svn', '.bzr' ]
+VCS_DIRECTORIES = set( PROJECT_ROOT_MARKERS )
+NUM_WORKERS = 2
+# The identifiers of that many files are added to the database at once, since
+# each change of the database costs time proportional to its size.
+FILES_PER_BATCH = 100
+DEFAULT_INDEX_DIRECTORY = os.path.join(
+  os.path.expanduser( '~' ), '.cache', 'ycmd', 'identifier_index' )
+
+
+def FindProjectRoot( filepath ):
+  """Returns the closest folder of |filepath| containing a version control
+  directory, or None if there is none."""
+  for folder in PathsToAllParentFolders( filepath ):
+    if any( os.path.isdir( os.path.join( folder, marker ) )
+            for marker in PROJECT_ROOT_MARKERS ):
+      return folder
+  return None
+
+
+def IndexPath( index_directory, root, kind = None ):
+  """Returns the path of the index of the project at |root|. Indexes of another
+  |kind| than those of the crawler are named after it."""
+  root_hash = hashlib.sha256( ToBytes( root ) ).hexdigest()
+  if kind is not None:
+    root_hash += '.' + kind
+  return os.path.join( index_directory, root_hash + '.idx' )
+
+
+class GitIgnore:
+  """The patterns of a .gitignore file, relative to |directory|. See
+  https://git-scm.com/docs/gitignore#_pattern_format"""
+
+  def __init__( self, directory, lines ):
+    self.directory = directory
+    self._patterns = []
+    for line in lines:
+      pattern = _CompileGitIgnorePattern( line )
+      if pattern is not None:
+        self._patterns.append( pattern )
+
+
+  @classmethod
+  def FromFile( cls, directory, filepath ):
+    try:
+      with open( filepath, encoding = 'utf8', errors = 'replace' ) as f:
+        return cls( directory, f.read().splitlines() )
+    except OSError:
+      return None
+
+
+  def Match( self, relative_path, is_dir ):
+    """Returns True if |relative_path| is ignored, False if it is explicitly
+    not ignored, and None if no pattern matches it."""
+    result = None
+    for regex, negated, dir_only in self._patterns:
+      if ( ( is_dir or not dir_only ) and
+           regex.match( relative_path ) is not None ):
+        result = not negated
+    return result
+
+
+def IsIgnored( gitignores, path, is_dir ):
+  """The last .gitignore matching |path| decides; deeper files come last in
+  |gitignores|."""
+  for gitignore in reversed( gitignores ):
+    relative_path = os.path.relpath( path, gitignore.directory )
+    if os.sep != '/':
+      relative_path = relative_path.replace( os.sep, '/' )
+    result = gitignore.Match( relative_path, is_dir )
+    if result is not None:
+      return result
+  return False
+
+
+def _CompileGitIgnorePattern( line ):
+  line = line.rstrip( '\n' )
+  if not line.endswith( '\\ ' ):
+    line = line.rstrip( ' ' )
+  if not line or line.startswith( '#' ):
+    return None
+  negated = line.startswith( '!' )
+  if negated:
+    line = line[ 1: ]
+  elif line.startswith( '\\!' ) or line.startswith( '\\#' ):
+    line = line[ 1: ]
+  dir_only = line.endswith( '/' )
+  line = line.rstrip( '/' )
+  if not line:
+    return None
+  # A pattern with a slash is relative to the directory of the .gitignore.
+  # Otherwise, it matches at any depth.
+  anchored = '/' in line
+  line = line.lstrip( '/' )
+  regex = _GlobToRegex( line )
+  if not anchored:
+    regex = '(?:.*/)?' + regex
+  return re.compile( regex + r'\Z', re.DOTALL ), negated, dir_only
+
+
+def _GlobToRegex( glob ):
+  regex = ''
+  index = 0
+  while index < len( glob ):
+    if glob.startswith( '**/', index ):
+      regex += '(?:.*/)?'
+      index += 3
+    elif glob.startswith( '/**', index ) and index + 3 == len( glob ):
+      regex += '/.*'
+      index += 3
+    elif glob.startswith( '**', index ):
+      regex += '.*'
+      index += 2
+    elif glob[ index ] == '*':
+      regex += '[^/]*'
+      index += 1
+    elif glob[ index ] == '?':
+      regex += '[^/]'
+      index += 1
+    elif glob[ index ] == '[' and glob.find( ']', index + 2 ) != -1:
+      end = glob.find( ']', index + 2 )
+      characters = glob[ index + 1 : end ]
+      if characters.startswith( '!' ):
+        characters = '^' + characters[ 1: ]
+      regex += '[' + characters.replace( '\\', '\\\\' ) + ']'
+      index = end + 1
+    elif glob[ index ] == '\\' and index + 1 < len( glob ):
+      regex += re.escape( glob[ index + 1 ] )
+      index += 2
+    else:
+      regex += re.escape( glob[ index ] )
+      index += 1
+  return regex
+
+
+class _Project:
+  def __init__( self, root, index ):
+    self.root = root
+    self.index = index
+    # extension -> [ filepath ] of the files that were not indexed yet, or None
+    # while the project is crawled.
+    self.files_by_extension = None
+    self.num_pending_batches = 0
+
+
+class WorkspaceCrawler:
+  """Indexes the identifiers of all files of the projects the editor works on,
+  including files that were never opened, in background threads.
+
+  The root of a project is found from the files the editor sends. A file of the
+  project is indexed if it is not ignored by git, is not too large, and has the
+  extension of a file the editor opened; it is given the filetype of that file.
+  The identifiers are given to |add_identifiers| as a dictionary from filetype
+  to filepath to identifiers, a batch of files at a time.
+
+  The identifiers of each project are saved in an index, in the
+  workspace_index_path directory. When the project is crawled again, for
+  instance after a restart, the identifiers of the files that didn't change
+  since are taken from there, and the extensions of these files are indexed
+  without waiting for the editor to open such a file."""
+
+  def __init__( self, add_identifiers, user_options ):
+    self._add_identifiers = add_identifiers
+    self._max_file_size = user_options[ 'workspace_index_max_file_size' ]
+    self._max_files = user_options[ 'workspace_index_max_files' ]
+    self._collect_from_comments_and_strings = bool( user_options[
+      'collect_identifiers_from_comments_and_strings' ] )
+    self._index_directory = ( user_options[ 'workspace_index_path' ] or
+                              DEFAULT_INDEX_DIRECTORY )
+    self._index_flags = (
+      identifier_index.COLLECT_FROM_COMMENTS_AND_STRINGS
+      if self._collect_from_comments_and_strings else 0 )
+    # extension -> filetype
+    self._extension_to_filetype = {}
+    # root -> _Project
+    self._projects = {}
+    self._lock = threading.Lock()
+
+    self._tasks = collections.deque()
+    self._condition = threading.Condition()
+    self._num_busy_workers = 0
+    self._workers = []
+
+
+  def OnFileReadyToParse( self, request_data ):
+    filepath = request_data[ 'filepath' ]
+    filetype = request_data[ 'first_filetype' ]
+    extension = os.path.splitext( filepath )[ 1 ]
+    if not filetype or not extension:
+      return
+
+    root = FindProjectRoot( os.path.dirname( filepath ) )
+    with self._lock:
+      is_new_extension = extension not in self._extension_to_filetype
+      if is_new_extension:
+        self._extension_to_filetype[ extension ] = filetype
+
+      if root is not None and root not in self._projects:
+        project = _Project( root, identifier_index.ProjectIndex(
+          IndexPath( self._index_directory, root ), self._index_flags ) )
+        self._projects[ root ] = project
+        LOGGER.info( 'Indexing identifiers of project %s', root )
+        self._Submit( self._Crawl, project )
+
+    # The files of the projects being crawled are indexed once they are found.
+    if is_new_extension:
+      self._IndexExtension( extension, filetype )
+
+
+  def WaitUntilIdle( self, timeout = None ):
+    """Blocks until all files have been indexed. Returns False if |timeout|
+    seconds passed before that."""
+    with self._condition:
+      return self._condition.wait_for(
+        lambda: not self._tasks and not self._num_busy_workers, timeout )
+
+
+  def _Submit( self, task, *args ):
+    with self._condition:
+      self._tasks.append( ( task, args ) )
+      if len( self._workers ) < NUM_WORKERS:
+        self._workers.append( StartThread( self._Work ) )
+      self._condition.notify()
+
+
+  def _Work( self ):
+    _LowerThreadPriority()
+    while True:
+      with self._condition:
+        self._condition.wait_for( lambda: self._tasks )
+        task, args = self._tasks.popleft()
+        self._num_busy_workers += 1
+
+      try:
+        task( *args )
+      except Exception:
+        LOGGER.exception( 'Error while indexing the workspace' )
+      finally:
+        with self._condition:
+          self._num_busy_workers -= 1
+          self._condition.notify_all()
+
+
+  def _Crawl( self, project ):
+    num_indexed_files = self._LoadIndex( project )
+
+    files_by_extension = collections.defaultdict( list )
+    num_files = 0
+    for filepath in self._ProjectFiles( project.root ):
+      if num_files == self._max_files:
+        LOGGER.warning( 'Only indexing the first %d files of %s',
+                        num_files, project.root )
+        break
+      num_files += 1
+      if filepath not in project.index:
+        files_by_extension[ os.path.splitext( filepath )[ 1 ] ].append(
+          filepath )
+
+    with self._lock:
+      project.files_by_extension = files_by_extension
+      extension_to_filetype = dict( self._extension_to_filetype )
+
+    LOGGER.info( 'Found %d files in %s, %d of them already indexed',
+                 num_files, project.root, num_indexed_files )
+    for extension, filepaths in files_by_extension.items():
+      filetype = extension_to_filetype.get( extension )
+      if filetype is not None:
+        self._IndexFiles( project, filepaths, filetype )
+    self._SaveIndexIfDone( project )
+
+
+  def _LoadIndex( self, project ):
+    """Adds the identifiers of the files that didn't change since they were
+    saved in the index of the project, a batch of files at a time, and returns
+    the number of these files."""
+    def AddEntries( entries ):
+      self._add_identifiers(
+        identifier_index.FiletypeIdentifierMap( entries ) )
+
+      # Files with these extensions can be indexed before the editor opens one.
+      with self._lock:
+        for filepath, entry in entries:
+          self._extension_to_filetype.setdefault(
+            os.path.splitext( filepath )[ 1 ], entry.filetype )
+
+    return project.index.LoadValidEntries( FILES_PER_BATCH, AddEntries )
+
+
+  def _SaveIndexIfDone( self, project ):
+    with self._lock:
+      if ( project.files_by_extension is None or
+           project.num_pending_batches ):
+        return
+    project.index.Save()
+
+
+  def _ProjectFiles( self, root ):
+    """Yields the files of the project that are not ignored, have an extension
+    and are small enough."""
+    root_gitignores = []
+    exclude = GitIgnore.FromFile(
+      root, os.path.join( root, '.git', 'info', 'exclude' ) )
+    if exclude is not None:
+      root_gitignores.append( exclude )
+    # directory -> the .gitignore files of its parents
+    parent_gitignores = {}
+
+    for directory, directories, files in os.walk( root ):
+      gitignores = parent_gitignores.pop( directory, root_gitignores )
+      if '.gitignore' in files:
+        gitignore = GitIgnore.FromFile(
+          directory, os.path.join( directory, '.gitignore' ) )
+        if gitignore is not None:
+          gitignores = gitignores + [ gitignore ]
+
+      # Prune the ignored directories so that they are not walked.
+      directories[ : ] = [
+        name for name in directories
+        if name not in VCS_DIRECTORIES and
+           not IsIgnored( gitignores, os.path.join( directory, name ), True ) ]
+      for name in directories:
+        parent_gitignores[ os.path.join( directory, name ) ] = gitignores
+
+      for name in files:
+        filepath = os.path.join( directory, name )
+        if ( os.path.splitext( name )[ 1 ] and
+             not IsIgnored( gitignores, filepath, False ) and
+             self._IsSmallEnough( filepath ) ):
+          yield filepath
+
+
+  def _IsSmallEnough( self, filepath ):
+    try:
+      return os.path.getsize( filepath ) <= self._max_file_size
+    except OSError:
+      return False
+
+
+  def _IndexExtension( self, extension, filetype ):
+    with self._lock:
+      projects = [ ( project, project.files_by_extension.get( extension ) )
+                   for project in self._projects.values()
+                   if project.files_by_extension is not None ]
+    for project, filepaths in projects:
+      if filepaths:
+        self._IndexFiles( project, filepaths, filetype )
+
+
+  def _IndexFiles( self, project, filepaths, filetype ):
+    for start in range( 0, len( filepaths ), FILES_PER_BATCH ):
+      with self._lock:
+        project.num_pending_batches += 1
+      self._Submit( self._IndexBatch,
+                    project,
+                    filepaths[ start : start + FILES_PER_BATCH ],
+                    filetype )
+
+
+  def _IndexBatch( self, project, filepaths, filetype ):
+    try:
+      filepath_to_identifiers = {}
+      entries = {}
+      for filepath in filepaths:
+        # Stamped before reading, so that a change while reading invalidates
+        # the entry.
+        stamp = identifier_index.FileStamp( filepath )
+        try:
+          with open( filepath, encoding = 'utf8' ) as f:
+            text = f.read()
+        except ( OSError, UnicodeDecodeError ):
+          continue
+        if not self._collect_from_comments_and_strings:
+          text = identifier_utils.RemoveIdentifierFreeText( text, filetype )
+        identifiers = list( set(
+          identifier_utils.ExtractIdentifiersFromText( text, filetype ) ) )
+        filepath_to_identifiers[ filepath ] = identifiers
+        if stamp is not None:
+          entries[ filepath ] = identifier_index.IndexEntry(
+            *stamp,
+            filetype,
+            identifier_index.EncodeIdentifiers( identifiers ) )
+      self._add_identifiers( { filetype: filepath_to_identifiers } )
+      project.index.Update( entries )
+    finally:
+      with self._lock:
+        project.num_pending_batches -= 1
+    self._SaveIndexIfDone( project )
+
+
+def _LowerThreadPriority():
+  # On Linux, and only there, the nice value is a property of each thread.
+  if sys.platform.startswith( 'linux' ):
+    try:
+      os.setpriority( os.PRIO_PROCESS, threading.get_native_id(), 19 )
+    except OSError:
+      pass
@@ -16,9 +16,11 @@
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
 import abc
+import collections
 import threading
-from ycmd import extra_conf_store
+from ycmd import extra_conf_store, metrics
 from ycmd.completers import completer_utils
+from ycmd.request_cancellation import RaiseIfCancelled
 from ycmd.responses import NoDiagnosticSupport, SignatureHelpAvailalability
 from ycmd.utils import LOGGER
 
@@ -27,6 +29,10 @@ NO_USER_COMMANDS = 'This completer does not define any commands.'
 # Number of seconds to block before returning True in PollForMessages
 MESSAGE_POLL_TIMEOUT = 10
 
+# Bounds of the completions kept by CompletionsCache.
+MAX_CACHED_POSITIONS = 16
+MAX_CACHED_COMPLETIONS = 50000
+
 
 class CompletionsChanged( Exception ):
   pass # pragma: no cover
@@ -209,6 +215,8 @@ class Completer( metaclass = abc.ABCMeta ):
       if not user_options[ 'disable_signature_help' ] else None )
 
     self._completions_cache = CompletionsCache()
+    self._parse_errors = collections.OrderedDict()
+    self._parse_errors_lock = threading.Lock()
     self._max_candidates = user_options[ 'max_num_candidates' ]
     self._max_candidates_to_detail = user_options[
       'max_num_candidates_to_detail' ]
@@ -221,7 +229,7 @@ class Completer( metaclass = abc.ABCMeta ):
   # version of it.
   def ShouldUseNow( self, request_data ):
     if not self.ShouldUseNowInner( request_data ):
-      self._completions_cache.Invalidate()
+      self._completions_cache.Invalidate( request_data )
       return False
 
     # We have to do the cache valid check and get the completions as part of one
@@ -296,15 +304,34 @@ class Completer( metaclass = abc.ABCMeta ):
   # It's highly likely you DON'T want to override this function but the *Inner
   # version of it.
   def ComputeCandidates( self, request_data ):
-    if ( not request_data[ 'force_semantic' ] and
-         not self.ShouldUseNow( request_data ) ):
-      return []
-
+    if not request_data[ 'force_semantic' ]:
+      with self.TimePhase( 'ShouldUseNow' ):
+        should_use_now = self.ShouldUseNow( request_data )
+      if not should_use_now:
+        return []
+
+    # Stop as soon as possible once the client sent a newer request for this
+    # buffer.
+    cancellation_token = request_data.get( 'cancellation_token' )
+    RaiseIfCancelled( request_data )
     candidates = self._GetCandidatesFromSubclass( request_data )
-    candidates = self.FilterAndSortCandidates( candidates,
-                                               request_data[ 'query' ] )
+    RaiseIfCancelled( request_data )
+    with self.TimePhase( 'FilterAndSortCandidates' ):
+      candidates = self.FilterAndSortCandidates( candidates,
+                                                 request_data[ 'query' ],
+                                                 cancellation_token )
+    RaiseIfCancelled( request_data )
 
-    return self.DetailCandidates( request_data, candidates )
+    with self.TimePhase( 'DetailCandidates' ):
+      return self.DetailCandidates( request_data, candidates )
+
+
+  def TimePhase( self, phase ):
+    """Context manager recording the time spent in |phase| of a completion
+    request in the metrics of this completer."""
+    return metrics.Timer( metrics.COMPLETER_PHASE_DURATION,
+                          completer = type( self ).__name__,
+                          phase = phase )
 
 
   def ShouldDetailCandidateList( self, candidates ):
@@ -338,7 +365,8 @@ class Completer( metaclass = abc.ABCMeta ):
     if cache_completions:
       return cache_completions
 
-    raw_completions = self.ComputeCandidatesInner( request_data )
+    with self.TimePhase( 'ComputeCandidatesInner' ):
+      raw_completions = self.ComputeCandidatesInner( request_data )
     self._completions_cache.Update( request_data, raw_completions )
     return raw_completions
 
@@ -419,7 +447,10 @@ class Completer( metaclass = abc.ABCMeta ):
       return 'This Completer has no supported subcommands.'
 
 
-  def FilterAndSortCandidates( self, candidates, query ):
+  def FilterAndSortCandidates( self,
+                               candidates,
+                               query,
+                               cancellation_token = None ):
     if not candidates:
       return []
 
@@ -435,12 +466,20 @@ class Completer( metaclass = abc.ABCMeta ):
       elif 'insertion_text' in candidates[ 0 ]:
         sort_property = 'insertion_text'
 
-    return self.FilterAndSortCandidatesInner( candidates, sort_property, query )
+    return self.FilterAndSortCandidatesInner( candidates,
+                                              sort_property,
+                                              query,
+                                              cancellation_token )
 
 
-  def FilterAndSortCandidatesInner( self, candidates, sort_property, query ):
+  def FilterAndSortCandidatesInner( self,
+                                    candidates,
+                                    sort_property,
+                                    query,
+                                    cancellation_token = None ):
     return completer_utils.FilterAndSortCandidatesWrap(
-      candidates, sort_property, query, self._max_candidates )
+      candidates, sort_property, query, self._max_candidates,
+      cancellation_token )
 
 
   def OnFileReadyToParse( self, request_data ):
@@ -531,6 +570,11 @@ class Completer( metaclass = abc.ABCMeta ):
 
 
   def PollForMessages( self, request_data ):
+    with self._parse_errors_lock:
+      messages = list( self._parse_errors.values() )
+      self._parse_errors.clear()
+    if messages:
+      return messages
     return self.PollForMessagesInner( request_data, MESSAGE_POLL_TIMEOUT )
 
 
@@ -542,6 +586,39 @@ class Completer( metaclass = abc.ABCMeta ):
     return False
 
 
+  def OnAsynchronousFileReadyToParse( self, request_data ):
+    """Called in the request thread when a FileReadyToParse event is queued to
+    be handled in the background, before PublishDiagnostics is called with its
+    diagnostics. Completers returning these diagnostics from
+    PollForMessagesInner should only start doing so from then on, so that
+    clients which never send asynchronous events aren't kept polling."""
+    pass # pragma: no cover
+
+
+  def PublishDiagnostics( self, request_data, diagnostics ):
+    """Called with the |diagnostics| returned by OnFileReadyToParse when the
+    event was handled in the background instead of the request thread.
+    Completers which can't push diagnostics to the client on their own should
+    return them from PollForMessagesInner, e.g. with a DiagnosticsQueue. The
+    default implementation drops them, which is fine for completers already
+    publishing their diagnostics through PollForMessagesInner."""
+    pass # pragma: no cover
+
+
+  def PublishError( self, request_data, error ):
+    """Called with the ExceptionResponse |error| when OnFileReadyToParse raised
+    while the event was handled in the background, so that the client can deal
+    with it as with the error response to a synchronous event, e.g. by asking
+    to load an unknown extra conf file. The default implementation returns it
+    from the next PollForMessages call. Completers returning a DiagnosticsQueue
+    from PollForMessagesInner should put it there instead, so that the poll in
+    progress returns it right away."""
+    filepath = request_data[ 'filepath' ]
+    with self._parse_errors_lock:
+      self._parse_errors.pop( filepath, None )
+      self._parse_errors[ filepath ] = _ErrorMessage( filepath, error )
+
+
   def AdditionalFormattingOptions( self, request_data ):
     module = extra_conf_store.ModuleForSourceFile( request_data[ 'filepath' ] )
     try:
@@ -565,22 +642,115 @@ class Completer( metaclass = abc.ABCMeta ):
     return {}
 
 
-class CompletionsCache:
-  """Cache of computed completions for a particular request."""
+class DiagnosticsQueue:
+  """Diagnostics waiting to be returned to the client by PollForMessages. Only
+  the latest diagnostics of each file are kept.
+
+  Polling is not supported until Enable is called, i.e. until the client sends
+  its first asynchronous FileReadyToParse event."""
 
   def __init__( self ):
+    self._messages = collections.OrderedDict()
+    self._condition = threading.Condition()
+    self._enabled = False
+
+
+  def Enable( self ):
+    self._enabled = True
+
+
+  def Put( self, filepath, diagnostics ):
+    self._Put( filepath, {
+      'diagnostics': diagnostics,
+      'filepath': filepath
+    } )
+
+
+  def PutError( self, filepath, error ):
+    """Queues the ExceptionResponse |error| raised while parsing |filepath|
+    instead of its diagnostics."""
+    self._Put( filepath, _ErrorMessage( filepath, error ) )
+
+
+  def _Put( self, filepath, message ):
+    with self._condition:
+      self._messages.pop( filepath, None )
+      self._messages[ filepath ] = message
+      self._condition.notify_all()
+
+
+  def Poll( self, timeout ):
+    """Returns the list of pending messages as soon as there is one, or True if
+    there was none for |timeout| seconds. Returns False, meaning that polling is
+    not supported, if the queue is not enabled."""
+    if not self._enabled:
+      return False
+
+    with self._condition:
+      if not self._condition.wait_for( lambda: self._messages, timeout ):
+        return True
+      messages = list( self._messages.values() )
+      self._messages.clear()
+      return messages
+
+
+def _ErrorMessage( filepath, error ):
+  return {
+    'error': error,
+    'filepath': filepath
+  }
+
+
+class CompletionsCacheEntry:
+  def __init__( self, request_data, completions ):
+    self.request_data = request_data
+    self.completions = completions
+
+
+def _CacheKey( request_data ):
+  return ( request_data[ 'filepath' ],
+           request_data[ 'line_num' ],
+           request_data[ 'start_column' ] )
+
+
+def _NumCompletions( completions ):
+  return len( completions ) if isinstance( completions, list ) else 0
+
+
+class CompletionsCache:
+  """Cache of computed completions for the last requests, keyed by their
+  position in the buffer. Going back to a previous position, or alternating
+  between several buffers, reuses the completions computed there as long as the
+  request is the same.
+
+  The least recently used completions are dropped beyond |max_positions|
+  positions, or when the cached completions add up to more than
+  |max_completions| candidates. The completions of the last request are always
+  kept."""
+
+  def __init__( self,
+                max_positions = MAX_CACHED_POSITIONS,
+                max_completions = MAX_CACHED_COMPLETIONS ):
+    self._max_positions = max_positions
+    self._max_completions = max_completions
     self._access_lock = threading.Lock()
     self.Invalidate()
 
 
-  def Invalidate( self ):
+  def Invalidate( self, request_data = None ):
+    """Drops the completions at the position of |request_data|, or all of them
+    if it is None."""
     with self._access_lock:
-      self.InvalidateNoLock()
+      self.InvalidateNoLock( request_data )
 
 
-  def InvalidateNoLock( self ):
-    self._request_data = None
-    self._completions = None
+  def InvalidateNoLock( self, request_data = None ):
+    if request_data is None:
+      # Least recently used first.
+      self._entries = collections.OrderedDict()
+      self._num_completions = 0
+    else:
+      self._RemoveNoLock( _CacheKey( request_data ) )
 
 
   def Update( self, request_data, completions ):
@@ -589,16 +759,49 @@ class CompletionsCache:
 
 
   def UpdateNoLock( self, request_data, completions ):
-    self._request_data = request_data
-    self._completions = completions
+    """Stores |completions| for the position of |request_data| and returns
+    their CompletionsCacheEntry."""
+    key = _CacheKey( request_data )
+    self._RemoveNoLock( key )
+    entry = CompletionsCacheEntry( request_data, completions )
+    self._entries[ key ] = entry
+    self._num_completions += _NumCompletions( completions )
+
+    while len( self._entries ) > 1 and (
+        len( self._entries ) > self._max_positions or
+        self._num_completions > self._max_completions ):
+      _, dropped = self._entries.popitem( last = False )
+      self._num_completions -= _NumCompletions( dropped.completions )
+    return entry
+
+
+  def GetEntryNoLock( self, request_data ):
+    """Returns the CompletionsCacheEntry at the position of |request_data|,
+    whether it is valid or not, or None."""
+    return self._entries.get( _CacheKey( request_data ) )
 
 
   def GetCompletionsIfCacheValid( self, request_data, **kwargs ):
     with self._access_lock:
-      return self.GetCompletionsIfCacheValidNoLock( request_data )
+      return self.GetCompletionsIfCacheValidNoLock( request_data, **kwargs )
+
+
+  def GetCompletionsIfCacheValidNoLock( self, request_data, **kwargs ):
+    key = _CacheKey( request_data )
+    entry = self._entries.get( key )
+    if entry is None or not self.IsEntryValidNoLock( entry,
+                                                     request_data,
+                                                     **kwargs ):
+      return None
+    self._entries.move_to_end( key )
+    return entry.completions
+
+
+  def IsEntryValidNoLock( self, entry, request_data, **kwargs ):
+    return entry.request_data == request_data
 
 
-  def GetCompletionsIfCacheValidNoLock( self, request_data ):
-    if self._request_data and self._request_data == request_data:
-      return self._completions
-    return None
+  def _RemoveNoLock( self, key ):
+    entry = self._entries.pop( key, None )
+    if entry is not None:
+      self._num_completions -= _NumCompletions( entry.completions )
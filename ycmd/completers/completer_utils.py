@@ -166,13 +166,15 @@ def _PrepareTrigger( trigger ):
 
 
 def FilterAndSortCandidatesWrap( candidates, sort_property, query,
-                                 max_candidates ):
+                                 max_candidates, cancellation_token = None ):
   from ycm_core import FilterAndSortCandidates
 
-  return FilterAndSortCandidates( candidates,
-                                  sort_property,
-                                  query,
-                                  max_candidates )
+  return FilterAndSortCandidates(
+    candidates,
+    sort_property,
+    query,
+    max_candidates,
+    cancellation_token.CoreToken() if cancellation_token else None )
 
 
 TRIGGER_REGEX_PREFIX = 're!'
@@ -23,7 +23,7 @@ from xml.etree.ElementTree import ParseError as XmlParseError
 
 from ycmd import responses
 from ycmd.utils import ImportCore, PathLeftSplit, re, ToBytes, ToUnicode
-from ycmd.completers.completer import Completer
+from ycmd.completers.completer import Completer, DiagnosticsQueue
 from ycmd.completers.cpp.flags import ( Flags, PrepareFlagsForClang,
                                         UserIncludePaths )
 from ycmd.completers.cpp.ephemeral_values_set import EphemeralValuesSet
@@ -50,6 +50,7 @@ class ClangCompleter( Completer ):
     self._flags = Flags()
     self._include_cache = IncludeCache()
     self._diagnostic_store = None
+    self._diagnostics_queue = DiagnosticsQueue()
     self._files_being_compiled = EphemeralValuesSet()
 
 
@@ -378,6 +379,22 @@ class ClangCompleter( Completer ):
                                               self.max_diagnostics_to_display )
 
 
+  def OnAsynchronousFileReadyToParse( self, request_data ):
+    self._diagnostics_queue.Enable()
+
+
+  def PublishDiagnostics( self, request_data, diagnostics ):
+    self._diagnostics_queue.Put( request_data[ 'filepath' ], diagnostics )
+
+
+  def PublishError( self, request_data, error ):
+    self._diagnostics_queue.PutError( request_data[ 'filepath' ], error )
+
+
+  def PollForMessagesInner( self, request_data, timeout ):
+    return self._diagnostics_queue.Poll( timeout )
+
+
   def OnBufferUnload( self, request_data ):
     # FIXME: The filepath here is (possibly) wrong when overriding the
     # translation unit filename. If the buffer that the user closed is not the
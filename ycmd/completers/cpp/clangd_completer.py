@@ -362,8 +362,9 @@ class ClangdCompleter( language_server_completer.LanguageServerCompleter ):
     if self._use_ycmd_caching:
       return super().ComputeCandidates( request_data )
     codepoint = request_data[ 'column_codepoint' ]
-    candidates, _ = super().ComputeCandidatesInner( request_data,
-                                                    codepoint )
+    with self.TimePhase( 'ComputeCandidatesInner' ):
+      candidates, _ = super().ComputeCandidatesInner( request_data,
+                                                      codepoint )
     return candidates
 
 
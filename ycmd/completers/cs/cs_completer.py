@@ -25,7 +25,7 @@ import urllib.error
 import threading
 from urllib.parse import urljoin
 
-from ycmd.completers.completer import Completer
+from ycmd.completers.completer import Completer, DiagnosticsQueue
 from ycmd.completers.completer_utils import GetFileLines
 from ycmd.completers.cs import solutiondetection
 from ycmd.utils import ( ByteOffsetToCodepointOffset,
@@ -85,6 +85,7 @@ class CsharpCompleter( Completer ):
     self._solution_for_file = {}
     self._completer_per_solution = {}
     self._diagnostic_store = None
+    self._diagnostics_queue = DiagnosticsQueue()
     self._solution_state_lock = threading.Lock()
     self.SetSignatureHelpTriggers( [ '(', ',' ] )
     if os.path.isfile( user_options[ 'roslyn_binary_path' ] ):
@@ -279,6 +280,22 @@ class CsharpCompleter( Completer ):
                                               self.max_diagnostics_to_display )
 
 
+  def OnAsynchronousFileReadyToParse( self, request_data ):
+    self._diagnostics_queue.Enable()
+
+
+  def PublishDiagnostics( self, request_data, diagnostics ):
+    self._diagnostics_queue.Put( request_data[ 'filepath' ], diagnostics )
+
+
+  def PublishError( self, request_data, error ):
+    self._diagnostics_queue.PutError( request_data[ 'filepath' ], error )
+
+
+  def PollForMessagesInner( self, request_data, timeout ):
+    return self._diagnostics_queue.Poll( timeout )
+
+
   def _QuickFixToDiagnostic( self, request_data, quick_fix ):
     filename = quick_fix[ "FileName" ]
     # NOTE: end of diagnostic range returned by the OmniSharp server is not
@@ -219,7 +219,9 @@ class FilenameCompleter( Completer ):
 
 
   def ComputeCandidates( self, request_data ):
-    if not self.ShouldUseNow( request_data ):
+    with self.TimePhase( 'ShouldUseNow' ):
+      should_use_now = self.ShouldUseNow( request_data )
+    if not should_use_now:
       return []
 
     # Calling this function seems inefficient when it's already been called in
@@ -230,9 +232,13 @@ class FilenameCompleter( Completer ):
     old_start_codepoint = request_data[ 'start_codepoint' ]
     request_data[ 'start_codepoint' ] = start_codepoint
 
-    candidates = self.GetCandidatesForDirectory( directory )
-    candidates = self.FilterAndSortCandidates( candidates,
-                                               request_data[ 'query' ] )
+    with self.TimePhase( 'ComputeCandidatesInner' ):
+      candidates = self.GetCandidatesForDirectory( directory )
+    with self.TimePhase( 'FilterAndSortCandidates' ):
+      candidates = self.FilterAndSortCandidates(
+        candidates,
+        request_data[ 'query' ],
+        request_data.get( 'cancellation_token' ) )
     if not candidates:
       # No candidates were matched. Reset the start column for the identifier
       # completer.
@@ -19,6 +19,7 @@ from ycmd.completers.completer import Completer
 from ycmd.completers.all.identifier_completer import IdentifierCompleter
 from ycmd.completers.general.filename_completer import FilenameCompleter
 from ycmd.completers.general.ultisnips_completer import UltiSnipsCompleter
+from ycmd.request_cancellation import RaiseIfCancelled
 
 
 class GeneralCompleterStore( Completer ):
@@ -55,6 +56,7 @@ class GeneralCompleterStore( Completer ):
     if candidates:
       return candidates
     for completer in self._non_filename_completers:
+      RaiseIfCancelled( request_data )
       candidates += completer.ComputeCandidates( request_data )
     return candidates
 
@@ -38,7 +38,9 @@ class UltiSnipsCompleter( GeneralCompleter ):
     if not self.ShouldUseNow( request_data ):
       return []
     return self.FilterAndSortCandidates(
-      self._candidates, request_data[ 'query' ] )
+      self._candidates,
+      request_data[ 'query' ],
+      request_data.get( 'cancellation_token' ) )
 
 
   def OnBufferVisit( self, request_data ):
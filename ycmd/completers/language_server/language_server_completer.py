@@ -19,6 +19,7 @@ from functools import partial
 import abc
 import collections
 import contextlib
+import itertools
 import json
 import logging
 import os
@@ -33,6 +34,7 @@ from watchdog.observers import Observer
 from ycmd import extra_conf_store, responses, utils
 from ycmd.completers.completer import Completer, CompletionsCache
 from ycmd.completers.completer_utils import GetFileContents, GetFileLines
+from ycmd.request_cancellation import RaiseIfCancelled, RequestSuperseded
 from ycmd.utils import LOGGER
 
 from ycmd.completers.language_server import language_server_protocol as lsp
@@ -45,9 +47,13 @@ REQUEST_TIMEOUT_INITIALISE = 30
 REQUEST_TIMEOUT_COMMAND    = 30
 CONNECTION_TIMEOUT         = 5
 
-# Size of the notification ring buffer
+# Size of the notification queue
 MAX_QUEUED_MESSAGES = 250
 
+# The method under which the decoding of responses to unknown or cancelled
+# requests is counted.
+UNKNOWN_METHOD = '<unknown>'
+
 PROVIDERS_MAP = {
   'codeActionProvider': (
     lambda self, request_data, args: self.GetCodeActions( request_data )
@@ -173,15 +179,22 @@ class Response:
   the associated response is read, which triggers the |AwaitResponse| method to
   handle the actual response"""
 
-  def __init__( self, response_callback=None ):
+  def __init__( self, response_callback=None, method=None ):
     """In order to receive a callback in the message pump thread context, supply
     a method taking ( response, message ) in |response_callback|. Note that
     |response| is _this object_, not the calling object, and message is the
     message that was received. NOTE: This should not normally be used. Instead
-    users should synchronously wait on AwaitResponse."""
+    users should synchronously wait on AwaitResponse.
+
+    |method| is the method of the request, if known."""
     self._event = threading.Event()
     self._message = None
     self._response_callback = response_callback
+    self._superseded = False
+    self.method = method
+    # Requests with the same key supersede this one. See
+    # LanguageServerConnection.GetResponseAsync.
+    self.superseding_key = None
 
 
   def ResponseReceived( self, message ):
@@ -199,19 +212,28 @@ class Response:
     self.ResponseReceived( None )
 
 
+  def Supersede( self ):
+    """Called when a newer request made this one unnecessary."""
+    self._superseded = True
+    self.ResponseReceived( None )
+
+
   def AwaitResponse( self, timeout ):
     """Called by clients to wait synchronously for either a response to be
     received or for |timeout| seconds to have passed.
     Returns the message, or:
         - throws ResponseFailedException if the request fails
         - throws ResponseTimeoutException in case of timeout
-        - throws ResponseAbortedException in case the server is shut down."""
+        - throws ResponseAbortedException in case the server is shut down
+        - throws RequestSuperseded in case a newer request superseded it."""
     self._event.wait( timeout )
 
     if not self._event.is_set():
       raise ResponseTimeoutException( 'Response Timeout' )
 
     if self._message is None:
+      if self._superseded:
+        raise RequestSuperseded()
       raise ResponseAbortedException( 'Response Aborted' )
 
     if 'error' in self._message:
@@ -221,6 +243,149 @@ class Response:
     return self._message
 
 
+class MessageReader:
+  """Splits the data read from a language server into messages. The data is
+  read into a single bytearray reused for every message, and each payload is
+  returned as a view of that buffer instead of being copied out of it.
+
+  |read_into| is called with a writable memoryview and must read between 1 and
+  len( view ) bytes into it and return how many were read."""
+
+  INITIAL_BUFFER_SIZE = 1 << 16
+  # The buffer goes back to its initial size once a message larger than that is
+  # consumed.
+  MAX_RETAINED_BUFFER_SIZE = 1 << 24
+
+  def __init__( self, read_into ):
+    self._read_into = read_into
+    self._buffer = bytearray( MessageReader.INITIAL_BUFFER_SIZE )
+    # The data not consumed yet is self._buffer[ self._start : self._end ].
+    self._start = 0
+    self._end = 0
+
+
+  def ReadMessage( self ):
+    """Returns a memoryview of the payload of the next message. It must be
+    released before calling ReadMessage again."""
+    headers = self._ReadHeaders()
+    if 'Content-Length' not in headers:
+      # FIXME: We could try and recover this, but actually the message pump
+      # just fails.
+      raise ValueError( "Missing 'Content-Length' header" )
+
+    content_length = int( headers[ 'Content-Length' ] )
+    self._Fill( content_length )
+    start = self._start
+    self._start += content_length
+    return memoryview( self._buffer )[ start : self._start ]
+
+
+  def _ReadHeaders( self ):
+    # LSP defines only 2 headers, of which only 1 is useful (Content-Length).
+    # Headers end with an empty line, and there is no guarantee that a single
+    # socket or stream read will contain only a single message, or even a whole
+    # message.
+    headers = {}
+    while True:
+      newline = self._buffer.find( b'\n', self._start, self._end )
+      if newline < 0:
+        self._Fill( self._end - self._start + 1 )
+        continue
+
+      line = self._buffer[ self._start : newline ].strip()
+      self._start = newline + 1
+      if not line:
+        return headers
+
+      try:
+        key, value = utils.ToUnicode( line ).split( ':', 1 )
+        headers[ key.strip() ] = value.strip()
+      except Exception:
+        LOGGER.exception( 'Received invalid protocol data from server: '
+                           + str( line ) )
+        raise
+
+
+  def _Fill( self, size ):
+    """Reads until at least |size| bytes are available."""
+    if self._start == self._end:
+      self._start = self._end = 0
+      if len( self._buffer ) > MessageReader.MAX_RETAINED_BUFFER_SIZE:
+        self._buffer = bytearray( MessageReader.INITIAL_BUFFER_SIZE )
+
+    if self._start + size > len( self._buffer ):
+      self._MakeRoom( size )
+
+    while self._end - self._start < size:
+      view = memoryview( self._buffer )[ self._end : ]
+      try:
+        self._end += self._read_into( view )
+      finally:
+        view.release()
+
+
+  def _MakeRoom( self, size ):
+    """Moves the data not consumed yet to the start of the buffer, which is
+    grown to hold at least |size| bytes."""
+    pending = self._end - self._start
+    if size > len( self._buffer ):
+      buffer = bytearray( max( size, 2 * len( self._buffer ) ) )
+    else:
+      buffer = self._buffer
+    with memoryview( self._buffer ) as source, memoryview( buffer ) as target:
+      target[ : pending ] = source[ self._start : self._end ]
+    self._buffer = buffer
+    self._start = 0
+    self._end = pending
+
+
+class NotificationQueue:
+  """Bounded queue of the notifications received from the server, consumed by
+  the message poll. A diagnostics notification replaces the one still queued
+  for the same document, as the client would only overwrite it with the newer
+  one. Other notifications are returned in the order they were received.
+
+  When the queue is full, this indicates either a slow consumer or the message
+  poll is not running. In any case, rather than infinitely queueing, the oldest
+  notification is discarded."""
+
+  def __init__( self, maxsize = MAX_QUEUED_MESSAGES ):
+    self._maxsize = maxsize
+    # Notifications by key, oldest first. The notifications which are never
+    # replaced get a unique key.
+    self._notifications = collections.OrderedDict()
+    self._unique_keys = itertools.count()
+    self._not_empty = threading.Condition()
+
+
+  def Put( self, notification ):
+    key = _CoalescingKey( notification )
+    with self._not_empty:
+      if key is None:
+        key = next( self._unique_keys )
+      elif self._notifications.pop( key, None ) is not None:
+        LOGGER.debug( 'Replacing queued notification %s', key )
+
+      self._notifications[ key ] = notification
+      while len( self._notifications ) > self._maxsize:
+        self._notifications.popitem( last = False )
+      self._not_empty.notify()
+
+
+  def Get( self, timeout = None ):
+    """Removes and returns the oldest notification. Waits up to |timeout|
+    seconds, or forever if None, for one to be queued and raises queue.Empty if
+    none was."""
+    with self._not_empty:
+      if not self._not_empty.wait_for( lambda: self._notifications, timeout ):
+        raise queue.Empty()
+      return self._notifications.popitem( last = False )[ 1 ]
+
+
+  def GetNowait( self ):
+    return self.Get( timeout = 0 )
+
+
 class LanguageServerConnection( threading.Thread ):
   """
   Abstract language server communication object.
@@ -322,6 +487,19 @@ class LanguageServerConnection( threading.Thread ):
     pass # pragma: no cover
 
 
+  def ReadDataInto( self, buffer ):
+    """Reads between 1 and len( buffer ) bytes from the stream/socket into the
+    writable |buffer| and returns how many were read. Connections should
+    override this to read directly into |buffer|; by default, the data returned
+    by ReadData is copied and what doesn't fit is kept for the next call."""
+    if not self._pending_data:
+      self._pending_data = memoryview( self.ReadData() )
+    size = min( len( buffer ), len( self._pending_data ) )
+    buffer[ : size ] = self._pending_data[ : size ]
+    self._pending_data = self._pending_data[ size : ]
+    return size
+
+
   def __init__( self,
                 project_directory,
                 watchdog_factory,
@@ -334,8 +512,22 @@ class LanguageServerConnection( threading.Thread ):
     self._project_directory = project_directory
     self._last_id = 0
     self._responses = {}
+    # Maps the superseding key of a pending request to its id. See
+    # GetResponseAsync.
+    self._superseding_requests = {}
     self._response_mutex = threading.Lock()
-    self._notifications = queue.Queue( maxsize=MAX_QUEUED_MESSAGES )
+    self._pending_data = None
+    self._notifications = NotificationQueue()
+
+    # Large messages are decoded and dispatched by the decode thread, along with
+    # the messages that must not overtake them. See _ReadMessages.
+    self._decode_queue = queue.Queue()
+    self._pending_decodes = 0
+    self._pending_decodes_mutex = threading.Lock()
+    # Maps a method to the ( count, total time, max time ) of the decoding of
+    # its messages.
+    self._decode_times = {}
+    self._decode_times_mutex = threading.Lock()
 
     self._connection_event = threading.Event()
     self._stop_event = threading.Event()
@@ -371,6 +563,7 @@ class LanguageServerConnection( threading.Thread ):
         for _, response in self._responses.items():
           response.Abort()
         self._responses.clear()
+        self._superseding_requests.clear()
 
       LOGGER.debug( 'Connection was closed cleanly' )
     except Exception:
@@ -383,6 +576,7 @@ class LanguageServerConnection( threading.Thread ):
         for _, response in self._responses.items():
           response.Abort()
         self._responses.clear()
+        self._superseding_requests.clear()
 
       # Close any remaining sockets or files
       self.Shutdown()
@@ -417,17 +611,35 @@ class LanguageServerConnection( threading.Thread ):
       return self._last_id
 
 
-  def GetResponseAsync( self, request_id, message, response_callback=None ):
+  def GetResponseAsync( self,
+                        request_id,
+                        message,
+                        response_callback=None,
+                        superseding_document=None ):
     """Issue a request to the server and return immediately. If a response needs
     to be handled, supply a method taking ( response, message ) in
     response_callback. Note |response| is the instance of Response and message
     is the message received from the server.
+
+    If |superseding_document| is supplied, the request supersedes the pending
+    request with the same method for that document, e.g. the previous hover
+    request for a file. The superseded request is cancelled.
+
     Returns the Response instance created."""
-    response = Response( response_callback )
+    response = Response( response_callback, lsp.RequestMethod( message ) )
+    superseded_id = None
 
     with self._response_mutex:
       assert request_id not in self._responses
       self._responses[ request_id ] = response
+      if superseding_document is not None:
+        response.superseding_key = ( response.method, superseding_document )
+        superseded_id = self._superseding_requests.get(
+          response.superseding_key )
+        self._superseding_requests[ response.superseding_key ] = request_id
+
+    if superseded_id is not None:
+      self.CancelRequest( superseded_id, superseded = True )
 
     LOGGER.debug( 'TX: Sending message: %r', message )
 
@@ -435,11 +647,47 @@ class LanguageServerConnection( threading.Thread ):
     return response
 
 
-  def GetResponse( self, request_id, message, timeout ):
+  def GetResponse( self,
+                   request_id,
+                   message,
+                   timeout,
+                   superseding_document=None ):
     """Issue a request to the server and await the response. See
-    Response.AwaitResponse for return values and exceptions."""
-    response = self.GetResponseAsync( request_id, message )
-    return response.AwaitResponse( timeout )
+    Response.AwaitResponse for return values and exceptions, and
+    GetResponseAsync for |superseding_document|. The request is cancelled if it
+    times out."""
+    response = self.GetResponseAsync(
+      request_id,
+      message,
+      superseding_document = superseding_document )
+    try:
+      return response.AwaitResponse( timeout )
+    except ResponseTimeoutException:
+      self.CancelRequest( request_id )
+      raise
+
+
+  def CancelRequest( self, request_id, superseded=False ):
+    """Stop waiting for the response to the request |request_id| and ask the
+    server to cancel it. Anyone waiting for the response gets a
+    ResponseAbortedException, or a RequestSuperseded exception if |superseded|
+    is set. The response, if the server still sends one, is ignored."""
+    with self._response_mutex:
+      response = self._PopResponseNoLock( request_id )
+
+    if response is None:
+      # The response was already received.
+      return
+
+    if superseded:
+      response.Supersede()
+    else:
+      response.Abort()
+    LOGGER.debug( 'Cancelling request %s', request_id )
+    try:
+      self.SendNotification( lsp.CancelRequest( request_id ) )
+    except Exception:
+      LOGGER.exception( 'Unable to cancel request %s', request_id )
 
 
   def SendNotification( self, message ):
@@ -473,109 +721,109 @@ class LanguageServerConnection( threading.Thread ):
         'Timed out waiting for server to connect' )
 
 
+  def DecodeTimes( self ):
+    """Returns a dictionary mapping the methods of the messages received so far
+    to their count and the total and max time spent decoding them, in
+    milliseconds. Responses are counted under the method of their request."""
+    with self._decode_times_mutex:
+      return { method: { 'count': count,
+                         'total_ms': round( total * 1000, 3 ),
+                         'max_ms': round( maximum * 1000, 3 ) }
+               for method, ( count, total, maximum )
+               in self._decode_times.items() }
+
+
   def _ReadMessages( self ):
     """Main message pump. Within the message pump thread context, reads messages
-    from the socket/stream by calling self.ReadData in a loop and dispatch
+    from the socket/stream by calling self.ReadDataInto in a loop and dispatch
     complete messages by calling self._DispatchMessage.
 
+    Messages of at least lsp.LARGE_PAYLOAD_SIZE bytes are decoded and dispatched
+    by a separate thread, so that the messages behind them aren't delayed by
+    their decoding. Responses are dispatched as soon as they are decoded, but
+    notifications and server requests are still dispatched in the order they
+    were received: they wait in the decode thread queue while a message is
+    pending there.
+
     When the server is shut down cleanly, raises
     LanguageServerConnectionStopped"""
 
-    data = bytes( b'' )
-    while True:
-      data, read_bytes, headers = self._ReadHeaders( data )
-
-      if 'Content-Length' not in headers:
-        # FIXME: We could try and recover this, but actually the message pump
-        # just fails.
-        raise ValueError( "Missing 'Content-Length' header" )
-
-      content_length = int( headers[ 'Content-Length' ] )
-
-      # We need to read content_length bytes for the payload of this message.
-      # This may be in the remainder of `data`, but equally we may need to read
-      # more data from the socket.
-      content = bytes( b'' )
-      content_read = 0
-      if read_bytes < len( data ):
-        # There are bytes left in data, use them
-        data = data[ read_bytes: ]
-
-        # Read up to content_length bytes from data
-        content_to_read = min( content_length, len( data ) )
-        content += data[ : content_to_read ]
-        content_read += len( content )
-        read_bytes = content_to_read
-
-      while content_read < content_length:
-        # There is more content to read, but data is exhausted - read more from
-        # the socket
-        data = self.ReadData( content_length - content_read )
-        content_to_read = min( content_length - content_read, len( data ) )
-        content += data[ : content_to_read ]
-        content_read += len( content )
-        read_bytes = content_to_read
-
-      LOGGER.debug( 'RX: Received message: %r', content )
-
-      # lsp will convert content to Unicode
-      self._DispatchMessage( lsp.Parse( content ) )
-
-      # We only consumed len( content ) of data. If there is more, we start
-      # again with the remainder and look for headers
-      data = data[ read_bytes : ]
-
-
-  def _ReadHeaders( self, data ):
-    """Starting with the data in |data| read headers from the stream/socket
-    until a full set of headers has been consumed. Returns a tuple (
-      - data: any remaining unused data from |data| or the socket
-      - read_bytes: the number of bytes of returned data that have been consumed
-      - headers: a dictionary whose keys are the header names and whose values
-                 are the header values
-    )"""
-    # LSP defines only 2 headers, of which only 1 is useful (Content-Length).
-    # Headers end with an empty line, and there is no guarantee that a single
-    # socket or stream read will contain only a single message, or even a whole
-    # message.
+    utils.StartThread( self._DecodeMessages )
+    try:
+      reader = MessageReader( self.ReadDataInto )
+      while True:
+        with reader.ReadMessage() as content:
+          if len( content ) >= lsp.LARGE_PAYLOAD_SIZE:
+            # The content is a view of a buffer reused for the next message.
+            self._QueueMessage( bytes( content ), None )
+            continue
+
+          # lsp will convert content to Unicode
+          message = self._DecodeMessage( content )
+
+        LOGGER.debug( 'RX: Received message: %r', message )
+        if _IsResponse( message ) or not self._QueueMessageIfPending( message ):
+          self._DispatchMessage( message )
+    finally:
+      self._decode_queue.put( None )
 
-    headers_complete = False
-    prefix = bytes( b'' )
-    headers = {}
 
-    while not headers_complete:
-      read_bytes = 0
-      last_line = 0
-      if len( data ) == 0:
-        data = self.ReadData()
-
-      while read_bytes < len( data ):
-        if utils.ToUnicode( data[ read_bytes: ] )[ 0 ] == '\n':
-          line = prefix + data[ last_line : read_bytes ].strip()
-          prefix = bytes( b'' )
-          last_line = read_bytes
-
-          if not line.strip():
-            headers_complete = True
-            read_bytes += 1
-            break
-          else:
-            try:
-              key, value = utils.ToUnicode( line ).split( ':', 1 )
-              headers[ key.strip() ] = value.strip()
-            except Exception:
-              LOGGER.exception( 'Received invalid protocol data from server: '
-                                 + str( line ) )
-              raise
+  def _QueueMessage( self, content, message ):
+    with self._pending_decodes_mutex:
+      self._pending_decodes += 1
+    self._decode_queue.put( ( content, message ) )
+
+
+  def _QueueMessageIfPending( self, message ):
+    """Queues the decoded |message| behind the messages waiting for the decode
+    thread, if any. Returns whether it was queued."""
+    with self._pending_decodes_mutex:
+      if not self._pending_decodes:
+        return False
+      self._pending_decodes += 1
+    self._decode_queue.put( ( None, message ) )
+    return True
+
+
+  def _DecodeMessages( self ):
+    """Decode thread. Decodes (unless already decoded) and dispatches the queued
+    messages in order until None is queued."""
+    while True:
+      item = self._decode_queue.get()
+      if item is None:
+        return
 
-        read_bytes += 1
+      content, message = item
+      try:
+        if message is None:
+          message = self._DecodeMessage( content )
+          LOGGER.debug( 'RX: Received message: %r', message )
+        self._DispatchMessage( message )
+      except Exception:
+        LOGGER.exception( 'Failed to handle a message in the decode thread' )
+      finally:
+        with self._pending_decodes_mutex:
+          self._pending_decodes -= 1
 
-      if not headers_complete:
-        prefix = data[ last_line : ]
-        data = bytes( b'' )
 
+  def _DecodeMessage( self, content ):
+    start_time = time.perf_counter()
+    message = lsp.Parse( content )
+    decode_time = time.perf_counter() - start_time
 
-    return data, read_bytes, headers
+    method = message.get( 'method' )
+    if method is None:
+      with self._response_mutex:
+        response = self._responses.get( message.get( 'id' ) )
+      method = response.method if response else None
+    method = method or UNKNOWN_METHOD
+
+    with self._decode_times_mutex:
+      count, total, maximum = self._decode_times.get( method, ( 0, 0.0, 0.0 ) )
+      self._decode_times[ method ] = ( count + 1,
+                                       total + decode_time,
+                                       max( maximum, decode_time ) )
+    return message
 
 
   def _HandleDynamicRegistrations( self, request ):
@@ -648,9 +896,13 @@ class LanguageServerConnection( threading.Thread ):
       else:
         # This is a response to the message with id message[ 'id' ]
         with self._response_mutex:
-          assert message_id in self._responses
-          self._responses[ message_id ].ResponseReceived( message )
-          del self._responses[ message_id ]
+          response = self._PopResponseNoLock( message_id )
+          if response is None:
+            # The request was cancelled.
+            LOGGER.debug( 'Ignoring response to cancelled request %s',
+                          message_id )
+            return
+          response.ResponseReceived( message )
     else:
       # This is a notification
       self._AddNotificationToQueue( message )
@@ -665,25 +917,17 @@ class LanguageServerConnection( threading.Thread ):
                             message )
 
 
-  def _AddNotificationToQueue( self, message ):
-    while True:
-      try:
-        self._notifications.put_nowait( message )
-        return
-      except queue.Full:
-        pass
+  def _PopResponseNoLock( self, request_id ):
+    response = self._responses.pop( request_id, None )
+    if ( response is not None and
+         self._superseding_requests.get( response.superseding_key ) ==
+           request_id ):
+      del self._superseding_requests[ response.superseding_key ]
+    return response
 
-      # The queue (ring buffer) is full.  This indicates either a slow
-      # consumer or the message poll is not running. In any case, rather than
-      # infinitely queueing, discard the oldest message and try again.
-      try:
-        self._notifications.get_nowait()
-      except queue.Empty:
-        # This is only a theoretical possibility to prevent this thread
-        # blocking in the unlikely event that all elements are removed from
-        # the queue between put_nowait and get_nowait. Unfortunately, this
-        # isn't testable without a debugger, so coverage will show up red.
-        pass # pragma: no cover
+
+  def _AddNotificationToQueue( self, message ):
+    self._notifications.Put( message )
 
 
 class StandardIOLanguageServerConnection( LanguageServerConnection ):
@@ -752,16 +996,37 @@ class StandardIOLanguageServerConnection( LanguageServerConnection ):
           data = self._server_stdout.readline()
 
     if not data:
-      # No data means the connection was severed. Connection severed when (not
-      # self.IsStopped()) means the server died unexpectedly.
-      if self.IsStopped():
-        raise LanguageServerConnectionStopped()
-
-      raise RuntimeError( "Connection to server died" )
+      self._ConnectionSevered()
 
     return data
 
 
+  def ReadDataInto( self, buffer ):
+    size = 0
+    with self._stdout_lock:
+      if not self._server_stdout.closed:
+        # Only read what is available, rather than blocking until the buffer is
+        # full.
+        readinto = getattr( self._server_stdout,
+                            'readinto1',
+                            self._server_stdout.readinto )
+        size = readinto( buffer )
+
+    if not size:
+      self._ConnectionSevered()
+
+    return size
+
+
+  def _ConnectionSevered( self ):
+    # No data means the connection was severed. Connection severed when (not
+    # self.IsStopped()) means the server died unexpectedly.
+    if self.IsStopped():
+      raise LanguageServerConnectionStopped()
+
+    raise RuntimeError( "Connection to server died" )
+
+
 class TCPSingleStreamConnection( LanguageServerConnection ):
   # Connection timeout in seconds
   TCP_CONNECT_TIMEOUT = 10
@@ -861,6 +1126,25 @@ class TCPSingleStreamConnection( LanguageServerConnection ):
     return b''.join( chunks )
 
 
+  def ReadDataInto( self, buffer ):
+    assert self._connection_event.is_set()
+    assert self._client_socket
+
+    try:
+      size = self._client_socket.recv_into( buffer )
+    except OSError:
+      size = 0
+
+    if not size:
+      # The socket was closed
+      if self.IsStopped():
+        raise LanguageServerConnectionStopped()
+
+      raise RuntimeError( 'Socket closed unexpectedly when reading' )
+
+    return size
+
+
 class LanguageServerCompleter( Completer ):
   """
   Abstract completer implementation for Language Server Protocol. Concrete
@@ -1286,12 +1570,29 @@ class LanguageServerCompleter( Completer ):
 
     self._UpdateServerWithCurrentFileContents( request_data )
 
-    request_id = self.GetConnection().NextRequestId()
+    connection = self.GetConnection()
+    request_id = connection.NextRequestId()
 
     msg = lsp.Completion( request_id, request_data, codepoint )
-    response = self.GetConnection().GetResponse( request_id,
-                                                 msg,
-                                                 REQUEST_TIMEOUT_COMPLETION )
+    response = connection.GetResponseAsync( request_id, msg )
+
+    # When a newer completion request is made for this buffer, the server is
+    # asked to cancel this one and its response is discarded.
+    token = request_data.get( 'cancellation_token' )
+    unregister = ( token.OnCancel(
+                     lambda: connection.CancelRequest( request_id ) )
+                   if token else lambda: None )
+    try:
+      response = response.AwaitResponse( REQUEST_TIMEOUT_COMPLETION )
+    except ResponseTimeoutException:
+      connection.CancelRequest( request_id )
+      raise
+    except ResponseAbortedException:
+      RaiseIfCancelled( request_data )
+      raise
+    finally:
+      unregister()
+
     result = response.get( 'result' ) or []
 
     if isinstance( result, list ):
@@ -1325,8 +1626,9 @@ class LanguageServerCompleter( Completer ):
       return cache_completions
 
     codepoint = self.GetCodepointForCompletionRequest( request_data )
-    raw_completions, is_incomplete = self.ComputeCandidatesInner( request_data,
-                                                                  codepoint )
+    with self.TimePhase( 'ComputeCandidatesInner' ):
+      raw_completions, is_incomplete = self.ComputeCandidatesInner(
+        request_data, codepoint )
     self._completions_cache.Update( request_data,
                                     raw_completions,
                                     is_incomplete )
@@ -1515,9 +1817,11 @@ class LanguageServerCompleter( Completer ):
 
     request_id = self.GetConnection().NextRequestId()
     msg = lsp.SignatureHelp( request_id, request_data )
-    response = self.GetConnection().GetResponse( request_id,
-                                                 msg,
-                                                 REQUEST_TIMEOUT_COMPLETION )
+    response = self.GetConnection().GetResponse(
+      request_id,
+      msg,
+      REQUEST_TIMEOUT_COMPLETION,
+      superseding_document = request_data[ 'filepath' ] )
 
     result = response[ 'result' ]
     if result is None:
@@ -1566,7 +1870,8 @@ class LanguageServerCompleter( Completer ):
       response = self._connection.GetResponse(
         request_id,
         body,
-        3 * REQUEST_TIMEOUT_COMPLETION )
+        3 * REQUEST_TIMEOUT_COMPLETION,
+        superseding_document = request_data[ 'filepath' ] )
 
     if response is None:
       return {}
@@ -1603,7 +1908,8 @@ class LanguageServerCompleter( Completer ):
       response = self._connection.GetResponse(
         request_id,
         body,
-        3 * REQUEST_TIMEOUT_COMPLETION )
+        3 * REQUEST_TIMEOUT_COMPLETION,
+        superseding_document = request_data[ 'filepath' ] )
 
     if response is None:
       return []
@@ -1954,7 +2260,7 @@ class LanguageServerCompleter( Completer ):
           # The server isn't running or something. Don't re-poll.
           return False
 
-        notification = self.GetConnection()._notifications.get_nowait()
+        notification = self.GetConnection()._notifications.GetNowait()
         message = self.ConvertNotificationToMessage( request_data,
                                                      notification )
 
@@ -1993,7 +2299,7 @@ class LanguageServerCompleter( Completer ):
           # just cause errors.
           return False
 
-        notification = self.GetConnection()._notifications.get(
+        notification = self.GetConnection()._notifications.Get(
           timeout = timeout )
         message = self.ConvertNotificationToMessage( request_data,
                                                      notification )
@@ -2118,6 +2424,7 @@ class LanguageServerCompleter( Completer ):
   def _RefreshFileContentsUnderLock( self, file_name, contents, file_types ):
     file_state: lsp.ServerFileState = self._server_file_state[ file_name ]
     old_state = file_state.state
+    previous_contents = file_state.contents
     action = file_state.GetDirtyFileAction( contents )
 
     LOGGER.debug( 'Refreshing file %s: State is %s -> %s/action %s',
@@ -2131,13 +2438,19 @@ class LanguageServerCompleter( Completer ):
 
       self.GetConnection().SendNotification( msg )
     elif action == lsp.ServerFileState.CHANGE_FILE:
-      # FIXME: DidChangeTextDocument doesn't actually do anything
-      # different from DidOpenTextDocument other than send the right
-      # message, because we don't actually have a mechanism for generating
-      # the diffs. This isn't strictly necessary, but might lead to
-      # performance problems.
-      msg = lsp.DidChangeTextDocument( file_state, contents )
-      self.GetConnection().SendNotification( msg )
+      self._SendDidChangeUnderLock( file_state, previous_contents )
+
+
+  def _SendDidChangeUnderLock( self, file_state, previous_contents ):
+    """Sends the new contents of |file_state| to the server. Servers supporting
+    incremental sync are only sent the range that changed since
+    |previous_contents|."""
+    if self._sync_type != 'Incremental':
+      previous_contents = None
+    msg = lsp.DidChangeTextDocument( file_state,
+                                     file_state.contents,
+                                     previous_contents )
+    self.GetConnection().SendNotification( msg )
 
 
   def _UpdateDirtyFilesUnderLock( self, request_data ):
@@ -2189,10 +2502,10 @@ class LanguageServerCompleter( Completer ):
         files_to_purge.append( file_name )
         continue
 
+      previous_contents = file_state.contents
       action = file_state.GetSavedFileAction( contents )
       if action == lsp.ServerFileState.CHANGE_FILE:
-        msg = lsp.DidChangeTextDocument( file_state, contents )
-        self.GetConnection().SendNotification( msg )
+        self._SendDidChangeUnderLock( file_state, previous_contents )
 
     return files_to_purge
 
@@ -2491,7 +2804,8 @@ class LanguageServerCompleter( Completer ):
     response = self.GetConnection().GetResponse(
       request_id,
       lsp.Hover( request_id, request_data ),
-      REQUEST_TIMEOUT_COMMAND )
+      REQUEST_TIMEOUT_COMMAND,
+      superseding_document = request_data[ 'filepath' ] )
 
     result = response[ 'result' ]
     if result:
@@ -2897,6 +3211,7 @@ class LanguageServerCompleter( Completer ):
 
       return 'Initialized'
 
+    connection = self.GetConnection()
     return [ responses.DebugInfoItem( 'Server State',
                                       ServerStateDescription() ),
              responses.DebugInfoItem( 'Project Directory',
@@ -2904,10 +3219,28 @@ class LanguageServerCompleter( Completer ):
              responses.DebugInfoItem(
                'Settings',
                json.dumps( self._settings.get( 'ls', {} ),
+                           indent = 2,
+                           sort_keys = True ) ),
+             responses.DebugInfoItem(
+               'Decode Times',
+               json.dumps( connection.DecodeTimes() if connection else {},
                            indent = 2,
                            sort_keys = True ) ) ]
 
 
+def _IsResponse( message ):
+  return 'id' in message and 'method' not in message
+
+
+def _CoalescingKey( notification ):
+  """Returns the key under which |notification| replaces the previous queued
+  notification with the same key, or None if it must not replace any."""
+  if notification.get( 'method' ) == 'textDocument/publishDiagnostics':
+    return ( 'textDocument/publishDiagnostics',
+             notification.get( 'params', {} ).get( 'uri' ) )
+  return None
+
+
 def _DistanceOfPointToRange( point, range ):
   """Calculate the distance from a point to a range.
 
@@ -3383,44 +3716,35 @@ def WorkspaceEditToFixIt( request_data,
 
 
 class LanguageServerCompletionsCache( CompletionsCache ):
-  """Cache of computed LSP completions for a particular request."""
-
-  def Invalidate( self ):
-    with self._access_lock:
-      super().InvalidateNoLock()
-      self._is_incomplete = False
-      self._use_start_column = True
-
+  """Cache of computed LSP completions for the last requests. Whether the
+  completions are incomplete, and the column to request them at, is tracked
+  separately for each position."""
 
   def Update( self, request_data, completions, is_incomplete ):
     with self._access_lock:
-      super().UpdateNoLock( request_data, completions )
-      self._is_incomplete = is_incomplete
-      if is_incomplete:
-        self._use_start_column = False
+      previous = self.GetEntryNoLock( request_data )
+      use_start_column = ( not is_incomplete and
+                           ( previous is None or previous.use_start_column ) )
+      entry = super().UpdateNoLock( request_data, completions )
+      entry.is_incomplete = is_incomplete
+      entry.use_start_column = use_start_column
 
 
   def GetCodepointForCompletionRequest( self, request_data ):
     with self._access_lock:
-      if self._use_start_column:
+      entry = self.GetEntryNoLock( request_data )
+      if entry is None or entry.use_start_column:
         return request_data[ 'start_codepoint' ]
       return request_data[ 'column_codepoint' ]
 
 
-  # Must be called under the lock.
-  def _IsQueryPrefix( self, request_data ):
-    return request_data[ 'query' ].startswith( self._request_data[ 'query' ] )
-
-
-  def GetCompletionsIfCacheValid( self,
-                                  request_data,
-                                  **kwargs ):
-    with self._access_lock:
-      if ( ( not self._is_incomplete
-             or kwargs.get( 'ignore_incomplete' ) ) and
-           ( self._use_start_column or self._IsQueryPrefix( request_data ) ) ):
-        return super().GetCompletionsIfCacheValidNoLock( request_data )
-      return None
+  def IsEntryValidNoLock( self, entry, request_data, **kwargs ):
+    return ( ( not entry.is_incomplete or
+               kwargs.get( 'ignore_incomplete' ) ) and
+             ( entry.use_start_column or
+               request_data[ 'query' ].startswith(
+                 entry.request_data[ 'query' ] ) ) and
+             super().IsEntryValidNoLock( entry, request_data ) )
 
 
 class RejectCollector:
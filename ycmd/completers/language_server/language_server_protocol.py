@@ -19,15 +19,28 @@ import collections
 import os
 import json
 import hashlib
+import re
 from urllib.parse import urljoin, urlparse, unquote
 from urllib.request import pathname2url, url2pathname
 
 from ycmd.utils import ( ByteOffsetToCodepointOffset,
+                         CommonPrefixLength,
+                         CommonSuffixLength,
                          ToBytes,
                          ToUnicode,
                          UpdateDict )
 
 
+# Payloads from that size are decoded in a way that doesn't hold the GIL for the
+# whole decoding. See Parse.
+LARGE_PAYLOAD_SIZE = 1 << 20
+
+# The keys of the messages we build are sorted, so the method of a request comes
+# right after its id and JSON RPC version.
+REQUEST_METHOD_REGEX = re.compile( rb'"method":"([^"]*)"' )
+REQUEST_METHOD_MAX_OFFSET = 256
+
+
 Error = collections.namedtuple( 'RequestError', [ 'code', 'reason' ] )
 
 
@@ -418,6 +431,10 @@ def Exit():
   return BuildNotification( 'exit', None )
 
 
+def CancelRequest( request_id ):
+  return BuildNotification( '$/cancelRequest', { 'id': request_id } )
+
+
 def Void( request ):
   return Accept( request, None )
 
@@ -473,18 +490,76 @@ def DidOpenTextDocument( file_state, file_types, file_contents ):
   } )
 
 
-def DidChangeTextDocument( file_state, file_contents ):
+def DidChangeTextDocument( file_state,
+                           file_contents,
+                           previous_contents = None ):
+  """Notifies the server that the contents of the file are now |file_contents|.
+  If the server supports incremental sync, |previous_contents| should be the
+  contents it knew of, so that only the range that changed is sent."""
+  if previous_contents is None:
+    content_changes = [ { 'text': file_contents } ]
+  else:
+    content_changes = ContentChanges( previous_contents, file_contents )
+
   return BuildNotification( 'textDocument/didChange', {
     'textDocument': {
       'uri': FilePathToUri( file_state.filename ),
       'version': file_state.version,
     },
-    'contentChanges': [
-      { 'text': file_contents },
-    ]
+    'contentChanges': content_changes
   } )
 
 
+def ContentChanges( previous_contents, contents ):
+  """Returns the list of TextDocumentContentChangeEvent turning
+  |previous_contents| into |contents|: a single edit replacing the range between
+  their common prefix and suffix. The whole contents are sent instead if either
+  one contains a lone carriage return, since ycmd and the server would not agree
+  on the lines."""
+  if _HasLoneCarriageReturn( previous_contents ) or _HasLoneCarriageReturn(
+      contents ):
+    return [ { 'text': contents } ]
+
+  start = CommonPrefixLength( previous_contents, contents )
+  # Don't split a \r\n line break.
+  if start > 0 and previous_contents[ start - 1 ] == '\r':
+    start -= 1
+  suffix = CommonSuffixLength(
+    previous_contents,
+    contents,
+    min( len( previous_contents ), len( contents ) ) - start )
+  end = len( previous_contents ) - suffix
+  if suffix > 0 and end > 0 and previous_contents[ end - 1 ] == '\r':
+    end += 1
+    suffix -= 1
+
+  if start == end and len( contents ) - suffix == start:
+    return []
+
+  return [ {
+    'range': {
+      'start': _PositionAtOffset( previous_contents, start ),
+      'end': _PositionAtOffset( previous_contents, end ),
+    },
+    'text': contents[ start : len( contents ) - suffix ]
+  } ]
+
+
+def _HasLoneCarriageReturn( contents ):
+  return contents.count( '\r' ) != contents.count( '\r\n' )
+
+
+def _PositionAtOffset( contents, offset ):
+  """Returns the LSP Position of the codepoint |offset| in |contents|, i.e.
+  the 0-based line number and 0-based UTF-16 offset on that line."""
+  line_start = contents.rfind( '\n', 0, offset ) + 1
+  return {
+    'line': contents.count( '\n', 0, offset ),
+    'character': len(
+      contents[ line_start : offset ].encode( 'utf-16-le' ) ) // 2
+  }
+
+
 def DidSaveTextDocument( file_state, file_contents ):
   params = {
     'textDocument': {
@@ -761,9 +836,26 @@ def _BuildMessageData( message ):
   return packet
 
 
+def RequestMethod( packet ):
+  """Returns the method of the request |packet| built by BuildRequest, or None
+  if it can't be found."""
+  match = REQUEST_METHOD_REGEX.search( packet, 0, REQUEST_METHOD_MAX_OFFSET )
+  return ToUnicode( match.group( 1 ) ) if match else None
+
+
+def _DecodedObject( obj ):
+  return obj
+
+
 def Parse( data ):
   """Reads the raw language server message payload into a Python dictionary"""
-  return json.loads( ToUnicode( data ) )
+  if len( data ) < LARGE_PAYLOAD_SIZE:
+    return json.loads( ToUnicode( data ) )
+
+  # The json module holds the GIL for the whole decoding, which takes about
+  # a second for a 20 MB response. Calling back into Python for every object
+  # lets the interpreter switch to other threads during the decoding.
+  return json.loads( ToUnicode( data ), object_hook = _DecodedObject )
 
 
 def CodepointsToUTF16CodeUnits( line_value, codepoint_offset ):
@@ -29,7 +29,7 @@ from tempfile import NamedTemporaryFile
 from ycmd import extra_conf_store
 from ycmd import responses
 from ycmd import utils
-from ycmd.completers.completer import Completer
+from ycmd.completers.completer import Completer, DiagnosticsQueue
 from ycmd.completers.completer_utils import GetFileLines, GetFileContents
 from ycmd.utils import LOGGER, re
 
@@ -141,6 +141,9 @@ class TypeScriptCompleter( Completer ):
 
     self._logfile = None
 
+    # Diagnostics of the files parsed in the background.
+    self._diagnostics_queue = DiagnosticsQueue()
+
     self._tsserver_lock = threading.Lock()
     self._tsserver_handle = None
     self._tsserver_version = None
@@ -568,6 +571,22 @@ class TypeScriptCompleter( Completer ):
                                               self.max_diagnostics_to_display )
 
 
+  def OnAsynchronousFileReadyToParse( self, request_data ):
+    self._diagnostics_queue.Enable()
+
+
+  def PublishDiagnostics( self, request_data, diagnostics ):
+    self._diagnostics_queue.Put( request_data[ 'filepath' ], diagnostics )
+
+
+  def PublishError( self, request_data, error ):
+    self._diagnostics_queue.PutError( request_data[ 'filepath' ], error )
+
+
+  def PollForMessagesInner( self, request_data, timeout ):
+    return self._diagnostics_queue.Poll( timeout )
+
+
   def GetTsDiagnosticsForCurrentFile( self, request_data ):
     # This returns the data the TypeScript server responded with.
     # Note that its "offset" values represent codepoint offsets,
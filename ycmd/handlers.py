@@ -24,7 +24,12 @@ import traceback
 from bottle import request
 
 
-from ycmd import extra_conf_store, hmac_plugin, server_state, user_options_store
+from ycmd import ( extra_conf_store, hmac_plugin, metrics, server_state,
+                   user_options_store )
+from ycmd.buffer_store import BufferStore
+from ycmd.candidate_store import CandidateStore
+from ycmd.parse_queue import ParseQueue
+from ycmd.request_cancellation import RequestGenerations, RequestSuperseded
 from ycmd.responses import ( BuildExceptionResponse,
                              BuildCompletionResponse,
                              BuildResolveCompletionResponse,
@@ -32,6 +37,7 @@ from ycmd.responses import ( BuildExceptionResponse,
                              BuildSignatureHelpAvailableResponse,
                              BuildSemanticTokensResponse,
                              BuildInlayHintsResponse,
+                             BuildSupersededResponse,
                              SignatureHelpAvailalability,
                              UnknownExtraConf )
 from ycmd.request_wrap import RequestWrap
@@ -45,6 +51,11 @@ ycm_core = ImportCore()
 bottle.Request.MEMFILE_MAX = 10 * 1024 * 1024
 
 _server_state = None
+_buffer_store = BufferStore()
+_candidate_store = CandidateStore()
+_request_generations = RequestGenerations()
+_parse_queue = ParseQueue( lambda request_data: _ParseFile( request_data ) )
+_request_recorder = None
 _hmac_secret = bytes()
 app = bottle.Bottle()
 wsgi_server = None
@@ -52,18 +63,27 @@ wsgi_server = None
 
 @app.post( '/event_notification' )
 def EventNotification():
-  request_data = RequestWrap( request.json )
+  request_data = RequestWrap( _RequestJson() )
   event_name = request_data[ 'event_name' ]
   LOGGER.debug( 'Event name: %s', event_name )
 
-  event_handler = 'On' + event_name
-  getattr( _server_state.GetGeneralCompleter(), event_handler )( request_data )
+  if event_name == 'BufferUnload':
+    _buffer_store.Remove( request_data[ 'filepath' ] )
+    _request_generations.Remove( request_data )
+    _parse_queue.Remove( request_data[ 'filepath' ] )
 
-  filetypes = request_data[ 'filetypes' ]
-  response_data = None
-  if _server_state.FiletypeCompletionUsable( filetypes ):
-    response_data = getattr( _server_state.GetFiletypeCompleter( filetypes ),
-                             event_handler )( request_data )
+  if ( event_name == 'FileReadyToParse' and
+       request_data.get( 'asynchronous', False ) ):
+    # The file is parsed in the background and the diagnostics are returned
+    # through /receive_messages.
+    filetypes = request_data[ 'filetypes' ]
+    if _server_state.FiletypeCompletionUsable( filetypes, silent = True ):
+      _server_state.GetFiletypeCompleter(
+        filetypes ).OnAsynchronousFileReadyToParse( request_data )
+    _parse_queue.Put( request_data )
+    return _JsonResponse( {} )
+
+  response_data = _HandleEvent( event_name, request_data )
 
   if response_data:
     return _JsonResponse( response_data )
@@ -87,17 +107,21 @@ def GetSignatureHelpAvailable():
 
 @app.post( '/run_completer_command' )
 def RunCompleterCommand():
-  request_data = RequestWrap( request.json )
+  request_data = RequestWrap( _RequestJson() )
   completer = _GetCompleterForRequestData( request_data )
 
-  return _JsonResponse( completer.OnUserCommand(
-      request_data[ 'command_arguments' ],
-      request_data ) )
+  try:
+    return _JsonResponse( completer.OnUserCommand(
+        request_data[ 'command_arguments' ],
+        request_data ) )
+  except RequestSuperseded:
+    LOGGER.debug( 'Subcommand superseded' )
+    return _JsonResponse( BuildSupersededResponse() )
 
 
 @app.post( '/resolve_fixit' )
 def ResolveFixit():
-  request_data = RequestWrap( request.json )
+  request_data = RequestWrap( _RequestJson() )
   completer = _GetCompleterForRequestData( request_data )
 
   return _JsonResponse( completer.ResolveFixit( request_data ) )
@@ -105,7 +129,22 @@ def ResolveFixit():
 
 @app.post( '/completions' )
 def GetCompletions():
-  request_data = RequestWrap( request.json )
+  request_data = RequestWrap( _RequestJson() )
+  cancellation_token = _request_generations.Start( request_data )
+  request_data[ 'cancellation_token' ] = cancellation_token
+  try:
+    return _GetCompletions( request_data )
+  except RequestSuperseded:
+    LOGGER.debug( 'Completion request superseded' )
+    return _JsonResponse(
+        BuildCompletionResponse( [],
+                                 request_data[ 'start_column' ],
+                                 superseded = True ) )
+  finally:
+    _request_generations.Finish( request_data, cancellation_token )
+
+
+def _GetCompletions( request_data ):
   do_filetype_completion = _server_state.ShouldUseFiletypeCompleter(
     request_data )
   LOGGER.debug( 'Using filetype completion: %s', do_filetype_completion )
@@ -118,6 +157,8 @@ def GetCompletions():
       filetype_completer = _server_state.GetFiletypeCompleter(
         request_data[ 'filetypes' ] )
       completions = filetype_completer.ComputeCandidates( request_data )
+    except RequestSuperseded:
+      raise
     except Exception as exception:
       if request_data[ 'force_semantic' ]:
         # user explicitly asked for semantic completion, so just pass the error
@@ -142,7 +183,7 @@ def GetCompletions():
 
 @app.post( '/resolve_completion' )
 def ResolveCompletionItem():
-  request_data = RequestWrap( request.json )
+  request_data = RequestWrap( _RequestJson() )
   completer = _GetCompleterForRequestData( request_data )
 
   errors = None
@@ -157,7 +198,7 @@ def ResolveCompletionItem():
 
 @app.post( '/signature_help' )
 def GetSignatureHelp():
-  request_data = RequestWrap( request.json )
+  request_data = RequestWrap( _RequestJson() )
 
   if not _server_state.FiletypeCompletionUsable( request_data[ 'filetypes' ],
                                                  silent = True ):
@@ -170,6 +211,10 @@ def GetSignatureHelp():
     filetype_completer = _server_state.GetFiletypeCompleter(
       request_data[ 'filetypes' ] )
     signature_info = filetype_completer.ComputeSignatures( request_data )
+  except RequestSuperseded:
+    LOGGER.debug( 'Signature help request superseded' )
+    return _JsonResponse( BuildSignatureHelpResponse( None,
+                                                      superseded = True ) )
   except Exception as exception:
     LOGGER.exception( 'Exception from semantic completer during sig help' )
     errors = [ BuildExceptionResponse( exception, traceback.format_exc() ) ]
@@ -183,7 +228,7 @@ def GetSignatureHelp():
 @app.post( '/semantic_tokens' )
 def GetSemanticTokens():
   LOGGER.info( 'Received semantic tokens request' )
-  request_data = RequestWrap( request.json )
+  request_data = RequestWrap( _RequestJson() )
 
   if not _server_state.FiletypeCompletionUsable( request_data[ 'filetypes' ],
                                                  silent = True ):
@@ -196,6 +241,10 @@ def GetSemanticTokens():
     filetype_completer = _server_state.GetFiletypeCompleter(
       request_data[ 'filetypes' ] )
     semantic_tokens = filetype_completer.ComputeSemanticTokens( request_data )
+  except RequestSuperseded:
+    LOGGER.debug( 'Semantic tokens request superseded' )
+    return _JsonResponse( BuildSemanticTokensResponse( None,
+                                                       superseded = True ) )
   except Exception as exception:
     LOGGER.exception(
       'Exception from semantic completer during tokens request' )
@@ -210,7 +259,7 @@ def GetSemanticTokens():
 @app.post( '/inlay_hints' )
 def GetInlayHints():
   LOGGER.info( 'Received inlay hints request' )
-  request_data = RequestWrap( request.json )
+  request_data = RequestWrap( _RequestJson() )
 
   if not _server_state.FiletypeCompletionUsable( request_data[ 'filetypes' ],
                                                  silent = True ):
@@ -223,6 +272,9 @@ def GetInlayHints():
     filetype_completer = _server_state.GetFiletypeCompleter(
       request_data[ 'filetypes' ] )
     inlay_hints = filetype_completer.ComputeInlayHints( request_data )
+  except RequestSuperseded:
+    LOGGER.debug( 'Inlay hints request superseded' )
+    return _JsonResponse( BuildInlayHintsResponse( None, superseded = True ) )
   except Exception as exception:
     LOGGER.exception(
       'Exception from semantic completer during tokens request' )
@@ -239,12 +291,28 @@ def FilterAndSortCandidates():
   # Not using RequestWrap because no need and the requests coming in aren't like
   # the usual requests we handle.
   request_data = request.json
+  max_num_candidates = _server_state.user_options[ 'max_num_candidates' ]
+
+  if 'candidates_handle' in request_data:
+    candidate_list = _candidate_store.Get( request_data[ 'candidates_handle' ] )
+    return _JsonResponse( candidate_list.FilterAndSort(
+      request_data[ 'query' ], max_num_candidates ) )
 
   return _JsonResponse( FilterAndSortCandidatesWrap(
     request_data[ 'candidates' ],
     request_data[ 'sort_property' ],
     request_data[ 'query' ],
-    _server_state.user_options[ 'max_num_candidates' ] ) )
+    max_num_candidates ) )
+
+
+@app.post( '/register_candidates' )
+def RegisterCandidates():
+  request_data = request.json
+  ttl = _server_state.user_options[ 'candidates_handle_ttl' ]
+  handle = _candidate_store.Register( request_data[ 'candidates' ],
+                                      request_data[ 'sort_property' ],
+                                      ttl )
+  return _JsonResponse( { 'candidates_handle': handle, 'ttl': ttl } )
 
 
 @app.get( '/healthy' )
@@ -268,19 +336,19 @@ def GetReady():
 @app.post( '/semantic_completion_available' )
 def FiletypeCompletionAvailable():
   return _JsonResponse( _server_state.FiletypeCompletionAvailable(
-      RequestWrap( request.json )[ 'filetypes' ] ) )
+      RequestWrap( _RequestJson() )[ 'filetypes' ] ) )
 
 
 @app.post( '/defined_subcommands' )
 def DefinedSubcommands():
-  completer = _GetCompleterForRequestData( RequestWrap( request.json ) )
+  completer = _GetCompleterForRequestData( RequestWrap( _RequestJson() ) )
 
   return _JsonResponse( completer.DefinedSubcommands() )
 
 
 @app.post( '/detailed_diagnostic' )
 def GetDetailedDiagnostic():
-  request_data = RequestWrap( request.json )
+  request_data = RequestWrap( _RequestJson() )
   completer = _GetCompleterForRequestData( request_data )
 
   return _JsonResponse( completer.GetDetailedDiagnostic( request_data ) )
@@ -288,7 +356,7 @@ def GetDetailedDiagnostic():
 
 @app.post( '/load_extra_conf_file' )
 def LoadExtraConfFile():
-  request_data = RequestWrap( request.json, validate = False )
+  request_data = RequestWrap( _RequestJson(), validate = False )
   extra_conf_store.Load( request_data[ 'filepath' ], force = True )
 
   return _JsonResponse( True )
@@ -296,7 +364,7 @@ def LoadExtraConfFile():
 
 @app.post( '/ignore_extra_conf_file' )
 def IgnoreExtraConfFile():
-  request_data = RequestWrap( request.json, validate = False )
+  request_data = RequestWrap( _RequestJson(), validate = False )
   extra_conf_store.Disable( request_data[ 'filepath' ] )
 
   return _JsonResponse( True )
@@ -304,7 +372,7 @@ def IgnoreExtraConfFile():
 
 @app.post( '/debug_info' )
 def DebugInfo():
-  request_data = RequestWrap( request.json )
+  request_data = RequestWrap( _RequestJson() )
 
   has_clang_support = ycm_core.HasClangSupport()
   clang_version = ycm_core.ClangVersion() if has_clang_support else None
@@ -330,7 +398,12 @@ def DebugInfo():
       'path': extra_conf_path,
       'is_loaded': is_loaded
     },
-    'completer': None
+    'candidate_repository': {
+      'size': ycm_core.NumStoredCandidates(),
+      'reclaimed': ycm_core.NumReclaimedCandidates()
+    },
+    'completer': None,
+    'metrics': metrics.Summary()
   }
 
   try:
@@ -342,6 +415,12 @@ def DebugInfo():
   return _JsonResponse( response )
 
 
+@app.get( '/metrics' )
+def Metrics():
+  bottle.response.set_header( 'Content-Type', metrics.CONTENT_TYPE )
+  return metrics.ExpositionText()
+
+
 @app.post( '/shutdown' )
 def Shutdown():
   ServerShutdown()
@@ -354,7 +433,7 @@ def ReceiveMessages():
   # The client makes the request with a long timeout (1 hour).
   # When we have data to send, we send it and close the socket.
   # The client then sends a new request.
-  request_data = RequestWrap( request.json )
+  request_data = RequestWrap( _RequestJson() )
   try:
     completer = _GetCompleterForRequestData( request_data )
   except Exception:
@@ -379,9 +458,48 @@ app.default_error_handler = ErrorHandler
 
 def _JsonResponse( data ):
   bottle.response.set_header( 'Content-Type', 'application/json' )
-  return json.dumps( data,
-                     separators = ( ',', ':' ),
-                     default = _UniversalSerialize )
+  route = request.environ.get( 'bottle.route' )
+  with metrics.Timer( metrics.JSON_SERIALIZATION_DURATION,
+                      route = route.rule if route else '' ):
+    return json.dumps( data,
+                       separators = ( ',', ':' ),
+                       default = _UniversalSerialize )
+
+
+def _HandleEvent( event_name, request_data ):
+  event_handler = 'On' + event_name
+  getattr( _server_state.GetGeneralCompleter(), event_handler )( request_data )
+
+  filetypes = request_data[ 'filetypes' ]
+  if _server_state.FiletypeCompletionUsable( filetypes ):
+    return getattr( _server_state.GetFiletypeCompleter( filetypes ),
+                    event_handler )( request_data )
+  return None
+
+
+def _ParseFile( request_data ):
+  filetypes = request_data[ 'filetypes' ]
+  try:
+    diagnostics = _HandleEvent( 'FileReadyToParse', request_data )
+  except Exception as exception:
+    # Return the error through /receive_messages, as it would have been returned
+    # in the response to a synchronous event.
+    if _server_state.FiletypeCompletionUsable( filetypes, silent = True ):
+      _server_state.GetFiletypeCompleter( filetypes ).PublishError(
+        request_data,
+        BuildExceptionResponse( exception, traceback.format_exc() ) )
+    raise
+
+  if diagnostics is not None:
+    completer = _server_state.GetFiletypeCompleter( filetypes )
+    completer.PublishDiagnostics( request_data, diagnostics )
+
+
+def _RequestJson():
+  # Restore the contents of the buffers sent as a list of changes.
+  request_json = request.json
+  _buffer_store.ResolveFileData( request_json )
+  return request_json
 
 
 def _UniversalSerialize( obj ):
@@ -418,6 +536,8 @@ def ServerCleanup():
   if _server_state:
     _server_state.Shutdown()
     extra_conf_store.Shutdown()
+  if _request_recorder:
+    _request_recorder.Close()
 
 
 def SetHmacSecret( hmac_secret ):
@@ -425,6 +545,17 @@ def SetHmacSecret( hmac_secret ):
   _hmac_secret = hmac_secret
 
 
+def SetRequestRecorder( recorder ):
+  """Installs |recorder|, a RequestRecorder, as a plugin of the app, replacing
+  the previous one. It must be called after the HMAC plugin is installed."""
+  global _request_recorder
+  if _request_recorder:
+    app.uninstall( _request_recorder )
+  _request_recorder = recorder
+  if recorder:
+    app.install( recorder )
+
+
 def UpdateUserOptions( options ):
   global _server_state
 
@@ -434,6 +565,10 @@ def UpdateUserOptions( options ):
   # This should never be passed in, but let's try to remove it just in case.
   options.pop( 'hmac_secret', None )
   user_options_store.SetAll( options )
+  # 0 lets ycm_core choose from the number of cores.
+  ycm_core.SetNumMatchingThreads( options.get( 'num_matching_threads', 0 ) )
+  ycm_core.SetParallelFilteringThreshold(
+    options.get( 'parallel_filtering_threshold', 16384 ) )
   _server_state = server_state.ServerState( options )
 
 
@@ -42,13 +42,17 @@ class HmacPlugin:
   api = 2
 
 
-  def __init__( self, hmac_secret ):
+  # The Host header check protects against DNS rebinding attacks from web
+  # browsers. It is not needed when serving over a Unix socket since those can't
+  # be reached by a browser.
+  def __init__( self, hmac_secret, check_host_header = True ):
     self._hmac_secret = hmac_secret
+    self._check_host_header = check_host_header
 
 
   def __call__( self, callback ):
     def wrapper( *args, **kwargs ):
-      if not HostHeaderCorrect( request ):
+      if self._check_host_header and not HostHeaderCorrect( request ):
         LOGGER.info( 'Dropping request with bad Host header' )
         abort( HTTP_UNAUTHORIZED, 'Unauthorized, received bad Host header.' )
         return
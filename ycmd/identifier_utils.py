@@ -15,7 +15,9 @@
 # You should have received a copy of the GNU General Public License
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
-from ycmd.utils import re, SplitLines
+from ycmd.utils import ImportCore, re, SplitLines
+
+ycm_core = ImportCore()
 
 C_STYLE_COMMENT = '/\\*(?:\n|.)*?\\*/'
 CPP_STYLE_COMMENT = '//.*?$'
@@ -175,13 +177,35 @@ def ReplaceWithEmptyLines( regex_match ):
   return '\n' * ( len( SplitLines( regex_match.group( 0 ) ) ) - 1 )
 
 
+# The comments, strings and identifiers are found by ycm_core, which gives the
+# same results as the regular expressions above without holding the GIL. The
+# regular expressions are used for what it doesn't support: text that can't be
+# encoded to UTF-8, non-ASCII identifiers and the scheme identifiers.
 def RemoveIdentifierFreeText( text, filetype = None ):
-  return CommentAndStringRegexForFiletype( filetype ).sub(
-    ReplaceWithEmptyLines, text )
+  return RemoveIdentifierFreeTextAndCheckEnd( text, filetype )[ 0 ]
+
+
+def RemoveIdentifierFreeTextAndCheckEnd( text, filetype = None ):
+  """Same as RemoveIdentifierFreeText but returns a tuple ( text,
+  ends_inside_comment_or_string ) where |ends_inside_comment_or_string| tells if
+  |text| ends inside a comment or a string that can span several lines, in
+  which case the result depends on the text that would follow. It is
+  conservatively true if that can't be determined."""
+  try:
+    return ycm_core.RemoveIdentifierFreeText( text, filetype or '' )
+  except TypeError:
+    return CommentAndStringRegexForFiletype( filetype ).sub(
+      ReplaceWithEmptyLines, text ), True
 
 
 def ExtractIdentifiersFromText( text, filetype = None ):
-  return re.findall( IdentifierRegexForFiletype( filetype ), text )
+  try:
+    identifiers = ycm_core.ExtractIdentifiersFromText( text, filetype or '' )
+  except TypeError:
+    identifiers = None
+  if identifiers is None:
+    return re.findall( IdentifierRegexForFiletype( filetype ), text )
+  return identifiers
 
 
 def IsIdentifier( text, filetype = None ):
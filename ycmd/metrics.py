@@ -0,0 +1,189 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Latency histograms of the server, exposed by the /metrics handler in the
+Prometheus text exposition format and summarised in /debug_info."""
+
+import bisect
+import contextlib
+import threading
+import time
+
+REQUEST_DURATION = 'ycmd_request_duration_seconds'
+COMPLETER_PHASE_DURATION = 'ycmd_completer_phase_duration_seconds'
+JSON_SERIALIZATION_DURATION = 'ycmd_json_serialization_duration_seconds'
+
+_DESCRIPTIONS = {
+  REQUEST_DURATION: 'Time spent handling requests.',
+  COMPLETER_PHASE_DURATION: 'Time spent in each phase of a completion request.',
+  JSON_SERIALIZATION_DURATION: 'Time spent serializing responses to JSON.',
+}
+
+# Upper bounds of the histogram buckets, in seconds: from 100us to about 100s,
+# doubling each time.
+BUCKETS = tuple( 0.0001 * 2 ** i for i in range( 21 ) )
+
+QUANTILES = ( 0.5, 0.95, 0.99 )
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+  def __init__( self ):
+    self._lock = threading.Lock()
+    # The last bucket counts observations above the largest bound.
+    self._bucket_counts = [ 0 ] * ( len( BUCKETS ) + 1 )
+    self._count = 0
+    self._sum = 0.0
+
+
+  def Observe( self, seconds ):
+    index = bisect.bisect_left( BUCKETS, seconds )
+    with self._lock:
+      self._bucket_counts[ index ] += 1
+      self._count += 1
+      self._sum += seconds
+
+
+  def Snapshot( self ):
+    """Returns a tuple ( bucket_counts, count, sum ) of consistent values."""
+    with self._lock:
+      return list( self._bucket_counts ), self._count, self._sum
+
+
+def Quantile( bucket_counts, count, quantile ):
+  """Estimates the |quantile| of the observations in |bucket_counts| assuming
+  they are evenly distributed in each bucket. Observations above the largest
+  bucket are assumed to be at its upper bound. Returns None if there is none."""
+  if not count:
+    return None
+
+  rank = quantile * count
+  cumulative = 0
+  for index, bucket_count in enumerate( bucket_counts ):
+    if bucket_count and cumulative + bucket_count >= rank:
+      if index == len( BUCKETS ):
+        return BUCKETS[ -1 ]
+      lower = BUCKETS[ index - 1 ] if index else 0.0
+      upper = BUCKETS[ index ]
+      return lower + ( upper - lower ) * ( rank - cumulative ) / bucket_count
+    cumulative += bucket_count
+  return BUCKETS[ -1 ] # pragma: no cover
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def Observe( name, seconds, **labels ):
+  """Records a duration of |seconds| in the histogram |name| with |labels|."""
+  key = ( name, tuple( sorted( labels.items() ) ) )
+  histogram = _histograms.get( key )
+  if histogram is None:
+    with _histograms_lock:
+      histogram = _histograms.setdefault( key, Histogram() )
+  histogram.Observe( seconds )
+
+
+@contextlib.contextmanager
+def Timer( name, **labels ):
+  """Context manager recording the time spent in its body, see Observe. The
+  time is recorded even if an exception is raised."""
+  start = time.perf_counter()
+  try:
+    yield
+  finally:
+    Observe( name, time.perf_counter() - start, **labels )
+
+
+def Reset():
+  with _histograms_lock:
+    _histograms.clear()
+
+
+def _Snapshots():
+  with _histograms_lock:
+    histograms = sorted( _histograms.items() )
+  return [ ( name, labels, histogram.Snapshot() )
+           for ( name, labels ), histogram in histograms ]
+
+
+def _FormatLabels( labels, extra = () ):
+  labels = list( labels ) + list( extra )
+  if not labels:
+    return ''
+  return '{' + ','.join( f'{ key }="{ _EscapeLabelValue( value ) }"'
+                         for key, value in labels ) + '}'
+
+
+def _EscapeLabelValue( value ):
+  return ( str( value ).replace( '\\', '\\\\' )
+                       .replace( '"', '\\"' )
+                       .replace( '\n', '\\n' ) )
+
+
+def ExpositionText():
+  """Returns all histograms in the Prometheus text exposition format. The
+  estimated quantiles of every histogram are also exposed as gauges whose name
+  is suffixed with _quantile."""
+  lines = []
+  quantile_lines = {}
+  last_name = None
+  for name, labels, ( bucket_counts, count, total ) in _Snapshots():
+    if name != last_name:
+      lines.append( f'# HELP { name } { _DESCRIPTIONS.get( name, name ) }' )
+      lines.append( f'# TYPE { name } histogram' )
+      last_name = name
+
+    cumulative = 0
+    for bound, bucket_count in zip( BUCKETS, bucket_counts ):
+      cumulative += bucket_count
+      lines.append( f'{ name }_bucket'
+                    f'{ _FormatLabels( labels, [ ( "le", repr( bound ) ) ] ) } '
+                    f'{ cumulative }' )
+    lines.append( f'{ name }_bucket'
+                  f'{ _FormatLabels( labels, [ ( "le", "+Inf" ) ] ) } '
+                  f'{ count }' )
+    lines.append( f'{ name }_sum{ _FormatLabels( labels ) } { total!r}' )
+    lines.append( f'{ name }_count{ _FormatLabels( labels ) } { count }' )
+
+    for quantile in QUANTILES:
+      value = Quantile( bucket_counts, count, quantile )
+      quantile_lines.setdefault( name, [] ).append(
+        f'{ name }_quantile'
+        f'{ _FormatLabels( labels, [ ( "quantile", quantile ) ] ) } '
+        f'{ value!r}' )
+
+  for name, values in quantile_lines.items():
+    lines.append( f'# HELP { name }_quantile Estimated quantiles of { name }.' )
+    lines.append( f'# TYPE { name }_quantile gauge' )
+    lines.extend( values )
+
+  return ''.join( line + '\n' for line in lines )
+
+
+def Summary():
+  """Returns the number of observations and the estimated quantiles, in
+  milliseconds, of every histogram. Used in /debug_info."""
+  summary = {}
+  for name, labels, ( bucket_counts, count, _ ) in _Snapshots():
+    entry = { 'count': count }
+    for quantile in QUANTILES:
+      value = Quantile( bucket_counts, count, quantile )
+      entry[ f'p{ round( quantile * 100 ) }_ms' ] = round( value * 1000, 3 )
+    summary[ name + _FormatLabels( labels ) ] = entry
+  return summary
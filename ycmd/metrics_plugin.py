@@ -0,0 +1,41 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from ycmd import metrics
+
+
+# This class implements the Bottle plugin API:
+# http://bottlepy.org/docs/dev/plugindev.html
+#
+# Every route handler is decorated so that the time spent handling the request
+# is recorded in the histogram of its route. Install it before the other plugins
+# so that the time spent in them is included.
+class MetricsPlugin:
+  name = 'metrics'
+  api = 2
+
+
+  def apply( self, callback, route ):
+    method = route.method
+    rule = route.rule
+
+    def wrapper( *args, **kwargs ):
+      with metrics.Timer( metrics.REQUEST_DURATION,
+                          method = method,
+                          route = rule ):
+        return callback( *args, **kwargs )
+    return wrapper
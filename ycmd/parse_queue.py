@@ -0,0 +1,76 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+import collections
+import threading
+
+from ycmd.utils import LOGGER, StartThread
+
+
+class ParseQueue:
+  """Runs |parse_handler| on the FileReadyToParse events of all files in a
+  background thread, in the order the files were queued. Only the latest event
+  of a file is kept: an event still waiting when a newer one is queued for the
+  same file is dropped, as the file would be parsed again right after."""
+
+  def __init__( self, parse_handler ):
+    self._parse_handler = parse_handler
+    self._pending = collections.OrderedDict()
+    self._condition = threading.Condition()
+    self._thread = None
+    self._busy = False
+
+
+  def Put( self, request_data ):
+    filepath = request_data[ 'filepath' ]
+    with self._condition:
+      if self._pending.pop( filepath, None ) is not None:
+        LOGGER.debug( 'Dropping outdated parse request for %s', filepath )
+      self._pending[ filepath ] = request_data
+      if self._thread is None:
+        self._thread = StartThread( self._Run )
+      self._condition.notify_all()
+
+
+  def Remove( self, filepath ):
+    """Drops the pending event for |filepath|, if any."""
+    with self._condition:
+      self._pending.pop( filepath, None )
+
+
+  def WaitUntilEmpty( self, timeout = None ):
+    """Blocks until all queued events have been handled. Returns False if
+    |timeout| seconds passed before that."""
+    with self._condition:
+      return self._condition.wait_for(
+        lambda: not self._pending and not self._busy,
+        timeout )
+
+
+  def _Run( self ):
+    while True:
+      with self._condition:
+        self._busy = False
+        self._condition.notify_all()
+        self._condition.wait_for( lambda: self._pending )
+        _, request_data = self._pending.popitem( last = False )
+        self._busy = True
+
+      try:
+        self._parse_handler( request_data )
+      except Exception:
+        LOGGER.exception( 'Error while parsing %s', request_data[ 'filepath' ] )
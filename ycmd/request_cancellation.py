@@ -0,0 +1,144 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+
+from ycmd.utils import ImportCore, LOGGER
+
+
+class RequestSuperseded( Exception ):
+  """Raised by completers when the request they are working on was superseded
+  by a newer one. The result of the request is no longer needed."""
+  pass # pragma: no cover
+
+
+class CancellationToken:
+  """Flag checked by the completers between the different phases of a request.
+  Once cancelled, the C++ filtering stops and the callbacks registered with
+  OnCancel are called, e.g. to abort requests sent to a language server."""
+
+  def __init__( self ):
+    self._core_token = ImportCore().CancellationToken()
+    self._callbacks = []
+    self._lock = threading.Lock()
+
+
+  def Cancel( self ):
+    with self._lock:
+      if self._core_token.IsCancelled():
+        return
+      self._core_token.Cancel()
+      callbacks, self._callbacks = self._callbacks, []
+
+    for callback in callbacks:
+      try:
+        callback()
+      except Exception:
+        LOGGER.exception( 'Error while cancelling request' )
+
+
+  def IsCancelled( self ):
+    return self._core_token.IsCancelled()
+
+
+  def RaiseIfCancelled( self ):
+    if self.IsCancelled():
+      raise RequestSuperseded()
+
+
+  def OnCancel( self, callback ):
+    """Calls |callback| when the token is cancelled, or right away if it already
+    is. Returns a function which unregisters the callback."""
+    with self._lock:
+      if not self._core_token.IsCancelled():
+        self._callbacks.append( callback )
+        return lambda: self._RemoveCallback( callback )
+
+    callback()
+    return lambda: None
+
+
+  def CoreToken( self ):
+    """Returns the token to pass to the ycm_core functions."""
+    return self._core_token
+
+
+  def _RemoveCallback( self, callback ):
+    with self._lock:
+      try:
+        self._callbacks.remove( callback )
+      except ValueError:
+        pass
+
+
+class RequestGenerations:
+  """Numbers the requests made by each client for each buffer. Starting a new
+  request for a buffer cancels the one still in flight for the same buffer and
+  client, as its result would be thrown away by the client anyway."""
+
+  def __init__( self ):
+    self._in_flight = {}
+    self._generations = {}
+    self._lock = threading.Lock()
+
+
+  def Start( self, request_data ):
+    """Returns the CancellationToken of a new request for the buffer in
+    |request_data|, after cancelling the previous one."""
+    key = _RequestKey( request_data )
+    token = CancellationToken()
+    with self._lock:
+      generation = self._generations.get( key, 0 ) + 1
+      self._generations[ key ] = generation
+      token.generation = generation
+      previous = self._in_flight.get( key )
+      self._in_flight[ key ] = token
+
+    if previous is not None:
+      LOGGER.debug( 'Request %s for %s superseded by request %s',
+                    previous.generation, key, generation )
+      previous.Cancel()
+    return token
+
+
+  def Finish( self, request_data, token ):
+    key = _RequestKey( request_data )
+    with self._lock:
+      if self._in_flight.get( key ) is token:
+        del self._in_flight[ key ]
+
+
+  def Remove( self, request_data ):
+    """Forgets about the buffer in |request_data|, e.g. when it is unloaded."""
+    key = _RequestKey( request_data )
+    with self._lock:
+      self._generations.pop( key, None )
+      token = self._in_flight.pop( key, None )
+
+    if token is not None:
+      token.Cancel()
+
+
+def RaiseIfCancelled( request_data ):
+  """Raises RequestSuperseded if the request in |request_data| was cancelled."""
+  token = request_data.get( 'cancellation_token' )
+  if token is not None:
+    token.RaiseIfCancelled()
+
+
+def _RequestKey( request_data ):
+  return request_data.get( 'client_id' ), request_data[ 'filepath' ]
@@ -0,0 +1,224 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Records the requests received by the server so that they can be replayed
+later with `benchmark.py --replay`. Each request is written as a JSON object on
+its own line:
+
+  { "time": 1.234, "method": "POST", "path": "/completions", "body": {...} }
+
+where |time| is the number of seconds since the recording started and |body| is
+the decoded JSON body of the request, or null if it had none."""
+
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from bottle import request
+
+from ycmd.utils import LOGGER, re, StartThread, ToBytes, ToUnicode
+
+_WORD_REGEX = re.compile( r'\w+' )
+_LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+_DIGITS = '0123456789'
+
+# The values of these keys are keywords or tokens which are kept as is, so that
+# the requests can be replayed.
+_KEYWORD_KEYS = { 'candidates_handle',
+                  'client_id',
+                  'event_name',
+                  'filetypes',
+                  'sort_property' }
+_PATH_KEYS = { 'filepath', 'working_dir' }
+_COMPLETER_TARGETS = { 'filetype_default', 'identifier' }
+
+
+class RequestRecorder:
+  """Records the requests in a background thread, so that requests are not
+  slowed down by the anonymization and the writing. It implements the Bottle
+  plugin API: http://bottlepy.org/docs/dev/plugindev.html
+
+  Plugins installed last are applied first, so that this one must be installed
+  after the HMAC plugin to only record authenticated requests."""
+  name = 'request_recorder'
+  api = 2
+
+
+  def __init__( self, path, anonymize = False ):
+    self._file = open( path, 'a', encoding = 'utf-8' )
+    self._start_time = time.monotonic()
+    self._anonymizer = Anonymizer() if anonymize else None
+    self._requests = queue.SimpleQueue()
+    self._closed = False
+    self._lock = threading.Lock()
+    self._writer = StartThread( self._WriteRequests )
+
+
+  def __call__( self, callback ):
+    def wrapper( *args, **kwargs ):
+      path = request.fullpath
+      if request.query_string:
+        path += '?' + request.query_string
+      self.Record( request.method, path, request.body.read() )
+      return callback( *args, **kwargs )
+    return wrapper
+
+
+  def Record( self, method, path, body ):
+    """Records a request. |body| is the raw body of the request."""
+    elapsed = time.monotonic() - self._start_time
+    with self._lock:
+      if not self._closed:
+        self._requests.put( ( elapsed, method, path, body ) )
+
+
+  def Close( self ):
+    """Writes the requests recorded so far and closes the file. Requests
+    recorded after are dropped."""
+    with self._lock:
+      if self._closed:
+        return
+      self._closed = True
+      self._requests.put( None )
+    self._writer.join()
+    self._file.close()
+
+
+  def _WriteRequests( self ):
+    while True:
+      recorded_request = self._requests.get()
+      if recorded_request is None:
+        return
+      try:
+        self._Write( *recorded_request )
+      except Exception:
+        LOGGER.exception( 'Error while recording a request' )
+      if self._requests.empty():
+        self._file.flush()
+
+
+  def _Write( self, elapsed, method, path, body ):
+    try:
+      body = json.loads( ToUnicode( body ) ) if body else None
+    except ValueError:
+      LOGGER.warning( 'Not recording %s %s: body is not JSON', method, path )
+      return
+
+    if self._anonymizer:
+      body = self._anonymizer.AnonymizeRequest( body )
+    self._file.write( json.dumps( { 'time': round( elapsed, 6 ),
+                                    'method': method,
+                                    'path': path,
+                                    'body': body } ) + '\n' )
+
+
+class Anonymizer:
+  """Replaces the paths, contents of the files and any other text in requests,
+  e.g. candidates, queries and command arguments, with pseudonyms while keeping
+  what matters for performance. Every word is replaced by a word
+  of the same length in bytes and the other characters are kept, so that the
+  structure of the buffers and all byte offsets stay valid. The same word is
+  always replaced by the same pseudonym so that identifiers still match each
+  other. Numbers are replaced by other numbers so that they are not turned into
+  identifiers."""
+
+  def __init__( self ):
+    # Salt the pseudonyms so that they can't be reversed by hashing a
+    # dictionary, while staying consistent for a whole recording.
+    self._salt = os.urandom( 16 )
+    self._pseudonyms = {}
+
+
+  def AnonymizeRequest( self, request ):
+    """Returns a copy of |request| where every string is anonymized, except the
+    keywords such as the event name, the filetypes or the subcommand. The keys
+    of the objects are kept."""
+    if not isinstance( request, dict ):
+      return self._AnonymizeValue( request )
+
+    anonymized = {}
+    for key, value in request.items():
+      if key in _KEYWORD_KEYS:
+        anonymized[ key ] = value
+      elif key in _PATH_KEYS and isinstance( value, str ):
+        anonymized[ key ] = self.AnonymizePath( value )
+      elif key == 'file_data' and isinstance( value, dict ):
+        anonymized[ key ] = {
+          self.AnonymizePath( filepath ): self._AnonymizeFileData( data )
+          for filepath, data in value.items()
+        }
+      elif key == 'command_arguments' and isinstance( value, list ):
+        # The first argument is the subcommand.
+        anonymized[ key ] = value[ : 1 ] + self._AnonymizeValue( value[ 1 : ] )
+      elif key == 'completer_target' and value in _COMPLETER_TARGETS:
+        anonymized[ key ] = value
+      else:
+        anonymized[ key ] = self._AnonymizeValue( value )
+    return anonymized
+
+
+  def AnonymizePath( self, path ):
+    # Keep the separators and the extension, which determines the filetype for
+    # some completers.
+    root, extension = os.path.splitext( path )
+    return self.AnonymizeText( root ) + extension
+
+
+  def AnonymizeText( self, text ):
+    return _WORD_REGEX.sub( lambda match: self._Pseudonym( match.group() ),
+                            text )
+
+
+  def _AnonymizeValue( self, value ):
+    if isinstance( value, str ):
+      return self.AnonymizeText( value )
+    if isinstance( value, list ):
+      return [ self._AnonymizeValue( item ) for item in value ]
+    if isinstance( value, dict ):
+      return { key: self._AnonymizeValue( item )
+               for key, item in value.items() }
+    return value
+
+
+  def _AnonymizeFileData( self, data ):
+    if not isinstance( data, dict ):
+      return data
+
+    data = dict( data )
+    if isinstance( data.get( 'contents' ), str ):
+      data[ 'contents' ] = self.AnonymizeText( data[ 'contents' ] )
+    if isinstance( data.get( 'changes' ), list ):
+      data[ 'changes' ] = [ dict( change, text = self.AnonymizeText(
+                                    change.get( 'text', '' ) ) )
+                            for change in data[ 'changes' ] ]
+    return data
+
+
+  def _Pseudonym( self, word ):
+    pseudonym = self._pseudonyms.get( word )
+    if pseudonym is None:
+      length = len( ToBytes( word ) )
+      digest = hashlib.sha256( self._salt + ToBytes( word ) ).digest()
+      while len( digest ) < length:
+        digest += hashlib.sha256( digest ).digest()
+      alphabet = _DIGITS if word[ 0 ].isdigit() else _LETTERS
+      pseudonym = ''.join( alphabet[ byte % len( alphabet ) ]
+                           for byte in digest[ : length ] )
+      self._pseudonyms[ word ] = pseudonym
+    return pseudonym
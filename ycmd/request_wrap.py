@@ -83,6 +83,10 @@ class RequestWrap:
       'lines': ( self._CurrentLines, None ),
 
       'extra_conf_data': ( self._GetExtraConfData, None ),
+
+      # The CancellationToken of the request, if it can be superseded by a
+      # newer one. See ycmd.request_cancellation.
+      'cancellation_token': ( lambda: None, self._SetCancellationToken ),
     }
     self._cached_computed = {}
 
@@ -125,6 +129,13 @@ class RequestWrap:
 
     for filename, file_data in self[ 'file_data' ].items():
       if filename == self[ 'filepath' ]:
+        # The same version of a buffer has the same contents.
+        version = file_data.get( 'version' )
+        if ( version is not None and
+             version == other[ 'file_data' ].get( filename, {} ).get(
+               'version' ) ):
+          continue
+
         lines = self[ 'lines' ]
         other_lines = other[ 'lines' ]
         if len( lines ) != len( other_lines ):
@@ -215,6 +226,10 @@ class RequestWrap:
     self._cached_computed.pop( 'query', None )
 
 
+  def _SetCancellationToken( self, token ):
+    self._cached_computed[ 'cancellation_token' ] = token
+
+
   def _Query( self ):
     return self[ 'line_value' ][
         self[ 'start_codepoint' ] - 1 : self[ 'column_codepoint' ] - 1
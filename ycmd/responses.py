@@ -31,6 +31,12 @@ NO_EXTRA_CONF_FILENAME_MESSAGE = ( f'No { YCM_EXTRA_CONF_FILENAME } file '
 NO_DIAGNOSTIC_SUPPORT_MESSAGE = ( 'YCM has no diagnostics support for this '
   'filetype; refer to Syntastic docs if using Syntastic.' )
 
+BUFFER_VERSION_MISMATCH_MESSAGE = ( 'Cannot apply changes to {0}: server has '
+  'version {1} of the buffer. Send its full contents instead.' )
+
+UNKNOWN_CANDIDATES_HANDLE_MESSAGE = ( 'Unknown or expired candidates handle '
+  '{0}. Register the candidates again.' )
+
 EMPTY_SIGNATURE_INFO = {
   'activeSignature': 0,
   'activeParameter': 0,
@@ -66,6 +72,20 @@ class NoDiagnosticSupport( ServerError ):
     super().__init__( NO_DIAGNOSTIC_SUPPORT_MESSAGE )
 
 
+class BufferVersionMismatch( ServerError ):
+  def __init__( self, filepath, version ):
+    super().__init__( BUFFER_VERSION_MISMATCH_MESSAGE.format( filepath,
+                                                              version ) )
+    self.filepath = filepath
+    self.version = version
+
+
+class UnknownCandidatesHandle( ServerError ):
+  def __init__( self, handle ):
+    super().__init__( UNKNOWN_CANDIDATES_HANDLE_MESSAGE.format( handle ) )
+    self.handle = handle
+
+
 # column_num is a byte offset
 def BuildGoToResponse( filepath,
                        line_num,
@@ -136,12 +156,17 @@ def BuildCompletionData( insertion_text,
 # start_column is a byte offset
 def BuildCompletionResponse( completions,
                              start_column,
-                             errors=None ):
-  return {
+                             errors=None,
+                             superseded=False ):
+  response = {
     'completions': completions,
     'completion_start_column': start_column,
     'errors': errors if errors else [],
   }
+  if superseded:
+    # A newer request was made for the same buffer before this one completed.
+    response[ 'superseded' ] = True
+  return response
 
 
 def BuildResolveCompletionResponse( completion, errors ):
@@ -151,26 +176,44 @@ def BuildResolveCompletionResponse( completion, errors ):
   }
 
 
-def BuildSignatureHelpResponse( signature_info, errors = None ):
-  return {
+def BuildSignatureHelpResponse( signature_info,
+                                errors = None,
+                                superseded = False ):
+  return _MarkSuperseded( {
     'signature_help':
       signature_info if signature_info else EMPTY_SIGNATURE_INFO,
     'errors': errors if errors else [],
-  }
+  }, superseded )
 
 
-def BuildSemanticTokensResponse( semantic_tokens, errors = None ):
-  return {
+def BuildSemanticTokensResponse( semantic_tokens,
+                                 errors = None,
+                                 superseded = False ):
+  return _MarkSuperseded( {
     'semantic_tokens': semantic_tokens if semantic_tokens else {},
     'errors': errors if errors else [],
-  }
+  }, superseded )
 
 
-def BuildInlayHintsResponse( inlay_hints, errors = None ):
-  return {
+def BuildInlayHintsResponse( inlay_hints, errors = None, superseded = False ):
+  return _MarkSuperseded( {
     'inlay_hints': inlay_hints if inlay_hints else [],
     'errors': errors if errors else [],
-  }
+  }, superseded )
+
+
+def BuildSupersededResponse():
+  """Response to a subcommand abandoned for a newer request of the same kind for
+  the same buffer."""
+  return { 'superseded': True }
+
+
+def _MarkSuperseded( response, superseded ):
+  if superseded:
+    # A newer request of the same kind was made for the same buffer before this
+    # one completed. The response must not replace the previous one.
+    response[ 'superseded' ] = True
+  return response
 
 
 # location.column_number_ is a byte offset
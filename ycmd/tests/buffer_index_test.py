@@ -0,0 +1,80 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+from hamcrest import assert_that, contains_inanyorder, empty
+from unittest import TestCase
+
+from ycmd.completers.all.identifier_completer import IdentifierCompleter
+from ycmd.request_wrap import RequestWrap
+from ycmd.tests.test_utils import BuildRequest, TemporaryTestDir
+from ycmd.user_options_store import DefaultOptions
+
+
+def StartIdentifierCompleter( index_directory ):
+  user_options = DefaultOptions()
+  user_options[ 'workspace_index_path' ] = index_directory
+  return IdentifierCompleter( user_options )
+
+
+def FileReadyToParse( completer, filepath, contents ):
+  completer.OnFileReadyToParse( RequestWrap( BuildRequest(
+    filepath = filepath,
+    filetype = 'python',
+    contents = contents ) ) )
+
+
+def Candidates( completer ):
+  return completer._completer.CandidatesForQueryAndType( '', 'python' )
+
+
+class BufferIndexTest( TestCase ):
+  def test_BufferIndex_IdentifiersSurviveRestarts( self ):
+    with TemporaryTestDir() as root, TemporaryTestDir() as index_directory:
+      os.mkdir( os.path.join( root, '.git' ) )
+      saved = os.path.join( root, 'saved.py' )
+      modified = os.path.join( root, 'modified.py' )
+      changed = os.path.join( root, 'changed.py' )
+      files = {
+        saved: 'saved_identifier = 1',
+        modified: 'modified_on_disk = 1',
+        changed: 'changed_identifier = 1',
+      }
+      for filepath, contents in files.items():
+        with open( filepath, 'w' ) as f:
+          f.write( contents )
+
+      completer = StartIdentifierCompleter( index_directory )
+      assert_that( not completer._workspace_crawler )
+      FileReadyToParse( completer, saved, files[ saved ] )
+      FileReadyToParse( completer, changed, files[ changed ] )
+      # The buffer differs from the file on disk.
+      FileReadyToParse( completer, modified, 'modified_in_buffer = 1' )
+      assert_that( completer._buffer_index.WaitUntilLoaded( 10 ) )
+      completer._buffer_index.Save()
+
+      with open( changed, 'w' ) as f:
+        f.write( 'changed_on_disk = 1' )
+
+      # Only the identifiers of the buffers saved with the contents their file
+      # still has are back, before the editor sends these buffers again.
+      completer = StartIdentifierCompleter( index_directory )
+      assert_that( Candidates( completer ), empty() )
+      FileReadyToParse( completer, os.path.join( root, 'other.py' ), '' )
+      assert_that( completer._buffer_index.WaitUntilLoaded( 10 ) )
+      assert_that( Candidates( completer ),
+                   contains_inanyorder( 'saved_identifier' ) )
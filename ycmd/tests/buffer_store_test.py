@@ -0,0 +1,196 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import assert_that, calling, equal_to, has_items, raises
+from unittest import TestCase
+
+from ycmd.buffer_store import BufferStore
+from ycmd.responses import BufferVersionMismatch, ServerError
+from ycmd.tests import SharedYcmd
+from ycmd.tests.test_utils import ( BuildRequest,
+                                    CompletionEntryMatcher,
+                                    ErrorMatcher )
+
+
+def Change( start_line, start_column, end_line, end_column, text ):
+  return {
+    'start': { 'line_num': start_line, 'column_num': start_column },
+    'end': { 'line_num': end_line, 'column_num': end_column },
+    'text': text
+  }
+
+
+def FullRequest( contents, version = None ):
+  data = { 'filetypes': [ 'foo' ], 'contents': contents }
+  if version is not None:
+    data[ 'version' ] = version
+  return { 'file_data': { '/foo': data } }
+
+
+def DeltaRequest( base_version, version, changes ):
+  return {
+    'file_data': {
+      '/foo': {
+        'filetypes': [ 'foo' ],
+        'base_version': base_version,
+        'version': version,
+        'changes': changes
+      }
+    }
+  }
+
+
+def ApplyChanges( store, base_version, version, changes ):
+  request = DeltaRequest( base_version, version, changes )
+  store.ResolveFileData( request )
+  return request[ 'file_data' ][ '/foo' ][ 'contents' ]
+
+
+class BufferStoreTest( TestCase ):
+  def test_BufferStore_InsertText( self ):
+    store = BufferStore()
+    store.ResolveFileData( FullRequest( 'foo\nbar\n', 1 ) )
+
+    assert_that( ApplyChanges( store, 1, 2, [ Change( 2, 4, 2, 4, 'baz' ) ] ),
+                 equal_to( 'foo\nbarbaz\n' ) )
+
+
+  def test_BufferStore_ReplaceAcrossLines( self ):
+    store = BufferStore()
+    store.ResolveFileData( FullRequest( 'foo\nbar\nbaz', 1 ) )
+
+    assert_that( ApplyChanges( store, 1, 2, [ Change( 1, 2, 3, 2, 'X\nY' ) ] ),
+                 equal_to( 'fX\nYaz' ) )
+
+
+  def test_BufferStore_ChangesAppliedInOrder( self ):
+    store = BufferStore()
+    store.ResolveFileData( FullRequest( 'abc', 1 ) )
+
+    assert_that( ApplyChanges( store, 1, 2, [ Change( 1, 1, 1, 1, 'x' ),
+                                              Change( 1, 2, 1, 3, '' ),
+                                              Change( 1, 4, 1, 4, '\n' ) ] ),
+                 equal_to( 'xbc\n' ) )
+    assert_that( ApplyChanges( store, 2, 3, [ Change( 2, 1, 2, 1, 'd' ) ] ),
+                 equal_to( 'xbc\nd' ) )
+
+
+  def test_BufferStore_UnicodeColumnsAreByteOffsets( self ):
+    store = BufferStore()
+    store.ResolveFileData( FullRequest( 'ƒøø bar', 1 ) )
+
+    assert_that( ApplyChanges( store, 1, 2, [ Change( 1, 7, 1, 8, '_' ) ] ),
+                 equal_to( 'ƒøø_bar' ) )
+
+
+  def test_BufferStore_VersionMismatch( self ):
+    store = BufferStore()
+    store.ResolveFileData( FullRequest( 'foo', 3 ) )
+
+    assert_that(
+      calling( ApplyChanges ).with_args( store, 2, 4,
+                                         [ Change( 1, 1, 1, 1, 'x' ) ] ),
+      raises( BufferVersionMismatch, '.*server has version 3.*' ) )
+
+
+  def test_BufferStore_UnknownBuffer( self ):
+    assert_that(
+      calling( ApplyChanges ).with_args( BufferStore(), 1, 2,
+                                         [ Change( 1, 1, 1, 1, 'x' ) ] ),
+      raises( BufferVersionMismatch, '.*server has version None.*' ) )
+
+
+  def test_BufferStore_UnversionedContentsForgetBuffer( self ):
+    store = BufferStore()
+    store.ResolveFileData( FullRequest( 'foo', 1 ) )
+    store.ResolveFileData( FullRequest( 'bar' ) )
+
+    assert_that(
+      calling( ApplyChanges ).with_args( store, 1, 2,
+                                         [ Change( 1, 1, 1, 1, 'x' ) ] ),
+      raises( BufferVersionMismatch ) )
+
+
+  def test_BufferStore_Remove( self ):
+    store = BufferStore()
+    store.ResolveFileData( FullRequest( 'foo', 1 ) )
+    store.Remove( '/foo' )
+
+    assert_that(
+      calling( ApplyChanges ).with_args( store, 1, 2,
+                                         [ Change( 1, 1, 1, 1, 'x' ) ] ),
+      raises( BufferVersionMismatch ) )
+
+
+  def test_BufferStore_InvalidChangeLeavesBufferUntouched( self ):
+    store = BufferStore()
+    store.ResolveFileData( FullRequest( 'foo', 1 ) )
+
+    for change in [ Change( 2, 1, 2, 1, 'x' ),
+                    Change( 1, 6, 1, 6, 'x' ),
+                    Change( 1, 3, 1, 2, 'x' ) ]:
+      assert_that(
+        calling( ApplyChanges ).with_args( store, 1, 2,
+                                           [ Change( 1, 1, 1, 1, 'y' ),
+                                             change ] ),
+        raises( ServerError, 'Invalid .*' ) )
+
+    assert_that( ApplyChanges( store, 1, 2, [ Change( 1, 4, 1, 4, 'd' ) ] ),
+                 equal_to( 'food' ) )
+
+
+  def test_BufferStore_MissingVersion( self ):
+    request = DeltaRequest( 1, 2, [] )
+    del request[ 'file_data' ][ '/foo' ][ 'version' ]
+    assert_that(
+      calling( BufferStore().ResolveFileData ).with_args( request ),
+      raises( ServerError, '.*missing required field.*"version"' ) )
+
+
+  @SharedYcmd
+  def test_BufferStore_Completions( self, app ):
+    request = BuildRequest( contents = 'foobar fooqux\n',
+                            event_name = 'FileReadyToParse' )
+    request[ 'file_data' ][ '/foo' ][ 'version' ] = 1
+    app.post_json( '/event_notification', request )
+
+    request = BuildRequest( line_num = 2, column_num = 3 )
+    request[ 'file_data' ] = DeltaRequest(
+      1, 2, [ Change( 2, 1, 2, 1, 'fo' ) ] )[ 'file_data' ]
+    response = app.post_json( '/completions', request ).json
+
+    assert_that( response[ 'completions' ],
+                 has_items( CompletionEntryMatcher( 'foobar' ),
+                            CompletionEntryMatcher( 'fooqux' ) ) )
+
+
+  @SharedYcmd
+  def test_BufferStore_Completions_VersionMismatch( self, app ):
+    request = BuildRequest( contents = 'foobar',
+                            event_name = 'FileReadyToParse' )
+    request[ 'file_data' ][ '/foo' ][ 'version' ] = 1
+    app.post_json( '/event_notification', request )
+
+    request = BuildRequest( column_num = 7 )
+    request[ 'file_data' ] = DeltaRequest(
+      5, 6, [ Change( 1, 7, 1, 7, 'x' ) ] )[ 'file_data' ]
+    response = app.post_json( '/completions',
+                              request,
+                              expect_errors = True )
+
+    assert_that( response.status_code, equal_to( 500 ) )
+    assert_that( response.json, ErrorMatcher( BufferVersionMismatch ) )
@@ -0,0 +1,107 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import ( assert_that, calling, contains_exactly, equal_to,
+                       has_entries, instance_of, raises )
+from unittest import TestCase
+from unittest.mock import patch
+
+from ycmd.candidate_store import CandidateStore
+from ycmd.responses import UnknownCandidatesHandle
+from ycmd.tests import SharedYcmd
+from ycmd.tests.test_utils import ErrorMatcher
+
+
+class CandidateStoreTest( TestCase ):
+  def test_CandidateStore_FilterRegisteredCandidates( self ):
+    store = CandidateStore()
+    candidates = [ { 'word': 'foobar' }, { 'word': 'fooqux' } ]
+    handle = store.Register( candidates, 'word', 60 )
+    # Changing the list afterwards doesn't change the registered candidates.
+    candidates.append( { 'word': 'foozoo' } )
+
+    assert_that( store.Get( handle ).FilterAndSort( 'fq' ),
+                 contains_exactly( { 'word': 'fooqux' } ) )
+    assert_that( store.Get( handle ).FilterAndSort( 'fo' ),
+                 contains_exactly( { 'word': 'foobar' },
+                                   { 'word': 'fooqux' } ) )
+
+
+  def test_CandidateStore_UnknownHandle( self ):
+    assert_that( calling( CandidateStore().Get ).with_args( 'unknown' ),
+                 raises( UnknownCandidatesHandle ) )
+
+
+  @patch( 'time.monotonic' )
+  def test_CandidateStore_Expiration( self, monotonic ):
+    store = CandidateStore()
+    monotonic.return_value = 100
+    handle = store.Register( [ 'foo' ], '', 10 )
+
+    # Using the list postpones its expiration.
+    monotonic.return_value = 109
+    store.Get( handle )
+    monotonic.return_value = 118
+    store.Get( handle )
+
+    monotonic.return_value = 128
+    assert_that( calling( store.Get ).with_args( handle ),
+                 raises( UnknownCandidatesHandle ) )
+
+
+  def test_CandidateStore_LeastRecentlyUsedDropped( self ):
+    store = CandidateStore( max_candidate_lists = 2 )
+    first = store.Register( [ 'foo' ], '', 60 )
+    second = store.Register( [ 'bar' ], '', 60 )
+    store.Get( first )
+    third = store.Register( [ 'baz' ], '', 60 )
+
+    assert_that( store.Get( first ).FilterAndSort( 'f' ),
+                 contains_exactly( 'foo' ) )
+    assert_that( store.Get( third ).FilterAndSort( 'b' ),
+                 contains_exactly( 'baz' ) )
+    assert_that( calling( store.Get ).with_args( second ),
+                 raises( UnknownCandidatesHandle ) )
+
+
+  @SharedYcmd
+  def test_CandidateStore_Handlers( self, app ):
+    candidate1 = { 'prop1': 'aoo', 'prop2': 'bar' }
+    candidate2 = { 'prop1': 'bfo', 'prop2': 'zoo' }
+    candidate3 = { 'prop1': 'cfo', 'prop2': 'moo' }
+    response = app.post_json( '/register_candidates', {
+      'candidates': [ candidate3, candidate1, candidate2 ],
+      'sort_property': 'prop1'
+    } ).json
+    assert_that( response, has_entries( {
+      'candidates_handle': instance_of( str ),
+      'ttl': equal_to( 120 )
+    } ) )
+
+    data = {
+      'candidates_handle': response[ 'candidates_handle' ],
+      'query': 'fo'
+    }
+    assert_that( app.post_json( '/filter_and_sort_candidates', data ).json,
+                 contains_exactly( candidate2, candidate3 ) )
+
+    data[ 'candidates_handle' ] = 'unknown'
+    response = app.post_json( '/filter_and_sort_candidates',
+                              data,
+                              expect_errors = True )
+    assert_that( response.status_code, equal_to( 500 ) )
+    assert_that( response.json, ErrorMatcher( UnknownCandidatesHandle ) )
@@ -62,6 +62,9 @@ class DebugInfoTest( TestCase ):
               'key': 'Settings',
               'value': '{}',
             } ),
+            has_entries( {
+              'key': 'Decode Times',
+            } ),
             has_entries( {
               'key': 'Compilation Command',
               'value': False,
@@ -99,6 +102,9 @@ class DebugInfoTest( TestCase ):
               'key': 'Settings',
               'value': '{}',
             } ),
+            has_entries( {
+              'key': 'Decode Times',
+            } ),
             has_entries( {
               'key': 'Compilation Command',
               'value': False,
@@ -138,6 +144,9 @@ class DebugInfoTest( TestCase ):
               'key': 'Settings',
               'value': '{}',
             } ),
+            has_entries( {
+              'key': 'Decode Times',
+            } ),
             has_entries( {
               'key': 'Compilation Command',
               'value': has_items( '-I', 'include', '-DFOO' ),
@@ -178,6 +187,9 @@ class DebugInfoTest( TestCase ):
               'key': 'Settings',
               'value': '{}',
             } ),
+            has_entries( {
+              'key': 'Decode Times',
+            } ),
             has_entries( {
               'key': 'Compilation Command',
               'value': False
@@ -220,6 +232,9 @@ class DebugInfoTest( TestCase ):
               'key': 'Settings',
               'value': '{}',
             } ),
+            has_entries( {
+              'key': 'Decode Times',
+            } ),
             has_entries( {
               'key': 'Compilation Command',
               'value': has_items( '-I', 'test' ),
@@ -263,6 +278,9 @@ class DebugInfoTest( TestCase ):
               'key': 'Settings',
               'value': '{}',
             } ),
+            has_entries( {
+              'key': 'Decode Times',
+            } ),
             has_entries( {
               'key': 'Compilation Command',
               'value': has_items( '-I', 'include', '-DFOO' ),
@@ -312,6 +330,9 @@ class DebugInfoTest( TestCase ):
                   'key': 'Settings',
                   'value': '{}',
                 } ),
+                has_entries( {
+                  'key': 'Decode Times',
+                } ),
                 has_entries( {
                   'key': 'Compilation Command',
                   'value': False
@@ -369,6 +390,9 @@ def Settings( **kwargs ):
                     'key': 'Settings',
                     'value': '{}',
                   } ),
+                  has_entries( {
+                    'key': 'Decode Times',
+                  } ),
                   has_entries( {
                     'key': 'Compilation Command',
                     'value': has_items( '-x', 'c++', '-I', 'ycm' )
@@ -423,6 +447,9 @@ def Settings( **kwargs ):
                   'key': 'Settings',
                   'value': '{}',
                 } ),
+                has_entries( {
+                  'key': 'Decode Times',
+                } ),
                 has_entries( {
                   'key': 'Compilation Command',
                   'value': False
@@ -463,6 +490,9 @@ def Settings( **kwargs ):
               'key': 'Settings',
               'value': '{}',
             } ),
+            has_entries( {
+              'key': 'Decode Times',
+            } ),
             has_entries( {
               'key': 'Compilation Command',
               'value': has_items( '-isystem', '-iframework' )
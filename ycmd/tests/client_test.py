@@ -69,7 +69,8 @@ class ClientTest( TestCase ):
 
 
   def Start( self, idle_suicide_seconds = 60,
-             check_interval_seconds = 60 * 10 ):
+             check_interval_seconds = 60 * 10,
+             server_threads = 0 ):
     # The temp options file is deleted by ycmd during startup.
     with NamedTemporaryFile( mode = 'w+', delete = False ) as options_file:
       json.dump( self._options_dict, options_file )
@@ -90,6 +91,7 @@ class ClientTest( TestCase ):
       '--log=debug',
       f'--idle_suicide_seconds={ idle_suicide_seconds }',
       f'--check_interval_seconds={ check_interval_seconds }',
+      f'--server_threads={ server_threads }',
     ]
 
     stdout = CreateLogfile(
@@ -15,11 +15,29 @@
 # You should have received a copy of the GNU General Public License
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
-from ycmd.tests.test_utils import DummyCompleter
+from ycmd.completers.completer import CompletionsCache
+from ycmd.completers.language_server.language_server_completer import (
+    LanguageServerCompletionsCache )
+from ycmd.request_wrap import RequestWrap
+from ycmd.tests.test_utils import BuildRequest, DummyCompleter
 from ycmd.user_options_store import DefaultOptions
+from ycmd.utils import ImportCore
 from unittest import TestCase
 from unittest.mock import patch
-from hamcrest import assert_that, contains_exactly, equal_to
+from hamcrest import ( assert_that, contains_exactly, equal_to, has_length,
+                       none )
+ycm_core = ImportCore()
+
+
+def _Request( contents, line_num = 1, column_num = None, filepath = '/foo',
+              **kwargs ):
+  if column_num is None:
+    column_num = len( contents.split( '\n' )[ line_num - 1 ] ) + 1
+  return RequestWrap( BuildRequest( contents = contents,
+                                    line_num = line_num,
+                                    column_num = column_num,
+                                    filepath = filepath,
+                                    **kwargs ) )
 
 
 def _FilterAndSortCandidates_Match( candidates, query, expected_matches ):
@@ -71,8 +89,136 @@ class CompleterTest( TestCase ):
                                     [ { 'insertion_text': 'ø' } ] )
 
 
+  def test_FilterAndSortCandidates_ParallelSameAsSerial( self ):
+    # Duplicates and candidates differing only by their case are ranked the
+    # same whatever the shard they end up in.
+    candidates = [ { 'insertion_text': text, 'index': index }
+                   for index, text in enumerate(
+                     [ f'{ prefix }_{ i % 97 }' for i in range( 5000 )
+                       for prefix in [ 'foo_bar', 'Foo_Bar', 'fOO_bAR' ] ] ) ]
+    num_threads = ycm_core.NumMatchingThreads()
+    try:
+      ycm_core.SetNumMatchingThreads( 4 )
+      for max_candidates in [ 0, 50 ]:
+        with self.subTest( max_candidates = max_candidates ):
+          ycm_core.SetParallelFilteringThreshold( len( candidates ) + 1 )
+          serial = ycm_core.FilterAndSortCandidates(
+            candidates, 'insertion_text', 'fb1', max_candidates )
+          ycm_core.SetParallelFilteringThreshold( 1 )
+          parallel = ycm_core.FilterAndSortCandidates(
+            candidates, 'insertion_text', 'fb1', max_candidates )
+          assert_that( parallel, has_length( max_candidates or 2952 ) )
+          assert_that( parallel, equal_to( serial ) )
+    finally:
+      ycm_core.SetNumMatchingThreads( num_threads )
+      ycm_core.SetParallelFilteringThreshold( 16384 )
+
+
   @patch( 'ycmd.tests.test_utils.DummyCompleter.GetSubcommandsMap',
           return_value = { 'Foo': '', 'StopServer': '' } )
   def test_DefinedSubcommands_RemoveStopServerSubcommand( self, *args ):
     completer = DummyCompleter( DefaultOptions() )
     assert_that( completer.DefinedSubcommands(), contains_exactly( 'Foo' ) )
+
+
+  def test_CompletionsCache_SeveralPositions( self ):
+    cache = CompletionsCache()
+    contents = 'foo.\nbar.'
+    cache.Update( _Request( contents, line_num = 1 ), [ 'foo' ] )
+    cache.Update( _Request( contents, line_num = 2 ), [ 'bar' ] )
+    cache.Update( _Request( 'baz.', filepath = '/baz' ), [ 'baz' ] )
+
+    assert_that( cache.GetCompletionsIfCacheValid(
+                   _Request( contents, line_num = 1 ) ),
+                 contains_exactly( 'foo' ) )
+    assert_that( cache.GetCompletionsIfCacheValid(
+                   _Request( contents, line_num = 2 ) ),
+                 contains_exactly( 'bar' ) )
+    assert_that( cache.GetCompletionsIfCacheValid(
+                   _Request( 'baz.', filepath = '/baz' ) ),
+                 contains_exactly( 'baz' ) )
+    # The buffer changed elsewhere.
+    assert_that( cache.GetCompletionsIfCacheValid(
+                   _Request( 'foo.\nbar.x', line_num = 1 ) ),
+                 none() )
+
+    cache.Invalidate( _Request( contents, line_num = 1 ) )
+    assert_that( cache.GetCompletionsIfCacheValid(
+                   _Request( contents, line_num = 1 ) ),
+                 none() )
+    assert_that( cache.GetCompletionsIfCacheValid(
+                   _Request( contents, line_num = 2 ) ),
+                 contains_exactly( 'bar' ) )
+
+
+  def test_CompletionsCache_LeastRecentlyUsedDropped( self ):
+    cache = CompletionsCache( max_positions = 2, max_completions = 3 )
+    contents = 'a.\nb.\nc.\nd.'
+    cache.Update( _Request( contents, line_num = 1 ), [ 'a' ] )
+    cache.Update( _Request( contents, line_num = 2 ), [ 'b' ] )
+    cache.GetCompletionsIfCacheValid( _Request( contents, line_num = 1 ) )
+    cache.Update( _Request( contents, line_num = 3 ), [ 'c' ] )
+
+    def Cached( line_num ):
+      return cache.GetCompletionsIfCacheValid(
+        _Request( contents, line_num = line_num ) )
+
+    assert_that( Cached( 1 ), contains_exactly( 'a' ) )
+    assert_that( Cached( 2 ), none() )
+    assert_that( Cached( 3 ), contains_exactly( 'c' ) )
+
+    # Too many completions; the last ones are kept anyway.
+    cache.Update( _Request( contents, line_num = 4 ), [ 'd1', 'd2', 'd3' ] )
+    assert_that( Cached( 1 ), none() )
+    assert_that( Cached( 3 ), none() )
+    assert_that( Cached( 4 ), contains_exactly( 'd1', 'd2', 'd3' ) )
+
+
+  def test_CompletionsCache_SameVersion( self ):
+    cache = CompletionsCache()
+    request = _Request( 'foo.\nbar' )
+    request[ 'file_data' ][ '/foo' ][ 'version' ] = 2
+    cache.Update( request, [ 'foo' ] )
+
+    # Buffers with the same version are not compared.
+    request = _Request( 'foo.\nbaz' )
+    request[ 'file_data' ][ '/foo' ][ 'version' ] = 2
+    assert_that( cache.GetCompletionsIfCacheValid( request ),
+                 contains_exactly( 'foo' ) )
+
+
+  def test_LanguageServerCompletionsCache_IncompleteAtOnePosition( self ):
+    cache = LanguageServerCompletionsCache()
+    contents = 'foo.ba\nbar.'
+    first = _Request( contents, line_num = 1 )
+    second = _Request( contents, line_num = 2 )
+    assert_that( cache.GetCodepointForCompletionRequest( first ),
+                 equal_to( 5 ) )
+
+    cache.Update( first, [ 'bar' ], is_incomplete = True )
+    cache.Update( second, [ 'baz' ], is_incomplete = False )
+
+    # Incomplete completions are only used to resolve an item.
+    assert_that( cache.GetCompletionsIfCacheValid( first ), none() )
+    assert_that( cache.GetCompletionsIfCacheValid( first,
+                                                   ignore_incomplete = True ),
+                 contains_exactly( 'bar' ) )
+    assert_that( cache.GetCodepointForCompletionRequest( first ),
+                 equal_to( 7 ) )
+
+    # The other position is not affected.
+    assert_that( cache.GetCompletionsIfCacheValid( second ),
+                 contains_exactly( 'baz' ) )
+    assert_that( cache.GetCodepointForCompletionRequest( second ),
+                 equal_to( 5 ) )
+
+    # Once complete, the completions are valid while the query is extended.
+    cache.Update( first, [ 'bar' ], is_incomplete = False )
+    assert_that( cache.GetCodepointForCompletionRequest( first ),
+                 equal_to( 7 ) )
+    assert_that( cache.GetCompletionsIfCacheValid(
+                   _Request( 'foo.bar\nbar.', line_num = 1 ) ),
+                 contains_exactly( 'bar' ) )
+    assert_that( cache.GetCompletionsIfCacheValid(
+                   _Request( 'foo.b\nbar.', line_num = 1 ) ),
+                 none() )
@@ -16,10 +16,16 @@
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
-from hamcrest import assert_that, empty, equal_to, contains_exactly
+import random
+from hamcrest import ( assert_that, contains_inanyorder, empty, equal_to,
+                       contains_exactly )
 from unittest import TestCase
+from unittest.mock import patch
+from ycmd import identifier_utils
 from ycmd.user_options_store import DefaultOptions
+from ycmd.completers.all import buffer_identifiers
 from ycmd.completers.all import identifier_completer as ic
+from ycmd.completers.all.buffer_identifiers import BufferIdentifiers
 from ycmd.completers.all.identifier_completer import IdentifierCompleter
 from ycmd.request_wrap import RequestWrap
 from ycmd.tests import PathToTestFile
@@ -305,3 +311,114 @@ class IdentifierCompleterTest( TestCase ):
     assert_that(
         list( ident_completer._FilterUnchangedTagFiles( [ tag_file ] ) ),
         empty() )
+
+
+  def test_BufferIdentifiers_Update( self ):
+    identifiers = BufferIdentifiers( 'cpp', False )
+    assert_that( identifiers.Update( 'foo bar\nbaz foo' ),
+                 contains_exactly( contains_inanyorder( 'foo', 'bar', 'baz' ),
+                                   empty() ) )
+    assert_that( identifiers.Update( 'foo bar\nbaz foo' ),
+                 contains_exactly( empty(), empty() ) )
+    # foo is still in the first line.
+    assert_that( identifiers.Update( 'foo bar\nbaz qux' ),
+                 contains_exactly( contains_exactly( 'qux' ), empty() ) )
+    assert_that( identifiers.Update( '/* foo bar\nbaz */ qux' ),
+                 contains_exactly(
+                   empty(), contains_inanyorder( 'foo', 'bar', 'baz' ) ) )
+    assert_that( identifiers.Identifiers(), contains_exactly( 'qux' ) )
+
+    identifiers.AddExtraIdentifier( 'extra' )
+    identifiers.AddExtraIdentifier( 'qux' )
+    assert_that( identifiers.Update( '/* foo bar\nbaz */ qux' ),
+                 contains_exactly( empty(), contains_exactly( 'extra' ) ) )
+
+
+  @patch.object( buffer_identifiers, 'BLOCK_SIZE', 2 )
+  def test_BufferIdentifiers_SameAsWholeBuffer( self ):
+    # Edit buffers randomly and check that the identifiers are always those
+    # found by scanning the whole buffer.
+    words = [ 'foo', 'bar', 'baz', ' ', '\n', '\n', '\\', '/*', '*/', '//',
+              '#', "'", '"', "'''", '"""', '`' ]
+    random_generator = random.Random( 0 )
+
+    def RandomText( max_words ):
+      return ''.join( random_generator.choice( words )
+                      for _ in range( random_generator.randint( 0,
+                                                                max_words ) ) )
+
+    for filetype in [ 'cpp', 'python', 'go', 'foo' ]:
+      for collect_from_comments_and_strings in [ False, True ]:
+        for _ in range( 50 ):
+          identifiers = BufferIdentifiers( filetype,
+                                           collect_from_comments_and_strings )
+          database = set()
+          text = RandomText( 50 )
+          for _ in range( 10 ):
+            added, removed = identifiers.Update( text )
+            database = database.union( added ).difference( removed )
+
+            expected = text
+            if not collect_from_comments_and_strings:
+              expected = identifier_utils.RemoveIdentifierFreeText( expected,
+                                                                    filetype )
+            expected = set( identifier_utils.ExtractIdentifiersFromText(
+              expected, filetype ) )
+            assert_that( database, equal_to( expected ), text )
+            assert_that( set( identifiers.Identifiers() ),
+                         equal_to( expected ) )
+
+            start = random_generator.randint( 0, len( text ) )
+            end = random_generator.randint( start, len( text ) )
+            text = text[ : start ] + RandomText( 5 ) + text[ end : ]
+
+
+  def test_ComputeCandidates_NarrowingQueries( self ):
+    ident_completer = IdentifierCompleter( DefaultOptions() )
+
+    def Candidates( contents, column_num ):
+      return [ completion[ 'insertion_text' ] for completion in
+               ident_completer.ComputeCandidates(
+                 BuildRequestWrap( contents, column_num, 2 ) ) ]
+
+    ident_completer.OnFileReadyToParse(
+      BuildRequestWrap( 'foobar fooqux\n', 1 ) )
+    assert_that( Candidates( 'foobar fooqux\nfo', 3 ),
+                 contains_exactly( 'foobar', 'fooqux' ) )
+    assert_that( Candidates( 'foobar fooqux\nfoq', 4 ),
+                 contains_exactly( 'fooqux' ) )
+
+    # The previous matches are not used once the database changed.
+    ident_completer.OnCurrentIdentifierFinished(
+      BuildRequestWrap( 'foobar fooqux\nfoqux ', 7, 2 ) )
+    assert_that( Candidates( 'foobar fooqux\nfoqux foq', 10 ),
+                 contains_exactly( 'foqux', 'fooqux' ) )
+
+
+  def test_AddBufferIdentifiers_Incremental( self ):
+    ident_completer = IdentifierCompleter( DefaultOptions() )
+
+    def Candidates():
+      return ident_completer._completer.CandidatesForQueryAndType( '', 'foo' )
+
+    ident_completer.OnFileReadyToParse(
+      BuildRequestWrap( 'foo bar\n// baz', 1 ) )
+    assert_that( Candidates(), contains_inanyorder( 'foo', 'bar' ) )
+
+    ident_completer.OnFileReadyToParse(
+      BuildRequestWrap( 'foo qux\n// baz', 1 ) )
+    assert_that( Candidates(), contains_inanyorder( 'foo', 'qux' ) )
+
+    # Identifiers added on their own are removed if they are not in the buffer.
+    ident_completer.OnCurrentIdentifierFinished(
+      BuildRequestWrap( 'foo qux\nquux ', 6, 2 ) )
+    assert_that( Candidates(), contains_inanyorder( 'foo', 'qux', 'quux' ) )
+    ident_completer.OnFileReadyToParse(
+      BuildRequestWrap( 'foo qux\n// baz', 1 ) )
+    assert_that( Candidates(), contains_inanyorder( 'foo', 'qux' ) )
+
+    # Unloading the buffer keeps its identifiers until it is scanned again.
+    ident_completer.OnBufferUnload( BuildRequestWrap( '', 1 ) )
+    assert_that( Candidates(), contains_inanyorder( 'foo', 'qux' ) )
+    ident_completer.OnFileReadyToParse( BuildRequestWrap( 'bar', 1 ) )
+    assert_that( Candidates(), contains_exactly( 'bar' ) )
@@ -0,0 +1,130 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+from hamcrest import ( assert_that, empty, equal_to, has_key, has_length,
+                       is_not, none )
+from unittest import TestCase
+
+from ycmd.completers.all import identifier_index
+from ycmd.completers.all.identifier_index import IndexEntry
+from ycmd.tests.test_utils import TemporaryTestDir
+
+ENTRIES = {
+  '/foo/main.cpp': IndexEntry( 1700000000123456789, 42, 'cpp',
+                               identifier_index.EncodeIdentifiers(
+                                 [ 'main', 'argc', 'ünïcode' ] ) ),
+  '/foo/empty.cpp': IndexEntry( 1, 0, 'cpp', b'' ),
+  '/foo/bär.py': IndexEntry( 2, 10, 'python',
+                             identifier_index.EncodeIdentifiers( [ 'x' ] ) ),
+}
+
+
+class IdentifierIndexTest( TestCase ):
+  def test_IdentifierIndex_RoundTrip( self ):
+    with TemporaryTestDir() as tmp_dir:
+      index_path = os.path.join( tmp_dir, 'subdir', 'project.idx' )
+      identifier_index.Save( index_path, 0, ENTRIES )
+      index = identifier_index.Load( index_path, 0 )
+      assert_that( index, has_length( 3 ) )
+      assert_that( dict( index.Items() ), equal_to( ENTRIES ) )
+      for filepath, entry in ENTRIES.items():
+        assert_that( index.Get( filepath ), equal_to( entry ) )
+      assert_that( index.Get( '/foo/missing.cpp' ), none() )
+      assert_that( identifier_index.DecodeIdentifiers(
+                     index.Get( '/foo/main.cpp' ).identifiers ),
+                   equal_to( [ 'main', 'argc', 'ünïcode' ] ) )
+      assert_that( identifier_index.DecodeIdentifiers(
+                     index.Get( '/foo/empty.cpp' ).identifiers ),
+                   empty() )
+      index.Close()
+      assert_that( os.listdir( os.path.dirname( index_path ) ),
+                   equal_to( [ 'project.idx' ] ) )
+
+
+  def test_IdentifierIndex_Invalid( self ):
+    with TemporaryTestDir() as tmp_dir:
+      index_path = os.path.join( tmp_dir, 'project.idx' )
+      assert_that( list( identifier_index.Load( index_path, 0 ).Items() ),
+                   empty() )
+
+      identifier_index.Save( index_path, 0, ENTRIES )
+      assert_that( list( identifier_index.Load(
+                     index_path,
+                     identifier_index.COLLECT_FROM_COMMENTS_AND_STRINGS
+                   ).Items() ),
+                   empty() )
+
+      with open( index_path, 'rb' ) as f:
+        contents = f.read()
+      for invalid_contents in [
+        b'',
+        contents[ : 10 ],
+        contents[ : -1 ],
+        b'XXXXXX' + contents[ 6: ],
+        contents[ : 6 ] + b'\xff' + contents[ 7: ],
+      ]:
+        with self.subTest( invalid_contents = invalid_contents[ : 20 ] ):
+          with open( index_path, 'wb' ) as f:
+            f.write( invalid_contents )
+          index = identifier_index.Load( index_path, 0 )
+          # The identifiers of main.cpp are at the end of the data section. A
+          # truncated data section is only found when they are read.
+          assert_that( dict( index.Items() ),
+                       is_not( has_key( '/foo/main.cpp' ) ) )
+          assert_that( index.Get( '/foo/main.cpp' ), none() )
+          index.Close()
+
+
+  def test_ProjectIndex_KeepsValidEntries( self ):
+    with TemporaryTestDir() as tmp_dir:
+      index_path = os.path.join( tmp_dir, 'project.idx' )
+      kept = os.path.join( tmp_dir, 'kept.py' )
+      changed = os.path.join( tmp_dir, 'changed.py' )
+      added = os.path.join( tmp_dir, 'added.py' )
+      for filepath in [ kept, changed, added ]:
+        with open( filepath, 'w' ) as f:
+          f.write( 'x = 1' )
+
+      def Entry( filepath, identifiers ):
+        return IndexEntry( *identifier_index.FileStamp( filepath ),
+                           'python',
+                           identifier_index.EncodeIdentifiers( identifiers ) )
+
+      identifier_index.Save( index_path, 0, {
+        kept: Entry( kept, [ 'kept' ] ),
+        changed: Entry( changed, [ 'old' ] ),
+        os.path.join( tmp_dir, 'removed.py' ): IndexEntry( 1, 1, 'python',
+                                                           b'removed' ),
+      } )
+      with open( changed, 'w' ) as f:
+        f.write( 'y = 2 + 3' )
+
+      project_index = identifier_index.ProjectIndex( index_path, 0 )
+      batches = []
+      assert_that( project_index.LoadValidEntries( 10, batches.append ),
+                   equal_to( 1 ) )
+      assert_that( batches, equal_to( [ [ ( kept,
+                                            Entry( kept, [ 'kept' ] ) ) ] ] ) )
+      assert_that( kept in project_index )
+      assert_that( changed not in project_index )
+
+      project_index.Update( { added: Entry( added, [ 'added' ] ) } )
+      project_index.Save()
+      assert_that( dict( identifier_index.Load( index_path, 0 ).Items() ),
+                   equal_to( { kept: Entry( kept, [ 'kept' ] ),
+                               added: Entry( added, [ 'added' ] ) } ) )
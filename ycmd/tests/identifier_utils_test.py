@@ -16,8 +16,10 @@
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
 from ycmd import identifier_utils as iu
+from ycmd.utils import re
 from hamcrest import assert_that, equal_to, has_item
 from unittest import TestCase
+import random
 
 
 def LoopExpectIdentfierAtIndex( ident, index, expected ):
@@ -29,6 +31,11 @@ def LoopExpectLongestIdentifier( ident, expected, end_index ):
     iu.StartOfLongestIdentifierEndingAtIndex( ident, end_index ) ) )
 
 
+def RandomText( random_generator, words, max_words ):
+  return ''.join( random_generator.choice( words )
+                  for _ in range( random_generator.randint( 0, max_words ) ) )
+
+
 class IdentifierUtilsTest( TestCase ):
   def test_RemoveIdentifierFreeText_CppComments( self ):
     assert_that( "foo \nbar \nqux",
@@ -458,3 +465,45 @@ class IdentifierUtilsTest( TestCase ):
   def test_IdentifierAtIndex_Css( self ):
     assert_that( 'font-face', equal_to(
       iu.IdentifierAtIndex( 'font-face', 0, 'css' ) ) )
+
+
+  def test_RemoveIdentifierFreeText_SameAsRegex( self ):
+    words = [ 'foo', 'b4r', ' ', '\n', '\\', '\\\\', '/*', '*/', '//', '#', "'",
+              '"', "'''", '"""', '`', "'\\'", 'ø' ]
+    random_generator = random.Random( 0 )
+    for filetype in [ None, 'cpp', 'go', 'python', 'rust', 'typescript' ]:
+      regex = iu.CommentAndStringRegexForFiletype( filetype )
+      for _ in range( 2000 ):
+        text = RandomText( random_generator, words, 30 )
+        assert_that( iu.RemoveIdentifierFreeText( text, filetype ),
+                     equal_to( regex.sub( iu.ReplaceWithEmptyLines, text ) ),
+                     repr( text ) )
+
+
+  def test_RemoveIdentifierFreeTextAndCheckEnd( self ):
+    for text, filetype, expected in [
+      ( 'foo /* bar', None, ( 'foo /* bar', True ) ),
+      ( 'foo /* bar */', None, ( 'foo ', False ) ),
+      ( 'foo """ bar\nbaz', 'python', ( 'foo " bar\nbaz', True ) ),
+      ( 'foo """ bar\nbaz', 'cpp', ( 'foo " bar\nbaz', False ) ),
+      ( "foo ' bar", None, ( "foo ' bar", False ) ),
+      ( 'foo // bar /*', None, ( 'foo ', False ) ),
+      # Text that can't be encoded to UTF-8.
+      ( 'foo \udc00', None, ( 'foo \udc00', True ) ),
+    ]:
+      assert_that( iu.RemoveIdentifierFreeTextAndCheckEnd( text, filetype ),
+                   equal_to( expected ), text )
+
+
+  def test_ExtractIdentifiersFromText_SameAsRegex( self ):
+    words = [ 'foo', 'B4r', '_', '-', "'", ':', '.', '/', '$', '1', '.5', ' ',
+              '\n', 'é' ] + [ chr( c ) for c in range( 128 ) ]
+    random_generator = random.Random( 0 )
+    for filetype in [ None, 'javascript', 'css', 'html', 'r', 'clojure',
+                      'haskell', 'tex', 'perl6', 'scheme' ]:
+      regex = iu.IdentifierRegexForFiletype( filetype )
+      for _ in range( 2000 ):
+        text = RandomText( random_generator, words, 30 )
+        assert_that( iu.ExtractIdentifiersFromText( text, filetype ),
+                     equal_to( re.findall( regex, text ) ),
+                     repr( text ) )
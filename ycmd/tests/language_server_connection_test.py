@@ -0,0 +1,295 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import ( assert_that, calling, contains_exactly, equal_to,
+                       has_entries, raises )
+from unittest import TestCase
+import json
+import os
+import queue
+import threading
+
+from ycmd.completers.language_server import language_server_protocol as lsp
+from ycmd.completers.language_server.language_server_completer import (
+  LanguageServerConnection,
+  LanguageServerConnectionStopped,
+  MessageReader,
+  NotificationQueue,
+  StandardIOLanguageServerConnection )
+from ycmd.utils import StartThread
+
+
+def _Frame( content ):
+  return b'Content-Length: %d\r\n\r\n%s' % ( len( content ), content )
+
+
+def _ChunkedReader( data, chunk_size ):
+  position = 0
+
+  def ReadInto( buffer ):
+    nonlocal position
+    size = min( len( buffer ), chunk_size, len( data ) - position )
+    buffer[ : size ] = data[ position : position + size ]
+    position += size
+    return size
+
+  return ReadInto
+
+
+def _Diagnostics( uri, version ):
+  return { 'method': 'textDocument/publishDiagnostics',
+           'params': { 'uri': uri, 'version': version, 'diagnostics': [] } }
+
+
+def _Drain( notifications ):
+  drained = []
+  try:
+    while True:
+      drained.append( notifications.GetNowait() )
+  except queue.Empty:
+    return drained
+
+
+def _ReadMessages( reader, count ):
+  messages = []
+  for _ in range( count ):
+    with reader.ReadMessage() as content:
+      messages.append( lsp.Parse( content ) )
+  return messages
+
+
+class StoppedConnection( StandardIOLanguageServerConnection ):
+  def __init__( self, server_stdout ):
+    super().__init__( None, None, None, server_stdout, None )
+    self.messages = []
+
+
+  def IsStopped( self ):
+    return True
+
+
+  def _DispatchMessage( self, message ):
+    self.messages.append( message )
+
+
+class ReadDataConnection( LanguageServerConnection ):
+  def __init__( self, chunks ):
+    super().__init__( None, None, None )
+    self._chunks = chunks
+
+
+  def TryServerConnectionBlocking( self ):
+    return True # pragma: no cover
+
+
+  def IsConnected( self ):
+    return True # pragma: no cover
+
+
+  def WriteData( self, data ):
+    pass # pragma: no cover
+
+
+  def ReadData( self, size = -1 ):
+    if not self._chunks:
+      raise LanguageServerConnectionStopped()
+    return self._chunks.pop( 0 )
+
+
+class DecodingConnection( ReadDataConnection ):
+  """Records the dispatched messages. The decoding of large messages waits until
+  |dispatched_id| is dispatched."""
+  def __init__( self, data, dispatched_id = None ):
+    super().__init__( [ data ] )
+    self.messages = []
+    self._dispatched_id = dispatched_id
+    self._dispatched = threading.Event()
+    self.decode_thread_done = threading.Event()
+
+
+  def _DecodeMessage( self, content ):
+    if len( content ) >= lsp.LARGE_PAYLOAD_SIZE and self._dispatched_id:
+      assert self._dispatched.wait( 10 )
+    return super()._DecodeMessage( content )
+
+
+  def _DecodeMessages( self ):
+    super()._DecodeMessages()
+    self.decode_thread_done.set()
+
+
+  def _DispatchMessage( self, message ):
+    self.messages.append( message )
+    if message.get( 'id' ) == self._dispatched_id:
+      self._dispatched.set()
+
+
+  def ReadAllMessages( self ):
+    assert_that( calling( self._ReadMessages ),
+                 raises( LanguageServerConnectionStopped ) )
+    assert self.decode_thread_done.wait( 10 )
+
+
+class LanguageServerConnectionTest( TestCase ):
+  def test_MessageReader_Chunks( self ):
+    large = { 'id': 3, 'result': [ 'x' * 100 ] * 2000 }
+    data = b''.join( [
+      _Frame( b'{"id":1,"result":null}' ),
+      b'Content-Type: application/vscode-jsonrpc; charset=utf-8\r\n',
+      _Frame( b'{"id":2,"result":"\xc3\xb8"}' ),
+      _Frame( json.dumps( large ).encode() ),
+      _Frame( b'{"id":4,"result":null}' ),
+    ] )
+    for chunk_size in [ 1, 7, 4096, len( data ) ]:
+      with self.subTest( chunk_size = chunk_size ):
+        reader = MessageReader( _ChunkedReader( data, chunk_size ) )
+        assert_that( _ReadMessages( reader, 4 ), contains_exactly(
+          { 'id': 1, 'result': None },
+          { 'id': 2, 'result': 'ø' },
+          large,
+          { 'id': 4, 'result': None } ) )
+
+
+  def test_MessageReader_ReusesBuffer( self ):
+    data = _Frame( b'"' + b'x' * 1000 + b'"' ) * 1000
+    reader = MessageReader( _ChunkedReader( data, 4096 ) )
+    _ReadMessages( reader, 1000 )
+    assert_that( len( reader._buffer ),
+                 equal_to( MessageReader.INITIAL_BUFFER_SIZE ) )
+
+
+  def test_MessageReader_MissingContentLength( self ):
+    reader = MessageReader( _ChunkedReader( b'Foo: bar\r\n\r\n{}', 4096 ) )
+    assert_that( calling( reader.ReadMessage ), raises( ValueError ) )
+
+
+  def test_StandardIOLanguageServerConnection_ReadMessages( self ):
+    read_fd, write_fd = os.pipe()
+    with open( read_fd, 'rb' ) as server_stdout:
+      connection = StoppedConnection( server_stdout )
+
+      def WriteMessages():
+        with open( write_fd, 'wb' ) as server_stdin:
+          for i in range( 100 ):
+            server_stdin.write( _Frame( b'{"id":%d,"result":"%s"}' %
+                                        ( i, b'x' * i * 1000 ) ) )
+
+      writer = StartThread( WriteMessages )
+      assert_that( calling( connection._ReadMessages ),
+                   raises( LanguageServerConnectionStopped ) )
+      writer.join()
+
+    assert_that( connection.messages, equal_to( [
+      { 'id': i, 'result': 'x' * i * 1000 } for i in range( 100 ) ] ) )
+
+
+  def test_LanguageServerConnection_ReadDataInto( self ):
+    # The data that doesn't fit in the buffer is kept for the next read.
+    connection = ReadDataConnection( [ b'foobar', b'baz' ] )
+    buffer = bytearray( 4 )
+    view = memoryview( buffer )
+    assert_that( connection.ReadDataInto( view ), equal_to( 4 ) )
+    assert_that( buffer, equal_to( b'foob' ) )
+    assert_that( connection.ReadDataInto( view ), equal_to( 2 ) )
+    assert_that( buffer[ : 2 ], equal_to( b'ar' ) )
+    assert_that( connection.ReadDataInto( view ), equal_to( 3 ) )
+    assert_that( buffer[ : 3 ], equal_to( b'baz' ) )
+
+
+  def test_LanguageServerConnection_LargeMessagesDecodedOutOfBand( self ):
+    large = { 'id': 1, 'result': 'x' * lsp.LARGE_PAYLOAD_SIZE }
+    connection = DecodingConnection( b''.join( [
+      _Frame( json.dumps( large ).encode() ),
+      _Frame( b'{"method":"first","params":null}' ),
+      _Frame( b'{"id":2,"result":null}' ),
+      _Frame( b'{"method":"second","params":null}' ),
+    ] ), dispatched_id = 2 )
+    connection.ReadAllMessages()
+
+    # The small response overtakes the large one, but the notifications are
+    # still dispatched in order after it.
+    assert_that( connection.messages, contains_exactly(
+      { 'id': 2, 'result': None },
+      large,
+      { 'method': 'first', 'params': None },
+      { 'method': 'second', 'params': None } ) )
+
+
+  def test_LanguageServerConnection_DecodeTimes( self ):
+    connection = DecodingConnection( b''.join( [
+      _Frame( b'{"method":"window/logMessage","params":null}' ),
+      _Frame( b'{"id":1,"result":"%s"}' % ( b'x' * lsp.LARGE_PAYLOAD_SIZE ) ),
+      _Frame( b'{"id":2,"result":null}' ),
+      _Frame( b'{"method":"window/logMessage","params":null}' ),
+    ] ) )
+    connection.GetResponseAsync(
+      1,
+      lsp.BuildRequest( 1, 'textDocument/completion', {} ) )
+    connection.ReadAllMessages()
+
+    assert_that( connection.DecodeTimes(), has_entries( {
+      'textDocument/completion': has_entries( { 'count': 1 } ),
+      'window/logMessage': has_entries( { 'count': 2 } ),
+      '<unknown>': has_entries( { 'count': 1 } ),
+    } ) )
+
+
+  def test_NotificationQueue_CoalescesDiagnostics( self ):
+    notifications = NotificationQueue()
+    progress = { 'method': '$/progress', 'params': { 'value': 1 } }
+    log = { 'method': 'window/logMessage', 'params': { 'message': 'foo' } }
+    notifications.Put( _Diagnostics( 'file:///foo', 1 ) )
+    notifications.Put( progress )
+    notifications.Put( _Diagnostics( 'file:///bar', 1 ) )
+    notifications.Put( log )
+    notifications.Put( _Diagnostics( 'file:///foo', 2 ) )
+    notifications.Put( log )
+
+    # The stale diagnostics for foo are dropped and the newer ones are queued
+    # after the notifications received in between.
+    assert_that( _Drain( notifications ), contains_exactly(
+      progress,
+      _Diagnostics( 'file:///bar', 1 ),
+      log,
+      _Diagnostics( 'file:///foo', 2 ),
+      log ) )
+
+
+  def test_NotificationQueue_DiscardsOldestWhenFull( self ):
+    notifications = NotificationQueue( maxsize = 3 )
+    for version in range( 5 ):
+      notifications.Put( { 'method': 'window/logMessage',
+                           'params': { 'message': str( version ) } } )
+
+    assert_that( [ notification[ 'params' ][ 'message' ]
+                   for notification in _Drain( notifications ) ],
+                 contains_exactly( '2', '3', '4' ) )
+
+
+  def test_NotificationQueue_Get( self ):
+    notifications = NotificationQueue()
+    assert_that( calling( notifications.Get ).with_args( timeout = 0.01 ),
+                 raises( queue.Empty ) )
+
+    def PutLater():
+      notifications.Put( _Diagnostics( 'file:///foo', 1 ) )
+
+    timer = threading.Timer( 0.01, PutLater )
+    timer.start()
+    assert_that( notifications.Get( timeout = 10 ),
+                 equal_to( _Diagnostics( 'file:///foo', 1 ) ) )
+    timer.join()
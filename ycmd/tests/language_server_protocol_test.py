@@ -0,0 +1,153 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import ( assert_that, contains_exactly, empty, equal_to,
+                       has_entries )
+from unittest import TestCase
+import json
+
+from ycmd.completers.language_server import language_server_protocol as lsp
+from ycmd.utils import ToUnicode
+
+
+def _Offset( contents, position ):
+  lines = contents.split( '\n' )
+  line_start = sum( len( line ) + 1 for line in lines[ : position[ 'line' ] ] )
+  return line_start + lsp.UTF16CodeUnitsToCodepoints(
+    lines[ position[ 'line' ] ], position[ 'character' ] )
+
+
+def _Message( data ):
+  return json.loads( ToUnicode( data ).split( '\r\n\r\n' )[ 1 ] )
+
+
+def _ApplyChanges( contents, changes ):
+  """Applies |changes| the way a language server does."""
+  for change in changes:
+    if 'range' not in change:
+      contents = change[ 'text' ]
+      continue
+    start = _Offset( contents, change[ 'range' ][ 'start' ] )
+    end = _Offset( contents, change[ 'range' ][ 'end' ] )
+    contents = contents[ : start ] + change[ 'text' ] + contents[ end : ]
+  return contents
+
+
+class LanguageServerProtocolTest( TestCase ):
+  def test_ContentChanges_SingleRange( self ):
+    assert_that(
+      lsp.ContentChanges( 'def foo():\n  pass\n', 'def foo():\n  return\n' ),
+      contains_exactly( {
+        'range': {
+          'start': { 'line': 1, 'character': 2 },
+          'end': { 'line': 1, 'character': 6 }
+        },
+        'text': 'return'
+      } ) )
+
+
+  def test_ContentChanges_UTF16CodeUnits( self ):
+    # 𐐀 is 2 UTF-16 code units.
+    assert_that(
+      lsp.ContentChanges( 'a𐐀b = 1\n', 'a𐐀bc = 1\n' ),
+      contains_exactly( {
+        'range': {
+          'start': { 'line': 0, 'character': 4 },
+          'end': { 'line': 0, 'character': 4 }
+        },
+        'text': 'c'
+      } ) )
+
+
+  def test_ContentChanges_Unchanged( self ):
+    assert_that( lsp.ContentChanges( 'foo', 'foo' ), empty() )
+
+
+  def test_ContentChanges_WindowsLineBreaks( self ):
+    # The range doesn't end between \r and \n.
+    assert_that(
+      lsp.ContentChanges( 'a\r\nb', 'a\nb' ),
+      contains_exactly( {
+        'range': {
+          'start': { 'line': 0, 'character': 1 },
+          'end': { 'line': 1, 'character': 0 }
+        },
+        'text': '\n'
+      } ) )
+
+
+  def test_ContentChanges_LoneCarriageReturn( self ):
+    assert_that( lsp.ContentChanges( 'a\rb', 'a\rc' ),
+                 contains_exactly( { 'text': 'a\rc' } ) )
+
+
+  def test_ContentChanges_ApplyToPreviousContents( self ):
+    for previous_contents, contents in [
+      ( '', 'foo' ),
+      ( 'foo', '' ),
+      ( 'foo\nbar\nbaz', 'foo\nbaz' ),
+      ( 'foo\nbar\nbaz', 'foo\nbar\nbar\nbaz' ),
+      ( 'aaaa', 'aaaaaa' ),
+      ( 'aaaa\r\nbbbb\r\n', 'aaaa\r\nbbbb\r\nbbbb\r\n' ),
+      ( 'x\r\n', 'x\n' ),
+      ( 'x\n', 'x\r\n' ),
+      ( 'ø𐐀\n𐐀ø', 'ø𐐀ø\n𐐀' ),
+      ( 'int main() {}', 'int main() {\n  return 0;\n}' ),
+    ]:
+      with self.subTest( previous_contents = previous_contents,
+                         contents = contents ):
+        changes = lsp.ContentChanges( previous_contents, contents )
+        assert_that( _ApplyChanges( previous_contents, changes ),
+                     equal_to( contents ) )
+
+
+  def test_DidChangeTextDocument( self ):
+    file_state = lsp.ServerFileState( '/foo' )
+    file_state.GetDirtyFileAction( 'foo' )
+    file_state.GetDirtyFileAction( 'foobar' )
+
+    assert_that( _Message( lsp.DidChangeTextDocument( file_state, 'foobar' ) ),
+                 has_entries( { 'params': has_entries( {
+                   'textDocument': has_entries( { 'version': 2 } ),
+                   'contentChanges': contains_exactly( { 'text': 'foobar' } )
+                 } ) } ) )
+    assert_that( _Message(
+                   lsp.DidChangeTextDocument( file_state, 'foobar', 'foo' ) ),
+                 has_entries( { 'params': has_entries( {
+                   'contentChanges': contains_exactly( {
+                     'range': {
+                       'start': { 'line': 0, 'character': 3 },
+                       'end': { 'line': 0, 'character': 3 }
+                     },
+                     'text': 'bar'
+                   } )
+                 } ) } ) )
+
+
+  def test_Parse_LargePayload( self ):
+    message = { 'id': 1, 'result': [ { 'uri': 'file:///foo', 'line': 1 } ] *
+                                   ( lsp.LARGE_PAYLOAD_SIZE // 20 ) }
+    data = json.dumps( message ).encode()
+    assert_that( len( data ) >= lsp.LARGE_PAYLOAD_SIZE )
+    assert_that( lsp.Parse( data ), equal_to( message ) )
+
+
+  def test_RequestMethod( self ):
+    assert_that( lsp.RequestMethod( lsp.BuildRequest( 123, 'foo/bar', {} ) ),
+                 equal_to( 'foo/bar' ) )
+    assert_that( lsp.RequestMethod( lsp.BuildRequest( 1, 'x', { 'a': 1 } ) ),
+                 equal_to( 'x' ) )
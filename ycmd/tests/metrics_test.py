@@ -0,0 +1,125 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import ( assert_that, close_to, contains_string, equal_to,
+                       has_entries, has_entry, has_key, is_not,
+                       starts_with )
+from unittest import TestCase
+from webtest import TestApp
+import bottle
+
+from ycmd import metrics
+from ycmd.metrics_plugin import MetricsPlugin
+from ycmd.tests import SharedYcmd
+from ycmd.tests.test_utils import BuildRequest
+
+
+class MetricsTest( TestCase ):
+  def setUp( self ):
+    metrics.Reset()
+
+
+  def tearDown( self ):
+    metrics.Reset()
+
+
+  def test_Quantile( self ):
+    counts = [ 0 ] * ( len( metrics.BUCKETS ) + 1 )
+    assert_that( metrics.Quantile( counts, 0, 0.5 ), equal_to( None ) )
+
+    # 10 observations between 0.1ms and 0.2ms and 10 above the largest bucket.
+    counts[ 1 ] = 10
+    counts[ -1 ] = 10
+    assert_that( metrics.Quantile( counts, 20, 0.25 ),
+                 close_to( 0.00015, 1e-9 ) )
+    assert_that( metrics.Quantile( counts, 20, 0.5 ),
+                 close_to( 0.0002, 1e-9 ) )
+    assert_that( metrics.Quantile( counts, 20, 0.99 ),
+                 equal_to( metrics.BUCKETS[ -1 ] ) )
+
+
+  def test_ExpositionText( self ):
+    metrics.Observe( metrics.REQUEST_DURATION, 0.00005, route = '/a"b' )
+    metrics.Observe( metrics.REQUEST_DURATION, 0.0003, route = '/a"b' )
+
+    text = metrics.ExpositionText()
+    assert_that( text, starts_with(
+      '# HELP ycmd_request_duration_seconds Time spent handling requests.\n'
+      '# TYPE ycmd_request_duration_seconds histogram\n'
+      'ycmd_request_duration_seconds_bucket{route="/a\\"b",le="0.0001"} 1\n'
+      'ycmd_request_duration_seconds_bucket{route="/a\\"b",le="0.0002"} 1\n'
+      'ycmd_request_duration_seconds_bucket{route="/a\\"b",le="0.0004"} 2\n' ) )
+    assert_that( text, contains_string(
+      'ycmd_request_duration_seconds_bucket{route="/a\\"b",le="+Inf"} 2\n'
+      'ycmd_request_duration_seconds_sum{route="/a\\"b"} 0.00035\n'
+      'ycmd_request_duration_seconds_count{route="/a\\"b"} 2\n' ) )
+    assert_that( text, contains_string(
+      '# TYPE ycmd_request_duration_seconds_quantile gauge\n'
+      'ycmd_request_duration_seconds_quantile'
+      '{route="/a\\"b",quantile="0.5"} 0.0001\n' ) )
+
+
+  def test_MetricsPlugin( self ):
+    app = bottle.Bottle()
+    app.install( MetricsPlugin() )
+
+    @app.get( '/foo/<name>' )
+    def Foo( name ):
+      return name
+
+    test_app = TestApp( app )
+    test_app.get( '/foo/bar' )
+    test_app.get( '/foo/baz' )
+
+    assert_that( metrics.Summary(), has_entry(
+      'ycmd_request_duration_seconds{method="GET",route="/foo/<name>"}',
+      has_entries( { 'count': 2,
+                     'p50_ms': close_to( 0, 100 ),
+                     'p95_ms': close_to( 0, 100 ),
+                     'p99_ms': close_to( 0, 100 ) } ) ) )
+
+
+  @SharedYcmd
+  def test_MetricsHandler_CompleterPhases( self, app ):
+    app.post_json( '/event_notification',
+                   BuildRequest( contents = 'foobar\nfo',
+                                 event_name = 'FileReadyToParse' ) )
+    app.post_json( '/completions',
+                   BuildRequest( contents = 'foobar\nfo',
+                                 line_num = 2,
+                                 column_num = 3 ) )
+
+    response = app.get( '/metrics' )
+    assert_that( response.content_type, equal_to( 'text/plain' ) )
+    for phase in [ 'ShouldUseNow', 'FilterAndSortCandidates' ]:
+      assert_that( response.text, contains_string(
+        'ycmd_completer_phase_duration_seconds_count'
+        f'{{completer="IdentifierCompleter",phase="{ phase }"}} 1\n' ) )
+    assert_that( response.text, contains_string(
+      'ycmd_json_serialization_duration_seconds_count'
+      '{route="/completions"} 1\n' ) )
+
+    debug_info = app.post_json( '/debug_info', BuildRequest() ).json
+    assert_that( debug_info[ 'metrics' ], has_entries( {
+      'ycmd_completer_phase_duration_seconds'
+      '{completer="IdentifierCompleter",phase="ShouldUseNow"}':
+        has_entries( { 'count': 1 } ),
+      'ycmd_json_serialization_duration_seconds{route="/completions"}':
+        has_key( 'p99_ms' )
+    } ) )
+    assert_that( debug_info[ 'metrics' ], is_not( has_key(
+      'ycmd_json_serialization_duration_seconds{route="/debug_info"}' ) ) )
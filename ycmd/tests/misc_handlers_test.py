@@ -16,7 +16,7 @@
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
 from hamcrest import ( any_of, assert_that, contains_exactly, empty, equal_to,
-                       has_entries, instance_of )
+                       greater_than_or_equal_to, has_entries, instance_of )
 from unittest.mock import patch
 from unittest import TestCase
 import requests
@@ -27,6 +27,8 @@ from ycmd.tests.test_utils import ( BuildRequest,
                                     PatchCompleter,
                                     SignatureAvailableMatcher,
                                     ErrorMatcher )
+from ycmd.utils import ImportCore
+ycm_core = ImportCore()
 
 
 class MiscHandlersTest( TestCase ):
@@ -222,6 +224,29 @@ class MiscHandlersTest( TestCase ):
     )
 
 
+  @SharedYcmd
+  def test_MiscHandlers_DebugInfo_CandidateRepository( self, app ):
+    app.post_json( '/filter_and_sort_candidates', {
+      'candidates': [ 'debug_info_candidate' ],
+      'sort_property': '',
+      'query': 'dic'
+    } )
+    assert_that(
+      app.post_json( '/debug_info', BuildRequest() ).json,
+      has_entries( {
+        'candidate_repository': has_entries( {
+          'size': greater_than_or_equal_to( 1 ),
+          'reclaimed': instance_of( int )
+        } )
+      } )
+    )
+
+
+  @IsolatedYcmd( { 'num_matching_threads': 2 } )
+  def test_MiscHandlers_NumMatchingThreads( self, app ):
+    assert_that( ycm_core.NumMatchingThreads(), equal_to( 2 ) )
+
+
   @SharedYcmd
   def test_MiscHandlers_ReceiveMessages_NoCompleter( self, app ):
     request_data = BuildRequest()
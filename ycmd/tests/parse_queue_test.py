@@ -0,0 +1,196 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import ( assert_that, contains_exactly, contains_string,
+                       equal_to, has_entries )
+from threading import Event
+from unittest import TestCase
+
+from ycmd import handlers
+from ycmd.completers.completer import DiagnosticsQueue
+from ycmd.parse_queue import ParseQueue
+from ycmd.responses import UnknownExtraConf
+from ycmd.tests import SharedYcmd
+from ycmd.tests.test_utils import ( BuildRequest, DummyCompleter,
+                                    PatchCompleter )
+
+
+class DiagnosticsCompleter( DummyCompleter ):
+  def __init__( self, user_options ):
+    super().__init__( user_options )
+    self._diagnostics_queue = DiagnosticsQueue()
+
+
+  def OnFileReadyToParse( self, request_data ):
+    contents = request_data[ 'file_data' ][ '/foo' ][ 'contents' ]
+    if contents == 'unknown extra conf':
+      raise UnknownExtraConf( '/.ycm_extra_conf.py' )
+    return [ { 'text': contents } ]
+
+
+  def OnAsynchronousFileReadyToParse( self, request_data ):
+    self._diagnostics_queue.Enable()
+
+
+  def PublishDiagnostics( self, request_data, diagnostics ):
+    self._diagnostics_queue.Put( request_data[ 'filepath' ], diagnostics )
+
+
+  def PollForMessagesInner( self, request_data, timeout ):
+    return self._diagnostics_queue.Poll( timeout )
+
+
+class ErrorCompleter( DummyCompleter ):
+  def OnFileReadyToParse( self, request_data ):
+    raise UnknownExtraConf( '/.ycm_extra_conf.py' )
+
+
+class ParseQueueTest( TestCase ):
+  def test_ParseQueue_OnlyLatestEventIsKept( self ):
+    parsing = Event()
+    unblock = Event()
+    parsed = []
+
+    def Parse( request_data ):
+      parsed.append( request_data[ 'id' ] )
+      parsing.set()
+      unblock.wait( 10 )
+
+    queue = ParseQueue( Parse )
+    queue.Put( { 'filepath': '/foo', 'id': 1 } )
+    parsing.wait( 10 )
+
+    queue.Put( { 'filepath': '/foo', 'id': 2 } )
+    queue.Put( { 'filepath': '/bar', 'id': 3 } )
+    queue.Put( { 'filepath': '/foo', 'id': 4 } )
+    queue.Put( { 'filepath': '/baz', 'id': 5 } )
+    queue.Remove( '/baz' )
+    unblock.set()
+
+    assert_that( queue.WaitUntilEmpty( 10 ), equal_to( True ) )
+    assert_that( parsed, contains_exactly( 1, 3, 4 ) )
+
+
+  def test_ParseQueue_ErrorsAreIgnored( self ):
+    parsed = []
+
+    def Parse( request_data ):
+      parsed.append( request_data[ 'filepath' ] )
+      raise RuntimeError( 'parse error' )
+
+    queue = ParseQueue( Parse )
+    queue.Put( { 'filepath': '/foo' } )
+    assert_that( queue.WaitUntilEmpty( 10 ), equal_to( True ) )
+    queue.Put( { 'filepath': '/bar' } )
+    assert_that( queue.WaitUntilEmpty( 10 ), equal_to( True ) )
+
+    assert_that( parsed, contains_exactly( '/foo', '/bar' ) )
+
+
+  def test_DiagnosticsQueue_LatestDiagnosticsPerFile( self ):
+    queue = DiagnosticsQueue()
+    assert_that( queue.Poll( 0 ), equal_to( False ) )
+    queue.Enable()
+    assert_that( queue.Poll( 0 ), equal_to( True ) )
+
+    queue.Put( '/foo', [ 'old' ] )
+    queue.Put( '/bar', [] )
+    queue.Put( '/foo', [ 'new' ] )
+
+    assert_that( queue.Poll( 0 ), contains_exactly(
+      { 'filepath': '/bar', 'diagnostics': [] },
+      { 'filepath': '/foo', 'diagnostics': [ 'new' ] } ) )
+    assert_that( queue.Poll( 0 ), equal_to( True ) )
+
+
+  @SharedYcmd
+  def test_EventNotification_AsynchronousFileReadyToParse( self, app ):
+    with PatchCompleter( DiagnosticsCompleter, filetype = 'dummy_filetype' ):
+      request = BuildRequest( contents = 'foo',
+                              filetype = 'dummy_filetype',
+                              event_name = 'FileReadyToParse' )
+      assert_that( app.post_json( '/event_notification', request ).json,
+                   equal_to( [ { 'text': 'foo' } ] ) )
+
+      # Polling is not supported until an asynchronous event is sent.
+      response = app.post_json( '/receive_messages',
+                                BuildRequest( filetype = 'dummy_filetype' ) )
+      assert_that( response.json, equal_to( False ) )
+
+      request = BuildRequest( contents = 'bar',
+                              filetype = 'dummy_filetype',
+                              event_name = 'FileReadyToParse',
+                              asynchronous = True )
+      assert_that( app.post_json( '/event_notification', request ).json,
+                   equal_to( {} ) )
+      assert_that( handlers._parse_queue.WaitUntilEmpty( 10 ),
+                   equal_to( True ) )
+
+      response = app.post_json( '/receive_messages',
+                                BuildRequest( filetype = 'dummy_filetype' ) )
+      assert_that( response.json, contains_exactly(
+        has_entries( { 'filepath': '/foo',
+                       'diagnostics': [ { 'text': 'bar' } ] } ) ) )
+
+
+  @SharedYcmd
+  def test_EventNotification_AsynchronousFileReadyToParse_Error( self, app ):
+    with PatchCompleter( DiagnosticsCompleter, filetype = 'dummy_filetype' ):
+      request = BuildRequest( contents = 'unknown extra conf',
+                              filetype = 'dummy_filetype',
+                              event_name = 'FileReadyToParse',
+                              asynchronous = True )
+      assert_that( app.post_json( '/event_notification', request ).json,
+                   equal_to( {} ) )
+      assert_that( handlers._parse_queue.WaitUntilEmpty( 10 ),
+                   equal_to( True ) )
+
+      response = app.post_json( '/receive_messages',
+                                BuildRequest( filetype = 'dummy_filetype' ) )
+      assert_that( response.json, contains_exactly(
+        has_entries( {
+          'filepath': '/foo',
+          'error': has_entries( {
+            'exception': has_entries( {
+              'TYPE': 'UnknownExtraConf',
+              'extra_conf_file': '/.ycm_extra_conf.py' } ),
+            'message': contains_string( '/.ycm_extra_conf.py' ) } ) } ) ) )
+
+
+  @SharedYcmd
+  def test_EventNotification_AsynchronousFileReadyToParse_ErrorNoQueue(
+      self, app ):
+    with PatchCompleter( ErrorCompleter, filetype = 'dummy_filetype' ):
+      request = BuildRequest( filetype = 'dummy_filetype',
+                              event_name = 'FileReadyToParse',
+                              asynchronous = True )
+      app.post_json( '/event_notification', request )
+      assert_that( handlers._parse_queue.WaitUntilEmpty( 10 ),
+                   equal_to( True ) )
+
+      # The completer doesn't support polling, but the error is still returned.
+      response = app.post_json( '/receive_messages',
+                                BuildRequest( filetype = 'dummy_filetype' ) )
+      assert_that( response.json, contains_exactly(
+        has_entries( {
+          'filepath': '/foo',
+          'error': has_entries( {
+            'exception': has_entries( { 'TYPE': 'UnknownExtraConf' } ) } )
+        } ) ) )
+      response = app.post_json( '/receive_messages',
+                                BuildRequest( filetype = 'dummy_filetype' ) )
+      assert_that( response.json, equal_to( False ) )
@@ -0,0 +1,294 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import ( assert_that, calling, contains_exactly, empty,
+                       equal_to, has_entries, has_items, has_key, is_not,
+                       raises )
+from threading import Event
+from unittest import TestCase
+from unittest.mock import patch
+import json
+
+from ycmd.completers.all.identifier_completer import IdentifierCompleter
+from ycmd.completers.completer_utils import FilterAndSortCandidatesWrap
+from ycmd.completers.language_server import language_server_protocol as lsp
+from ycmd.completers.language_server.language_server_completer import (
+  LanguageServerConnection,
+  ResponseAbortedException,
+  ResponseTimeoutException )
+from ycmd.request_cancellation import ( CancellationToken,
+                                        RaiseIfCancelled,
+                                        RequestGenerations,
+                                        RequestSuperseded )
+from ycmd.tests import SharedYcmd
+from ycmd.tests.test_utils import ( BuildRequest, CompletionEntryMatcher,
+                                    DummyCompleter, PatchCompleter )
+from ycmd.utils import StartThread, ToUnicode
+
+
+class MockConnection( LanguageServerConnection ):
+  def __init__( self ):
+    super().__init__( None, None, None )
+    self.sent = []
+
+
+  def TryServerConnectionBlocking( self ):
+    return True # pragma: no cover
+
+
+  def IsConnected( self ):
+    return True # pragma: no cover
+
+
+  def WriteData( self, data ):
+    self.sent.append( json.loads( ToUnicode( data ).split( '\r\n\r\n' )[ 1 ] ) )
+
+
+  def ReadData( self, size = -1 ):
+    return bytes() # pragma: no cover
+
+
+class SupersededCompleter( DummyCompleter ):
+  def ComputeSignatures( self, request_data ):
+    raise RequestSuperseded()
+
+
+  def ComputeSemanticTokens( self, request_data ):
+    raise RequestSuperseded()
+
+
+  def ComputeInlayHints( self, request_data ):
+    raise RequestSuperseded()
+
+
+  def GetSubcommandsMap( self ):
+    return {
+      'GetDoc': lambda self, request_data, args: self._Superseded()
+    }
+
+
+  def _Superseded( self ):
+    raise RequestSuperseded()
+
+
+class RequestCancellationTest( TestCase ):
+  def test_CancellationToken_CallbacksAreCalledOnce( self ):
+    token = CancellationToken()
+    calls = []
+    token.OnCancel( lambda: calls.append( 'first' ) )
+    unregister = token.OnCancel( lambda: calls.append( 'unregistered' ) )
+    unregister()
+
+    assert_that( token.IsCancelled(), equal_to( False ) )
+    token.Cancel()
+    token.Cancel()
+    assert_that( token.IsCancelled(), equal_to( True ) )
+    assert_that( calls, contains_exactly( 'first' ) )
+
+    # Callbacks registered after the cancellation are called right away.
+    token.OnCancel( lambda: calls.append( 'late' ) )
+    assert_that( calls, contains_exactly( 'first', 'late' ) )
+
+
+  def test_RequestGenerations_NewRequestCancelsPrevious( self ):
+    generations = RequestGenerations()
+    first = generations.Start( { 'filepath': '/foo' } )
+    other_buffer = generations.Start( { 'filepath': '/bar' } )
+    other_client = generations.Start( { 'filepath': '/foo',
+                                        'client_id': 'other' } )
+    second = generations.Start( { 'filepath': '/foo' } )
+
+    assert_that( first.IsCancelled(), equal_to( True ) )
+    assert_that( first.generation, equal_to( 1 ) )
+    assert_that( second.generation, equal_to( 2 ) )
+    for token in [ second, other_buffer, other_client ]:
+      assert_that( token.IsCancelled(), equal_to( False ) )
+
+    assert_that( calling( RaiseIfCancelled ).with_args(
+                   { 'cancellation_token': first } ),
+                 raises( RequestSuperseded ) )
+    RaiseIfCancelled( { 'cancellation_token': second } )
+    RaiseIfCancelled( {} )
+
+
+  def test_RequestGenerations_FinishedRequestIsNotCancelled( self ):
+    generations = RequestGenerations()
+    first = generations.Start( { 'filepath': '/foo' } )
+    generations.Finish( { 'filepath': '/foo' }, first )
+    generations.Start( { 'filepath': '/foo' } )
+
+    assert_that( first.IsCancelled(), equal_to( False ) )
+
+
+  def test_RequestGenerations_RemoveCancelsRequest( self ):
+    generations = RequestGenerations()
+    token = generations.Start( { 'filepath': '/foo' } )
+    generations.Remove( { 'filepath': '/foo' } )
+
+    assert_that( token.IsCancelled(), equal_to( True ) )
+
+
+  def test_FilterAndSortCandidates_Cancelled( self ):
+    token = CancellationToken()
+    candidates = [ 'foo', 'bar', 'foobar' ]
+    assert_that( FilterAndSortCandidatesWrap( candidates, '', 'fo', 0, token ),
+                 contains_exactly( 'foo', 'foobar' ) )
+
+    token.Cancel()
+    assert_that( FilterAndSortCandidatesWrap( candidates, '', 'fo', 0, token ),
+                 empty() )
+
+
+  def test_LanguageServerConnection_CancelRequest( self ):
+    connection = MockConnection()
+    response = connection.GetResponseAsync( 1, lsp.Shutdown( 1 ) )
+    connection.CancelRequest( 1 )
+
+    assert_that( calling( response.AwaitResponse ).with_args( 0 ),
+                 raises( ResponseAbortedException ) )
+    assert_that( connection.sent[ -1 ],
+                 has_entries( { 'method': '$/cancelRequest',
+                                'params': { 'id': 1 } } ) )
+
+    # The response sent by the server anyway is ignored and cancelling a request
+    # which already completed does nothing.
+    connection._DispatchMessage( { 'id': 1, 'result': None } )
+    connection.CancelRequest( 1 )
+    assert_that( connection.sent, equal_to( connection.sent[ : 2 ] ) )
+
+
+  def test_LanguageServerConnection_CancelRequestOnTimeout( self ):
+    connection = MockConnection()
+    assert_that(
+      calling( connection.GetResponse ).with_args(
+        1, lsp.BuildRequest( 1, 'textDocument/hover', {} ), 0 ),
+      raises( ResponseTimeoutException ) )
+
+    assert_that( connection.sent[ -1 ],
+                 has_entries( { 'method': '$/cancelRequest',
+                                'params': { 'id': 1 } } ) )
+    assert_that( connection._responses, empty() )
+
+    # The late response is ignored.
+    connection._DispatchMessage( { 'id': 1, 'result': None } )
+
+
+  def test_LanguageServerConnection_SupersedeRequest( self ):
+    connection = MockConnection()
+
+    def Request( request_id, method, filepath ):
+      return connection.GetResponseAsync(
+        request_id,
+        lsp.BuildRequest( request_id, method, {} ),
+        superseding_document = filepath )
+
+    first = Request( 1, 'textDocument/hover', '/foo' )
+    # Requests for other documents or of another kind don't supersede it.
+    Request( 2, 'textDocument/hover', '/bar' )
+    Request( 3, 'textDocument/signatureHelp', '/foo' )
+    assert_that( connection.sent, equal_to( connection.sent[ : 3 ] ) )
+
+    second = Request( 4, 'textDocument/hover', '/foo' )
+    assert_that( calling( first.AwaitResponse ).with_args( 0 ),
+                 raises( RequestSuperseded ) )
+    assert_that( connection.sent[ 3 ],
+                 has_entries( { 'method': '$/cancelRequest',
+                                'params': { 'id': 1 } } ) )
+
+    connection._DispatchMessage( { 'id': 1, 'result': 'late' } )
+    connection._DispatchMessage( { 'id': 4, 'result': 'hover' } )
+    assert_that( second.AwaitResponse( 0 ),
+                 has_entries( { 'result': 'hover' } ) )
+    assert_that( connection._responses.keys(), contains_exactly( 2, 3 ) )
+    assert_that( connection._superseding_requests, equal_to( {
+      ( 'textDocument/hover', '/bar' ): 2,
+      ( 'textDocument/signatureHelp', '/foo' ): 3 } ) )
+
+
+  @SharedYcmd
+  def test_GetCompletions_Superseded( self, app ):
+    started = Event()
+    compute_candidates = IdentifierCompleter.ComputeCandidates
+
+    def SlowComputeCandidates( self, request_data ):
+      if not started.is_set():
+        # Wait for the next request to cancel this one.
+        cancelled = Event()
+        request_data[ 'cancellation_token' ].OnCancel( cancelled.set )
+        started.set()
+        cancelled.wait( 10 )
+        RaiseIfCancelled( request_data )
+      return compute_candidates( self, request_data )
+
+    app.post_json( '/event_notification',
+                   BuildRequest( contents = 'foobar foozoo\n',
+                                 event_name = 'FileReadyToParse' ) )
+    request = BuildRequest( contents = 'foobar foozoo\nfo',
+                            line_num = 2,
+                            column_num = 3 )
+
+    with patch.object( IdentifierCompleter,
+                       'ComputeCandidates',
+                       SlowComputeCandidates ):
+      responses = []
+      thread = StartThread(
+        lambda: responses.append( app.post_json( '/completions',
+                                                 request ).json ) )
+      started.wait( 10 )
+
+      # Requests for other buffers don't supersede it.
+      other = app.post_json( '/completions',
+                             BuildRequest( filepath = '/bar',
+                                           contents = 'foobar' ) ).json
+      assert_that( started.is_set(), equal_to( True ) )
+      assert_that( other, is_not( has_key( 'superseded' ) ) )
+
+      response = app.post_json( '/completions', request ).json
+      thread.join()
+
+    assert_that( responses[ 0 ], has_entries( { 'completions': empty(),
+                                                'superseded': True } ) )
+    assert_that( response, is_not( has_key( 'superseded' ) ) )
+    assert_that( response[ 'completions' ],
+                 has_items( CompletionEntryMatcher( 'foobar' ),
+                            CompletionEntryMatcher( 'foozoo' ) ) )
+
+
+  @SharedYcmd
+  def test_SupersededRequests_AreMarked( self, app ):
+    request = BuildRequest( filetype = 'dummy_filetype' )
+    with PatchCompleter( SupersededCompleter, 'dummy_filetype' ):
+      assert_that(
+        app.post_json( '/signature_help', request ).json,
+        has_entries( { 'signature_help': has_entries( {
+                         'signatures': empty() } ),
+                       'errors': empty(),
+                       'superseded': True } ) )
+      assert_that(
+        app.post_json( '/semantic_tokens', request ).json,
+        has_entries( { 'semantic_tokens': empty(),
+                       'errors': empty(),
+                       'superseded': True } ) )
+      assert_that(
+        app.post_json( '/inlay_hints', request ).json,
+        has_entries( { 'inlay_hints': empty(),
+                       'errors': empty(),
+                       'superseded': True } ) )
+
+      request[ 'command_arguments' ] = [ 'GetDoc' ]
+      assert_that( app.post_json( '/run_completer_command', request ).json,
+                   equal_to( { 'superseded': True } ) )
@@ -0,0 +1,213 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import ( assert_that, contains_exactly, contains_string, equal_to,
+                       greater_than_or_equal_to, has_entries, has_length,
+                       is_not, matches_regexp )
+from base64 import b64encode
+from unittest import TestCase
+from webtest import TestApp
+import bottle
+import json
+import os
+
+from ycmd import handlers, hmac_utils
+from ycmd.hmac_plugin import HmacPlugin
+from ycmd.request_recorder import Anonymizer, RequestRecorder
+from ycmd.tests import SharedYcmd
+from ycmd.tests.test_utils import BuildRequest, TemporaryTestDir
+from ycmd.utils import ToBytes
+
+
+def ReadRecording( path ):
+  with open( path, encoding = 'utf-8' ) as recording:
+    return [ json.loads( line ) for line in recording ]
+
+
+class RequestRecorderTest( TestCase ):
+  def test_Anonymizer_AnonymizeText( self ):
+    anonymizer = Anonymizer()
+    text = 'foo( bar, 42 ); // fôo foo\n'
+    anonymized = anonymizer.AnonymizeText( text )
+
+    assert_that( len( ToBytes( anonymized ) ),
+                 equal_to( len( ToBytes( text ) ) ) )
+    assert_that( anonymized, matches_regexp(
+      r'^([a-z]{3})\( [a-z]{3}, \d\d \); // [a-z]{4} \1\n$' ) )
+    assert_that( anonymized, is_not( equal_to( text ) ) )
+    assert_that( anonymizer.AnonymizeText( 'bar' ),
+                 equal_to( anonymized[ 5 : 8 ] ) )
+
+
+  def test_Anonymizer_AnonymizeRequest( self ):
+    anonymizer = Anonymizer()
+    request = {
+      'filepath': '/src/foo.cpp',
+      'line_num': 1,
+      'file_data': {
+        '/src/foo.cpp': { 'filetypes': [ 'cpp' ], 'contents': 'int foo;' },
+        '/src/bar.h': { 'filetypes': [ 'cpp' ],
+                        'changes': [ { 'start': 0, 'end': 0, 'text': 'x' } ] }
+      }
+    }
+    anonymized = anonymizer.AnonymizeRequest( request )
+    filepath = anonymized[ 'filepath' ]
+
+    assert_that( filepath, matches_regexp( r'^/[a-z]{3}/[a-z]{3}\.cpp$' ) )
+    assert_that( anonymized, has_entries( { 'line_num': 1 } ) )
+    assert_that( anonymized[ 'file_data' ], has_length( 2 ) )
+    assert_that( anonymized[ 'file_data' ][ filepath ], has_entries( {
+      'filetypes': [ 'cpp' ],
+      'contents': matches_regexp( r'^[a-z]{3} [a-z]{3};$' ) } ) )
+    # The original request is not modified.
+    assert_that( request[ 'filepath' ], equal_to( '/src/foo.cpp' ) )
+
+
+  def test_Anonymizer_AnonymizeRequest_OtherFields( self ):
+    anonymizer = Anonymizer()
+    anonymized = anonymizer.AnonymizeRequest( {
+      'event_name': 'FileReadyToParse',
+      'completer_target': 'filetype_default',
+      'command_arguments': [ 'RefactorRename', 'secret_name' ],
+      'extra_conf_data': { 'project': [ 'confidential' ] },
+      'force_semantic': True
+    } )
+
+    assert_that( anonymized, equal_to( {
+      'event_name': 'FileReadyToParse',
+      'completer_target': 'filetype_default',
+      'command_arguments': [ 'RefactorRename',
+                             anonymizer.AnonymizeText( 'secret_name' ) ],
+      'extra_conf_data': {
+        'project': [ anonymizer.AnonymizeText( 'confidential' ) ] },
+      'force_semantic': True
+    } ) )
+
+
+  def test_RequestRecorder_Record( self ):
+    with TemporaryTestDir() as tmp_dir:
+      path = os.path.join( tmp_dir, 'recording.jsonl' )
+      recorder = RequestRecorder( path )
+      recorder.Record( 'GET', '/healthy?subserver=cpp', b'' )
+      recorder.Record( 'POST', '/completions', b'{"line_num": 1}' )
+      recorder.Record( 'POST', '/completions', b'not json' )
+      recorder.Close()
+
+      assert_that( ReadRecording( path ), contains_exactly(
+        has_entries( { 'method': 'GET',
+                       'path': '/healthy?subserver=cpp',
+                       'body': None } ),
+        has_entries( { 'method': 'POST',
+                       'path': '/completions',
+                       'body': { 'line_num': 1 } } ) ) )
+
+
+  def test_RequestRecorder_OnlyAuthenticatedRequests( self ):
+    app = bottle.Bottle()
+    app.install( HmacPlugin( b'secret' ) )
+
+    @app.post( '/foo' )
+    def Foo():
+      return 'foo'
+
+    with TemporaryTestDir() as tmp_dir:
+      path = os.path.join( tmp_dir, 'recording.jsonl' )
+      recorder = RequestRecorder( path )
+      app.install( recorder )
+      test_app = TestApp( app )
+      body = b'{"authenticated": true}'
+      test_app.post( '/foo', body, headers = {
+        'x-ycm-hmac': b64encode( hmac_utils.CreateRequestHmac(
+          b'POST', b'/foo', body, b'secret' ) ).decode() } )
+      test_app.post( '/foo',
+                     b'{"authenticated": false}',
+                     headers = { 'x-ycm-hmac': b64encode( b'bad' ).decode() },
+                     status = 401 )
+      test_app.post( '/foo', b'{"authenticated": false}', status = 401 )
+      recorder.Close()
+      # Requests recorded after Close are dropped.
+      recorder.Record( 'POST', '/foo', body )
+
+      assert_that( ReadRecording( path ), contains_exactly(
+        has_entries( { 'path': '/foo',
+                       'body': { 'authenticated': True } } ) ) )
+
+
+  @SharedYcmd
+  def test_RecordRequest_Handler( self, app ):
+    with TemporaryTestDir() as tmp_dir:
+      path = os.path.join( tmp_dir, 'recording.jsonl' )
+      recorder = RequestRecorder( path, anonymize = True )
+      handlers.SetRequestRecorder( recorder )
+      try:
+        app.get( '/healthy', { 'include_subservers': '1' } )
+        app.post_json( '/event_notification',
+                       BuildRequest( contents = 'foo bar',
+                                     event_name = 'FileReadyToParse' ) )
+      finally:
+        handlers.SetRequestRecorder( None )
+        recorder.Close()
+
+      recording = ReadRecording( path )
+      assert_that( recording, contains_exactly(
+        has_entries( { 'method': 'GET',
+                       'path': '/healthy?include_subservers=1',
+                       'body': None } ),
+        has_entries( { 'method': 'POST',
+                       'path': '/event_notification',
+                       'body': has_entries( {
+                         'event_name': 'FileReadyToParse',
+                         'filepath': matches_regexp( r'^/[a-z]+$' )
+                       } ) } ) ) )
+      body = recording[ 1 ][ 'body' ]
+      assert_that( body[ 'file_data' ][ body[ 'filepath' ] ][ 'contents' ],
+                   matches_regexp( r'^[a-z]{3} [a-z]{3}$' ) )
+      assert_that( recording[ 1 ][ 'time' ],
+                   greater_than_or_equal_to( recording[ 0 ][ 'time' ] ) )
+
+
+  @SharedYcmd
+  def test_RecordRequest_FilterAndSortCandidates( self, app ):
+    with TemporaryTestDir() as tmp_dir:
+      path = os.path.join( tmp_dir, 'recording.jsonl' )
+      recorder = RequestRecorder( path, anonymize = True )
+      handlers.SetRequestRecorder( recorder )
+      try:
+        app.post_json( '/filter_and_sort_candidates', {
+          'candidates': [ { 'word': 'privateIdentifier', 'menu': 'hidden' },
+                          { 'word': 'secretFunction', 'menu': 'internal' } ],
+          'sort_property': 'word',
+          'query': 'secret'
+        } )
+      finally:
+        handlers.SetRequestRecorder( None )
+        recorder.Close()
+
+      with open( path, encoding = 'utf-8' ) as recording:
+        contents = recording.read()
+      for identifier in [ 'privateIdentifier', 'hidden', 'secretFunction',
+                          'internal', 'secret' ]:
+        assert_that( contents, is_not( contains_string( identifier ) ) )
+      candidate = has_entries( { 'word': matches_regexp( '^[a-z]+$' ),
+                                 'menu': matches_regexp( '^[a-z]+$' ) } )
+      assert_that( ReadRecording( path ), contains_exactly(
+        has_entries( { 'path': '/filter_and_sort_candidates',
+                       'body': has_entries( {
+                         'candidates': contains_exactly( candidate,
+                                                         candidate ),
+                         'sort_property': 'word',
+                         'query': matches_regexp( '^[a-z]{6}$' ) } ) } ) ) )
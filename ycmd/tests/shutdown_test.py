@@ -49,6 +49,23 @@ class ShutdownTest( ClientTest ):
     self.AssertLogfilesAreRemoved()
 
 
+  @ClientTest.CaptureLogfiles
+  def test_FromHandlerWithoutSubserver_PooledServer( self ):
+    self.Start( server_threads = 2 )
+    self.AssertServersAreRunning()
+
+    try:
+      response = self.PostRequest( 'shutdown' )
+      response.raise_for_status()
+      self.AssertResponse( response )
+      assert_that( response.json(), equal_to( True ) )
+    except requests.exceptions.ConnectionError:
+      pass
+
+    self.AssertServersShutDown( timeout = SUBSERVER_SHUTDOWN_TIMEOUT )
+    self.AssertLogfilesAreRemoved()
+
+
   @ClientTest.CaptureLogfiles
   def test_FromHandlerWithSubservers( self ):
     self.Start()
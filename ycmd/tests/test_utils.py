@@ -59,7 +59,9 @@ TESTS_DIR = os.path.abspath( os.path.dirname( __file__ ) )
 TEST_OPTIONS = {
   # The 'client' represented by the tests supports on-demand resolve, but the
   # server default config doesn't for backward compatibility
-  'max_num_candidates_to_detail': 10
+  'max_num_candidates_to_detail': 10,
+  # The buffers of the tests must not be saved in the cache of the user.
+  'persist_buffer_identifiers': 0
 }
 
 WindowsOnly = skipIf( not OnWindows(), 'Windows only' )
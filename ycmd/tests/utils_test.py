@@ -127,6 +127,39 @@ class UtilsTest( TestCase ):
     )
 
 
+  def test_CommonPrefixLength( self ):
+    for a, b, length in [
+      ( '', '', 0 ),
+      ( 'abc', '', 0 ),
+      ( 'abc', 'abc', 3 ),
+      ( 'abcd', 'abxd', 2 ),
+      ( 'abc', 'abcdef', 3 ),
+      ( 'xbc', 'abc', 0 ),
+    ]:
+      with self.subTest( a = a, b = b ):
+        assert_that( utils.CommonPrefixLength( a, b ), equal_to( length ) )
+        assert_that( utils.CommonPrefixLength( b, a ), equal_to( length ) )
+
+
+  def test_CommonSuffixLength( self ):
+    for a, b, max_length, length in [
+      ( '', '', None, 0 ),
+      ( 'abc', '', None, 0 ),
+      ( 'abc', 'abc', None, 3 ),
+      ( 'abcd', 'axcd', None, 2 ),
+      ( 'def', 'abcdef', None, 3 ),
+      ( 'abx', 'abc', None, 0 ),
+      # The common suffix doesn't overlap the common prefix.
+      ( 'aa', 'aaa', 0, 0 ),
+      ( 'abab', 'ababab', 2, 2 ),
+    ]:
+      with self.subTest( a = a, b = b, max_length = max_length ):
+        assert_that( utils.CommonSuffixLength( a, b, max_length ),
+                     equal_to( length ) )
+        assert_that( utils.CommonSuffixLength( b, a, max_length ),
+                     equal_to( length ) )
+
+
   def test_RemoveIfExists_Exists( self ):
     tempfile = PathToTestFile( 'remove-if-exists' )
     open( tempfile, 'a' ).close()
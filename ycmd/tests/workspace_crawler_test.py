@@ -0,0 +1,247 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+from hamcrest import ( assert_that, contains_inanyorder, equal_to,
+                       has_entries, has_item, has_length, is_not )
+from unittest import TestCase
+from unittest.mock import patch
+
+from ycmd import identifier_utils
+from ycmd.completers.all.identifier_completer import IdentifierCompleter
+from ycmd.completers.all.workspace_crawler import ( FindProjectRoot,
+                                                    GitIgnore,
+                                                    IsIgnored,
+                                                    WorkspaceCrawler )
+from ycmd.request_wrap import RequestWrap
+from ycmd.tests.test_utils import BuildRequest, TemporaryTestDir
+from ycmd.user_options_store import DefaultOptions
+
+
+def WriteFiles( root, files ):
+  for path, contents in files.items():
+    filepath = os.path.join( root, *path.split( '/' ) )
+    os.makedirs( os.path.dirname( filepath ), exist_ok = True )
+    with open( filepath, 'w' ) as f:
+      f.write( contents )
+
+
+def Options( index_directory, **options ):
+  user_options = DefaultOptions()
+  user_options[ 'workspace_index_path' ] = index_directory
+  user_options.update( options )
+  return user_options
+
+
+def FileReadyToParse( crawler, filepath, filetype, contents = '' ):
+  crawler.OnFileReadyToParse( RequestWrap( BuildRequest(
+    filepath = filepath,
+    filetype = filetype,
+    contents = contents ) ) )
+
+
+class WorkspaceCrawlerTest( TestCase ):
+  def test_GitIgnore_Patterns( self ):
+    gitignore = GitIgnore( '/root', [
+      '# comment',
+      '',
+      '*.o',
+      'build/',
+      '/TODO',
+      'doc/**/*.html',
+      '!important.o',
+      'foo[0-9].txt',
+      '\\#bar',
+    ] )
+    for path, is_dir, expected in [
+      ( 'main.o', False, True ),
+      ( 'src/main.o', False, True ),
+      ( 'src/important.o', False, False ),
+      ( 'build', True, True ),
+      ( 'src/build', True, True ),
+      ( 'build', False, None ),
+      ( 'TODO', False, True ),
+      ( 'src/TODO', False, None ),
+      ( 'doc/index.html', False, True ),
+      ( 'doc/api/v1/index.html', False, True ),
+      ( 'src/doc/index.html', False, None ),
+      ( 'foo1.txt', False, True ),
+      ( 'fooa.txt', False, None ),
+      ( '#bar', False, True ),
+      ( 'main.c', False, None ),
+    ]:
+      with self.subTest( path = path, is_dir = is_dir ):
+        assert_that( gitignore.Match( path, is_dir ), equal_to( expected ) )
+
+
+  def test_GitIgnore_DeeperFilesWin( self ):
+    gitignores = [ GitIgnore( '/root', [ '*.log' ] ),
+                   GitIgnore( os.path.join( '/root', 'src' ),
+                              [ '!keep.log' ] ) ]
+    root = os.path.join( '/root', 'src' )
+    assert_that( IsIgnored( gitignores, os.path.join( root, 'keep.log' ),
+                            False ),
+                 equal_to( False ) )
+    assert_that( IsIgnored( gitignores, os.path.join( root, 'other.log' ),
+                            False ),
+                 equal_to( True ) )
+    assert_that( IsIgnored( gitignores, os.path.join( root, 'main.c' ),
+                            False ),
+                 equal_to( False ) )
+
+
+  def test_FindProjectRoot( self ):
+    with TemporaryTestDir() as root:
+      os.mkdir( os.path.join( root, '.git' ) )
+      os.makedirs( os.path.join( root, 'src', 'lib' ) )
+      assert_that( FindProjectRoot( os.path.join( root, 'src', 'lib' ) ),
+                   equal_to( root ) )
+
+
+  def test_WorkspaceCrawler_IndexesProjectFiles( self ):
+    with TemporaryTestDir() as root, TemporaryTestDir() as index_directory:
+      os.mkdir( os.path.join( root, '.git' ) )
+      WriteFiles( root, {
+        '.gitignore': 'build/\n*.gen.py\n',
+        'main.py': 'def main(): pass',
+        'lib/util.py': 'class Util: # comment_identifier\n  pass',
+        'lib/.gitignore': '!keep.gen.py\n',
+        'lib/keep.gen.py': 'kept_identifier = 1',
+        'lib/drop.gen.py': 'dropped_identifier = 1',
+        'build/out.py': 'built_identifier = 1',
+        'large.py': 'large_identifier = 1' + ' ' * 1000,
+        'notes.txt': 'some notes',
+      } )
+      added = {}
+
+      def AddIdentifiers( filetype_identifier_map ):
+        for filetype, identifiers in filetype_identifier_map.items():
+          added.setdefault( filetype, {} ).update( identifiers )
+
+      crawler = WorkspaceCrawler(
+        AddIdentifiers,
+        Options( index_directory, workspace_index_max_file_size = 1000 ) )
+      FileReadyToParse( crawler, os.path.join( root, 'main.py' ), 'python' )
+      assert_that( crawler.WaitUntilIdle( 10 ) )
+
+      assert_that( added, has_entries( { 'python': has_entries( {
+        os.path.join( root, 'main.py' ): contains_inanyorder(
+          'def', 'main', 'pass' ),
+        os.path.join( root, 'lib', 'util.py' ): contains_inanyorder(
+          'class', 'Util', 'pass' ),
+        os.path.join( root, 'lib', 'keep.gen.py' ): contains_inanyorder(
+          'kept_identifier' ),
+      } ) } ) )
+      assert_that( added[ 'python' ], has_length( 3 ) )
+
+      # Text files are only indexed once the editor opened one.
+      FileReadyToParse( crawler, os.path.join( root, 'todo.txt' ), 'text' )
+      assert_that( crawler.WaitUntilIdle( 10 ) )
+      assert_that( added, has_entries( { 'text': has_entries( {
+        os.path.join( root, 'notes.txt' ): contains_inanyorder( 'some',
+                                                                'notes' ),
+      } ) } ) )
+
+
+  def test_WorkspaceCrawler_NoProjectRoot( self ):
+    with TemporaryTestDir() as root, TemporaryTestDir() as index_directory:
+      WriteFiles( root, { 'main.py': 'def main(): pass' } )
+      added = []
+      crawler = WorkspaceCrawler( added.append, Options( index_directory ) )
+      FileReadyToParse( crawler, os.path.join( root, 'main.py' ), 'python' )
+      assert_that( crawler.WaitUntilIdle( 10 ) )
+      assert_that( added, equal_to( [] ) )
+
+
+  def test_IdentifierCompleter_WorkspaceIdentifiers( self ):
+    with TemporaryTestDir() as root, TemporaryTestDir() as index_directory:
+      os.mkdir( os.path.join( root, '.git' ) )
+      WriteFiles( root, {
+        'main.py': 'def main(): pass',
+        'unopened.py': 'maintain = 1',
+      } )
+      completer = IdentifierCompleter(
+        Options( index_directory, index_workspace_identifiers = 1 ) )
+      # The buffer differs from the file on disk.
+      main = os.path.join( root, 'main.py' )
+      completer.OnFileReadyToParse( RequestWrap( BuildRequest(
+        filepath = main,
+        filetype = 'python',
+        contents = 'def main_buffer(): pass' ) ) )
+      assert_that( completer._workspace_crawler.WaitUntilIdle( 10 ) )
+
+      candidates = [ candidate[ 'insertion_text' ] for candidate in
+                     completer.ComputeCandidates( RequestWrap( BuildRequest(
+                       filepath = main,
+                       filetype = 'python',
+                       contents = 'ma',
+                       column_num = 3 ) ) ) ]
+      assert_that( candidates, has_item( 'maintain' ) )
+      assert_that( candidates, has_item( 'main_buffer' ) )
+      assert_that( candidates, is_not( has_item( 'main' ) ) )
+
+
+  def test_WorkspaceCrawler_IndexSurvivesRestarts( self ):
+    with TemporaryTestDir() as root, TemporaryTestDir() as index_directory:
+      os.mkdir( os.path.join( root, '.git' ) )
+      WriteFiles( root, {
+        'main.py': 'def main(): pass',
+        'changed.py': 'old_identifier = 1',
+        'removed.py': 'removed_identifier = 1',
+        'notes.txt': 'some notes',
+      } )
+      main = os.path.join( root, 'main.py' )
+      changed = os.path.join( root, 'changed.py' )
+      removed = os.path.join( root, 'removed.py' )
+      notes = os.path.join( root, 'notes.txt' )
+
+      crawler = WorkspaceCrawler( lambda identifiers: None,
+                                  Options( index_directory ) )
+      FileReadyToParse( crawler, main, 'python' )
+      FileReadyToParse( crawler, notes, 'text' )
+      assert_that( crawler.WaitUntilIdle( 10 ) )
+
+      WriteFiles( root, { 'changed.py': 'new_identifier = 1 + 2' } )
+      os.remove( removed )
+
+      # Only the changed file is read again after a restart.
+      added = {}
+
+      def AddIdentifiers( filetype_identifier_map ):
+        for filetype, identifiers in filetype_identifier_map.items():
+          added.setdefault( filetype, {} ).update( identifiers )
+
+      crawler = WorkspaceCrawler( AddIdentifiers, Options( index_directory ) )
+      with patch( 'ycmd.identifier_utils.ExtractIdentifiersFromText',
+                  wraps = identifier_utils.ExtractIdentifiersFromText ) as (
+             extract ):
+        FileReadyToParse( crawler, main, 'python' )
+        assert_that( crawler.WaitUntilIdle( 10 ) )
+      assert_that( extract.call_count, equal_to( 1 ) )
+
+      # The text files are indexed even though no text file was opened since
+      # the restart.
+      assert_that( added, has_entries( {
+        'python': has_entries( {
+          main: contains_inanyorder( 'def', 'main', 'pass' ),
+          changed: [ 'new_identifier' ],
+        } ),
+        'text': has_entries( {
+          notes: contains_inanyorder( 'some', 'notes' ),
+        } ),
+      } ) )
+      assert_that( added[ 'python' ], has_length( 2 ) )
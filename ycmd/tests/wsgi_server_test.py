@@ -0,0 +1,293 @@
+# Copyright (C) 2026 ycmd contributors
+#
+# This file is part of ycmd.
+#
+# ycmd is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# ycmd is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
+
+from hamcrest import assert_that, calling, equal_to, less_than, raises
+from http.client import HTTPConnection
+from threading import Event
+from unittest import TestCase
+from unittest.mock import patch
+import bottle
+import os
+import socket
+import stat
+import tempfile
+import time
+import unittest
+
+from ycmd.utils import OnWindows, StartThread
+from ycmd.wsgi_server import ( KEEP_ALIVE_TIMEOUT_SECONDS,
+                               PooledWSGIServer,
+                               UnixSocketPooledWSGIServer,
+                               UnixSocketStoppableWSGIServer )
+
+
+class UnixHTTPConnection( HTTPConnection ):
+  def __init__( self, path ):
+    super().__init__( 'localhost', timeout = 5 )
+    self._path = path
+
+
+  def connect( self ):
+    self.sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+    self.sock.settimeout( self.timeout )
+    self.sock.connect( self._path )
+
+
+def BuildApp( blocked, unblock ):
+  app = bottle.Bottle()
+
+  @app.get( '/echo' )
+  def Echo():
+    return bottle.request.query.value
+
+
+  @app.post( '/ignore_body' )
+  def IgnoreBody():
+    return 'ignored'
+
+
+  @app.post( '/body' )
+  def Body():
+    return bottle.request.body.read()
+
+
+  @app.get( '/block' )
+  def Block():
+    blocked.set()
+    unblock.wait()
+    return 'unblocked'
+
+  return app
+
+
+class PooledWSGIServerTest( TestCase ):
+  def setUp( self ):
+    self._blocked = Event()
+    self._unblock = Event()
+
+
+  def tearDown( self ):
+    self._unblock.set()
+    if self._server:
+      self._server.shutdown()
+      self._server.server_close()
+
+
+  def StartServer( self, num_threads = 2, queue_size = 4 ):
+    self._server = PooledWSGIServer( BuildApp( self._blocked,
+                                               self._unblock ),
+                                     '127.0.0.1',
+                                     0,
+                                     num_threads = num_threads,
+                                     queue_size = queue_size )
+    StartThread( self._server.serve_forever )
+    return HTTPConnection( '127.0.0.1', self._server.server_port, timeout = 5 )
+
+
+  def test_PooledWSGIServer_ReusesConnection( self ):
+    connection = self.StartServer()
+
+    connection.request( 'GET', '/echo?value=foo' )
+    response = connection.getresponse()
+    assert_that( response.version, equal_to( 11 ) )
+    assert_that( response.read(), equal_to( b'foo' ) )
+    sock = connection.sock
+
+    connection.request( 'GET', '/echo?value=bar' )
+    response = connection.getresponse()
+    assert_that( response.read(), equal_to( b'bar' ) )
+    assert_that( connection.sock, equal_to( sock ) )
+
+
+  def test_PooledWSGIServer_UnreadBodyIsDiscarded( self ):
+    connection = self.StartServer()
+
+    connection.request( 'POST', '/ignore_body', body = b'x' * 100000 )
+    assert_that( connection.getresponse().read(), equal_to( b'ignored' ) )
+
+    connection.request( 'POST', '/body', body = b'some body' )
+    assert_that( connection.getresponse().read(), equal_to( b'some body' ) )
+
+
+  def test_PooledWSGIServer_ConnectionClose( self ):
+    connection = self.StartServer()
+
+    connection.request( 'GET', '/echo?value=foo',
+                        headers = { 'Connection': 'close' } )
+    response = connection.getresponse()
+    assert_that( response.read(), equal_to( b'foo' ) )
+    assert_that( response.will_close, equal_to( True ) )
+
+
+  def test_PooledWSGIServer_RefusesConnectionsWhenQueueIsFull( self ):
+    blocked = self.StartServer( num_threads = 1, queue_size = 1 )
+    blocked.request( 'GET', '/block' )
+
+    # Wait for the only worker to pick up the blocking request before filling
+    # the queue.
+    self._blocked.wait()
+
+    queued = HTTPConnection( '127.0.0.1', self._server.server_port )
+    queued.request( 'GET', '/echo?value=queued' )
+    while not self._server._requests.qsize():
+      time.sleep( 0.01 )
+
+    refused = HTTPConnection( '127.0.0.1', self._server.server_port )
+    refused.request( 'GET', '/echo?value=refused' )
+    assert_that( refused.getresponse().status, equal_to( 503 ) )
+
+    self._unblock.set()
+    assert_that( blocked.getresponse().read(), equal_to( b'unblocked' ) )
+    blocked.close()
+    assert_that( queued.getresponse().read(), equal_to( b'queued' ) )
+
+
+
+  def test_PooledWSGIServer_IdleConnectionDoesNotHoldWorker( self ):
+    idle = self.StartServer( num_threads = 1 )
+    idle.request( 'GET', '/echo?value=idle' )
+    assert_that( idle.getresponse().read(), equal_to( b'idle' ) )
+
+    start = time.monotonic()
+    other = HTTPConnection( '127.0.0.1', self._server.server_port, timeout = 5 )
+    other.request( 'GET', '/echo?value=other' )
+    assert_that( other.getresponse().read(), equal_to( b'other' ) )
+    assert_that( time.monotonic() - start,
+                 less_than( KEEP_ALIVE_TIMEOUT_SECONDS / 2 ) )
+
+    # The idle connection can still be reused.
+    sock = idle.sock
+    idle.request( 'GET', '/echo?value=reused' )
+    assert_that( idle.getresponse().read(), equal_to( b'reused' ) )
+    assert_that( idle.sock, equal_to( sock ) )
+
+
+  @patch( 'ycmd.wsgi_server.KEEP_ALIVE_TIMEOUT_SECONDS', 0.1 )
+  def test_PooledWSGIServer_IdleConnectionIsClosed( self ):
+    connection = self.StartServer()
+    connection.request( 'GET', '/echo?value=foo' )
+    assert_that( connection.getresponse().read(), equal_to( b'foo' ) )
+
+    # The server closes the connection, so the client reads the end of stream.
+    assert_that( connection.sock.recv( 1 ), equal_to( b'' ) )
+
+
+  def test_PooledWSGIServer_QueueSizeMustBePositive( self ):
+    self._server = None
+    assert_that(
+      calling( PooledWSGIServer ).with_args( BuildApp( self._blocked,
+                                                       self._unblock ),
+                                             '127.0.0.1',
+                                             0,
+                                             num_threads = 1,
+                                             queue_size = 0 ),
+      raises( ValueError ) )
+
+
+@unittest.skipIf( OnWindows(), 'Unix sockets are not supported on Windows' )
+class UnixSocketWSGIServerTest( TestCase ):
+  def setUp( self ):
+    self._temp_dir = tempfile.TemporaryDirectory()
+    self._path = os.path.join( self._temp_dir.name, 'ycmd.sock' )
+    self._unblock = Event()
+    self._unblock.set()
+
+
+  def tearDown( self ):
+    self._temp_dir.cleanup()
+
+
+  def StartServer( self, server ):
+    StartThread( server.serve_forever )
+    return UnixHTTPConnection( self._path )
+
+
+  def StopServer( self, server ):
+    server.shutdown()
+    server.server_close()
+
+
+  def test_UnixSocketStoppableWSGIServer( self ):
+    server = UnixSocketStoppableWSGIServer( BuildApp( Event(),
+                                                      self._unblock ),
+                                            path = self._path )
+    try:
+      connection = self.StartServer( server )
+      connection.request( 'POST', '/body', body = b'some body' )
+      assert_that( connection.getresponse().read(), equal_to( b'some body' ) )
+    finally:
+      self.StopServer( server )
+
+    assert_that( os.path.exists( self._path ), equal_to( False ) )
+
+
+  def test_UnixSocketPooledWSGIServer_ReusesConnection( self ):
+    server = UnixSocketPooledWSGIServer( BuildApp( Event(), self._unblock ),
+                                         path = self._path,
+                                         num_threads = 2,
+                                         queue_size = 4 )
+    try:
+      connection = self.StartServer( server )
+      connection.request( 'GET', '/echo?value=foo' )
+      assert_that( connection.getresponse().read(), equal_to( b'foo' ) )
+      sock = connection.sock
+
+      connection.request( 'GET', '/echo?value=bar' )
+      assert_that( connection.getresponse().read(), equal_to( b'bar' ) )
+      assert_that( connection.sock, equal_to( sock ) )
+    finally:
+      self.StopServer( server )
+
+
+  def test_UnixSocketServer_OnlyAccessibleToOwner( self ):
+    server = UnixSocketStoppableWSGIServer( BuildApp( Event(),
+                                                      self._unblock ),
+                                            path = self._path )
+    try:
+      mode = os.stat( self._path ).st_mode
+      assert_that( stat.S_ISSOCK( mode ), equal_to( True ) )
+      assert_that( stat.S_IMODE( mode ), equal_to( 0o600 ) )
+    finally:
+      server.server_close()
+
+
+  def test_UnixSocketServer_ReplacesStaleSocket( self ):
+    with socket.socket( socket.AF_UNIX, socket.SOCK_STREAM ) as stale:
+      stale.bind( self._path )
+
+    server = UnixSocketStoppableWSGIServer( BuildApp( Event(),
+                                                      self._unblock ),
+                                            path = self._path )
+    try:
+      connection = self.StartServer( server )
+      connection.request( 'GET', '/echo?value=foo' )
+      assert_that( connection.getresponse().read(), equal_to( b'foo' ) )
+    finally:
+      self.StopServer( server )
+
+
+  def test_UnixSocketServer_DoesNotReplaceLiveSocket( self ):
+    server = UnixSocketStoppableWSGIServer( BuildApp( Event(),
+                                                      self._unblock ),
+                                            path = self._path )
+    try:
+      with self.assertRaises( OSError ):
+        UnixSocketStoppableWSGIServer( BuildApp( Event(), self._unblock ),
+                                       path = self._path )
+      assert_that( os.path.exists( self._path ), equal_to( True ) )
+    finally:
+      server.server_close()
@@ -117,7 +117,7 @@ def ToUnicode( value ):
     return ''
   if isinstance( value, str ):
     return value
-  if isinstance( value, bytes ):
+  if isinstance( value, ( bytes, bytearray, memoryview ) ):
     # All incoming text should be utf8
     return str( value, 'utf8' )
   return str( value )
@@ -394,6 +394,40 @@ def SplitLines( contents ):
   return contents.split( '\n' )
 
 
+def CommonPrefixLength( a, b ):
+  """Returns the length of the longest common prefix of the strings |a| and
+  |b|."""
+  # Binary search so that the strings are compared by slices, in C, rather than
+  # character by character.
+  low = 0
+  high = min( len( a ), len( b ) )
+  while low < high:
+    middle = ( low + high + 1 ) // 2
+    if a[ low : middle ] == b[ low : middle ]:
+      low = middle
+    else:
+      high = middle - 1
+  return low
+
+
+def CommonSuffixLength( a, b, max_length = None ):
+  """Returns the length of the longest common suffix of the strings |a| and
+  |b|, up to |max_length| characters. Passing the remaining length after the
+  common prefix prevents the prefix and suffix from overlapping."""
+  low = 0
+  high = min( len( a ), len( b ) )
+  if max_length is not None:
+    high = min( high, max_length )
+  while low < high:
+    middle = ( low + high + 1 ) // 2
+    if a[ len( a ) - middle : len( a ) - low ] == b[ len( b ) - middle :
+                                                    len( b ) - low ]:
+      low = middle
+    else:
+      high = middle - 1
+  return low
+
+
 def GetCurrentDirectory():
   """Returns the current directory as an unicode object. If the current
   directory does not exist anymore, returns the temporary folder instead."""
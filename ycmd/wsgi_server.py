@@ -15,8 +15,33 @@
 # You should have received a copy of the GNU General Public License
 # along with ycmd.  If not, see <http://www.gnu.org/licenses/>.
 
-from wsgiref.simple_server import WSGIServer, WSGIRequestHandler
-from socketserver import ThreadingMixIn
+import collections
+import os
+import queue
+import selectors
+import socket
+import stat
+import threading
+import time
+from wsgiref.simple_server import ServerHandler, WSGIServer, WSGIRequestHandler
+from socketserver import TCPServer, ThreadingMixIn
+
+from ycmd.utils import LOGGER, RemoveIfExists, StartThread
+
+# Number of seconds an idle keep-alive connection is kept open.
+KEEP_ALIVE_TIMEOUT_SECONDS = 5
+
+# A long poll of /receive_messages holds a worker thread while it waits, so a
+# single thread would leave none for the other requests.
+MIN_SERVER_THREADS = 2
+
+# Longest request line we accept, same limit as the one used by wsgiref.
+MAX_REQUEST_LINE_LENGTH = 65536
+
+_SERVICE_UNAVAILABLE_RESPONSE = ( b'HTTP/1.1 503 Service Unavailable\r\n'
+                                  b'Content-Length: 0\r\n'
+                                  b'Connection: close\r\n'
+                                  b'\r\n' )
 
 
 class StoppableWSGIServer( ThreadingMixIn, WSGIServer ):
@@ -25,3 +50,415 @@ class StoppableWSGIServer( ThreadingMixIn, WSGIServer ):
   def __init__( self, app, host, port ):
     super().__init__( ( host, port ), WSGIRequestHandler )
     self.set_app( app )
+
+
+class _KeepAliveServerHandler( ServerHandler ):
+  http_version = '1.1'
+  keep_alive = False
+
+
+  def cleanup_headers( self ):
+    super().cleanup_headers()
+    if self.request_handler.close_connection:
+      self.headers[ 'Connection' ] = 'close'
+
+  def close( self ):
+    # The connection can only be reused if the client knows where the response
+    # ends. Headers are reset by the base class so check them first.
+    self.keep_alive = ( self.headers is not None and
+                        'Content-Length' in self.headers )
+    super().close()
+
+
+class _BoundedInput:
+  """File-like wrapper around the connection's input stream which never reads
+  past the end of the current request body. Whatever the application leaves
+  unread is discarded with Drain() so that the next request on the same
+  connection starts at the right offset."""
+
+  def __init__( self, stream, length ):
+    self._stream = stream
+    self._remaining = length
+
+
+  def read( self, size = -1 ):
+    if size is None or size < 0 or size > self._remaining:
+      size = self._remaining
+    data = self._stream.read( size ) if size else b''
+    self._remaining -= len( data )
+    return data
+
+
+  def readline( self, size = -1 ):
+    if size is None or size < 0 or size > self._remaining:
+      size = self._remaining
+    data = self._stream.readline( size ) if size else b''
+    self._remaining -= len( data )
+    return data
+
+
+  def readlines( self, hint = -1 ):
+    return list( iter( self.readline, b'' ) )
+
+
+  def __iter__( self ):
+    return iter( self.readline, b'' )
+
+
+  def Drain( self ):
+    while self._remaining > 0:
+      if not self.read( min( self._remaining, 64 * 1024 ) ):
+        return False
+    return True
+
+
+class KeepAliveWSGIRequestHandler( WSGIRequestHandler ):
+  """HTTP/1.1 request handler of a persistent connection. Unlike other request
+  handlers, it doesn't serve the connection when created. Instead, the server
+  calls HandleRequest for each request sent over the connection, possibly from
+  different threads, and Close once the connection is done."""
+
+  protocol_version = 'HTTP/1.1'
+  timeout = KEEP_ALIVE_TIMEOUT_SECONDS
+
+
+  def __init__( self, request, client_address, server ):
+    self.request = request
+    self.client_address = client_address
+    self.server = server
+    self.setup()
+
+
+  def setup( self ):
+    # Headers and body are written separately, which otherwise makes every
+    # response on a reused TCP connection wait for the client's delayed ACK.
+    self.disable_nagle_algorithm = self.request.family in (
+      socket.AF_INET, socket.AF_INET6 )
+    super().setup()
+
+
+  def HandleRequest( self ):
+    """Serves the next request of the connection. Returns False if the
+    connection must be closed afterwards."""
+    self.close_connection = True
+    self.handle_one_request()
+    return not self.close_connection
+
+
+  def HasBufferedRequest( self ):
+    """Returns True if the next request was already received, in which case
+    waiting for the connection to become readable could block forever since
+    that request may already be in the input buffer."""
+    self.connection.settimeout( 0 )
+    try:
+      return bool( self.rfile.peek( 1 ) )
+    except OSError:
+      # Let HandleRequest deal with the error.
+      return True
+    finally:
+      self.connection.settimeout( self.timeout )
+
+
+  def Close( self ):
+    try:
+      self.finish()
+    except OSError:
+      pass
+
+
+  def handle_one_request( self ):
+    try:
+      self.raw_requestline = self.rfile.readline( MAX_REQUEST_LINE_LENGTH + 1 )
+    except ( socket.timeout, ConnectionError ):
+      self.close_connection = True
+      return
+
+    if not self.raw_requestline:
+      self.close_connection = True
+      return
+
+    if len( self.raw_requestline ) > MAX_REQUEST_LINE_LENGTH:
+      self.requestline = ''
+      self.request_version = ''
+      self.command = ''
+      self.send_error( 414 )
+      return
+
+    if not self.parse_request():
+      return
+
+    environ = self.get_environ()
+    try:
+      content_length = int( environ.get( 'CONTENT_LENGTH' ) or 0 )
+    except ValueError:
+      self.send_error( 400, 'Bad Content-Length' )
+      self.close_connection = True
+      return
+    body = _BoundedInput( self.rfile, content_length )
+
+    handler = _KeepAliveServerHandler( body,
+                                       self.wfile,
+                                       self.get_stderr(),
+                                       environ,
+                                       multithread = True )
+    handler.request_handler = self
+    handler.run( self.server.get_app() )
+
+    # An error while writing the response leaves the connection in an unknown
+    # state. The same goes for a body that could not be fully consumed.
+    if not handler.keep_alive or not body.Drain():
+      self.close_connection = True
+
+
+class _IdleConnections:
+  """Watches the keep-alive connections between two requests from a single
+  thread, so that they don't hold a worker thread meanwhile. The request handler
+  of a connection is passed to |on_ready| as soon as the next request arrives,
+  or to |on_expired| if none arrives within |timeout| seconds or when the
+  watcher is closed."""
+
+  def __init__( self, on_ready, on_expired, timeout ):
+    self._on_ready = on_ready
+    self._on_expired = on_expired
+    self._timeout = timeout
+    self._added = []
+    self._closed = False
+    self._lock = threading.Lock()
+    self._selector = selectors.DefaultSelector()
+    self._wakeup_receiver, self._wakeup_sender = socket.socketpair()
+    self._wakeup_receiver.setblocking( False )
+    self._wakeup_sender.setblocking( False )
+    self._selector.register( self._wakeup_receiver, selectors.EVENT_READ )
+    self._thread = StartThread( self._Run )
+
+
+  def Add( self, handler ):
+    """Returns False if the connection can't be watched because the watcher is
+    closed."""
+    with self._lock:
+      if self._closed:
+        return False
+      self._added.append( handler )
+    self._Wakeup()
+    return True
+
+
+  def Close( self ):
+    with self._lock:
+      self._closed = True
+    self._Wakeup()
+    self._thread.join()
+
+
+  def _Wakeup( self ):
+    try:
+      self._wakeup_sender.send( b'\0' )
+    except OSError:
+      # The buffer is full, so the thread will wake up anyway.
+      pass
+
+
+  def _Run( self ):
+    # The timeout is the same for all connections, so the deadlines are in
+    # insertion order.
+    deadlines = collections.OrderedDict()
+    while True:
+      with self._lock:
+        added, self._added = self._added, []
+        closed = self._closed
+      if closed:
+        break
+
+      now = time.monotonic()
+      for handler in added:
+        self._selector.register( handler.connection,
+                                 selectors.EVENT_READ,
+                                 handler )
+        deadlines[ handler ] = now + self._timeout
+      while deadlines:
+        handler, deadline = next( iter( deadlines.items() ) )
+        if deadline > now:
+          break
+        del deadlines[ handler ]
+        self._selector.unregister( handler.connection )
+        self._on_expired( handler )
+
+      timeout = next( iter( deadlines.values() ) ) - now if deadlines else None
+      for key, _ in self._selector.select( timeout ):
+        if key.data is None:
+          self._DrainWakeups()
+          continue
+        handler = key.data
+        del deadlines[ handler ]
+        self._selector.unregister( key.fileobj )
+        self._on_ready( handler )
+
+    for handler in list( deadlines ) + added:
+      self._on_expired( handler )
+    self._selector.close()
+    self._wakeup_receiver.close()
+    self._wakeup_sender.close()
+
+
+  def _DrainWakeups( self ):
+    try:
+      while self._wakeup_receiver.recv( 4096 ):
+        pass
+    except OSError:
+      pass
+
+
+class PooledWSGIServer( WSGIServer ):
+  """HTTP/1.1 server where connections are accepted by the main thread and their
+  requests are handed over to a fixed number of worker threads through a bounded
+  queue. A worker serves one request at a time, after which a keep-alive
+  connection is watched by a single thread until its next request arrives, so
+  that idle connections don't keep the workers from serving the others. When the
+  queue is full, requests are refused with a 503 response so that clients back
+  off instead of piling up work the server cannot keep up with."""
+
+  def __init__( self, app, host, port, num_threads, queue_size ):
+    if queue_size < 1:
+      # A queue of size 0 would be unbounded.
+      raise ValueError( 'The request queue size must be at least 1' )
+    super().__init__( ( host, port ), KeepAliveWSGIRequestHandler )
+    self.set_app( app )
+    self._requests = queue.Queue( maxsize = queue_size )
+    self._idle_connections = _IdleConnections(
+      on_ready = self._Dispatch,
+      on_expired = self._CloseConnection,
+      timeout = KEEP_ALIVE_TIMEOUT_SECONDS )
+    self._workers = [ StartThread( self._WorkerMain )
+                      for _ in range( num_threads ) ]
+
+
+  def process_request( self, request, client_address ):
+    try:
+      handler = self.RequestHandlerClass( request, client_address, self )
+    except Exception:
+      self.handle_error( request, client_address )
+      self.shutdown_request( request )
+      return
+    self._Dispatch( handler )
+
+
+  def _Dispatch( self, handler ):
+    try:
+      self._requests.put_nowait( handler )
+    except queue.Full:
+      LOGGER.warning( 'Request queue is full, refusing request from %s',
+                      handler.client_address )
+      self._RefuseRequest( handler )
+
+
+  def _RefuseRequest( self, handler ):
+    try:
+      handler.request.sendall( _SERVICE_UNAVAILABLE_RESPONSE )
+    except OSError:
+      pass
+    self._CloseConnection( handler )
+
+
+  def _CloseConnection( self, handler ):
+    handler.Close()
+    self.shutdown_request( handler.request )
+
+
+  def _WorkerMain( self ):
+    while True:
+      handler = self._requests.get()
+      if handler is None:
+        return
+      try:
+        keep_alive = handler.HandleRequest()
+      except Exception:
+        self.handle_error( handler.request, handler.client_address )
+        keep_alive = False
+
+      if not keep_alive:
+        self._CloseConnection( handler )
+      elif handler.HasBufferedRequest():
+        self._Dispatch( handler )
+      elif not self._idle_connections.Add( handler ):
+        self._CloseConnection( handler )
+
+
+  def server_close( self ):
+    super().server_close()
+    self._idle_connections.Close()
+    # Refuse requests still waiting in the queue and wake up the workers.
+    while True:
+      try:
+        handler = self._requests.get_nowait()
+      except queue.Empty:
+        break
+      if handler is not None:
+        self._RefuseRequest( handler )
+    for _ in self._workers:
+      self._requests.put( None )
+
+
+def _RemoveStaleUnixSocket( path ):
+  try:
+    if not stat.S_ISSOCK( os.stat( path ).st_mode ):
+      return
+  except OSError:
+    return
+
+  # Only remove the socket if no server is listening on it anymore.
+  with socket.socket( socket.AF_UNIX, socket.SOCK_STREAM ) as sock:
+    try:
+      sock.connect( path )
+    except ConnectionRefusedError:
+      LOGGER.info( 'Removing stale socket %s', path )
+      RemoveIfExists( path )
+
+
+class UnixSocketServerMixin:
+  """Serves the application over a Unix domain socket bound to |path| instead
+  of a TCP port. The socket file is only accessible to the current user."""
+
+  address_family = getattr( socket, 'AF_UNIX', None )
+
+  def __init__( self, app, path, **kwargs ):
+    self.unix_socket_path = path
+    self._socket_bound = False
+    super().__init__( app, host = 'localhost', port = 0, **kwargs )
+
+
+  def server_bind( self ):
+    self.server_address = self.unix_socket_path
+    _RemoveStaleUnixSocket( self.unix_socket_path )
+    old_umask = os.umask( 0o177 )
+    try:
+      # HTTPServer.server_bind expects a (host, port) address so skip it.
+      TCPServer.server_bind( self )
+    finally:
+      os.umask( old_umask )
+    self._socket_bound = True
+    self.server_name = 'localhost'
+    self.server_port = 0
+    self.setup_environ()
+
+
+  def get_request( self ):
+    request, _ = self.socket.accept()
+    # Clients of a Unix socket have no address but request handlers expect a
+    # (host, port) pair.
+    return request, ( 'localhost', 0 )
+
+
+  def server_close( self ):
+    super().server_close()
+    # Don't remove the socket of another server if binding failed.
+    if self._socket_bound:
+      RemoveIfExists( self.unix_socket_path )
+
+
+class UnixSocketStoppableWSGIServer( UnixSocketServerMixin,
+                                     StoppableWSGIServer ):
+  pass
+
+
+class UnixSocketPooledWSGIServer( UnixSocketServerMixin, PooledWSGIServer ):
+  pass